@@ -3,6 +3,7 @@ from __future__ import annotations
 from django.http import HttpResponseRedirect
 
 from apps.accounts.application.usecases.resolve_onboarding_state import resolve_onboarding_state
+from apps.tenants.routing import get_request_class, get_route_classifier
 
 
 class OnboardingFlowMiddleware:
@@ -11,7 +12,7 @@ class OnboardingFlowMiddleware:
 
     def __call__(self, request):
         user = getattr(request, "user", None)
-        if user and user.is_authenticated and self._should_guard(request.path):
+        if user and user.is_authenticated and get_request_class(request).onboarding_guarded:
             destination = resolve_onboarding_state(request)
             if destination and destination != request.path:
                 return HttpResponseRedirect(destination)
@@ -19,9 +20,4 @@ class OnboardingFlowMiddleware:
 
     @staticmethod
     def _should_guard(path: str) -> bool:
-        return (
-            path.startswith("/dashboard")
-            or path.startswith("/store/setup")
-            or path.startswith("/dashboard/setup")
-            or path.startswith("/store/create")
-        )
+        return get_route_classifier().classify(path).onboarding_guarded
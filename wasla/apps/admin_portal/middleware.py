@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from apps.tenants.routing import get_request_class
+
 
 class AdminPortalSecurityHeadersMiddleware:
     def __init__(self, get_response):
@@ -7,7 +9,7 @@ class AdminPortalSecurityHeadersMiddleware:
 
     def __call__(self, request):
         response = self.get_response(request)
-        if request.path.startswith("/admin-portal/"):
+        if get_request_class(request).is_admin_portal:
             response["X-Frame-Options"] = "DENY"
             response["Cache-Control"] = "no-store"
             response["Referrer-Policy"] = "same-origin"
@@ -1,31 +1,23 @@
 from __future__ import annotations
 
-from decimal import Decimal
-
 from django.db.models import Sum
 
 from apps.cart.models import Cart, CartItem
 from apps.analytics.models import Event
 from apps.catalog.models import Product
 from apps.orders.models import OrderItem, Order
+from apps.storefront.related import related_product_ids
 
 
 def recommend_for_product(*, tenant_id: int, product_id: int, limit: int = 8) -> list[int]:
-    product = Product.objects.filter(store_id=tenant_id, id=product_id).first()
-    if not product:
+    # Ranked ahead of time by the storefront related-items job; only the store scope is checked here.
+    related_ids = related_product_ids(product_id)
+    if not related_ids:
         return []
-
-    categories = list(product.categories.values_list("id", flat=True))
-    qs = Product.objects.filter(store_id=tenant_id, is_active=True).exclude(id=product.id)
-    if categories:
-        qs = qs.filter(categories__in=categories)
-
-    if product.price:
-        lower = product.price * Decimal("0.8")
-        upper = product.price * Decimal("1.2")
-        qs = qs.filter(price__gte=lower, price__lte=upper)
-
-    return list(qs.distinct().values_list("id", flat=True)[:limit])
+    active_ids = set(
+        Product.objects.filter(store_id=tenant_id, is_active=True, id__in=related_ids).values_list("id", flat=True)
+    )
+    return [pid for pid in related_ids if pid in active_ids][:limit]
 
 
 def recommend_for_cart(*, tenant_id: int, cart_id: int, limit: int = 8) -> list[int]:
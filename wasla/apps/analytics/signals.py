@@ -29,7 +29,7 @@ def track_order_completion(sender, instance: Order, created: bool, **kwargs):
     Track purchase_completed event when order status changes to completed/paid.
     """
     # Only track on status change to completed/paid
-    if instance.status in [Order.STATUS_COMPLETED, Order.STATUS_PAID]:
+    if instance.status in {"completed", "paid"}:
         # Calculate order value from items
         order_value = instance.total_amount or Decimal('0.00')
         item_count = instance.items.count()
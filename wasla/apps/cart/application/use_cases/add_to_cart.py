@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from decimal import Decimal
 
 from django.db import transaction
 
 from apps.cart.domain.dtos import CartSummary
 from apps.cart.domain.errors import CartError
-from apps.cart.domain.policies import ensure_positive_quantity
-from apps.cart.infrastructure.repositories import get_or_create_cart
+from apps.cart.domain.policies import ensure_positive_quantity, safe_decimal
+from apps.cart.infrastructure.hot_store import get_hot_cart_store
+from apps.cart.infrastructure.repositories import get_or_create_cart, record_cart_change
 from apps.catalog.models import Product
 from apps.catalog.services.variant_service import ProductVariantService, VariantPricingService
 from apps.tenants.domain.tenant_context import TenantContext
@@ -27,7 +29,6 @@ class AddToCartCommand:
 
 class AddToCartUseCase:
     @staticmethod
-    @transaction.atomic
     def execute(cmd: AddToCartCommand) -> CartSummary:
         quantity = ensure_positive_quantity(cmd.quantity)
         product = Product.objects.filter(
@@ -51,21 +52,24 @@ class AddToCartUseCase:
 
         unit_price = VariantPricingService.resolve_price(product=product, variant=variant)
 
-        cart = get_or_create_cart(cmd.tenant_ctx)
-        item = cart.items.filter(product_id=product.id, variant_id=(variant.id if variant else None)).first()
-        if item:
-            item.quantity = item.quantity + quantity
-            item.unit_price_snapshot = unit_price
-            item.save(update_fields=["quantity", "unit_price_snapshot"])
+        store = get_hot_cart_store()
+        hot = None
+        if store is not None:
+            hot = store.add_item(
+                cmd.tenant_ctx,
+                product=product,
+                variant=variant,
+                quantity=quantity,
+                unit_price=unit_price,
+            )
         else:
-            cart.items.create(
+            AddToCartUseCase._add_to_db_cart(
+                cmd,
                 product=product,
                 variant=variant,
                 quantity=quantity,
-                unit_price_snapshot=unit_price,
+                unit_price=unit_price,
             )
-        cart.currency = cmd.tenant_ctx.currency or cart.currency
-        cart.save(update_fields=["currency", "updated_at"])
         TelemetryService.track(
             event_name="cart.item_added",
             tenant_ctx=cmd.tenant_ctx,
@@ -73,4 +77,31 @@ class AddToCartUseCase:
             object_ref=ObjectRef(object_type="PRODUCT", object_id=product.id),
             properties={"quantity": quantity},
         )
+        if hot is not None:
+            return GetCartUseCase.summarize_hot(store, cmd.tenant_ctx, hot)
         return GetCartUseCase.execute(cmd.tenant_ctx)
+
+    @staticmethod
+    @transaction.atomic
+    def _add_to_db_cart(cmd: AddToCartCommand, *, product, variant, quantity: int, unit_price) -> None:
+        cart = get_or_create_cart(cmd.tenant_ctx)
+        item = cart.items.filter(product_id=product.id, variant_id=(variant.id if variant else None)).first()
+        if item:
+            previous_total = safe_decimal(item.unit_price_snapshot) * item.quantity
+            item.quantity = item.quantity + quantity
+            item.unit_price_snapshot = unit_price
+            item.save(update_fields=["quantity", "unit_price_snapshot"])
+        else:
+            previous_total = Decimal("0")
+            item = cart.items.create(
+                product=product,
+                variant=variant,
+                quantity=quantity,
+                unit_price_snapshot=unit_price,
+            )
+        record_cart_change(
+            cart.id,
+            subtotal_delta=unit_price * item.quantity - previous_total,
+            count_delta=quantity,
+            currency=cmd.tenant_ctx.currency or cart.currency,
+        )
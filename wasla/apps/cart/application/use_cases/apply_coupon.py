@@ -7,7 +7,8 @@ from django.db import transaction
 
 from apps.cart.domain.errors import CartError
 from apps.cart.domain.policies import safe_decimal
-from apps.cart.infrastructure.repositories import get_or_create_cart, list_cart_items
+from apps.cart.infrastructure.hot_store import get_hot_cart_store
+from apps.cart.infrastructure.repositories import get_or_create_cart, list_cart_items, record_cart_change
 from apps.coupons.models import Coupon
 from apps.coupons.services import CouponValidationService
 from apps.tenants.domain.tenant_context import TenantContext
@@ -23,12 +24,27 @@ class ApplyCouponCommand:
 
 class ApplyCouponUseCase:
     @staticmethod
-    @transaction.atomic
     def execute(cmd: ApplyCouponCommand):
         code = (cmd.coupon_code or "").strip()
         if not code:
             raise CartError("Coupon code is required.")
 
+        store = get_hot_cart_store()
+        if store is not None:
+            hot = store.load(cmd.tenant_ctx)
+            if not hot or not hot.lines:
+                raise CartError("Cart is empty.")
+            subtotal = sum((line.unit_price * line.quantity for line in hot.lines), Decimal("0"))
+            coupon, discount = _resolve_coupon(cmd.tenant_ctx, code, subtotal)
+            store.set_coupon(hot, code=coupon.code, discount_amount=discount)
+            return GetCartUseCase.summarize_hot(store, cmd.tenant_ctx, hot)
+
+        ApplyCouponUseCase._apply_to_db_cart(cmd, code)
+        return GetCartUseCase.execute(cmd.tenant_ctx)
+
+    @staticmethod
+    @transaction.atomic
+    def _apply_to_db_cart(cmd: ApplyCouponCommand, code: str) -> None:
         cart = get_or_create_cart(cmd.tenant_ctx)
         items = list_cart_items(cart)
         if not items:
@@ -38,30 +54,31 @@ class ApplyCouponUseCase:
         for item in items:
             subtotal += safe_decimal(item.unit_price_snapshot) * item.quantity
 
-        coupon = Coupon.objects.filter(
-            store_id=cmd.tenant_ctx.store_id,
-            code__iexact=code,
-            is_active=True,
-        ).first()
-        if not coupon:
-            raise CartError("Invalid coupon code.")
-
-        is_valid, message = CouponValidationService().validate_coupon(
-            coupon,
-            customer=None,
-            subtotal=subtotal,
-        )
-        if not is_valid:
-            raise CartError(message or "Coupon not valid.")
-
-        discount = safe_decimal(coupon.calculate_discount(subtotal))
-        if discount <= 0:
-            raise CartError("Coupon does not apply to this cart.")
-
-        cart.applied_coupon_code = coupon.code
-        cart.discount_amount = discount
-        cart.save(update_fields=["applied_coupon_code", "discount_amount", "updated_at"])
-        return GetCartUseCase.execute(cmd.tenant_ctx)
+        coupon, discount = _resolve_coupon(cmd.tenant_ctx, code, subtotal)
+        record_cart_change(cart.id, applied_coupon_code=coupon.code, discount_amount=discount)
+
+
+def _resolve_coupon(tenant_ctx: TenantContext, code: str, subtotal: Decimal) -> tuple[Coupon, Decimal]:
+    coupon = Coupon.objects.filter(
+        store_id=tenant_ctx.store_id,
+        code__iexact=code,
+        is_active=True,
+    ).first()
+    if not coupon:
+        raise CartError("Invalid coupon code.")
+
+    is_valid, message = CouponValidationService().validate_coupon(
+        coupon,
+        customer=None,
+        subtotal=subtotal,
+    )
+    if not is_valid:
+        raise CartError(message or "Coupon not valid.")
+
+    discount = safe_decimal(coupon.calculate_discount(subtotal))
+    if discount <= 0:
+        raise CartError("Coupon does not apply to this cart.")
+    return coupon, discount
 
 
 @dataclass(frozen=True)
@@ -71,11 +88,19 @@ class RemoveCouponCommand:
 
 class RemoveCouponUseCase:
     @staticmethod
-    @transaction.atomic
     def execute(cmd: RemoveCouponCommand):
-        cart = get_or_create_cart(cmd.tenant_ctx)
-        cart.applied_coupon_code = ""
-        cart.discount_amount = Decimal("0")
-        cart.save(update_fields=["applied_coupon_code", "discount_amount", "updated_at"])
+        store = get_hot_cart_store()
+        if store is not None:
+            hot = store.load(cmd.tenant_ctx)
+            if hot is not None and hot.cart_id is not None:
+                store.set_coupon(hot, code="", discount_amount=Decimal("0"))
+                return GetCartUseCase.summarize_hot(store, cmd.tenant_ctx, hot)
+
+        RemoveCouponUseCase._remove_from_db_cart(cmd)
         return GetCartUseCase.execute(cmd.tenant_ctx)
 
+    @staticmethod
+    @transaction.atomic
+    def _remove_from_db_cart(cmd: RemoveCouponCommand) -> None:
+        cart = get_or_create_cart(cmd.tenant_ctx)
+        record_cart_change(cart.id, applied_coupon_code="", discount_amount=Decimal("0"))
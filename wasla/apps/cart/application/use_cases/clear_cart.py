@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from decimal import Decimal
 
 from django.db import transaction
 
 from apps.cart.domain.errors import CartNotFoundError
 from apps.cart.domain.policies import assert_cart_access
-from apps.cart.infrastructure.repositories import find_cart
+from apps.cart.infrastructure.hot_store import get_hot_cart_store
+from apps.cart.infrastructure.repositories import find_cart, record_cart_change
 from apps.tenants.domain.tenant_context import TenantContext
 
 
@@ -17,10 +19,22 @@ class ClearCartCommand:
 
 class ClearCartUseCase:
     @staticmethod
-    @transaction.atomic
     def execute(cmd: ClearCartCommand) -> None:
+        store = get_hot_cart_store()
+        if store is not None:
+            hot = store.load(cmd.tenant_ctx)
+            if not hot or hot.cart_id is None:
+                raise CartNotFoundError("Cart not found.")
+            store.clear(hot)
+            return
+        ClearCartUseCase._clear_db_cart(cmd)
+
+    @staticmethod
+    @transaction.atomic
+    def _clear_db_cart(cmd: ClearCartCommand) -> None:
         cart = find_cart(cmd.tenant_ctx)
         if not cart:
             raise CartNotFoundError("Cart not found.")
         assert_cart_access(cart, cmd.tenant_ctx)
         cart.items.all().delete()
+        record_cart_change(cart.id, subtotal=Decimal("0"), item_count=0)
@@ -1,14 +1,26 @@
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
 from decimal import Decimal
 
+from django.core.cache import cache
+
 from apps.cart.domain.dtos import CartItemDTO, CartSummary
 from apps.cart.domain.policies import safe_decimal
-from apps.cart.infrastructure.repositories import find_cart, list_cart_items
+from apps.cart.infrastructure.hot_store import HotCart, HotCartStore, get_hot_cart_store
+from apps.cart.infrastructure.repositories import find_cart, list_cart_items, record_cart_change
+from apps.cart.models import Cart
 from apps.tenants.domain.tenant_context import TenantContext
 from apps.coupons.models import Coupon
 from apps.coupons.services import CouponValidationService
+from core.infrastructure.store_cache import StoreCacheService
+
+
+# Coupon changes bump this store namespace, invalidating every cart summary
+# (and hot-cart coupon check) that depended on the previous coupon state.
+COUPON_NAMESPACE = "coupons"
+SUMMARY_CACHE_TIMEOUT = 3600
 
 
 @dataclass(frozen=True)
@@ -17,26 +29,41 @@ class GetCartCommand:
 
 
 class GetCartUseCase:
+    """
+    Build the cart summary shown on every storefront page.
+
+    Summaries are cached per cart version, so page views between two cart
+    changes cost one cart lookup and no item or coupon queries. The coupon is
+    revalidated only when the cart version or the store's coupon namespace
+    changed, or the coupon has reached its end date since the last check.
+    """
+
     @staticmethod
     def execute(tenant_ctx: TenantContext) -> CartSummary:
+        store = get_hot_cart_store()
+        if store is not None:
+            hot = store.load(tenant_ctx)
+            if hot is not None:
+                return GetCartUseCase.summarize_hot(store, tenant_ctx, hot)
+
         cart = find_cart(tenant_ctx)
         if not cart:
-            return CartSummary(
-                cart_id=None,
-                currency=tenant_ctx.currency or "SAR",
-                items=[],
-                subtotal=Decimal("0"),
-                discount_amount=Decimal("0"),
-                coupon_code=None,
-                total=Decimal("0"),
-            )
+            return _empty_summary(tenant_ctx)
+
+        cached = cache.get(_summary_key(cart, cart.version))
+        if cached is not None:
+            summary, valid_until = cached
+            if valid_until is None or valid_until > time.time():
+                return summary
 
         items = []
         subtotal = Decimal("0")
+        item_count = 0
         for item in list_cart_items(cart):
             unit_price = safe_decimal(item.unit_price_snapshot)
             line_total = unit_price * item.quantity
             subtotal += line_total
+            item_count += item.quantity
             items.append(
                 CartItemDTO(
                     id=item.id,
@@ -49,36 +76,24 @@ class GetCartUseCase:
                     line_total=line_total,
                 )
             )
-        # Coupon revalidation to keep totals accurate when cart changes.
-        coupon_code = (cart.applied_coupon_code or "").strip()
-        discount_amount = Decimal("0")
-        if coupon_code:
-            coupon = Coupon.objects.filter(
-                store_id=tenant_ctx.store_id,
-                code__iexact=coupon_code,
-                is_active=True,
-            ).first()
-            if coupon:
-                is_valid, _ = CouponValidationService().validate_coupon(
-                    coupon,
-                    customer=None,
-                    subtotal=subtotal,
-                )
-                if is_valid:
-                    discount_amount = safe_decimal(coupon.calculate_discount(subtotal))
-                else:
-                    coupon_code = ""
-            else:
-                coupon_code = ""
+        coupon_code, discount_amount, valid_until = _revalidate_coupon(
+            tenant_ctx, cart.applied_coupon_code, subtotal
+        )
 
         # Sync cart fields if needed
+        changes = {}
         if coupon_code != (cart.applied_coupon_code or "") or discount_amount != safe_decimal(cart.discount_amount):
-            cart.applied_coupon_code = coupon_code
-            cart.discount_amount = discount_amount
-            cart.save(update_fields=["applied_coupon_code", "discount_amount", "updated_at"])
+            changes.update(applied_coupon_code=coupon_code, discount_amount=discount_amount)
+        if subtotal != safe_decimal(cart.subtotal) or item_count != cart.item_count:
+            # Items were changed outside the cart use cases (or predate the running totals).
+            changes.update(subtotal=subtotal, item_count=item_count)
+        version = cart.version
+        if changes:
+            record_cart_change(cart.id, **changes)
+            version += 1
 
         total = max(Decimal("0"), subtotal - discount_amount)
-        return CartSummary(
+        summary = CartSummary(
             cart_id=cart.id,
             currency=cart.currency,
             items=items,
@@ -86,4 +101,102 @@ class GetCartUseCase:
             discount_amount=discount_amount,
             coupon_code=coupon_code or None,
             total=total,
+            item_count=item_count,
+        )
+        cache.set(_summary_key(cart, version), (summary, valid_until), timeout=SUMMARY_CACHE_TIMEOUT)
+        return summary
+
+    @staticmethod
+    def summarize_hot(store: HotCartStore, tenant_ctx: TenantContext, hot: HotCart) -> CartSummary:
+        if hot.cart_id is None and not hot.lines:
+            return _empty_summary(tenant_ctx)
+
+        items = []
+        subtotal = Decimal("0")
+        item_count = 0
+        for line in hot.lines:
+            line_total = line.unit_price * line.quantity
+            subtotal += line_total
+            item_count += line.quantity
+            items.append(
+                CartItemDTO(
+                    id=line.id,
+                    product_id=line.product_id,
+                    variant_id=line.variant_id,
+                    variant_sku=line.variant_sku,
+                    name=line.name,
+                    quantity=line.quantity,
+                    unit_price=line.unit_price,
+                    line_total=line_total,
+                )
+            )
+        if hot.coupon_code:
+            namespace_version = StoreCacheService.get_namespace_version(
+                store_id=tenant_ctx.store_id, namespace=COUPON_NAMESPACE
+            )
+            if not store.coupon_check_current(hot, namespace_version=namespace_version):
+                coupon_code, discount_amount, valid_until = _revalidate_coupon(tenant_ctx, hot.coupon_code, subtotal)
+                store.record_coupon_check(
+                    hot,
+                    code=coupon_code,
+                    discount_amount=discount_amount,
+                    namespace_version=namespace_version,
+                    valid_until=valid_until,
+                )
+
+        total = max(Decimal("0"), subtotal - hot.discount_amount)
+        return CartSummary(
+            cart_id=hot.cart_id,
+            currency=hot.currency,
+            items=items,
+            subtotal=subtotal,
+            discount_amount=hot.discount_amount,
+            coupon_code=hot.coupon_code or None,
+            total=total,
+            item_count=item_count,
         )
+
+
+def _summary_key(cart: Cart, version: int) -> str:
+    # The creation time guards against reused ids (SQLite, recreated carts).
+    return StoreCacheService.build_key(
+        store_id=cart.store_id,
+        namespace=COUPON_NAMESPACE,
+        key_parts=["cart_summary", cart.id, int(cart.created_at.timestamp() * 1_000_000), version],
+    )
+
+
+def _empty_summary(tenant_ctx: TenantContext) -> CartSummary:
+    return CartSummary(
+        cart_id=None,
+        currency=tenant_ctx.currency or "SAR",
+        items=[],
+        subtotal=Decimal("0"),
+        discount_amount=Decimal("0"),
+        coupon_code=None,
+        total=Decimal("0"),
+    )
+
+
+def _revalidate_coupon(
+    tenant_ctx: TenantContext, code: str | None, subtotal: Decimal
+) -> tuple[str, Decimal, float | None]:
+    """Return the coupon code and discount still valid for `subtotal`, and when that check expires."""
+    coupon_code = (code or "").strip()
+    if not coupon_code:
+        return "", Decimal("0"), None
+    coupon = Coupon.objects.filter(
+        store_id=tenant_ctx.store_id,
+        code__iexact=coupon_code,
+        is_active=True,
+    ).first()
+    if not coupon:
+        return "", Decimal("0"), None
+    is_valid, _ = CouponValidationService().validate_coupon(
+        coupon,
+        customer=None,
+        subtotal=subtotal,
+    )
+    if not is_valid:
+        return "", Decimal("0"), None
+    return coupon_code, safe_decimal(coupon.calculate_discount(subtotal)), coupon.end_date.timestamp()
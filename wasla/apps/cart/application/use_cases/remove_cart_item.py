@@ -5,8 +5,9 @@ from dataclasses import dataclass
 from django.db import transaction
 
 from apps.cart.domain.errors import CartNotFoundError
-from apps.cart.domain.policies import assert_cart_access
-from apps.cart.infrastructure.repositories import find_cart
+from apps.cart.domain.policies import assert_cart_access, safe_decimal
+from apps.cart.infrastructure.hot_store import get_hot_cart_store
+from apps.cart.infrastructure.repositories import find_cart, record_cart_change
 from apps.tenants.domain.tenant_context import TenantContext
 from apps.analytics.application.telemetry import TelemetryService, actor_from_tenant_ctx
 from apps.analytics.domain.types import ObjectRef
@@ -22,8 +23,25 @@ class RemoveCartItemCommand:
 
 class RemoveCartItemUseCase:
     @staticmethod
-    @transaction.atomic
     def execute(cmd: RemoveCartItemCommand):
+        store = get_hot_cart_store()
+        if store is not None:
+            hot = store.load(cmd.tenant_ctx)
+            if not hot or hot.cart_id is None:
+                raise CartNotFoundError("Cart not found.")
+            line = hot.find_line(cmd.item_id)
+            if not line:
+                raise CartNotFoundError("Cart item not found.")
+            store.remove_line(hot, line)
+            _track_removed(cmd, product_id=line.product_id, quantity=line.quantity)
+            return GetCartUseCase.summarize_hot(store, cmd.tenant_ctx, hot)
+
+        RemoveCartItemUseCase._remove_db_item(cmd)
+        return GetCartUseCase.execute(cmd.tenant_ctx)
+
+    @staticmethod
+    @transaction.atomic
+    def _remove_db_item(cmd: RemoveCartItemCommand) -> None:
         cart = find_cart(cmd.tenant_ctx)
         if not cart:
             raise CartNotFoundError("Cart not found.")
@@ -32,12 +50,20 @@ class RemoveCartItemUseCase:
         item = cart.items.filter(id=cmd.item_id).first()
         if not item:
             raise CartNotFoundError("Cart item not found.")
-        TelemetryService.track(
-            event_name="cart.item_removed",
-            tenant_ctx=cmd.tenant_ctx,
-            actor_ctx=actor_from_tenant_ctx(tenant_ctx=cmd.tenant_ctx, actor_type="CUSTOMER"),
-            object_ref=ObjectRef(object_type="PRODUCT", object_id=item.product_id),
-            properties={"quantity": item.quantity},
-        )
+        _track_removed(cmd, product_id=item.product_id, quantity=item.quantity)
         item.delete()
-        return GetCartUseCase.execute(cmd.tenant_ctx)
+        record_cart_change(
+            cart.id,
+            subtotal_delta=-safe_decimal(item.unit_price_snapshot) * item.quantity,
+            count_delta=-item.quantity,
+        )
+
+
+def _track_removed(cmd: RemoveCartItemCommand, *, product_id: int, quantity: int) -> None:
+    TelemetryService.track(
+        event_name="cart.item_removed",
+        tenant_ctx=cmd.tenant_ctx,
+        actor_ctx=actor_from_tenant_ctx(tenant_ctx=cmd.tenant_ctx, actor_type="CUSTOMER"),
+        object_ref=ObjectRef(object_type="PRODUCT", object_id=product_id),
+        properties={"quantity": quantity},
+    )
@@ -5,8 +5,9 @@ from dataclasses import dataclass
 from django.db import transaction
 
 from apps.cart.domain.errors import CartNotFoundError
-from apps.cart.domain.policies import assert_cart_access, ensure_positive_quantity
-from apps.cart.infrastructure.repositories import find_cart
+from apps.cart.domain.policies import assert_cart_access, ensure_positive_quantity, safe_decimal
+from apps.cart.infrastructure.hot_store import get_hot_cart_store
+from apps.cart.infrastructure.repositories import find_cart, record_cart_change
 from apps.tenants.domain.tenant_context import TenantContext
 
 from .get_cart import GetCartUseCase
@@ -21,9 +22,25 @@ class UpdateCartItemCommand:
 
 class UpdateCartItemUseCase:
     @staticmethod
-    @transaction.atomic
     def execute(cmd: UpdateCartItemCommand):
         quantity = ensure_positive_quantity(cmd.quantity)
+        store = get_hot_cart_store()
+        if store is not None:
+            hot = store.load(cmd.tenant_ctx)
+            if not hot or hot.cart_id is None:
+                raise CartNotFoundError("Cart not found.")
+            line = hot.find_line(cmd.item_id)
+            if not line:
+                raise CartNotFoundError("Cart item not found.")
+            store.update_quantity(hot, line, quantity)
+            return GetCartUseCase.summarize_hot(store, cmd.tenant_ctx, hot)
+
+        UpdateCartItemUseCase._update_db_item(cmd, quantity)
+        return GetCartUseCase.execute(cmd.tenant_ctx)
+
+    @staticmethod
+    @transaction.atomic
+    def _update_db_item(cmd: UpdateCartItemCommand, quantity: int) -> None:
         cart = find_cart(cmd.tenant_ctx)
         if not cart:
             raise CartNotFoundError("Cart not found.")
@@ -32,6 +49,11 @@ class UpdateCartItemUseCase:
         item = cart.items.filter(id=cmd.item_id).first()
         if not item:
             raise CartNotFoundError("Cart item not found.")
+        change = quantity - item.quantity
         item.quantity = quantity
         item.save(update_fields=["quantity"])
-        return GetCartUseCase.execute(cmd.tenant_ctx)
+        record_cart_change(
+            cart.id,
+            subtotal_delta=safe_decimal(item.unit_price_snapshot) * change,
+            count_delta=change,
+        )
@@ -26,3 +26,4 @@ class CartSummary:
     discount_amount: Decimal
     coupon_code: str | None
     total: Decimal
+    item_count: int = 0
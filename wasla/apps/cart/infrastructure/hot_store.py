@@ -0,0 +1,538 @@
+"""
+Hot cart store: active carts kept in Redis with write-behind to the database.
+
+- Each cart is one hash keyed by store and owner (user id or session key):
+  scalar fields (`cart`, `cur`, `cpn`, `disc`, `t`, `v`, `seq`, `o`, `cc`, `cx`) plus one
+  compact JSON field per line (`l:<line id>`), so a click rewrites only the
+  fields it changed.
+- Writes bump `v` and record the cart in a dirty index (a sorted set scored by
+  last activity). `Cart`/`CartItem` rows are brought up to date on checkout
+  start, by the periodic idle flush and before abandoned-cart processing; the
+  database stays the source of truth for both.
+- A cart missing from the store is seeded from its `Cart` row, and line ids
+  of seeded carts are the `CartItem` ids, so existing item ids keep working.
+- `CART_HOT_STORE` selects the backend: "redis", "cache" (any Django cache;
+  only coherent within one process) or "off". "auto" uses Redis whenever
+  `CACHE_USE_REDIS` is on and the database otherwise.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models import F
+from django.dispatch import receiver
+
+from apps.cart.domain.policies import safe_decimal
+from apps.cart.infrastructure.repositories import find_cart, get_or_create_cart, list_cart_items
+from apps.cart.models import Cart, CartItem
+from apps.tenants.domain.tenant_context import TenantContext
+
+
+logger = logging.getLogger(__name__)
+
+LINE_PREFIX = "l:"
+
+
+@dataclass
+class HotCartLine:
+    id: int
+    product_id: int
+    variant_id: int | None
+    quantity: int
+    unit_price: Decimal
+    name: str = ""
+    variant_sku: str = ""
+
+    def encode(self) -> str:
+        return json.dumps(
+            [self.product_id, self.variant_id, self.quantity, str(self.unit_price), self.name, self.variant_sku],
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+
+    @classmethod
+    def decode(cls, line_id: int, raw: str) -> "HotCartLine":
+        product_id, variant_id, quantity, unit_price, name, variant_sku = json.loads(raw)
+        return cls(
+            id=line_id,
+            product_id=int(product_id),
+            variant_id=int(variant_id) if variant_id else None,
+            quantity=int(quantity),
+            unit_price=safe_decimal(unit_price),
+            name=name or "",
+            variant_sku=variant_sku or "",
+        )
+
+
+@dataclass
+class HotCart:
+    key: str
+    cart_id: int | None
+    currency: str
+    coupon_code: str = ""
+    discount_amount: Decimal = Decimal("0")
+    lines: list[HotCartLine] = field(default_factory=list)
+    version: str = ""
+    touched_at: float | None = None
+    # "<cart version>:<coupon namespace version>" of the last coupon check.
+    coupon_stamp: str = ""
+    coupon_valid_until: float | None = None
+
+    def find_line(self, line_id: int) -> HotCartLine | None:
+        return next((line for line in self.lines if line.id == line_id), None)
+
+    def find_product_line(self, product_id: int, variant_id: int | None) -> HotCartLine | None:
+        return next(
+            (line for line in self.lines if line.product_id == product_id and line.variant_id == variant_id),
+            None,
+        )
+
+
+class CacheHotCartBackend:
+    """Hot cart hashes stored as dicts on the Django cache (single process only)."""
+
+    def __init__(self, *, ttl: int, key_prefix: str = "cart") -> None:
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+        self.dirty_key = f"{key_prefix}:dirty"
+
+    def load(self, key: str) -> dict[str, str]:
+        return dict(cache.get(key) or {})
+
+    def save(
+        self,
+        key: str,
+        *,
+        fields: dict[str, str],
+        removed: Iterable[str] = (),
+        touched: float | None = None,
+    ) -> None:
+        data = self.load(key)
+        data.update(fields)
+        for name in removed:
+            data.pop(name, None)
+        if touched is not None:
+            data["v"] = str(int(data.get("v") or 0) + 1)
+            dirty = cache.get(self.dirty_key) or {}
+            dirty[key] = touched
+            cache.set(self.dirty_key, dirty, timeout=None)
+        cache.set(key, data, timeout=self.ttl)
+
+    def incr(self, key: str, name: str) -> int:
+        data = self.load(key)
+        value = int(data.get(name) or 0) + 1
+        data[name] = str(value)
+        cache.set(key, data, timeout=self.ttl)
+        return value
+
+    def dirty_keys(self, *, idle_before: float, limit: int) -> list[str]:
+        dirty = cache.get(self.dirty_key) or {}
+        ordered = sorted((score, key) for key, score in dirty.items() if score <= idle_before)
+        return [key for _, key in ordered[:limit]]
+
+    def mark_clean(self, key: str, version: str) -> None:
+        dirty = cache.get(self.dirty_key) or {}
+        if key not in dirty:
+            return
+        current = self.load(key)
+        if current and current.get("v", "") != version:
+            return
+        dirty.pop(key, None)
+        cache.set(self.dirty_key, dirty, timeout=None)
+
+
+_MARK_CLEAN_LUA = """
+local version = redis.call('HGET', KEYS[2], 'v')
+if (not version) or version == ARGV[2] then
+  return redis.call('ZREM', KEYS[1], ARGV[1])
+end
+return 0
+"""
+
+
+class RedisHotCartBackend(CacheHotCartBackend):
+    """Same layout as native Redis hashes; every write is one pipelined round trip."""
+
+    def __init__(self, connection, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.connection = connection
+        self._mark_clean = connection.register_script(_MARK_CLEAN_LUA)
+
+    @staticmethod
+    def _text(value) -> str:
+        return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+    def load(self, key: str) -> dict[str, str]:
+        raw = self.connection.hgetall(key)
+        return {self._text(name): self._text(value) for name, value in raw.items()}
+
+    def save(
+        self,
+        key: str,
+        *,
+        fields: dict[str, str],
+        removed: Iterable[str] = (),
+        touched: float | None = None,
+    ) -> None:
+        removed = list(removed)
+        pipe = self.connection.pipeline(transaction=True)
+        if fields:
+            pipe.hset(key, mapping=fields)
+        if removed:
+            pipe.hdel(key, *removed)
+        if touched is not None:
+            pipe.hincrby(key, "v", 1)
+            pipe.zadd(self.dirty_key, {key: touched})
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def incr(self, key: str, name: str) -> int:
+        return int(self.connection.hincrby(key, name, 1))
+
+    def dirty_keys(self, *, idle_before: float, limit: int) -> list[str]:
+        return [self._text(key) for key in self.connection.zrangebyscore(self.dirty_key, "-inf", idle_before, 0, limit)]
+
+    def mark_clean(self, key: str, version: str) -> None:
+        self._mark_clean(keys=[self.dirty_key, key], args=[key, version])
+
+
+class HotCartStore:
+    def __init__(self, backend: CacheHotCartBackend, *, key_prefix: str = "cart") -> None:
+        self.backend = backend
+        self.key_prefix = key_prefix
+
+    def key_for(self, tenant_ctx: TenantContext) -> str | None:
+        if tenant_ctx.user_id:
+            return f"{self.key_prefix}:{tenant_ctx.store_id}:u{tenant_ctx.user_id}"
+        if tenant_ctx.session_key:
+            return f"{self.key_prefix}:{tenant_ctx.store_id}:s{tenant_ctx.session_key}"
+        return None
+
+    # -- reads -------------------------------------------------------------
+
+    def load(self, tenant_ctx: TenantContext) -> HotCart | None:
+        key = self.key_for(tenant_ctx)
+        if key is None:
+            return None
+        raw = self.backend.load(key)
+        if raw:
+            return self._decode(key, raw)
+        cart = find_cart(tenant_ctx)
+        if not cart:
+            return HotCart(key=key, cart_id=None, currency=tenant_ctx.currency or "SAR")
+        return self._seed(key, tenant_ctx, cart)
+
+    def _decode(self, key: str, raw: dict[str, str]) -> HotCart:
+        lines = [
+            HotCartLine.decode(int(name[len(LINE_PREFIX):]), value)
+            for name, value in raw.items()
+            if name.startswith(LINE_PREFIX)
+        ]
+        lines.sort(key=lambda line: line.id)
+        return HotCart(
+            key=key,
+            cart_id=int(raw["cart"]) if raw.get("cart") else None,
+            currency=raw.get("cur") or "SAR",
+            coupon_code=raw.get("cpn", ""),
+            discount_amount=safe_decimal(raw.get("disc")),
+            lines=lines,
+            version=raw.get("v", ""),
+            touched_at=float(raw["t"]) if raw.get("t") else None,
+            coupon_stamp=raw.get("cc", ""),
+            coupon_valid_until=float(raw["cx"]) if raw.get("cx") else None,
+        )
+
+    def _seed(self, key: str, tenant_ctx: TenantContext, cart: Cart) -> HotCart:
+        hot = HotCart(
+            key=key,
+            cart_id=cart.id,
+            currency=cart.currency,
+            coupon_code=cart.applied_coupon_code or "",
+            discount_amount=safe_decimal(cart.discount_amount),
+            lines=[
+                HotCartLine(
+                    id=item.id,
+                    product_id=item.product_id,
+                    variant_id=item.variant_id,
+                    quantity=item.quantity,
+                    unit_price=safe_decimal(item.unit_price_snapshot),
+                    name=getattr(item.product, "name", ""),
+                    variant_sku=getattr(item.variant, "sku", ""),
+                )
+                for item in list_cart_items(cart)
+            ],
+        )
+        fields = self._scalar_fields(hot)
+        fields["o"] = self._owner(tenant_ctx)
+        fields["seq"] = str(max((line.id for line in hot.lines), default=0))
+        fields.update({f"{LINE_PREFIX}{line.id}": line.encode() for line in hot.lines})
+        self.backend.save(key, fields=fields)
+        return hot
+
+    @staticmethod
+    def _scalar_fields(hot: HotCart) -> dict[str, str]:
+        return {
+            "cart": str(hot.cart_id or ""),
+            "cur": hot.currency,
+            "cpn": hot.coupon_code,
+            "disc": str(hot.discount_amount),
+        }
+
+    @staticmethod
+    def _owner(tenant_ctx: TenantContext) -> str:
+        return json.dumps([tenant_ctx.store_id, tenant_ctx.user_id, tenant_ctx.session_key])
+
+    # -- writes ------------------------------------------------------------
+
+    def _touch(self, hot: HotCart, fields: dict[str, str], removed: Iterable[str] = ()) -> None:
+        hot.touched_at = time.time()
+        hot.version = _next_version(hot.version)
+        fields["t"] = repr(hot.touched_at)
+        self.backend.save(hot.key, fields=fields, removed=removed, touched=hot.touched_at)
+
+    def add_item(
+        self,
+        tenant_ctx: TenantContext,
+        *,
+        product,
+        variant,
+        quantity: int,
+        unit_price: Decimal,
+    ) -> HotCart:
+        hot = self.load(tenant_ctx)
+        if hot is None:
+            raise ValueError("Session key is required for guest cart.")
+        fields: dict[str, str] = {}
+        if hot.cart_id is None:
+            # The row is created once so the cart id stays stable for clients
+            # and checkout; items follow on the next flush.
+            hot.cart_id = get_or_create_cart(tenant_ctx).id
+            fields.update(self._scalar_fields(hot))
+            fields["o"] = self._owner(tenant_ctx)
+        hot.currency = tenant_ctx.currency or hot.currency
+        fields["cur"] = hot.currency
+
+        variant_id = variant.id if variant else None
+        line = hot.find_product_line(product.id, variant_id)
+        if line:
+            line.quantity += quantity
+            line.unit_price = unit_price
+        else:
+            line = HotCartLine(
+                id=self.backend.incr(hot.key, "seq"),
+                product_id=product.id,
+                variant_id=variant_id,
+                quantity=quantity,
+                unit_price=unit_price,
+                name=product.name,
+                variant_sku=getattr(variant, "sku", ""),
+            )
+            hot.lines.append(line)
+        fields[f"{LINE_PREFIX}{line.id}"] = line.encode()
+        self._touch(hot, fields)
+        return hot
+
+    def update_quantity(self, hot: HotCart, line: HotCartLine, quantity: int) -> None:
+        line.quantity = quantity
+        self._touch(hot, {f"{LINE_PREFIX}{line.id}": line.encode()})
+
+    def remove_line(self, hot: HotCart, line: HotCartLine) -> None:
+        hot.lines.remove(line)
+        self._touch(hot, {}, removed=[f"{LINE_PREFIX}{line.id}"])
+
+    def clear(self, hot: HotCart) -> None:
+        removed = [f"{LINE_PREFIX}{line.id}" for line in hot.lines]
+        hot.lines = []
+        self._touch(hot, {}, removed=removed)
+
+    def set_coupon(self, hot: HotCart, *, code: str, discount_amount: Decimal) -> None:
+        hot.coupon_code = code
+        hot.discount_amount = discount_amount
+        self._touch(hot, {"cpn": code, "disc": str(discount_amount)})
+
+    @staticmethod
+    def coupon_check_current(hot: HotCart, *, namespace_version: int) -> bool:
+        if hot.coupon_stamp != f"{hot.version}:{namespace_version}":
+            return False
+        return hot.coupon_valid_until is None or hot.coupon_valid_until > time.time()
+
+    def record_coupon_check(
+        self,
+        hot: HotCart,
+        *,
+        code: str,
+        discount_amount: Decimal,
+        namespace_version: int,
+        valid_until: float | None,
+    ) -> None:
+        fields = {"cx": repr(valid_until) if valid_until else ""}
+        touched = None
+        if code != hot.coupon_code or discount_amount != hot.discount_amount:
+            # Derived change: written back like any other, but it is not
+            # customer activity, so the last-activity time is kept.
+            hot.coupon_code = code
+            hot.discount_amount = discount_amount
+            hot.version = _next_version(hot.version)
+            fields.update(cpn=code, disc=str(discount_amount))
+            touched = hot.touched_at or time.time()
+        hot.coupon_stamp = f"{hot.version}:{namespace_version}"
+        hot.coupon_valid_until = valid_until
+        fields["cc"] = hot.coupon_stamp
+        self.backend.save(hot.key, fields=fields, touched=touched)
+
+    # -- write-behind ------------------------------------------------------
+
+    def persist(self, key: str) -> int | None:
+        """Write the hot cart under `key` to `Cart`/`CartItem`; returns the cart id."""
+        raw = self.backend.load(key)
+        if not raw or not raw.get("o"):
+            self.backend.mark_clean(key, raw.get("v", "") if raw else "")
+            return None
+        hot = self._decode(key, raw)
+        store_id, user_id, session_key = json.loads(raw["o"])
+        owner = TenantContext(
+            tenant_id=store_id,
+            store_id=store_id,
+            currency=hot.currency,
+            user_id=user_id,
+            session_key=session_key,
+        )
+        with transaction.atomic():
+            cart = Cart.objects.select_for_update().filter(pk=hot.cart_id, store_id=store_id).first()
+            if cart is None:
+                cart = get_or_create_cart(owner)
+            self._sync_items(cart, hot.lines)
+            updates = {
+                "currency": hot.currency,
+                "applied_coupon_code": hot.coupon_code,
+                "discount_amount": hot.discount_amount,
+                "subtotal": sum((line.unit_price * line.quantity for line in hot.lines), Decimal("0")),
+                "item_count": sum(line.quantity for line in hot.lines),
+                "version": F("version") + 1,
+            }
+            if hot.touched_at:
+                # Keep the customer's last activity, not the flush time, for
+                # abandoned-cart detection.
+                updates["updated_at"] = datetime.fromtimestamp(hot.touched_at, tz=dt_timezone.utc)
+            Cart.objects.filter(pk=cart.pk).update(**updates)
+        if cart.pk != hot.cart_id:
+            self.backend.save(key, fields={"cart": str(cart.pk)})
+        self.backend.mark_clean(key, hot.version)
+        return cart.pk
+
+    @staticmethod
+    def _sync_items(cart: Cart, lines: list[HotCartLine]) -> None:
+        existing = {(item.product_id, item.variant_id): item for item in CartItem.objects.filter(cart=cart)}
+        to_create: list[CartItem] = []
+        to_update: list[CartItem] = []
+        for line in lines:
+            item = existing.pop((line.product_id, line.variant_id), None)
+            if item is None:
+                to_create.append(
+                    CartItem(
+                        cart=cart,
+                        product_id=line.product_id,
+                        variant_id=line.variant_id,
+                        quantity=line.quantity,
+                        unit_price_snapshot=line.unit_price,
+                    )
+                )
+            elif item.quantity != line.quantity or safe_decimal(item.unit_price_snapshot) != line.unit_price:
+                item.quantity = line.quantity
+                item.unit_price_snapshot = line.unit_price
+                to_update.append(item)
+        if existing:
+            CartItem.objects.filter(pk__in=[item.pk for item in existing.values()]).delete()
+        if to_update:
+            CartItem.objects.bulk_update(to_update, ["quantity", "unit_price_snapshot"])
+        if to_create:
+            CartItem.objects.bulk_create(to_create)
+
+    def flush_idle(self, *, idle_seconds: int, limit: int) -> int:
+        flushed = 0
+        for key in self.backend.dirty_keys(idle_before=time.time() - idle_seconds, limit=limit):
+            try:
+                self.persist(key)
+                flushed += 1
+            except Exception:
+                logger.exception("hot_cart_flush_failed", extra={"cart_key": key})
+        return flushed
+
+
+def _next_version(version: str) -> str:
+    return str(int(version or 0) + 1)
+
+
+def _build_store() -> HotCartStore | None:
+    choice = str(getattr(settings, "CART_HOT_STORE", "auto") or "auto").lower()
+    if choice == "auto":
+        choice = "redis" if getattr(settings, "CACHE_USE_REDIS", False) else "off"
+    if choice not in {"redis", "cache"}:
+        return None
+    prefix = f"{getattr(settings, 'CACHE_KEY_PREFIX', 'wasla')}:cart"
+    ttl = int(getattr(settings, "CART_HOT_STORE_TTL", 172800) or 172800)
+    if choice == "redis":
+        try:
+            from django_redis import get_redis_connection
+
+            return HotCartStore(
+                RedisHotCartBackend(get_redis_connection("default"), ttl=ttl, key_prefix=prefix),
+                key_prefix=prefix,
+            )
+        except Exception:
+            logger.warning("Redis hot cart store unavailable; carts are written to the database")
+            return None
+    return HotCartStore(CacheHotCartBackend(ttl=ttl, key_prefix=prefix), key_prefix=prefix)
+
+
+_store: HotCartStore | None = None
+_store_built = False
+
+
+def get_hot_cart_store() -> HotCartStore | None:
+    """The configured hot cart store, or None when carts live in the database only."""
+    global _store, _store_built
+    if not _store_built:
+        _store = _build_store()
+        _store_built = True
+    return _store
+
+
+def persist_hot_cart(tenant_ctx: TenantContext) -> None:
+    """Flush the caller's hot cart (if any) so the database rows are current."""
+    store = get_hot_cart_store()
+    if store is None:
+        return
+    key = store.key_for(tenant_ctx)
+    if key is not None:
+        store.persist(key)
+
+
+def flush_idle_hot_carts(*, idle_seconds: int | None = None, limit: int | None = None) -> int:
+    store = get_hot_cart_store()
+    if store is None:
+        return 0
+    if idle_seconds is None:
+        idle_seconds = int(getattr(settings, "CART_HOT_FLUSH_IDLE_SECONDS", 900) or 0)
+    if limit is None:
+        limit = int(getattr(settings, "CART_HOT_FLUSH_BATCH", 500) or 500)
+    return store.flush_idle(idle_seconds=idle_seconds, limit=limit)
+
+
+@receiver(setting_changed)
+def _reset_hot_cart_store(setting, **kwargs):
+    global _store, _store_built
+    if setting in {"CART_HOT_STORE", "CART_HOT_STORE_TTL", "CACHE_USE_REDIS", "CACHES"}:
+        _store = None
+        _store_built = False
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+from decimal import Decimal
 from typing import Iterable
 
+from django.db.models import F
+from django.utils import timezone
+
 from apps.cart.models import Cart, CartItem
 from apps.tenants.domain.tenant_context import TenantContext
 
@@ -34,3 +38,25 @@ def find_cart(tenant_ctx: TenantContext) -> Cart | None:
 
 def list_cart_items(cart: Cart) -> Iterable[CartItem]:
     return CartItem.objects.select_related("product", "variant").filter(cart=cart).order_by("id")
+
+
+def record_cart_change(
+    cart_id: int,
+    *,
+    subtotal_delta: Decimal = Decimal("0"),
+    count_delta: int = 0,
+    **fields,
+) -> None:
+    """Apply one change to the cart's running totals and bump its version.
+
+    `fields` are written as-is and may replace `subtotal`/`item_count`
+    outright (e.g. when the cart is emptied).
+    """
+    updates = {
+        "subtotal": F("subtotal") + subtotal_delta,
+        "item_count": F("item_count") + count_delta,
+        "version": F("version") + 1,
+        "updated_at": timezone.now(),
+    }
+    updates.update(fields)
+    Cart.objects.filter(pk=cart_id).update(**updates)
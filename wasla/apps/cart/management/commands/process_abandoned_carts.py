@@ -1,6 +1,7 @@
 """Django management command to process abandoned carts."""
 from django.core.management.base import BaseCommand
 from django.utils import timezone
+from apps.cart.infrastructure.hot_store import flush_idle_hot_carts
 from apps.cart.services import AbandonedCartService, AbandonedCartRecoveryEmailService
 from apps.stores.models import Store
 
@@ -46,6 +47,11 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.ERROR(f"Store with ID {store_id} not found"))
                 return
 
+        # Write back idle carts held in the hot cart store so the database
+        # reflects their items and last activity.
+        while flush_idle_hot_carts():
+            pass
+
         # Get stats before
         stats_before = AbandonedCartService.get_abandoned_cart_stats(store)
         self.stdout.write(
@@ -19,6 +19,11 @@ class Cart(models.Model):
     currency = models.CharField(max_length=10, default="SAR")
     applied_coupon_code = models.CharField(max_length=50, blank=True, default="")
     discount_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # Running totals kept up to date by every cart change; `version` is bumped
+    # with each change so cached cart summaries stay valid until the next one.
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    item_count = models.PositiveIntegerField(default=0)
+    version = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     # Abandoned cart tracking
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+try:
+    from celery import shared_task
+except Exception:  # pragma: no cover
+    def shared_task(*_args, **_kwargs):
+        def _decorator(func):
+            func.delay = func
+            return func
+        return _decorator
+
+from .infrastructure.hot_store import flush_idle_hot_carts
+
+
+@shared_task
+def flush_hot_carts() -> dict:
+    flushed = flush_idle_hot_carts()
+    return {"flushed": flushed}
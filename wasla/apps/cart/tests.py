@@ -0,0 +1,223 @@
+"""Tests for cart summaries, the hot cart store and its write-behind to Cart/CartItem."""
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.cart.application.use_cases.add_to_cart import AddToCartCommand, AddToCartUseCase
+from apps.cart.application.use_cases.apply_coupon import (
+    ApplyCouponCommand,
+    ApplyCouponUseCase,
+    RemoveCouponCommand,
+    RemoveCouponUseCase,
+)
+from apps.cart.application.use_cases import get_cart
+from apps.cart.application.use_cases.get_cart import GetCartUseCase
+from apps.cart.application.use_cases.remove_cart_item import RemoveCartItemCommand, RemoveCartItemUseCase
+from apps.cart.application.use_cases.update_cart_item import UpdateCartItemCommand, UpdateCartItemUseCase
+from apps.cart.domain.errors import CartNotFoundError
+from apps.cart.infrastructure import hot_store
+from apps.cart.infrastructure.hot_store import flush_idle_hot_carts, persist_hot_cart
+from apps.cart.models import Cart, CartItem
+from apps.catalog.models import Product
+from apps.coupons.models import Coupon
+from apps.stores.models import Store
+from apps.tenants.domain.tenant_context import TenantContext
+
+STORE_ID = 9301
+
+
+class CartSummaryCacheMixin:
+    """Store, products and a 10% coupon for the summary cache tests."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        owner = get_user_model().objects.create_user(username="cart-owner", password="pass")
+        self.store = Store.objects.create(owner=owner, name="Cart Store", slug="cart-store", subdomain="cart-store")
+        self.ctx = TenantContext(
+            tenant_id=self.store.id, store_id=self.store.id, currency="SAR", session_key="sess-summary"
+        )
+        self.mug = Product.objects.create(store_id=self.store.id, sku="MUG", name="Mug", price=Decimal("10.00"))
+        self.coupon = Coupon.objects.create(
+            store=self.store,
+            code="TEN",
+            discount_type=Coupon.DISCOUNT_PERCENTAGE,
+            discount_value=Decimal("10.00"),
+            end_date=timezone.now() + timedelta(days=30),
+        )
+
+    def _add(self, quantity: int = 1):
+        command = AddToCartCommand(tenant_ctx=self.ctx, product_id=self.mug.id, quantity=quantity)
+        return AddToCartUseCase.execute(command)
+
+    def _apply_coupon(self):
+        return ApplyCouponUseCase.execute(ApplyCouponCommand(tenant_ctx=self.ctx, coupon_code="TEN"))
+
+
+@override_settings(CART_HOT_STORE="off")
+class CartSummaryCacheTests(CartSummaryCacheMixin, TestCase):
+    def test_running_totals_follow_every_change(self):
+        summary = self._add(3)
+        cart = Cart.objects.get(pk=summary.cart_id)
+        self.assertEqual((cart.subtotal, cart.item_count), (Decimal("30.00"), 3))
+
+        item_id = summary.items[0].id
+        UpdateCartItemUseCase.execute(UpdateCartItemCommand(tenant_ctx=self.ctx, item_id=item_id, quantity=5))
+        cart.refresh_from_db()
+        self.assertEqual((cart.subtotal, cart.item_count), (Decimal("50.00"), 5))
+
+        version = cart.version
+        RemoveCartItemUseCase.execute(RemoveCartItemCommand(tenant_ctx=self.ctx, item_id=item_id))
+        cart.refresh_from_db()
+        self.assertEqual((cart.subtotal, cart.item_count), (Decimal("0.00"), 0))
+        self.assertGreater(cart.version, version)
+
+    def test_page_views_reuse_summary_until_cart_changes(self):
+        self._add(2)
+        summary = self._apply_coupon()
+        self.assertEqual((summary.discount_amount, summary.total), (Decimal("2.00"), Decimal("18.00")))
+
+        # Only the cart row is read: no item or coupon queries.
+        with self.assertNumQueries(1):
+            cached = GetCartUseCase.execute(self.ctx)
+        self.assertEqual(cached, summary)
+
+        summary = self._add(1)
+        self.assertEqual((summary.subtotal, summary.discount_amount), (Decimal("30.00"), Decimal("3.00")))
+
+    def test_coupon_change_triggers_revalidation(self):
+        self._add(2)
+        self._apply_coupon()
+        GetCartUseCase.execute(self.ctx)
+
+        self.coupon.is_active = False
+        self.coupon.save()
+
+        summary = GetCartUseCase.execute(self.ctx)
+        self.assertEqual((summary.coupon_code, summary.discount_amount), (None, Decimal("0")))
+        self.assertEqual(Cart.objects.get(pk=summary.cart_id).applied_coupon_code, "")
+
+    def test_expired_coupon_check_is_not_reused(self):
+        self._add(2)
+        self._apply_coupon()
+        # A queryset update sends no signal, so only the coupon's end date
+        # (recorded with the cached summary) can expire the check.
+        Coupon.objects.filter(pk=self.coupon.pk).update(end_date=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(GetCartUseCase.execute(self.ctx).coupon_code, "TEN")
+
+        later = (timezone.now() + timedelta(days=31)).timestamp()
+        with mock.patch.object(get_cart, "time", mock.Mock(time=lambda: later)):
+            summary = GetCartUseCase.execute(self.ctx)
+        self.assertIsNone(summary.coupon_code)
+
+
+@override_settings(CART_HOT_STORE="cache")
+class HotCartSummaryTests(CartSummaryCacheMixin, TestCase):
+    def test_coupon_checked_once_per_cart_version(self):
+        self._add(2)
+        self._apply_coupon()
+        GetCartUseCase.execute(self.ctx)
+
+        with self.assertNumQueries(0):
+            summary = GetCartUseCase.execute(self.ctx)
+        self.assertEqual(summary.discount_amount, Decimal("2.00"))
+
+        self.coupon.discount_value = Decimal("50.00")
+        self.coupon.save()
+        summary = GetCartUseCase.execute(self.ctx)
+        self.assertEqual(summary.discount_amount, Decimal("10.00"))
+
+        persist_hot_cart(self.ctx)
+        cart = Cart.objects.get(pk=summary.cart_id)
+        self.assertEqual(
+            (cart.subtotal, cart.item_count, cart.discount_amount),
+            (Decimal("20.00"), 2, Decimal("10.00")),
+        )
+
+
+@override_settings(CART_HOT_STORE="cache", CART_HOT_FLUSH_IDLE_SECONDS=900)
+class HotCartStoreTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.ctx = TenantContext(tenant_id=STORE_ID, store_id=STORE_ID, currency="SAR", session_key="sess-hot")
+        self.mug = Product.objects.create(store_id=STORE_ID, sku="MUG", name="Mug", price=Decimal("10.00"))
+        self.lamp = Product.objects.create(store_id=STORE_ID, sku="LAMP", name="Lamp", price=Decimal("40.00"))
+
+    def _add(self, product: Product, quantity: int = 1):
+        return AddToCartUseCase.execute(AddToCartCommand(tenant_ctx=self.ctx, product_id=product.id, quantity=quantity))
+
+    def test_changes_stay_in_store_until_persisted(self):
+        self._add(self.mug, 2)
+        self._add(self.mug, 1)
+        summary = self._add(self.lamp)
+        lamp_line = next(item for item in summary.items if item.product_id == self.lamp.id)
+        mug_line = next(item for item in summary.items if item.product_id == self.mug.id)
+        summary = UpdateCartItemUseCase.execute(
+            UpdateCartItemCommand(tenant_ctx=self.ctx, item_id=mug_line.id, quantity=5)
+        )
+
+        self.assertEqual(summary.subtotal, Decimal("90.00"))
+        self.assertEqual(summary.cart_id, Cart.objects.get(store_id=STORE_ID, session_key="sess-hot").id)
+        self.assertFalse(CartItem.objects.exists())
+
+        summary = RemoveCartItemUseCase.execute(RemoveCartItemCommand(tenant_ctx=self.ctx, item_id=lamp_line.id))
+        self.assertEqual([(item.name, item.quantity) for item in summary.items], [("Mug", 5)])
+
+        persist_hot_cart(self.ctx)
+
+        self.assertEqual(
+            list(CartItem.objects.values_list("product_id", "quantity", "unit_price_snapshot")),
+            [(self.mug.id, 5, Decimal("10.00"))],
+        )
+        self.assertEqual(GetCartUseCase.execute(self.ctx).total, Decimal("50.00"))
+
+    def test_repeat_add_only_reads_the_product(self):
+        self._add(self.mug)
+        with mock.patch("apps.cart.application.use_cases.add_to_cart.TelemetryService.track"):
+            with self.assertNumQueries(1):
+                summary = self._add(self.mug)
+        self.assertEqual(summary.items[0].quantity, 2)
+
+    def test_idle_flush_writes_back_and_keeps_last_activity(self):
+        with mock.patch.object(hot_store, "time", mock.Mock(time=lambda: 1_700_000_000.0)):
+            self._add(self.mug, 3)
+
+        self.assertEqual(flush_idle_hot_carts(idle_seconds=10**12), 0)
+        self.assertEqual(flush_idle_hot_carts(), 1)
+
+        cart = Cart.objects.get(store_id=STORE_ID, session_key="sess-hot")
+        self.assertEqual(cart.items.get().quantity, 3)
+        self.assertEqual(int(cart.updated_at.timestamp()), 1_700_000_000)
+        # Clean carts are not flushed again.
+        self.assertEqual(flush_idle_hot_carts(), 0)
+
+    def test_cart_seeded_from_database_keeps_item_ids(self):
+        cart = Cart.objects.create(store_id=STORE_ID, session_key="sess-hot", currency="SAR")
+        item = CartItem.objects.create(cart=cart, product=self.mug, quantity=1, unit_price_snapshot=Decimal("9.00"))
+
+        summary = GetCartUseCase.execute(self.ctx)
+        self.assertEqual([(line.id, line.unit_price) for line in summary.items], [(item.id, Decimal("9.00"))])
+
+        summary = self._add(self.lamp)
+        self.assertEqual(sorted(line.id for line in summary.items)[0], item.id)
+        self.assertEqual(len({line.id for line in summary.items}), 2)
+
+        RemoveCouponUseCase.execute(RemoveCouponCommand(tenant_ctx=self.ctx))
+        persist_hot_cart(self.ctx)
+        self.assertEqual(
+            sorted(cart.items.values_list("product_id", "quantity")),
+            sorted([(self.mug.id, 1), (self.lamp.id, 1)]),
+        )
+
+    def test_unknown_item_raises(self):
+        self._add(self.mug)
+        with self.assertRaises(CartNotFoundError):
+            UpdateCartItemUseCase.execute(UpdateCartItemCommand(tenant_ctx=self.ctx, item_id=999, quantity=1))
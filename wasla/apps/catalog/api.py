@@ -7,7 +7,8 @@ from django.utils.decorators import method_decorator
 from drf_spectacular.utils import OpenApiExample, OpenApiParameter, OpenApiResponse, extend_schema, inline_serializer
 
 from apps.catalog.models import Inventory, Product, ProductVariant, StockMovement
-from apps.catalog.serializers import ProductDetailSerializer, ProductWriteSerializer
+from apps.catalog.serializers import ProductBulkWriteSerializer, ProductDetailSerializer, ProductWriteSerializer
+from apps.catalog.services.bulk_service import BulkCatalogWriteService
 from apps.catalog.services.variant_service import (
     ProductConfigurationService,
     ProductVariantService,
@@ -230,6 +231,78 @@ class ProductUpdateAPI(APIView):
         return Response(ProductDetailSerializer(product).data, status=status.HTTP_200_OK)
 
 
+class ProductBulkUpsertAPI(APIView):
+    """Create or update many products and variants (matched by SKU) in one call."""
+
+    @extend_schema(
+        tags=["Catalog / Variants"],
+        summary="Bulk upsert products and variants",
+        request=ProductBulkWriteSerializer,
+        responses={
+            200: inline_serializer(
+                name="ProductBulkUpsertResponse",
+                fields={
+                    "store_id": serializers.IntegerField(),
+                    "created": serializers.IntegerField(),
+                    "updated": serializers.IntegerField(),
+                    "variants": serializers.IntegerField(),
+                    "product_ids": serializers.DictField(child=serializers.IntegerField()),
+                },
+            ),
+            400: OpenApiResponse(description="Validation or business rule error"),
+        },
+        examples=[
+            OpenApiExample(
+                "Upsert products with variants",
+                value={
+                    "option_groups": [
+                        {"name": "Size", "options": [{"value": "M"}, {"value": "L"}]},
+                    ],
+                    "products": [
+                        {
+                            "sku": "TEE-BASE",
+                            "name": "T-Shirt",
+                            "price": "100.00",
+                            "quantity": 50,
+                            "variants": [
+                                {
+                                    "sku": "TEE-M",
+                                    "stock_quantity": 20,
+                                    "options": [{"group": "Size", "value": "M"}],
+                                }
+                            ],
+                        }
+                    ],
+                },
+                request_only=True,
+            )
+        ],
+    )
+    @method_decorator(require_permission("catalog.create_product"))
+    @method_decorator(require_permission("catalog.update_product"))
+    def post(self, request):
+        store = require_store(request)
+        serializer = ProductBulkWriteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            result = BulkCatalogWriteService.upsert_products(
+                store=store,
+                products=serializer.validated_data["products"],
+                option_groups=serializer.validated_data.get("option_groups"),
+            )
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {
+                "store_id": store.id,
+                "created": result.created,
+                "updated": result.updated,
+                "variants": result.variants,
+                "product_ids": result.product_ids,
+            }
+        )
+
+
 class VariantStockAPI(APIView):
     """Return stock for a specific variant scoped by current store."""
 
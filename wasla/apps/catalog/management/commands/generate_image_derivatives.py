@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from apps.catalog.models import ProductImage
+from apps.catalog.services.image_derivatives import content_hash
+from apps.catalog.tasks import enqueue_image_derivatives
+
+
+class Command(BaseCommand):
+    help = "Hash product images without a content hash and enqueue their missing responsive derivatives."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--store-id", type=int, default=None)
+
+    def handle(self, *args, **options):
+        images = ProductImage.objects.exclude(image="")
+        if options["store_id"] is not None:
+            images = images.filter(product__store_id=options["store_id"])
+
+        enqueued = 0
+        for product_image in images.filter(derivatives={}).order_by("id").iterator(chunk_size=500):
+            if not product_image.content_hash:
+                try:
+                    digest = content_hash(product_image.image)
+                except OSError:
+                    self.stderr.write(f"Missing file for product image {product_image.pk}: {product_image.image.name}")
+                    continue
+                ProductImage.objects.filter(pk=product_image.pk).update(content_hash=digest)
+            enqueue_image_derivatives(image_id=product_image.pk)
+            enqueued += 1
+        self.stdout.write(self.style.SUCCESS(f"Enqueued derivatives for {enqueued} product images."))
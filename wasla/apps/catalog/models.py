@@ -10,10 +10,8 @@ EN:
 - Tenant isolation is implemented via `store_id`.
 """
 
-import os
-from io import BytesIO
+from functools import partial
 
-from django.core.files.base import ContentFile
 from django.db import models, transaction
 from django.db.models import Q
 
@@ -41,57 +39,6 @@ def product_gallery_upload_to(instance, filename: str) -> str:
     return f"store_{instance.product.store_id}/products/gallery/{filename}"
 
 
-def optimize_image_file(image_field):
-    """Best-effort image optimization for uploaded product images."""
-
-    if not image_field:
-        return image_field
-
-    try:
-        from PIL import Image, ImageOps
-    except Exception:
-        return image_field
-
-    try:
-        image_field.file.seek(0)
-        image = Image.open(image_field.file)
-        image = ImageOps.exif_transpose(image)
-        image.thumbnail((1600, 1600))
-
-        image_format = (image.format or "JPEG").upper()
-        output = BytesIO()
-        save_kwargs = {}
-        extension = ".jpg"
-
-        if image_format in {"JPEG", "JPG"}:
-            if image.mode in {"RGBA", "P"}:
-                image = image.convert("RGB")
-            image_format = "JPEG"
-            extension = ".jpg"
-            save_kwargs = {"quality": 85, "optimize": True}
-        elif image_format == "PNG":
-            extension = ".png"
-            save_kwargs = {"optimize": True, "compress_level": 7}
-        elif image_format == "WEBP":
-            extension = ".webp"
-            save_kwargs = {"quality": 85, "method": 6}
-        else:
-            if image.mode in {"RGBA", "P"}:
-                image = image.convert("RGB")
-            image_format = "JPEG"
-            extension = ".jpg"
-            save_kwargs = {"quality": 85, "optimize": True}
-
-        image.save(output, format=image_format, **save_kwargs)
-        output.seek(0)
-
-        base_name, _ = os.path.splitext(image_field.name)
-        optimized_name = f"{base_name}{extension}"
-        return ContentFile(output.read(), name=optimized_name)
-    except Exception:
-        return image_field
-
-
 class Product(models.Model):
     """Sellable product within a store (unique SKU per store)."""
 
@@ -220,6 +167,10 @@ class ProductImage(models.Model):
     alt_text = models.CharField(max_length=255, blank=True, default="")
     position = models.PositiveIntegerField(default=0)
     is_primary = models.BooleanField(default=False)
+    # SHA-256 of the uploaded file and the responsive derivatives manifest
+    # (see apps.catalog.services.image_derivatives).
+    content_hash = models.CharField(max_length=64, blank=True, default="")
+    derivatives = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -232,13 +183,37 @@ class ProductImage(models.Model):
         ]
         indexes = [
             models.Index(fields=["product", "position"]),
+            models.Index(fields=["content_hash"], name="catalog_pim_content_hash_idx"),
         ]
         ordering = ["position", "id"]
 
+    def _adopt_upload(self) -> bool:
+        """Hash a new upload and reuse an identical file of the same store; True when derivatives are needed."""
+        from apps.catalog.services.image_derivatives import content_hash
+
+        self.content_hash = content_hash(self.image)
+        duplicate = (
+            ProductImage.objects.filter(product__store_id=self.product.store_id, content_hash=self.content_hash)
+            .exclude(pk=self.pk)
+            .only("image", "derivatives")
+            .first()
+        )
+        if duplicate is None:
+            self.derivatives = {}
+            return True
+        self.image = duplicate.image.name
+        self.derivatives = duplicate.derivatives
+        return not self.derivatives
+
     def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and not {"image", "is_primary"}.intersection(update_fields):
+            return super().save(*args, **kwargs)
+
         is_new = self.pk is None
-        if self.image:
-            self.image = optimize_image_file(self.image)
+        needs_derivatives = False
+        if self.image and not self.image._committed:
+            needs_derivatives = self._adopt_upload()
 
         with transaction.atomic():
             if self.is_primary:
@@ -266,6 +241,11 @@ class ProductImage(models.Model):
             if self.is_primary:
                 Product.objects.filter(pk=self.product_id).update(image=self.image.name)
 
+        if needs_derivatives:
+            from apps.catalog.tasks import enqueue_image_derivatives
+
+            transaction.on_commit(partial(enqueue_image_derivatives, image_id=self.pk))
+
     def delete(self, *args, **kwargs):
         product_id = self.product_id
         was_primary = self.is_primary
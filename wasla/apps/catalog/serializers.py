@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from django.conf import settings
 from rest_framework import serializers
 
 from apps.catalog.models import Product, ProductImage, ProductOption, ProductOptionGroup, ProductVariant
@@ -100,6 +101,24 @@ class ProductWriteSerializer(serializers.Serializer):
     variants = ProductVariantWriteSerializer(many=True, required=False)
 
 
+class ProductBulkItemSerializer(ProductWriteSerializer):
+    # Bulk writes are JSON only; per-product images and option groups stay on the single-product API.
+    image = None
+    images = None
+    option_groups = None
+
+
+class ProductBulkWriteSerializer(serializers.Serializer):
+    option_groups = ProductOptionGroupWriteSerializer(many=True, required=False)
+    products = ProductBulkItemSerializer(many=True, allow_empty=False)
+
+    def validate_products(self, value):
+        limit = int(getattr(settings, "CATALOG_BULK_MAX_PRODUCTS", 5000) or 5000)
+        if len(value) > limit:
+            raise serializers.ValidationError(f"At most {limit} products per request.")
+        return value
+
+
 class ProductDetailSerializer(serializers.ModelSerializer):
     image = serializers.ImageField(required=False, allow_null=True)
     images = serializers.SerializerMethodField()
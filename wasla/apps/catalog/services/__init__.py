@@ -7,10 +7,13 @@ EN:
 - Catalog services containing business logic for creating products and managing inventory.
 """
 
+from .bulk_service import BulkCatalogWriteService, BulkUpsertResult
 from .product_service import ProductService
 from .variant_service import ProductConfigurationService, ProductVariantService, VariantPricingService
 
 __all__ = [
+    "BulkCatalogWriteService",
+    "BulkUpsertResult",
     "ProductService",
     "ProductConfigurationService",
     "ProductVariantService",
@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from django.db import connections, router, transaction
+
+from apps.catalog.models import Category, Inventory, Product, ProductOption, ProductOptionGroup, ProductVariant
+from apps.stores.models import Store
+from apps.storefront.read_models import batched_read_model_refresh, schedule_read_model_refresh
+from apps.storefront.search import try_index_products
+from core.infrastructure.store_cache import StoreCacheService, coalesced_invalidation
+
+# Products written per round of set-based statements (keeps `IN (...)` lists bounded).
+BULK_CHUNK_SIZE = 1000
+
+# Namespaces the per-row catalog signals would bump.
+CATALOG_NAMESPACES = ("storefront_products", "product_detail", "variant_price")
+
+
+def sync_bulk_written_products(*, store_id: int, products: list[Product]) -> None:
+    """Do what the per-row catalog signals would have done for bulk-written `products`.
+
+    Call inside `coalesced_invalidation()` and `batched_read_model_refresh()`
+    so the namespaces are bumped and read models refreshed once per batch.
+    """
+    try_index_products(products)
+    schedule_read_model_refresh([product.pk for product in products])
+    for namespace in CATALOG_NAMESPACES:
+        StoreCacheService.bump_namespace_version(store_id=store_id, namespace=namespace)
+
+
+def _conflict_target(model, *unique_fields: str) -> dict:
+    """`unique_fields` for an upsert of `model`, where the database can name a conflict target.
+
+    MySQL cannot: its ON DUPLICATE KEY UPDATE resolves on the unique key the
+    row collides with (uq_product_store_sku, uq_product_variant_store_sku,
+    uq_product_option_group_store_name, Inventory.product).
+    """
+    if connections[router.db_for_write(model)].features.supports_update_conflicts_with_target:
+        return {"unique_fields": list(unique_fields)}
+    return {}
+
+
+@dataclass
+class BulkUpsertResult:
+    created: int = 0
+    updated: int = 0
+    variants: int = 0
+    product_ids: dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class _ProductRow:
+    product: Product
+    quantity: int
+    category_ids: list[int] | None
+    variants: list[dict] | None
+
+
+class BulkCatalogWriteService:
+    """Set-based product/variant upserts for bulk API calls and imports.
+
+    Products and variants are matched by SKU within the store and written
+    with `bulk_create(update_conflicts=True)`; inventory, category and
+    option links are written in one statement per chunk. Because bulk
+    writes send no model signals, the search index, read models and cache
+    namespaces are refreshed once for the whole call.
+
+    Unlike `ProductConfigurationService.upsert_product_with_variants`,
+    option groups are only added or updated here, never pruned, since other
+    products of the store may still use their options.
+    """
+
+    @staticmethod
+    @coalesced_invalidation()
+    @batched_read_model_refresh()
+    @transaction.atomic
+    def upsert_products(
+        *,
+        store: Store,
+        products: list[dict],
+        option_groups: list[dict] | None = None,
+    ) -> BulkUpsertResult:
+        rows = BulkCatalogWriteService._normalize_products(store=store, products_payload=products)
+        if option_groups:
+            BulkCatalogWriteService._upsert_option_groups(store=store, groups_payload=option_groups)
+
+        result = BulkUpsertResult()
+        for start in range(0, len(rows), BULK_CHUNK_SIZE):
+            BulkCatalogWriteService._upsert_chunk(store=store, rows=rows[start:start + BULK_CHUNK_SIZE], result=result)
+
+        return result
+
+    @staticmethod
+    def _normalize_products(*, store: Store, products_payload: list[dict]) -> list[_ProductRow]:
+        rows: list[_ProductRow] = []
+        seen_skus: set[str] = set()
+        seen_variant_skus: set[str] = set()
+        for payload in products_payload:
+            sku = str(payload.get("sku", "")).strip()
+            name = str(payload.get("name", "")).strip()
+            if not sku:
+                raise ValueError("SKU is required")
+            if not name:
+                raise ValueError("Product name is required")
+            if sku in seen_skus:
+                raise ValueError(f"Duplicate SKU '{sku}' in request.")
+            seen_skus.add(sku)
+
+            quantity = max(0, int(payload.get("quantity", 0) or 0))
+            requested_visibility = payload.get("visibility")
+            if requested_visibility is None and payload.get("is_active") is False:
+                requested_visibility = Product.VISIBILITY_DISABLED
+            visibility = Product.resolve_visibility(quantity=quantity, requested_visibility=requested_visibility)
+
+            variants = payload.get("variants")
+            for variant_payload in variants or []:
+                variant_sku = str(variant_payload.get("sku", "")).strip()
+                if not variant_sku:
+                    raise ValueError("Variant SKU is required.")
+                if variant_sku in seen_variant_skus:
+                    raise ValueError("Variant SKU must be unique per store.")
+                seen_variant_skus.add(variant_sku)
+
+            category_ids = payload.get("category_ids")
+            rows.append(
+                _ProductRow(
+                    product=Product(
+                        store_id=store.id,
+                        sku=sku,
+                        name=name,
+                        price=payload.get("price"),
+                        description_ar=payload.get("description_ar", "") or "",
+                        description_en=payload.get("description_en", "") or "",
+                        visibility=visibility,
+                        is_active=Product.is_active_from_visibility(visibility),
+                    ),
+                    quantity=quantity,
+                    category_ids=[int(pk) for pk in category_ids if pk] if category_ids is not None else None,
+                    variants=variants,
+                )
+            )
+        return rows
+
+    @staticmethod
+    def _upsert_option_groups(*, store: Store, groups_payload: list[dict]) -> None:
+        groups: dict[str, ProductOptionGroup] = {}
+        values: dict[str, set[str]] = {}
+        for group_payload in groups_payload:
+            name = str(group_payload.get("name", "")).strip()
+            if not name:
+                raise ValueError("Option group name is required.")
+            groups[name] = ProductOptionGroup(
+                store=store,
+                name=name,
+                is_required=bool(group_payload.get("is_required", False)),
+                position=int(group_payload.get("position", 0) or 0),
+            )
+            group_values = values.setdefault(name, set())
+            for option_payload in group_payload.get("options") or []:
+                value = str(option_payload.get("value", "")).strip()
+                if not value:
+                    raise ValueError("Option value is required.")
+                group_values.add(value)
+
+        ProductOptionGroup.objects.bulk_create(
+            list(groups.values()),
+            update_conflicts=True,
+            update_fields=["is_required", "position"],
+            **_conflict_target(ProductOptionGroup, "store", "name"),
+        )
+        group_ids = dict(
+            ProductOptionGroup.objects.filter(store=store, name__in=list(groups)).values_list("name", "id")
+        )
+        ProductOption.objects.bulk_create(
+            [
+                ProductOption(group_id=group_ids[name], value=value)
+                for name, group_values in values.items()
+                for value in sorted(group_values)
+            ],
+            ignore_conflicts=True,
+        )
+
+    @staticmethod
+    def _upsert_chunk(*, store: Store, rows: list[_ProductRow], result: BulkUpsertResult) -> None:
+        skus = [row.product.sku for row in rows]
+        existing = set(Product.objects.filter(store_id=store.id, sku__in=skus).values_list("sku", flat=True))
+        Product.objects.bulk_create(
+            [row.product for row in rows],
+            update_conflicts=True,
+            update_fields=["name", "price", "description_ar", "description_en", "visibility", "is_active"],
+            **_conflict_target(Product, "store_id", "sku"),
+        )
+        # Not every backend returns ids for upserted rows, so read them back by SKU.
+        ids = dict(Product.objects.filter(store_id=store.id, sku__in=skus).values_list("sku", "id"))
+        for row in rows:
+            row.product.pk = ids[row.product.sku]
+            result.product_ids[row.product.sku] = row.product.pk
+        result.created += len(rows) - len(existing)
+        result.updated += len(existing)
+
+        Inventory.objects.bulk_create(
+            [Inventory(product_id=row.product.pk, quantity=row.quantity, in_stock=row.quantity > 0) for row in rows],
+            update_conflicts=True,
+            update_fields=["quantity", "in_stock"],
+            **_conflict_target(Inventory, "product"),
+        )
+        BulkCatalogWriteService._link_categories(store=store, rows=rows)
+        result.variants += BulkCatalogWriteService._upsert_variants(store=store, rows=rows)
+
+        sync_bulk_written_products(store_id=store.id, products=[row.product for row in rows])
+
+    @staticmethod
+    def _link_categories(*, store: Store, rows: list[_ProductRow]) -> None:
+        through = Product.categories.through
+        replaced = [row for row in rows if row.category_ids is not None]
+        if replaced:
+            requested = {category_id for row in replaced for category_id in row.category_ids}
+            found = set(Category.objects.filter(store_id=store.id, id__in=requested).values_list("id", flat=True))
+            if found != requested:
+                raise ValueError("One or more categories were not found in this store.")
+            through.objects.filter(product_id__in=[row.product.pk for row in replaced]).delete()
+            through.objects.bulk_create(
+                [
+                    through(product_id=row.product.pk, category_id=category_id)
+                    for row in replaced
+                    for category_id in set(row.category_ids)
+                ],
+                ignore_conflicts=True,
+            )
+
+        product_ids = [row.product.pk for row in rows]
+        linked = set(through.objects.filter(product_id__in=product_ids).values_list("product_id", flat=True))
+        unlinked = [product_id for product_id in product_ids if product_id not in linked]
+        if unlinked:
+            default_category, _ = Category.objects.get_or_create(store_id=store.id, name="General")
+            through.objects.bulk_create(
+                [through(product_id=product_id, category_id=default_category.id) for product_id in unlinked]
+            )
+
+    @staticmethod
+    def _upsert_variants(*, store: Store, rows: list[_ProductRow]) -> int:
+        replaced = [row for row in rows if row.variants is not None]
+        if not replaced:
+            return 0
+
+        variants: list[ProductVariant] = []
+        option_refs: dict[str, list] = {}
+        for row in replaced:
+            for variant_payload in row.variants:
+                sku = str(variant_payload.get("sku", "")).strip()
+                variants.append(
+                    ProductVariant(
+                        store_id=store.id,
+                        product_id=row.product.pk,
+                        sku=sku,
+                        price_override=variant_payload.get("price_override"),
+                        stock_quantity=max(0, int(variant_payload.get("stock_quantity", 0) or 0)),
+                        is_active=bool(variant_payload.get("is_active", True)),
+                    )
+                )
+                option_refs[sku] = (
+                    [int(option_id) for option_id in (variant_payload.get("option_ids") or []) if option_id]
+                    or variant_payload.get("options")
+                    or []
+                )
+
+        skus = [variant.sku for variant in variants]
+        owners = dict(ProductVariant.objects.filter(store_id=store.id, sku__in=skus).values_list("sku", "product_id"))
+        for variant in variants:
+            if owners.get(variant.sku, variant.product_id) != variant.product_id:
+                raise ValueError("Variant SKU must be unique per store.")
+        option_ids = BulkCatalogWriteService._resolve_option_refs(store=store, option_refs=option_refs)
+
+        ProductVariant.objects.bulk_create(
+            variants,
+            update_conflicts=True,
+            update_fields=["price_override", "stock_quantity", "is_active"],
+            **_conflict_target(ProductVariant, "store_id", "sku"),
+        )
+        variant_ids = dict(ProductVariant.objects.filter(store_id=store.id, sku__in=skus).values_list("sku", "id"))
+        ProductVariant.objects.filter(
+            store_id=store.id,
+            product_id__in=[row.product.pk for row in replaced],
+        ).exclude(id__in=list(variant_ids.values())).delete()
+
+        through = ProductVariant.options.through
+        through.objects.filter(productvariant_id__in=list(variant_ids.values())).delete()
+        through.objects.bulk_create(
+            [
+                through(productvariant_id=variant_ids[sku], productoption_id=option_id)
+                for sku, ids in option_ids.items()
+                for option_id in ids
+            ],
+            ignore_conflicts=True,
+        )
+        return len(variants)
+
+    @staticmethod
+    def _resolve_option_refs(*, store: Store, option_refs: dict[str, list]) -> dict[str, list[int]]:
+        """Map each variant SKU to option ids, from explicit ids or {group, value} labels."""
+        requested_ids: set[int] = set()
+        labels: set[tuple[str, str]] = set()
+        for refs in option_refs.values():
+            for ref in refs:
+                if isinstance(ref, int):
+                    requested_ids.add(ref)
+                    continue
+                group_name = str(ref.get("group", "")).strip()
+                value = str(ref.get("value", "")).strip()
+                if not group_name or not value:
+                    raise ValueError("Variant options must include group and value.")
+                labels.add((group_name, value))
+
+        if requested_ids:
+            found = set(ProductOption.objects.filter(id__in=requested_ids, group__store_id=store.id).values_list("id", flat=True))
+            if found != requested_ids:
+                raise ValueError("One or more options were not found in this store.")
+
+        by_label: dict[tuple[str, str], int] = {}
+        if labels:
+            group_names = {group_name for group_name, _ in labels}
+            known_groups = set(
+                ProductOptionGroup.objects.filter(store=store, name__in=group_names).values_list("name", flat=True)
+            )
+            missing_groups = sorted(group_names - known_groups)
+            if missing_groups:
+                raise ValueError(f"Option group '{missing_groups[0]}' not found.")
+            for group_name, value, option_id in ProductOption.objects.filter(
+                group__store=store,
+                group__name__in=group_names,
+            ).values_list("group__name", "value", "id"):
+                by_label[(group_name, value)] = option_id
+            for group_name, value in sorted(labels):
+                if (group_name, value) not in by_label:
+                    raise ValueError(f"Option '{value}' not found in group '{group_name}'.")
+
+        return {
+            sku: [ref if isinstance(ref, int) else by_label[(str(ref["group"]).strip(), str(ref["value"]).strip())] for ref in refs]
+            for sku, refs in option_refs.items()
+        }
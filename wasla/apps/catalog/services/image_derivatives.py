@@ -0,0 +1,125 @@
+"""
+Responsive derivatives of product gallery images.
+
+Uploads are stored as-is; derivatives are rendered off the request path
+(`apps.catalog.tasks.enqueue_image_derivatives`) for every preset width in
+WebP plus a JPEG fallback. Files are named after the upload's SHA-256, so
+identical uploads in a store share one set of derivatives, and a width
+whose files already exist is not encoded again (small sources collapse
+several presets onto one width).
+
+`ProductImage.derivatives` is the manifest templates build `srcset` from
+(`width`/`height` are those of the largest derivative):
+
+    {"hash": "<sha256>", "width": 1600, "height": 1067,
+     "sources": {"card": {"width": 400, "height": 267,
+                          "webp": "<name>", "jpeg": "<name>"}, ...}}
+"""
+
+from __future__ import annotations
+
+import hashlib
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+# preset -> target width in pixels (never upscaled past the source width).
+DERIVATIVE_WIDTHS = {
+    "thumb": 160,
+    "card": 400,
+    "detail": 800,
+    "zoom": 1600,
+}
+
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+
+def content_hash(image_field) -> str:
+    digest = hashlib.sha256()
+    # Pending uploads stay open for the storage save that follows.
+    opened_here = image_field.closed
+    image_field.open("rb")
+    image_field.seek(0)
+    for chunk in image_field.chunks():
+        digest.update(chunk)
+    image_field.seek(0)
+    if opened_here:
+        image_field.close()
+    return digest.hexdigest()
+
+
+def derivative_name(*, store_id: int, digest: str, width: int, extension: str) -> str:
+    return f"store_{int(store_id)}/products/derived/{digest}/{width}w.{extension}"
+
+
+def _save(name: str, image, image_format: str, **options) -> None:
+    output = BytesIO()
+    image.save(output, format=image_format, **options)
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    default_storage.save(name, ContentFile(output.getvalue()))
+
+
+def render_derivatives(image_id: int, presets=None) -> list[dict]:
+    """Render `presets` (default: all) of one ProductImage; returns manifest entries."""
+    from PIL import Image, ImageOps
+
+    from apps.catalog.models import ProductImage
+
+    product_image = ProductImage.objects.select_related("product").filter(pk=image_id).first()
+    if product_image is None or not product_image.image or not product_image.content_hash:
+        return []
+
+    store_id = product_image.product.store_id
+    digest = product_image.content_hash
+    with product_image.image.open("rb") as handle:
+        source = ImageOps.exif_transpose(Image.open(handle))
+        source.load()
+    if source.mode not in ("RGB", "RGBA"):
+        source = source.convert("RGBA")
+
+    entries = []
+    for preset in presets or DERIVATIVE_WIDTHS:
+        width = min(DERIVATIVE_WIDTHS[preset], source.width)
+        height = max(1, round(source.height * width / source.width))
+        webp_name = derivative_name(store_id=store_id, digest=digest, width=width, extension="webp")
+        jpeg_name = derivative_name(store_id=store_id, digest=digest, width=width, extension="jpg")
+        if not (default_storage.exists(webp_name) and default_storage.exists(jpeg_name)):
+            resized = source.resize((width, height), Image.LANCZOS) if width != source.width else source
+            _save(webp_name, resized, "WEBP", quality=WEBP_QUALITY, method=6)
+            _save(jpeg_name, resized.convert("RGB"), "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        entries.append({"preset": preset, "width": width, "height": height, "webp": webp_name, "jpeg": jpeg_name})
+    return entries
+
+
+def record_derivatives(image_id: int, digest: str, entries: list[dict]) -> bool:
+    """Store the manifest unless the image was replaced while rendering."""
+    from apps.catalog.models import ProductImage
+
+    product_image = ProductImage.objects.filter(pk=image_id, content_hash=digest).first()
+    if product_image is None or not entries:
+        return False
+    largest = max(entries, key=lambda entry: entry["width"])
+    product_image.derivatives = {
+        "hash": digest,
+        "width": largest["width"],
+        "height": largest["height"],
+        "sources": {
+            entry["preset"]: {key: entry[key] for key in ("width", "height", "webp", "jpeg")}
+            for entry in sorted(entries, key=lambda entry: entry["width"])
+        },
+    }
+    # update_fields saves skip upload handling; post_save refreshes the storefront projection.
+    product_image.save(update_fields=["derivatives"])
+    return True
+
+
+def generate_derivatives(image_id: int) -> bool:
+    from apps.catalog.models import ProductImage
+
+    digest = ProductImage.objects.filter(pk=image_id).values_list("content_hash", flat=True).first()
+    if not digest:
+        return False
+    return record_derivatives(image_id, digest, render_derivatives(image_id))
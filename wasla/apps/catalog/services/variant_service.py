@@ -7,6 +7,8 @@ from django.db import IntegrityError, transaction
 
 from apps.catalog.models import Category, Inventory, Product, ProductImage, ProductOption, ProductOptionGroup, ProductVariant
 from apps.stores.models import Store
+from apps.storefront.read_models import batched_read_model_refresh
+from core.infrastructure.store_cache import coalesced_invalidation
 
 
 class VariantPricingService:
@@ -40,7 +42,11 @@ class ProductVariantService:
         }
 
     @staticmethod
-    def assert_checkout_stock(*, store_id: int, items: Iterable[dict]) -> None:
+    def assert_checkout_stock(
+        *, store_id: int, items: Iterable[dict], on_hand: dict[int, int] | None = None
+    ) -> None:
+        # `on_hand` (product id -> Inventory quantity) skips the Inventory query when already loaded.
+        unvaried: list[tuple[Product, int]] = []
         for item in items:
             quantity = int(item.get("quantity") or 0)
             if quantity < 1:
@@ -59,13 +65,25 @@ class ProductVariantService:
             product = item.get("product")
             if not product:
                 raise ValueError("Product is required.")
-            inventory = Inventory.objects.filter(product_id=product.id).first()
-            if not inventory or int(inventory.quantity) < quantity:
+            unvaried.append((product, quantity))
+
+        if not unvaried:
+            return
+        if on_hand is None:
+            on_hand = dict(
+                Inventory.objects.filter(product_id__in={product.id for product, _ in unvaried}).values_list(
+                    "product_id", "quantity"
+                )
+            )
+        for product, quantity in unvaried:
+            if int(on_hand.get(product.id, 0)) < quantity:
                 raise ValueError(f"Insufficient stock for '{product}'.")
 
 
 class ProductConfigurationService:
     @staticmethod
+    @coalesced_invalidation()
+    @batched_read_model_refresh()
     @transaction.atomic
     def upsert_product_with_variants(
         *,
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import logging
+import os
+
+from django.conf import settings
+
+from apps.catalog.services.image_derivatives import (
+    DERIVATIVE_WIDTHS,
+    generate_derivatives,
+    record_derivatives,
+    render_derivatives,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _generate_derivatives_now(*, image_id: int) -> None:
+    try:
+        generate_derivatives(image_id)
+    except Exception:
+        # best-effort: templates fall back to the original upload without a manifest
+        logger.exception("product_image_derivatives_failed", extra={"image_id": image_id})
+
+
+def enqueue_image_derivatives(*, image_id: int) -> None:
+    """
+    Fan derivative rendering out to Celery workers; render synchronously when
+    Celery is unavailable, eager or has no broker.
+    """
+    eager = (
+        getattr(settings, "CELERY_TASK_ALWAYS_EAGER", False)
+        or os.getenv("CELERY_TASK_ALWAYS_EAGER", "").strip().lower() in ("1", "true", "yes")
+    )
+    broker_url = (getattr(settings, "CELERY_BROKER_URL", "") or os.getenv("CELERY_BROKER_URL", "")).strip()
+    try:
+        from celery import shared_task  # noqa: F401
+    except Exception:
+        _generate_derivatives_now(image_id=image_id)
+        return
+
+    if eager or not broker_url:
+        _generate_derivatives_now(image_id=image_id)
+        return
+
+    try:
+        generate_image_derivatives_task.delay(image_id=image_id)
+    except Exception:
+        _generate_derivatives_now(image_id=image_id)
+
+
+try:
+    from celery import chord, shared_task
+except Exception:  # pragma: no cover
+    shared_task = None
+
+
+if shared_task:
+
+    @shared_task(
+        bind=True,
+        autoretry_for=(Exception,),
+        retry_backoff=True,
+        retry_backoff_max=300,
+        retry_jitter=True,
+        retry_kwargs={"max_retries": 3},
+    )
+    def render_image_derivative_task(self, *, image_id: int, preset: str) -> list[dict]:
+        return render_derivatives(image_id, [preset])
+
+    @shared_task
+    def record_image_derivatives_task(results: list[list[dict]], *, image_id: int, digest: str) -> bool:
+        return record_derivatives(image_id, digest, [entry for entries in results for entry in entries])
+
+    @shared_task
+    def generate_image_derivatives_task(*, image_id: int) -> None:
+        from apps.catalog.models import ProductImage
+
+        digest = ProductImage.objects.filter(pk=image_id).values_list("content_hash", flat=True).first()
+        if not digest:
+            return
+        chord(
+            render_image_derivative_task.s(image_id=image_id, preset=preset) for preset in DERIVATIVE_WIDTHS
+        )(record_image_derivatives_task.s(image_id=image_id, digest=digest))
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.catalog.models import Category, Inventory, Product, ProductVariant
+from apps.catalog.services.bulk_service import BulkCatalogWriteService
+from apps.stores.models import Store
+from apps.storefront.models import ProductSearch, StorefrontProductView
+from core.infrastructure.store_cache import StoreCacheService
+
+
+def _products(prefix: str, count: int, *, variants: int = 2) -> list[dict]:
+    return [
+        {
+            "sku": f"{prefix}-{index}",
+            "name": f"Product {prefix} {index}",
+            "price": Decimal("20.00") + index,
+            "quantity": 5,
+            "variants": [
+                {
+                    "sku": f"{prefix}-{index}-{size}",
+                    "stock_quantity": 3,
+                    "options": [{"group": "Size", "value": size}],
+                }
+                for size in ("S", "M", "L")[:variants]
+            ],
+        }
+        for index in range(count)
+    ]
+
+
+class BulkCatalogWriteServiceTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        owner = get_user_model().objects.create_user(username="owner-bulk", password="pass12345")
+        self.store = Store.objects.create(owner=owner, name="Bulk Store", slug="bulk-store", subdomain="bulk-store")
+        self.option_groups = [{"name": "Size", "options": [{"value": "S"}, {"value": "M"}, {"value": "L"}]}]
+
+    def _upsert(self, products):
+        with self.captureOnCommitCallbacks(execute=True):
+            return BulkCatalogWriteService.upsert_products(
+                store=self.store,
+                products=products,
+                option_groups=self.option_groups,
+            )
+
+    def test_creates_products_variants_and_links(self):
+        result = self._upsert(_products("TEE", 3))
+
+        self.assertEqual((result.created, result.updated, result.variants), (3, 0, 6))
+        product = Product.objects.get(store_id=self.store.id, sku="TEE-1")
+        self.assertEqual(result.product_ids["TEE-1"], product.id)
+        self.assertEqual(Inventory.objects.get(product=product).quantity, 5)
+        self.assertEqual(list(product.categories.values_list("name", flat=True)), ["General"])
+        variant = ProductVariant.objects.get(store_id=self.store.id, sku="TEE-1-M")
+        self.assertEqual(variant.product_id, product.id)
+        self.assertEqual(list(variant.options.values_list("value", flat=True)), ["M"])
+        self.assertTrue(ProductSearch.objects.filter(product=product).exists())
+        self.assertTrue(StorefrontProductView.objects.get(pk=product.pk).has_variants)
+
+    def test_second_call_updates_by_sku_and_prunes_variants(self):
+        self._upsert(_products("TEE", 2))
+        category = Category.objects.create(store_id=self.store.id, name="Shirts")
+        payload = _products("TEE", 3, variants=1)
+        payload[0]["price"] = Decimal("99.00")
+        payload[0]["quantity"] = 0
+        payload[0]["category_ids"] = [category.id]
+
+        result = self._upsert(payload)
+
+        self.assertEqual((result.created, result.updated), (1, 2))
+        product = Product.objects.get(store_id=self.store.id, sku="TEE-0")
+        self.assertEqual(product.price, Decimal("99.00"))
+        self.assertEqual(product.visibility, Product.VISIBILITY_DISABLED)
+        self.assertFalse(Inventory.objects.get(product=product).in_stock)
+        self.assertEqual(list(product.categories.all()), [category])
+        self.assertEqual(list(product.variants.values_list("sku", flat=True)), ["TEE-0-S"])
+        self.assertEqual(Product.objects.filter(store_id=self.store.id).count(), 3)
+
+    def test_upserts_without_a_conflict_target_on_mysql_like_backends(self):
+        # Django refuses `unique_fields` where the backend cannot name a conflict target.
+        with mock.patch.object(connection.features, "supports_update_conflicts_with_target", False):
+            result = self._upsert(_products("TEE", 2))
+
+        self.assertEqual((result.created, result.variants), (2, 4))
+        self.assertEqual(ProductVariant.objects.filter(store_id=self.store.id).count(), 4)
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        self._upsert(_products("WARM", 1))
+
+        with CaptureQueriesContext(connection) as small:
+            self._upsert(_products("SMALL", 5))
+        with CaptureQueriesContext(connection) as large:
+            # Sized below SQLite's per-statement parameter limit, which splits inserts into batches.
+            self._upsert(_products("LARGE", 40))
+
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+
+    def test_cache_namespaces_are_bumped_once_per_call(self):
+        before = StoreCacheService.get_namespace_version(store_id=self.store.id, namespace="product_detail")
+
+        self._upsert(_products("TEE", 10))
+
+        after = StoreCacheService.get_namespace_version(store_id=self.store.id, namespace="product_detail")
+        self.assertEqual(after, before + 1)
+
+    def test_variant_sku_of_another_product_is_rejected(self):
+        self._upsert(_products("TEE", 1))
+        payload = _products("CAP", 1, variants=0)
+        payload[0]["variants"] = [{"sku": "TEE-0-S"}]
+
+        with self.assertRaisesMessage(ValueError, "Variant SKU must be unique per store."):
+            self._upsert(payload)
+        self.assertFalse(Product.objects.filter(store_id=self.store.id, sku="CAP-0").exists())
+
+    def test_unknown_option_label_is_rejected(self):
+        payload = _products("TEE", 1, variants=0)
+        payload[0]["variants"] = [{"sku": "TEE-0-XL", "options": [{"group": "Size", "value": "XL"}]}]
+
+        with self.assertRaisesMessage(ValueError, "Option 'XL' not found in group 'Size'."):
+            self._upsert(payload)
@@ -105,3 +105,76 @@ class ProductImageBackwardCompatibilityAPITests(TestCase):
         self.assertEqual(images.count(), 1)
         self.assertTrue(images.first().is_primary)
         self.assertTrue(bool(product.image))
+
+
+def _sample_jpeg(name: str, size=(1000, 500), color=(0, 128, 255)):
+    from PIL import Image
+
+    output = BytesIO()
+    Image.new("RGB", size, color=color).save(output, format="JPEG")
+    output.seek(0)
+    return SimpleUploadedFile(name=name, content=output.read(), content_type="image/jpeg")
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class ProductImageDerivativeTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        import tempfile
+
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_override = override_settings(MEDIA_ROOT=media.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.product = Product.objects.create(store_id=7301, sku="IMG-DER", name="Derived", price="10.00")
+
+    def test_derivatives_are_rendered_after_commit(self):
+        from django.core.files.storage import default_storage
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            image = ProductImage.objects.create(product=self.product, image=_sample_jpeg("large.jpg"))
+        image.refresh_from_db()
+        self.assertEqual(len(image.content_hash), 64)
+        self.assertEqual(image.derivatives, {})
+
+        for callback in callbacks:
+            callback()
+        image.refresh_from_db()
+        sources = image.derivatives["sources"]
+        self.assertEqual(
+            {preset: entry["width"] for preset, entry in sources.items()},
+            {"thumb": 160, "card": 400, "detail": 800, "zoom": 1000},
+        )
+        self.assertEqual(sources["card"]["height"], 200)
+        self.assertTrue(default_storage.exists(sources["card"]["webp"]))
+        self.assertTrue(default_storage.exists(sources["card"]["jpeg"]))
+
+    def test_identical_upload_reuses_file_and_derivatives(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = ProductImage.objects.create(product=self.product, image=_sample_jpeg("one.jpg"))
+        first.refresh_from_db()
+
+        other = Product.objects.create(store_id=7301, sku="IMG-DER-2", name="Copy", price="10.00")
+        with self.captureOnCommitCallbacks(execute=True):
+            copy = ProductImage.objects.create(product=other, image=_sample_jpeg("two.jpg"))
+        copy.refresh_from_db()
+
+        self.assertEqual(copy.image.name, first.image.name)
+        self.assertEqual(copy.derivatives, first.derivatives)
+
+    def test_storefront_cards_emit_srcset(self):
+        from django.template import Context, Template
+
+        from apps.storefront.models import StorefrontProductView
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductImage.objects.create(product=self.product, image=_sample_jpeg("card.jpg"))
+        card = StorefrontProductView.objects.get(pk=self.product.pk)
+        html = Template(
+            '{% load storefront_images %}{% responsive_image card.image card.image_derivatives "card" alt=card.name %}'
+        ).render(Context({"card": card}))
+
+        self.assertIn('<source type="image/webp" srcset="', html)
+        self.assertIn("160w.webp 160w", html)
+        self.assertIn('width="400" height="200"', html)
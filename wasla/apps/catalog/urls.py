@@ -2,6 +2,7 @@ from django.urls import path
 
 from apps.catalog.api import (
     LowStockAPI,
+    ProductBulkUpsertAPI,
     ProductUpsertAPI,
     ProductUpdateAPI,
     StockMovementsAPI,
@@ -15,6 +16,7 @@ app_name = "catalog"
 # API endpoints
 api_patterns = [
     path("catalog/products/", ProductUpsertAPI.as_view()),
+    path("catalog/products/bulk/", ProductBulkUpsertAPI.as_view()),
     path("catalog/products/<int:product_id>/", ProductUpdateAPI.as_view()),
     path("catalog/products/<int:product_id>/price/", VariantPriceResolveAPI.as_view()),
     path("catalog/variants/<int:variant_id>/stock/", VariantStockAPI.as_view()),
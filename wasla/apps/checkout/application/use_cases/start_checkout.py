@@ -6,6 +6,7 @@ from decimal import Decimal
 from django.db import transaction
 
 from apps.cart.application.use_cases.get_cart import GetCartUseCase
+from apps.cart.infrastructure.hot_store import persist_hot_cart
 from apps.checkout.domain.errors import EmptyCartError
 from apps.checkout.domain.policies import compute_totals
 from apps.checkout.models import CheckoutSession
@@ -23,6 +24,8 @@ class StartCheckoutUseCase:
     @staticmethod
     @transaction.atomic
     def execute(cmd: StartCheckoutCommand) -> CheckoutSession:
+        # Checkout works from the database cart: write back the hot cart first.
+        persist_hot_cart(cmd.tenant_ctx)
         cart_summary = GetCartUseCase.execute(cmd.tenant_ctx)
         if not cart_summary.items:
             raise EmptyCartError("Cart is empty.")
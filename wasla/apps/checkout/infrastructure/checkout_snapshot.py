@@ -0,0 +1,153 @@
+"""
+Checkout snapshot: everything an order is priced from, read once.
+
+The cart lines come back with their products, variants and inventory in one
+query; the cart, the applied coupon and the chosen shipping rate take a fixed
+number of queries more. Order placement prices and validates from the
+snapshot only, so its cost does not grow with the size of the cart and the
+cart itself is never written while the checkout session is locked.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import Decimal
+
+from apps.cart.domain.dtos import CartItemDTO, CartSummary
+from apps.cart.domain.policies import safe_decimal
+from apps.cart.models import Cart, CartItem
+from apps.catalog.models import Inventory, Product, ProductVariant
+from apps.checkout.domain.errors import InvalidCheckoutStateError
+from apps.checkout.infrastructure.shipping_options import list_shipping_methods
+from apps.checkout.models import CheckoutSession
+from apps.coupons.models import Coupon
+from apps.tenants.domain.tenant_context import TenantContext
+
+
+@dataclass(frozen=True)
+class CheckoutLine:
+    cart_item_id: int
+    product: Product
+    variant: ProductVariant | None
+    quantity: int
+    unit_price: Decimal
+
+
+@dataclass(frozen=True)
+class CheckoutSnapshot:
+    cart: Cart
+    lines: list[CheckoutLine]
+    # Inventory quantity per product id (products without an Inventory row are absent).
+    on_hand: dict[int, int]
+    coupon: Coupon | None
+    shipping_fee: Decimal
+
+    @property
+    def subtotal(self) -> Decimal:
+        return _subtotal(self.lines)
+
+    def order_items(self) -> list[dict]:
+        return [
+            {
+                "product": line.product,
+                "variant": line.variant,
+                "quantity": line.quantity,
+                "price": line.unit_price,
+            }
+            for line in self.lines
+        ]
+
+
+def load_checkout_snapshot(*, session: CheckoutSession, tenant_ctx: TenantContext) -> CheckoutSnapshot:
+    store_id = tenant_ctx.store_id
+    cart = Cart.objects.filter(id=session.cart_id, store_id=store_id).first()
+    if not cart:
+        raise InvalidCheckoutStateError("Cart is empty.")
+
+    lines: list[CheckoutLine] = []
+    on_hand: dict[int, int] = {}
+    cart_items = (
+        CartItem.objects.filter(cart=cart)
+        .select_related("product", "product__inventory", "variant")
+        .order_by("id")
+    )
+    for item in cart_items:
+        product = item.product
+        if product.store_id != store_id:
+            raise InvalidCheckoutStateError("Product not found for order.")
+        variant = item.variant
+        if variant is not None and (variant.store_id != store_id or variant.product_id != product.id):
+            raise InvalidCheckoutStateError("Variant not found for order.")
+        try:
+            on_hand[product.id] = int(product.inventory.quantity)
+        except Inventory.DoesNotExist:
+            pass
+        lines.append(
+            CheckoutLine(
+                cart_item_id=item.id,
+                product=product,
+                variant=variant,
+                quantity=item.quantity,
+                unit_price=safe_decimal(item.unit_price_snapshot),
+            )
+        )
+    if not lines:
+        raise InvalidCheckoutStateError("Cart is empty.")
+
+    coupon = None
+    coupon_code = (cart.applied_coupon_code or "").strip()
+    if coupon_code:
+        coupon = Coupon.objects.filter(store_id=store_id, code__iexact=coupon_code, is_active=True).first()
+
+    return CheckoutSnapshot(
+        cart=cart,
+        lines=lines,
+        on_hand=on_hand,
+        coupon=coupon,
+        shipping_fee=_shipping_fee(session, tenant_ctx, cart, lines),
+    )
+
+
+def _subtotal(lines: list[CheckoutLine]) -> Decimal:
+    return sum((line.unit_price * line.quantity for line in lines), Decimal("0"))
+
+
+def _shipping_fee(session: CheckoutSession, tenant_ctx: TenantContext, cart: Cart, lines: list[CheckoutLine]) -> Decimal:
+    """Current fee of the method chosen for this session, priced on the snapshot's lines."""
+    if not session.shipping_method_code:
+        return Decimal(str((session.totals_json or {}).get("shipping_fee") or "0"))
+    available = list_shipping_methods(
+        tenant_id=tenant_ctx.store_id,
+        address=session.shipping_address_json or {},
+        cart_summary=_cart_summary(cart, lines),
+    )
+    chosen = next((method for method in available if method.code == session.shipping_method_code), None)
+    if not chosen:
+        raise InvalidCheckoutStateError("Shipping method not available.")
+    return Decimal(chosen.fee)
+
+
+def _cart_summary(cart: Cart, lines: list[CheckoutLine]) -> CartSummary:
+    subtotal = _subtotal(lines)
+    return CartSummary(
+        cart_id=cart.id,
+        currency=cart.currency,
+        items=[
+            CartItemDTO(
+                id=line.cart_item_id,
+                product_id=line.product.id,
+                variant_id=line.variant.id if line.variant else None,
+                variant_sku=getattr(line.variant, "sku", ""),
+                name=line.product.name,
+                quantity=line.quantity,
+                unit_price=line.unit_price,
+                line_total=line.unit_price * line.quantity,
+            )
+            for line in lines
+        ],
+        subtotal=subtotal,
+        discount_amount=Decimal("0"),
+        coupon_code=None,
+        total=subtotal,
+        item_count=sum(line.quantity for line in lines),
+    )
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.cart.models import Cart, CartItem
+from apps.catalog.models import Inventory, Product
+from apps.checkout.application.use_cases.create_order_from_checkout import (
+    CreateOrderFromCheckoutCommand,
+    CreateOrderFromCheckoutUseCase,
+)
+from apps.checkout.models import CheckoutSession
+from apps.coupons.models import Coupon, CouponUsageLog
+from apps.stores.models import Store
+from apps.subscriptions.models import StoreSubscription, SubscriptionPlan
+from apps.tenants.domain.tenant_context import TenantContext
+from apps.tenants.models import Tenant
+
+# Session lock, cart, lines, coupon, shipping settings and weights, customer,
+# stock, plan snapshot, usage counter, order, items, coupon usage, session.
+CHECKOUT_QUERY_BUDGET = 30
+
+
+class CheckoutQueryBudgetTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        owner = get_user_model().objects.create_user(username="owner-budget", password="pass12345")
+        self.tenant = Tenant.objects.create(slug="tenant-budget", name="Tenant Budget", is_active=True)
+        self.store = Store.objects.create(
+            owner=owner,
+            tenant=self.tenant,
+            name="Budget Store",
+            slug="budget-store",
+            subdomain="budget-store",
+            status=Store.STATUS_ACTIVE,
+            country="SA",
+        )
+        plan = SubscriptionPlan.objects.create(name=f"Budget-{uuid.uuid4().hex[:8]}", is_active=True)
+        StoreSubscription.objects.create(
+            store_id=self.store.id,
+            plan=plan,
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=30),
+            status="active",
+        )
+        # Bulk inserts keep catalog signals (search, read models) out of the fixture.
+        Product.objects.bulk_create(
+            [
+                Product(store_id=self.store.id, sku=f"SKU-{index}", name=f"Item {index}", price=Decimal("10.00"))
+                for index in range(100)
+            ]
+        )
+        self.products = list(Product.objects.filter(store_id=self.store.id).order_by("id"))
+        Inventory.objects.bulk_create([Inventory(product=product, quantity=5) for product in self.products])
+        self.coupon = Coupon.objects.create(
+            store=self.store,
+            code="TEN",
+            discount_type=Coupon.DISCOUNT_PERCENTAGE,
+            discount_value=Decimal("10.00"),
+            end_date=timezone.now() + timedelta(days=30),
+        )
+
+    def _session(self, lines: int, name: str = "") -> tuple[TenantContext, CheckoutSession]:
+        session_key = f"budget-{name or lines}"
+        cart = Cart.objects.create(
+            store_id=self.store.id, session_key=session_key, currency="SAR", applied_coupon_code="ten"
+        )
+        CartItem.objects.bulk_create(
+            [
+                CartItem(cart=cart, product=product, quantity=2, unit_price_snapshot=Decimal("10.00"))
+                for product in self.products[:lines]
+            ]
+        )
+        session = CheckoutSession.objects.create(
+            store_id=self.store.id,
+            cart=cart,
+            status=CheckoutSession.STATUS_PAYMENT,
+            shipping_method_code="pickup",
+            shipping_address_json={
+                "full_name": "Buyer",
+                "email": f"buyer-{name or lines}@example.com",
+                "phone": "0500000000",
+                "line1": "Riyadh",
+                "city": "Riyadh",
+                "country": "SA",
+            },
+        )
+        tenant_ctx = TenantContext(
+            tenant_id=self.tenant.id,
+            store_id=self.store.id,
+            currency="SAR",
+            user_id=None,
+            session_key=session_key,
+        )
+        return tenant_ctx, session
+
+    def _checkout(self, tenant_ctx: TenantContext, session: CheckoutSession):
+        return CreateOrderFromCheckoutUseCase.execute(
+            CreateOrderFromCheckoutCommand(tenant_ctx=tenant_ctx, session_id=session.id)
+        )
+
+    def test_checkout_query_count_does_not_grow_with_the_cart(self):
+        # The store's first order also seeds its usage counter and plan snapshot.
+        self._checkout(*self._session(1, name="warm-up"))
+        counts = {}
+        for lines in (1, 10, 100):
+            tenant_ctx, session = self._session(lines)
+            with CaptureQueriesContext(connection) as queries:
+                order = self._checkout(tenant_ctx, session)
+            counts[lines] = len(queries)
+
+            subtotal = Decimal("20.00") * lines
+            self.assertEqual(order.items.count(), lines)
+            self.assertEqual((order.subtotal, order.discount_amount), (subtotal, subtotal / 10))
+            self.assertEqual(order.total_amount, (subtotal * Decimal("0.9") * Decimal("1.15")).quantize(Decimal("0.01")))
+            self.assertEqual(order.coupon_code, "TEN")
+
+        self.assertLessEqual(max(counts.values()), CHECKOUT_QUERY_BUDGET, counts)
+        self.assertEqual(len(set(counts.values())), 1, counts)
+        self.assertEqual(CouponUsageLog.objects.filter(coupon=self.coupon).count(), 4)
+
+    def test_monthly_usage_counter_is_the_last_write(self):
+        self._checkout(*self._session(1, name="warm-up"))
+        tenant_ctx, session = self._session(2)
+        with CaptureQueriesContext(connection) as queries:
+            self._checkout(tenant_ctx, session)
+
+        writes = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE"))
+        ]
+        self.assertIn("subscriptions_storemonthlyusage", writes[-1])
+        self.assertEqual(sum("subscriptions_storemonthlyusage" in sql for sql in writes), 1)
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import logging
+import threading
+from collections import Counter
 from contextvars import ContextVar
 from typing import Any
 
@@ -12,6 +14,51 @@ cache_hit_var: ContextVar[bool] = ContextVar("store_cache_hit", default=False)
 logger = logging.getLogger("wasla.performance")
 
 
+class CacheStats:
+    """
+    Per-process cache operation counters.
+
+    Replaces one log line per hit/miss with a single `cache_stats` summary
+    every `CACHE_STATS_LOG_EVERY` operations.
+    """
+
+    def __init__(self) -> None:
+        self._counts: Counter[str] = Counter()
+        self._operations = 0
+        self._lock = threading.Lock()
+
+    def record(self, event: str) -> None:
+        every = int(getattr(settings, "CACHE_STATS_LOG_EVERY", 1000) or 0)
+        with self._lock:
+            self._counts[event] += 1
+            self._operations += 1
+            if every <= 0 or self._operations % every:
+                return
+            snapshot = dict(self._counts)
+        lookups = snapshot.get("hit", 0) + snapshot.get("l1_hit", 0) + snapshot.get("miss", 0)
+        hits = snapshot.get("hit", 0) + snapshot.get("l1_hit", 0)
+        logger.info(
+            "cache_stats",
+            extra={
+                "cache_status": "STATS",
+                "counts": snapshot,
+                "hit_ratio": round(hits / lookups, 4) if lookups else None,
+            },
+        )
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+            self._operations = 0
+
+
+cache_stats = CacheStats()
+
+
 def _default_ttl() -> int:
     return int(getattr(settings, "CACHE_TTL_DEFAULT", 300) or 300)
 
@@ -25,60 +72,24 @@ def cache_get(key: str, store_id: int):
     cache_key = make_cache_key(key=key, store_id=store_id)
     value = cache.get(cache_key)
     if value is None:
-        logger.info(
-            "cache_miss",
-            extra={
-                "store_id": int(store_id),
-                "cache_status": "MISS",
-                "query_count": 0,
-                "duration_ms": 0,
-                "path": None,
-            },
-        )
+        cache_stats.record("miss")
         return None
 
     cache_hit_var.set(True)
-    logger.info(
-        "cache_hit",
-        extra={
-            "store_id": int(store_id),
-            "cache_status": "HIT",
-            "query_count": 0,
-            "duration_ms": 0,
-            "path": None,
-        },
-    )
+    cache_stats.record("hit")
     return value
 
 
 def cache_set(key: str, value: Any, store_id: int, ttl: int | None = None):
     cache_key = make_cache_key(key=key, store_id=store_id)
     cache.set(cache_key, value, timeout=int(ttl or _default_ttl()))
-    logger.info(
-        "cache_set",
-        extra={
-            "store_id": int(store_id),
-            "cache_status": "SET",
-            "query_count": 0,
-            "duration_ms": 0,
-            "path": None,
-        },
-    )
+    cache_stats.record("set")
 
 
 def cache_delete(key: str, store_id: int):
     cache_key = make_cache_key(key=key, store_id=store_id)
     cache.delete(cache_key)
-    logger.info(
-        "cache_invalidation",
-        extra={
-            "store_id": int(store_id),
-            "cache_status": "DELETE",
-            "query_count": 0,
-            "duration_ms": 0,
-            "path": None,
-        },
-    )
+    cache_stats.record("delete")
 
 
 def consume_cache_hit() -> bool:
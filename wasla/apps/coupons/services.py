@@ -3,6 +3,7 @@ from django.utils import timezone
 from django.db import transaction
 from django.db.models import F
 from apps.coupons.models import Coupon, CouponUsageLog
+from core.infrastructure.store_cache import StoreCacheService
 
 
 class CouponValidationError(Exception):
@@ -104,6 +105,9 @@ class CouponValidationService:
 
             # Increment coupon usage count atomically
             Coupon.objects.filter(id=locked_coupon.id).update(times_used=F("times_used") + 1)
+            if locked_coupon.usage_limit:
+                # The usage limit may now be reached; carts must recheck the coupon.
+                StoreCacheService.bump_namespace_version(store_id=locked_coupon.store_id, namespace="coupons")
 
         return usage_log
 
@@ -121,6 +125,8 @@ class CouponValidationService:
                 coupon = log.coupon
                 Coupon.objects.filter(id=coupon.id, times_used__gt=0).update(times_used=F("times_used") - 1)
                 log.delete()
+                if coupon.usage_limit:
+                    StoreCacheService.bump_namespace_version(store_id=coupon.store_id, namespace="coupons")
 
 
 class CouponAnalyticsService:
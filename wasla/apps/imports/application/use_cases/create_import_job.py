@@ -5,7 +5,7 @@ from dataclasses import dataclass
 from django.db import transaction
 
 from apps.imports.domain.errors import ImportValidationError
-from apps.imports.domain.policies import validate_csv_file
+from apps.imports.domain.policies import is_xlsx_file, validate_import_file
 from apps.imports.infrastructure.storage import save_import_csv, save_import_images
 from apps.imports.models import ImportJob
 from apps.tenants.domain.tenant_context import TenantContext
@@ -26,13 +26,13 @@ class CreateImportJobUseCase:
         if not cmd.tenant_ctx.store_id:
             raise ImportValidationError("Tenant context missing.", message_key="import.tenant.required")
 
-        validate_csv_file(cmd.uploaded_file)
+        validate_import_file(cmd.uploaded_file)
 
         job = ImportJob.objects.create(
             store_id=cmd.tenant_ctx.store_id,
             created_by_id=cmd.actor_id,
             status=ImportJob.STATUS_CREATED,
-            source_type=ImportJob.SOURCE_CSV,
+            source_type=ImportJob.SOURCE_XLSX if is_xlsx_file(cmd.uploaded_file.name) else ImportJob.SOURCE_CSV,
         )
 
         try:
@@ -1,132 +1,267 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Iterable
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 
 from django.core.files import File
 from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
 from django.utils.text import slugify
 
 from apps.catalog.models import Category, Inventory, Product
+from apps.catalog.services.bulk_service import sync_bulk_written_products
 from apps.imports.domain.errors import ImportJobNotFoundError
-from apps.imports.domain.policies import parse_decimal, parse_int, sanitize_text
-from apps.imports.infrastructure.csv_utils import iter_csv_rows
+from apps.imports.domain.rows import ProductRow, RowError, parse_product_rows
+from apps.imports.infrastructure.readers import import_chunk_size, iter_row_chunks
 from apps.imports.infrastructure.storage import list_import_images, open_import_file
 from apps.imports.models import ImportJob, ImportRowError
+from apps.storefront.read_models import batched_read_model_refresh
+from core.infrastructure.store_cache import coalesced_invalidation
 
 
 @dataclass(frozen=True)
 class RunImportJobCommand:
     import_job_id: int
+    # Take over a job left in IMPORTING (e.g. by a crashed worker) instead of skipping it.
+    resume: bool = False
+
+
+@dataclass
+class _ImportState:
+    """Lookups shared by every chunk; only updated once a chunk has committed."""
+
+    store_id: int
+    image_map: dict[str, str]
+    error_rows: set[int]
+    existing_skus: set[str]
+    category_ids: dict[str, int] = field(default_factory=dict)
 
 
 class RunImportJobUseCase:
+    """
+    Import the rows of a validated job in chunks of IMPORT_CHUNK_SIZE rows.
+
+    Each chunk is parsed as a whole, written with bulk inserts and committed
+    in its own transaction together with the job's progress counters, so
+    `GetImportJobStatusUseCase` sees progress while the import runs and a
+    rerun continues after `last_committed_row`. A chunk that fails to
+    commit is retried row by row, so only the offending rows are reported;
+    product images it already wrote to storage are deleted first.
+    """
+
     @staticmethod
-    @transaction.atomic
     def execute(cmd: RunImportJobCommand) -> ImportJob:
+        job, should_run = RunImportJobUseCase._start(cmd)
+        if not should_run:
+            return job
+
+        state = _ImportState(
+            store_id=job.store_id,
+            image_map=list_import_images(store_id=job.store_id, job_id=job.id),
+            error_rows=set(ImportRowError.objects.filter(import_job=job).values_list("row_number", flat=True)),
+            existing_skus=set(Product.objects.filter(store_id=job.store_id).values_list("sku", flat=True)),
+        )
+        for chunk in iter_row_chunks(
+            job.original_file_path,
+            import_chunk_size(),
+            start_after=job.last_committed_row,
+        ):
+            RunImportJobUseCase._import_rows(job.id, chunk, state)
+
+        job.refresh_from_db()
+        job.status = ImportJob.STATUS_COMPLETED if job.success_rows > 0 else ImportJob.STATUS_FAILED
+        job.save(update_fields=["status", "updated_at"])
+        return job
+
+    @staticmethod
+    @transaction.atomic
+    def _start(cmd: RunImportJobCommand) -> tuple[ImportJob, bool]:
         job = ImportJob.objects.select_for_update().filter(id=cmd.import_job_id).first()
         if not job:
             raise ImportJobNotFoundError("Import job not found.", message_key="import.job.not_found")
 
         if job.status == ImportJob.STATUS_COMPLETED:
-            return job
+            return job, False
+        if job.status == ImportJob.STATUS_IMPORTING and not cmd.resume:
+            # Another worker owns the job; leave it running.
+            return job, False
 
         if not job.original_file_path:
             job.status = ImportJob.STATUS_FAILED
             job.save(update_fields=["status", "updated_at"])
-            return job
+            return job, False
 
+        update_fields = ["status", "updated_at"]
+        if not job.last_committed_row:
+            # Fresh run: validation stored the expected success count.
+            job.success_rows = 0
+            job.processed_rows = 0
+            update_fields += ["success_rows", "processed_rows"]
         job.status = ImportJob.STATUS_IMPORTING
-        job.save(update_fields=["status", "updated_at"])
+        job.save(update_fields=update_fields)
+        return job, True
+
+    @staticmethod
+    def _import_rows(job_id: int, rows: list[tuple[int, dict]], state: _ImportState) -> None:
+        try:
+            RunImportJobUseCase._commit_chunk(job_id, rows, state)
+        except Exception as exc:
+            if len(rows) == 1:
+                RunImportJobUseCase._commit_failed_row(job_id, rows[0][0], exc)
+                return
+            for row in rows:
+                RunImportJobUseCase._import_rows(job_id, [row], state)
 
-        image_map = list_import_images(store_id=job.store_id, job_id=job.id)
-        error_rows = set(
-            ImportRowError.objects.filter(import_job=job).values_list("row_number", flat=True)
+    @staticmethod
+    def _commit_chunk(job_id: int, rows: list[tuple[int, dict]], state: _ImportState) -> None:
+        chunk_skus: set[str] = set()
+        new_categories: dict[str, int] = {}
+        written_images: list = []
+        with (
+            _discard_on_error(written_images),
+            coalesced_invalidation(),
+            batched_read_model_refresh(),
+            transaction.atomic(),
+        ):
+            parsed, errors = parse_product_rows(
+                [(row_number, row) for row_number, row in rows if row_number not in state.error_rows],
+                image_map=state.image_map,
+                existing_skus=state.existing_skus,
+                seen_skus=chunk_skus,
+            )
+            products = RunImportJobUseCase._build_products(parsed, state, chunk_skus, written_images)
+            if products:
+                Product.objects.bulk_create(products)
+                # Not every backend returns ids from bulk inserts, so read them back by SKU.
+                ids = dict(
+                    Product.objects.filter(store_id=state.store_id, sku__in=[product.sku for product in products])
+                    .values_list("sku", "id")
+                )
+                for product in products:
+                    product.pk = ids[product.sku]
+
+                Inventory.objects.bulk_create(
+                    [
+                        Inventory(product_id=product.pk, quantity=row.stock_quantity, in_stock=row.stock_quantity > 0)
+                        for product, row in zip(products, parsed)
+                    ]
+                )
+                new_categories = RunImportJobUseCase._create_missing_categories(parsed, state)
+                category_ids = {**state.category_ids, **new_categories}
+                through = Product.categories.through
+                through.objects.bulk_create(
+                    [
+                        through(product_id=product.pk, category_id=category_ids[row.category])
+                        for product, row in zip(products, parsed)
+                        if row.category
+                    ]
+                )
+                sync_bulk_written_products(store_id=state.store_id, products=products)
+
+            RunImportJobUseCase._save_errors(job_id, errors)
+            ImportJob.objects.filter(pk=job_id).update(
+                processed_rows=F("processed_rows") + len(rows),
+                success_rows=F("success_rows") + len(products),
+                failed_rows=F("failed_rows") + len({error.row_number for error in errors}),
+                last_committed_row=rows[-1][0],
+                updated_at=timezone.now(),
+            )
+        state.existing_skus.update(chunk_skus)
+        state.category_ids.update(new_categories)
+
+    @staticmethod
+    def _build_products(
+        parsed: list[ProductRow], state: _ImportState, chunk_skus: set[str], written_images: list
+    ) -> list[Product]:
+        products = []
+        for row in parsed:
+            sku = row.sku
+            if not sku:
+                sku = _generate_sku(row.name, state.existing_skus, chunk_skus)
+                chunk_skus.add(sku)
+            visibility = Product.resolve_visibility(quantity=row.stock_quantity)
+            product = Product(
+                store_id=state.store_id,
+                sku=sku,
+                name=row.name,
+                price=row.price,
+                visibility=visibility,
+                is_active=Product.is_active_from_visibility(visibility),
+            )
+            if row.image_file:
+                with open_import_file(state.image_map[row.image_file], "rb") as img:
+                    product.image.save(row.image_file, File(img), save=False)
+                written_images.append(product.image)
+            products.append(product)
+        return products
+
+    @staticmethod
+    def _create_missing_categories(parsed: list[ProductRow], state: _ImportState) -> dict[str, int]:
+        names = {row.category for row in parsed if row.category} - set(state.category_ids)
+        if not names:
+            return {}
+        found: dict[str, int] = {}
+        lookup = Category.objects.filter(store_id=state.store_id, name__in=names).order_by("id")
+        for name, category_id in lookup.values_list("name", "id"):
+            found.setdefault(name, category_id)
+        missing = sorted(names - set(found))
+        if missing:
+            Category.objects.bulk_create([Category(store_id=state.store_id, name=name) for name in missing])
+            created = Category.objects.filter(store_id=state.store_id, name__in=missing).order_by("id")
+            for name, category_id in created.values_list("name", "id"):
+                found.setdefault(name, category_id)
+        return found
+
+    @staticmethod
+    def _save_errors(job_id: int, errors: list[RowError]) -> None:
+        ImportRowError.objects.bulk_create(
+            [
+                ImportRowError(
+                    import_job_id=job_id,
+                    row_number=error.row_number,
+                    field=error.field,
+                    message_key=error.message_key,
+                    raw_value=error.raw_value,
+                )
+                for error in errors
+            ]
+        )
+
+    @staticmethod
+    @transaction.atomic
+    def _commit_failed_row(job_id: int, row_number: int, exc: Exception) -> None:
+        ImportRowError.objects.create(
+            import_job_id=job_id,
+            row_number=row_number,
+            field="row",
+            message_key="import.row.failed",
+            raw_value=str(exc),
         )
-        existing_skus = set(
-            Product.objects.filter(store_id=job.store_id).values_list("sku", flat=True)
+        ImportJob.objects.filter(pk=job_id).update(
+            processed_rows=F("processed_rows") + 1,
+            failed_rows=F("failed_rows") + 1,
+            last_committed_row=row_number,
+            updated_at=timezone.now(),
         )
-        created_rows = 0
-        failed_rows = job.failed_rows
-
-        category_cache: dict[str, Category] = {}
-
-        for row_number, row in iter_csv_rows(job.original_file_path):
-            if row_number in error_rows:
-                continue
-
-            try:
-                with transaction.atomic():
-                    name_ar = sanitize_text(row.get("name_ar", ""))
-                    name_en = sanitize_text(row.get("name_en", ""))
-                    name_raw = sanitize_text(row.get("name", ""))
-                    name = name_ar or name_en or name_raw
-                    if not name:
-                        raise ValueError("Missing name.")
-
-                    price = parse_decimal(row.get("price", ""), field="price")
-                    stock_qty = parse_int(row.get("stock_quantity", ""), field="stock_quantity", default=0)
-                    sku = sanitize_text(row.get("sku", ""))
-                    if not sku:
-                        sku = _generate_sku(name, existing_skus)
-                    if sku in existing_skus:
-                        raise ValueError("Duplicate SKU.")
-                    existing_skus.add(sku)
-
-                    product = Product(
-                        store_id=job.store_id,
-                        sku=sku,
-                        name=name,
-                        price=price,
-                        is_active=True,
-                    )
-
-                    image_file = sanitize_text(row.get("image_file", "")) or sanitize_text(row.get("image_files", ""))
-                    if image_file and image_file in image_map:
-                        with open_import_file(image_map[image_file], "rb") as img:
-                            product.image.save(image_file, File(img), save=False)
-
-                    product.save()
-
-                    category_name = sanitize_text(row.get("category", ""))
-                    if category_name:
-                        category = category_cache.get(category_name)
-                        if not category:
-                            category, _ = Category.objects.get_or_create(
-                                store_id=job.store_id, name=category_name
-                            )
-                            category_cache[category_name] = category
-                        product.categories.add(category)
-
-                    Inventory.objects.create(
-                        product=product,
-                        quantity=stock_qty,
-                        in_stock=stock_qty > 0,
-                    )
-
-                    created_rows += 1
-            except Exception as exc:
-                failed_rows += 1
-                ImportRowError.objects.create(
-                    import_job=job,
-                    row_number=row_number,
-                    field="row",
-                    message_key="import.row.failed",
-                    raw_value=str(exc),
-                )
 
-        job.success_rows = created_rows
-        job.failed_rows = failed_rows
-        job.status = ImportJob.STATUS_COMPLETED if created_rows > 0 else ImportJob.STATUS_FAILED
-        job.save(update_fields=["success_rows", "failed_rows", "status", "updated_at"])
-        return job
+
+@contextmanager
+def _discard_on_error(files: list):
+    """Delete stored `files` when the block raises; storage does not roll back with the transaction."""
+    try:
+        yield
+    except Exception:
+        for stored in files:
+            stored.delete(save=False)
+        raise
 
 
-def _generate_sku(name: str, existing: Iterable[str]) -> str:
+def _generate_sku(name: str, *taken: set[str]) -> str:
     base = slugify(name)[:40] or "item"
     candidate = base.upper()
     counter = 1
-    while candidate in existing:
+    while any(candidate in skus for skus in taken):
         counter += 1
         candidate = f"{base[:35]}-{counter}".upper()
     return candidate
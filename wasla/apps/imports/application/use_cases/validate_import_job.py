@@ -1,14 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from decimal import Decimal
 
 from django.db import transaction
 
 from apps.catalog.models import Product
 from apps.imports.domain.errors import ImportJobNotFoundError, ImportValidationError
-from apps.imports.domain.policies import parse_decimal, parse_int, sanitize_text
-from apps.imports.infrastructure.csv_utils import get_csv_headers, iter_csv_rows
+from apps.imports.domain.rows import parse_product_rows
+from apps.imports.infrastructure.readers import get_import_headers, import_chunk_size, iter_row_chunks
 from apps.imports.infrastructure.storage import list_import_images
 from apps.imports.models import ImportJob, ImportRowError
 
@@ -37,10 +36,23 @@ class ValidateImportJobUseCase:
         job.total_rows = 0
         job.success_rows = 0
         job.failed_rows = 0
+        job.processed_rows = 0
+        job.last_committed_row = 0
         job.errors_json = {}
-        job.save(update_fields=["status", "total_rows", "success_rows", "failed_rows", "errors_json", "updated_at"])
+        job.save(
+            update_fields=[
+                "status",
+                "total_rows",
+                "success_rows",
+                "failed_rows",
+                "processed_rows",
+                "last_committed_row",
+                "errors_json",
+                "updated_at",
+            ]
+        )
 
-        headers = get_csv_headers(job.original_file_path)
+        headers = get_import_headers(job.original_file_path)
         if not headers:
             job.status = ImportJob.STATUS_FAILED
             job.errors_json = {"message_key": "import.csv.empty"}
@@ -68,71 +80,26 @@ class ValidateImportJobUseCase:
         failed_rows = 0
         total_rows = 0
 
-        for row_number, row in iter_csv_rows(job.original_file_path):
-            total_rows += 1
-            row_errors = []
-            name_ar = sanitize_text(row.get("name_ar", ""))
-            name_en = sanitize_text(row.get("name_en", ""))
-            name_raw = sanitize_text(row.get("name", ""))
-            name = name_ar or name_en or name_raw
-            if not name:
-                row_errors.append(("name", "import.name.required", ""))
-            if name and len(name) > 255:
-                row_errors.append(("name", "import.name.too_long", name))
-
-            try:
-                price = parse_decimal(row.get("price", ""), field="price")
-                if price <= 0:
-                    raise ImportValidationError(
-                        "Price must be positive.", message_key="import.price.positive", field="price"
-                    )
-            except ImportValidationError as exc:
-                row_errors.append((exc.field or "price", exc.message_key, exc.raw_value))
-
-            try:
-                qty = parse_int(row.get("stock_quantity", ""), field="stock_quantity", default=0)
-                if qty < 0:
-                    raise ImportValidationError(
-                        "Stock must be non-negative.",
-                        message_key="import.stock.non_negative",
-                        field="stock_quantity",
-                    )
-            except ImportValidationError as exc:
-                row_errors.append((exc.field or "stock_quantity", exc.message_key, exc.raw_value))
-
-            sku = sanitize_text(row.get("sku", ""))
-            if sku:
-                if len(sku) > 64:
-                    row_errors.append(("sku", "import.sku.too_long", sku))
-                if sku in existing_skus or sku in seen_skus:
-                    row_errors.append(("sku", "import.sku.duplicate", sku))
-                else:
-                    seen_skus.add(sku)
-
-            image_file = sanitize_text(row.get("image_file", "")) or sanitize_text(row.get("image_files", ""))
-            image_url = sanitize_text(row.get("image_url", ""))
-            if image_url:
-                row_errors.append(("image_url", "import.image_url.unsupported", image_url))
-            if image_file:
-                if image_file not in image_map:
-                    row_errors.append(("image_file", "import.image.missing", image_file))
-
-            category_name = sanitize_text(row.get("category", ""))
-            if category_name and len(category_name) > 255:
-                row_errors.append(("category", "import.category.too_long", category_name))
-
+        for chunk in iter_row_chunks(job.original_file_path, import_chunk_size()):
+            total_rows += len(chunk)
+            _, row_errors = parse_product_rows(
+                chunk,
+                image_map=image_map,
+                existing_skus=existing_skus,
+                seen_skus=seen_skus,
+            )
             if row_errors:
-                failed_rows += 1
+                failed_rows += len({error.row_number for error in row_errors})
                 ImportRowError.objects.bulk_create(
                     [
                         ImportRowError(
                             import_job=job,
-                            row_number=row_number,
-                            field=field,
-                            message_key=message_key,
-                            raw_value=raw_value,
+                            row_number=error.row_number,
+                            field=error.field,
+                            message_key=error.message_key,
+                            raw_value=error.raw_value,
                         )
-                        for field, message_key, raw_value in row_errors
+                        for error in row_errors
                     ]
                 )
 
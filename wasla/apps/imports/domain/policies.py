@@ -8,7 +8,13 @@ from .errors import ImportValidationError
 
 ALLOWED_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
 ALLOWED_CSV_EXTENSIONS = {".csv"}
+ALLOWED_XLSX_EXTENSIONS = {".xlsx"}
+XLSX_CONTENT_TYPES = {
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "application/octet-stream",
+}
 MAX_CSV_SIZE_MB = 5
+MAX_XLSX_SIZE_MB = 5
 MAX_IMAGE_SIZE_MB = 5
 
 _CONTROL_CHARS_RE = re.compile(r"[\x00-\x1f\x7f]")
@@ -37,6 +43,33 @@ def validate_csv_file(uploaded_file) -> None:
         raise ImportValidationError("CSV file too large.", message_key="import.csv.too_large")
 
 
+def is_xlsx_file(name: str) -> bool:
+    return Path(name or "").suffix.lower() in ALLOWED_XLSX_EXTENSIONS
+
+
+def validate_xlsx_file(uploaded_file) -> None:
+    from apps.imports.infrastructure.xlsx_utils import xlsx_supported
+
+    if not xlsx_supported():
+        raise ImportValidationError("XLSX import is not available.", message_key="import.xlsx.unsupported")
+
+    content_type = getattr(uploaded_file, "content_type", "") or ""
+    if content_type and content_type not in XLSX_CONTENT_TYPES:
+        raise ImportValidationError("Invalid XLSX file type.", message_key="import.xlsx.invalid_type")
+
+    max_bytes = MAX_XLSX_SIZE_MB * 1024 * 1024
+    if getattr(uploaded_file, "size", 0) > max_bytes:
+        raise ImportValidationError("XLSX file too large.", message_key="import.xlsx.too_large")
+
+
+def validate_import_file(uploaded_file) -> None:
+    """Validate an uploaded CSV or XLSX catalog file."""
+    if uploaded_file and is_xlsx_file(uploaded_file.name):
+        validate_xlsx_file(uploaded_file)
+        return
+    validate_csv_file(uploaded_file)
+
+
 def validate_image_file(image_file) -> None:
     ext = Path(image_file.name or "").suffix.lower()
     if ext not in ALLOWED_IMAGE_EXTENSIONS:
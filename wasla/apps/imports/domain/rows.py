@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import Decimal
+
+from .errors import ImportValidationError
+from .policies import parse_decimal, parse_int, sanitize_text
+
+
+@dataclass(frozen=True)
+class ProductRow:
+    row_number: int
+    name: str
+    price: Decimal
+    stock_quantity: int
+    sku: str
+    image_file: str
+    category: str
+
+
+@dataclass(frozen=True)
+class RowError:
+    row_number: int
+    field: str
+    message_key: str
+    raw_value: str = ""
+
+
+def parse_product_rows(
+    rows: list[tuple[int, dict]],
+    *,
+    image_map: dict[str, str],
+    existing_skus: set[str],
+    seen_skus: set[str],
+) -> tuple[list[ProductRow], list[RowError]]:
+    """Parse and check one chunk of import rows.
+
+    Returns the valid rows and every error of the invalid ones. SKUs of
+    valid and invalid rows alike are added to `seen_skus`, so a repeated SKU
+    is reported on every occurrence after the first.
+    """
+    parsed: list[ProductRow] = []
+    errors: list[RowError] = []
+    for row_number, row in rows:
+        row_errors: list[RowError] = []
+
+        name_ar = sanitize_text(row.get("name_ar", ""))
+        name_en = sanitize_text(row.get("name_en", ""))
+        name_raw = sanitize_text(row.get("name", ""))
+        name = name_ar or name_en or name_raw
+        if not name:
+            row_errors.append(RowError(row_number, "name", "import.name.required"))
+        if name and len(name) > 255:
+            row_errors.append(RowError(row_number, "name", "import.name.too_long", name))
+
+        price = None
+        try:
+            price = parse_decimal(row.get("price", ""), field="price")
+            if price <= 0:
+                raise ImportValidationError(
+                    "Price must be positive.", message_key="import.price.positive", field="price"
+                )
+        except ImportValidationError as exc:
+            row_errors.append(RowError(row_number, exc.field or "price", exc.message_key, exc.raw_value))
+
+        quantity = 0
+        try:
+            quantity = parse_int(row.get("stock_quantity", ""), field="stock_quantity", default=0)
+            if quantity < 0:
+                raise ImportValidationError(
+                    "Stock must be non-negative.",
+                    message_key="import.stock.non_negative",
+                    field="stock_quantity",
+                )
+        except ImportValidationError as exc:
+            row_errors.append(RowError(row_number, exc.field or "stock_quantity", exc.message_key, exc.raw_value))
+
+        sku = sanitize_text(row.get("sku", ""))
+        if sku:
+            if len(sku) > 64:
+                row_errors.append(RowError(row_number, "sku", "import.sku.too_long", sku))
+            if sku in existing_skus or sku in seen_skus:
+                row_errors.append(RowError(row_number, "sku", "import.sku.duplicate", sku))
+            else:
+                seen_skus.add(sku)
+
+        image_file = sanitize_text(row.get("image_file", "")) or sanitize_text(row.get("image_files", ""))
+        image_url = sanitize_text(row.get("image_url", ""))
+        if image_url:
+            row_errors.append(RowError(row_number, "image_url", "import.image_url.unsupported", image_url))
+        if image_file and image_file not in image_map:
+            row_errors.append(RowError(row_number, "image_file", "import.image.missing", image_file))
+
+        category_name = sanitize_text(row.get("category", ""))
+        if category_name and len(category_name) > 255:
+            row_errors.append(RowError(row_number, "category", "import.category.too_long", category_name))
+
+        if row_errors:
+            errors.extend(row_errors)
+            continue
+        parsed.append(
+            ProductRow(
+                row_number=row_number,
+                name=name,
+                price=price,
+                stock_quantity=quantity,
+                sku=sku,
+                image_file=image_file,
+                category=category_name,
+            )
+        )
+    return parsed, errors
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from django.conf import settings
+
+from apps.imports.domain.policies import is_xlsx_file
+from apps.imports.infrastructure.csv_utils import get_csv_headers, iter_csv_rows
+from apps.imports.infrastructure.xlsx_utils import get_xlsx_headers, iter_xlsx_rows
+
+
+def iter_import_rows(file_path: str):
+    """Yield `(row_number, {normalized_header: text})` from a CSV or XLSX import file."""
+    if is_xlsx_file(file_path):
+        return iter_xlsx_rows(file_path)
+    return iter_csv_rows(file_path)
+
+
+def get_import_headers(file_path: str) -> set[str]:
+    if is_xlsx_file(file_path):
+        return get_xlsx_headers(file_path)
+    return get_csv_headers(file_path)
+
+
+def import_chunk_size() -> int:
+    return max(1, int(getattr(settings, "IMPORT_CHUNK_SIZE", 500) or 500))
+
+
+def iter_row_chunks(file_path: str, size: int, *, start_after: int = 0):
+    """Stream rows in lists of at most `size`, skipping rows up to `start_after`."""
+    chunk = []
+    for row_number, row in iter_import_rows(file_path):
+        if row_number <= start_after:
+            continue
+        chunk.append((row_number, row))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from apps.imports.infrastructure.csv_utils import normalize_header
+from apps.imports.infrastructure.storage import open_import_file
+
+try:
+    from openpyxl import load_workbook
+except ImportError:  # pragma: no cover - optional dependency
+    load_workbook = None
+
+
+def xlsx_supported() -> bool:
+    return load_workbook is not None
+
+
+def _cell_text(value) -> str:
+    """Render a cell the way the same value would appear in a CSV export."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _iter_sheet(file_path: str):
+    if load_workbook is None:
+        raise RuntimeError("openpyxl is required to read XLSX imports.")
+    with open_import_file(file_path, "rb") as raw:
+        # read_only streams rows instead of loading the whole sheet.
+        workbook = load_workbook(raw, read_only=True, data_only=True)
+        try:
+            yield from workbook.active.iter_rows(values_only=True)
+        finally:
+            workbook.close()
+
+
+def iter_xlsx_rows(file_path: str):
+    rows = _iter_sheet(file_path)
+    header = next(rows, None)
+    if not header:
+        return
+    fieldnames = [normalize_header(_cell_text(cell)) for cell in header]
+    for index, values in enumerate(rows, start=2):
+        if not any(value not in (None, "") for value in values):
+            continue
+        yield index, {
+            fieldname: _cell_text(values[position]) if position < len(values) else ""
+            for position, fieldname in enumerate(fieldnames)
+        }
+
+
+def get_xlsx_headers(file_path: str) -> set[str]:
+    rows = _iter_sheet(file_path)
+    try:
+        header = next(rows, None)
+    finally:
+        rows.close()
+    if not header:
+        return set()
+    return {normalize_header(_cell_text(cell)) for cell in header if cell not in (None, "")}
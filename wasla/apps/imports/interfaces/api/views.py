@@ -13,13 +13,13 @@ from apps.imports.application.use_cases.get_import_job_status import (
     GetImportJobStatusCommand,
     GetImportJobStatusUseCase,
 )
-from apps.imports.application.use_cases.run_import_job import RunImportJobCommand, RunImportJobUseCase
 from apps.imports.application.use_cases.validate_import_job import (
     ValidateImportJobCommand,
     ValidateImportJobUseCase,
 )
 from apps.imports.domain.errors import ImportErrorBase
 from apps.imports.models import ImportRowError
+from apps.imports.tasks import enqueue_import_job
 from apps.tenants.domain.tenant_context import TenantContext
 from apps.tenants.guards import require_store, require_tenant
 
@@ -63,19 +63,22 @@ class ImportStartAPI(APIView):
                 )
             )
             ValidateImportJobUseCase.execute(ValidateImportJobCommand(import_job_id=job.id))
-            RunImportJobUseCase.execute(RunImportJobCommand(import_job_id=job.id))
+            enqueue_import_job(import_job_id=job.id)
         except ImportErrorBase as exc:
             return api_response(
                 success=False,
                 errors=[exc.message_key or str(exc)],
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
+        job.refresh_from_db()
         return api_response(
             success=True,
             data={
                 "job_id": job.id,
                 "status": job.status,
                 "total_rows": job.total_rows,
+                "processed_rows": job.processed_rows,
+                "progress_percent": job.progress_percent,
                 "success_rows": job.success_rows,
                 "failed_rows": job.failed_rows,
             },
@@ -103,6 +106,8 @@ class ImportStatusAPI(APIView):
                 "job_id": job.id,
                 "status": job.status,
                 "total_rows": job.total_rows,
+                "processed_rows": job.processed_rows,
+                "progress_percent": job.progress_percent,
                 "success_rows": job.success_rows,
                 "failed_rows": job.failed_rows,
                 "errors": errors,
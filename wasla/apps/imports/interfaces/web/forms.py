@@ -19,5 +19,5 @@ class MultipleFileField(forms.FileField):
 
 
 class ImportStartForm(forms.Form):
-    csv_file = forms.FileField(required=True, label="CSV file")
+    csv_file = forms.FileField(required=True, label="CSV or XLSX file")
     images = MultipleFileField(required=False, label="Images")
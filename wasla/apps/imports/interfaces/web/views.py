@@ -14,7 +14,6 @@ from apps.imports.application.use_cases.get_import_job_status import (
     GetImportJobStatusCommand,
     GetImportJobStatusUseCase,
 )
-from apps.imports.application.use_cases.run_import_job import RunImportJobCommand, RunImportJobUseCase
 from apps.imports.application.use_cases.validate_import_job import (
     ValidateImportJobCommand,
     ValidateImportJobUseCase,
@@ -22,6 +21,7 @@ from apps.imports.application.use_cases.validate_import_job import (
 from apps.imports.domain.errors import ImportErrorBase
 from apps.imports.interfaces.web.forms import ImportStartForm
 from apps.imports.models import ImportJob, ImportRowError
+from apps.imports.tasks import enqueue_import_job
 from apps.tenants.domain.tenant_context import TenantContext
 from apps.tenants.guards import require_store, require_tenant
 from apps.tenants.interfaces.web.decorators import merchant_dashboard_required
@@ -78,8 +78,12 @@ def import_start(request: HttpRequest) -> HttpResponse:
             )
         )
         ValidateImportJobUseCase.execute(ValidateImportJobCommand(import_job_id=job.id))
-        RunImportJobUseCase.execute(RunImportJobCommand(import_job_id=job.id))
-        messages.success(request, "Import completed.")
+        enqueue_import_job(import_job_id=job.id)
+        job.refresh_from_db(fields=["status"])
+        if job.status == ImportJob.STATUS_COMPLETED:
+            messages.success(request, "Import completed.")
+        else:
+            messages.info(request, "Import started.")
     except ImportErrorBase as exc:
         messages.error(request, str(exc))
         return redirect("imports_web:dashboard_import")
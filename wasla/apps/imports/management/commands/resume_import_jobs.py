@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.imports.models import ImportJob
+from apps.imports.tasks import enqueue_import_job
+
+
+class Command(BaseCommand):
+    help = "Resume import jobs left in IMPORTING (e.g. by a crashed worker) from their last committed chunk."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stale-minutes", type=int, default=15)
+        parser.add_argument("--job-id", type=int, default=None)
+
+    def handle(self, *args, **options):
+        jobs = ImportJob.objects.filter(status=ImportJob.STATUS_IMPORTING)
+        if options["job_id"] is not None:
+            jobs = jobs.filter(id=options["job_id"])
+        else:
+            # Jobs still making progress touch updated_at with every chunk.
+            cutoff = timezone.now() - timedelta(minutes=max(0, int(options["stale_minutes"])))
+            jobs = jobs.filter(updated_at__lt=cutoff)
+
+        job_ids = list(jobs.order_by("id").values_list("id", flat=True))
+        for job_id in job_ids:
+            enqueue_import_job(import_job_id=job_id, resume=True)
+        self.stdout.write(self.style.SUCCESS(f"Resumed {len(job_ids)} import jobs."))
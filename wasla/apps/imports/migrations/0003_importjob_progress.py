@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("imports", "0002_rename_imports_impo_store_c0d915_idx_imports_imp_store_i_229e7c_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="importjob",
+            name="last_committed_row",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="importjob",
+            name="processed_rows",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="importjob",
+            name="source_type",
+            field=models.CharField(choices=[("CSV", "CSV"), ("XLSX", "XLSX")], default="CSV", max_length=20),
+        ),
+    ]
@@ -1,5 +1,5 @@
 """
-Bulk import models (CSV).
+Bulk import models (CSV/XLSX).
 
 AR:
 - تخزين معلومات مهمة الاستيراد وأخطاء الصفوف.
@@ -27,8 +27,10 @@ class ImportJob(models.Model):
     ]
 
     SOURCE_CSV = "CSV"
+    SOURCE_XLSX = "XLSX"
     SOURCE_CHOICES = [
         (SOURCE_CSV, "CSV"),
+        (SOURCE_XLSX, "XLSX"),
     ]
 
     store_id = models.IntegerField(db_index=True)
@@ -41,6 +43,10 @@ class ImportJob(models.Model):
     total_rows = models.PositiveIntegerField(default=0)
     success_rows = models.PositiveIntegerField(default=0)
     failed_rows = models.PositiveIntegerField(default=0)
+    # Import progress, committed together with each chunk: rows read so far and
+    # the last row number of the last committed chunk (where a rerun resumes).
+    processed_rows = models.PositiveIntegerField(default=0)
+    last_committed_row = models.PositiveIntegerField(default=0)
     errors_json = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -54,6 +60,14 @@ class ImportJob(models.Model):
     def __str__(self) -> str:
         return f"ImportJob {self.id} ({self.status})"
 
+    @property
+    def progress_percent(self) -> int:
+        if self.status == self.STATUS_COMPLETED:
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(100, self.processed_rows * 100 // self.total_rows)
+
 
 class ImportRowError(models.Model):
     import_job = models.ForeignKey(ImportJob, on_delete=models.CASCADE, related_name="row_errors")
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import logging
+import os
+
+from django.conf import settings
+
+from apps.imports.application.use_cases.run_import_job import RunImportJobCommand, RunImportJobUseCase
+
+logger = logging.getLogger(__name__)
+
+
+def _run_import_now(*, import_job_id: int, resume: bool) -> None:
+    RunImportJobUseCase.execute(RunImportJobCommand(import_job_id=import_job_id, resume=resume))
+
+
+def enqueue_import_job(*, import_job_id: int, resume: bool = False) -> None:
+    """
+    Run an import job on a Celery worker; run it synchronously when Celery
+    is unavailable, eager or has no broker.
+    """
+    eager = (
+        getattr(settings, "CELERY_TASK_ALWAYS_EAGER", False)
+        or os.getenv("CELERY_TASK_ALWAYS_EAGER", "").strip().lower() in ("1", "true", "yes")
+    )
+    broker_url = (getattr(settings, "CELERY_BROKER_URL", "") or os.getenv("CELERY_BROKER_URL", "")).strip()
+    try:
+        from celery import shared_task  # noqa: F401
+    except Exception:
+        _run_import_now(import_job_id=import_job_id, resume=resume)
+        return
+
+    if eager or not broker_url:
+        _run_import_now(import_job_id=import_job_id, resume=resume)
+        return
+
+    try:
+        run_import_job_task.delay(import_job_id=import_job_id, resume=resume)
+    except Exception:
+        logger.warning("import_job_enqueue_failed", extra={"import_job_id": import_job_id})
+        _run_import_now(import_job_id=import_job_id, resume=resume)
+
+
+try:
+    from celery import shared_task
+except Exception:  # pragma: no cover
+    shared_task = None
+
+
+if shared_task:
+
+    @shared_task(
+        bind=True,
+        autoretry_for=(Exception,),
+        retry_backoff=True,
+        retry_backoff_max=300,
+        retry_jitter=True,
+        retry_kwargs={"max_retries": 3},
+    )
+    def run_import_job_task(self, *, import_job_id: int, resume: bool = False) -> None:
+        # A retry takes over the job its failed attempt left in IMPORTING.
+        _run_import_now(import_job_id=import_job_id, resume=resume or self.request.retries > 0)
@@ -0,0 +1,189 @@
+"""Tests for the chunked catalog importer."""
+import tempfile
+from io import BytesIO
+from unittest import mock, skipUnless
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from apps.catalog.models import Category, Inventory, Product
+from apps.imports.application.use_cases import run_import_job
+from apps.imports.application.use_cases.create_import_job import CreateImportJobCommand, CreateImportJobUseCase
+from apps.imports.application.use_cases.get_import_job_status import (
+    GetImportJobStatusCommand,
+    GetImportJobStatusUseCase,
+)
+from apps.imports.application.use_cases.run_import_job import RunImportJobCommand, RunImportJobUseCase
+from apps.imports.application.use_cases.validate_import_job import (
+    ValidateImportJobCommand,
+    ValidateImportJobUseCase,
+)
+from apps.imports.infrastructure.xlsx_utils import xlsx_supported
+from apps.imports.models import ImportJob, ImportRowError
+from apps.tenants.domain.tenant_context import TenantContext
+
+STORE_ID = 8801
+
+CSV_ROWS = [
+    "name,sku,price,stock_quantity,category",
+    "Mug,MUG-1,10.00,4,Kitchen",
+    "Plate,PLT-1,12.50,0,Kitchen",
+    "Broken,BRK-1,abc,1,Kitchen",
+    "Lamp,LMP-1,40,2,Living",
+    "Copy,MUG-1,11,1,Kitchen",
+    "Rug,,55,3,Living",
+    "Chair,CHR-1,80,1,",
+]
+
+
+@override_settings(IMPORT_CHUNK_SIZE=3)
+class ChunkedImportTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_override = override_settings(MEDIA_ROOT=media.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+    def _create_job(self, uploaded_file, image_files=()) -> ImportJob:
+        job = CreateImportJobUseCase.execute(
+            CreateImportJobCommand(
+                tenant_ctx=TenantContext(tenant_id=STORE_ID, currency="SAR", store_id=STORE_ID),
+                actor_id=None,
+                uploaded_file=uploaded_file,
+                image_files=list(image_files),
+            )
+        )
+        return ValidateImportJobUseCase.execute(ValidateImportJobCommand(import_job_id=job.id))
+
+    def _csv_job(self) -> ImportJob:
+        content = ("\n".join(CSV_ROWS) + "\n").encode("utf-8")
+        return self._create_job(SimpleUploadedFile("products.csv", content, content_type="text/csv"))
+
+    def _status(self, job: ImportJob) -> ImportJob:
+        return GetImportJobStatusUseCase.execute(GetImportJobStatusCommand(import_job_id=job.id, store_id=STORE_ID))
+
+    def test_imports_valid_rows_in_chunks(self):
+        job = self._csv_job()
+        self.assertEqual((job.total_rows, job.failed_rows), (7, 2))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            job = RunImportJobUseCase.execute(RunImportJobCommand(import_job_id=job.id))
+
+        self.assertEqual(job.status, ImportJob.STATUS_COMPLETED)
+        self.assertEqual((job.success_rows, job.failed_rows, job.processed_rows), (5, 2, 7))
+        self.assertEqual(job.last_committed_row, 8)
+        self.assertEqual(
+            sorted(Product.objects.filter(store_id=STORE_ID).values_list("sku", flat=True)),
+            ["CHR-1", "LMP-1", "MUG-1", "PLT-1", "RUG"],
+        )
+        self.assertEqual(Category.objects.filter(store_id=STORE_ID, name="Kitchen").count(), 1)
+        mug = Product.objects.get(store_id=STORE_ID, sku="MUG-1")
+        self.assertEqual(list(mug.categories.values_list("name", flat=True)), ["Kitchen"])
+        self.assertEqual(Inventory.objects.get(product=mug).quantity, 4)
+        plate = Product.objects.get(store_id=STORE_ID, sku="PLT-1")
+        self.assertEqual(plate.visibility, Product.VISIBILITY_DISABLED)
+        self.assertEqual(
+            sorted(ImportRowError.objects.filter(import_job=job).values_list("row_number", "message_key")),
+            [(4, "import.value.invalid_number"), (6, "import.sku.duplicate")],
+        )
+
+    def test_rerun_resumes_after_last_committed_chunk(self):
+        job = self._csv_job()
+        real_chunks = run_import_job.iter_row_chunks
+
+        def crash_after_first_chunk(*args, **kwargs):
+            chunks = real_chunks(*args, **kwargs)
+            yield next(chunks)
+            raise RuntimeError("worker lost")
+
+        with mock.patch.object(run_import_job, "iter_row_chunks", crash_after_first_chunk):
+            with self.assertRaises(RuntimeError):
+                RunImportJobUseCase.execute(RunImportJobCommand(import_job_id=job.id))
+
+        status = self._status(job)
+        self.assertEqual(status.status, ImportJob.STATUS_IMPORTING)
+        self.assertEqual((status.processed_rows, status.last_committed_row, status.success_rows), (3, 4, 2))
+        self.assertEqual(status.progress_percent, 42)
+
+        # Without `resume` a running job is left to its owner.
+        skipped = RunImportJobUseCase.execute(RunImportJobCommand(import_job_id=job.id))
+        self.assertEqual(skipped.status, ImportJob.STATUS_IMPORTING)
+
+        job = RunImportJobUseCase.execute(RunImportJobCommand(import_job_id=job.id, resume=True))
+
+        self.assertEqual(job.status, ImportJob.STATUS_COMPLETED)
+        self.assertEqual((job.success_rows, job.failed_rows, job.processed_rows), (5, 2, 7))
+        self.assertEqual(Product.objects.filter(store_id=STORE_ID).count(), 5)
+
+    def test_sku_taken_after_validation_fails_only_its_row(self):
+        job = self._csv_job()
+        Product.objects.create(store_id=STORE_ID, sku="LMP-1", name="Existing lamp", price="30.00")
+
+        job = RunImportJobUseCase.execute(RunImportJobCommand(import_job_id=job.id))
+
+        self.assertEqual((job.success_rows, job.failed_rows), (4, 3))
+        self.assertTrue(
+            ImportRowError.objects.filter(import_job=job, row_number=5, message_key="import.sku.duplicate").exists()
+        )
+        self.assertEqual(Product.objects.get(store_id=STORE_ID, sku="LMP-1").name, "Existing lamp")
+
+    def test_failed_chunk_leaves_no_orphaned_images(self):
+        import os
+
+        from django.conf import settings
+
+        products = (("Mug", "MUG-1"), ("Lamp", "LMP-1"), ("Vase", "VAS-1"))
+        rows = ["name,sku,price,stock_quantity,image_file"] + [
+            f"{name},{sku},10,1,{sku.lower()}.png" for name, sku in products
+        ]
+        images = [
+            SimpleUploadedFile(f"{sku}.png", b"\x89PNG\r\n\x1a\n", content_type="image/png")
+            for sku in ("mug-1", "lmp-1", "vas-1")
+        ]
+        job = self._create_job(
+            SimpleUploadedFile("products.csv", ("\n".join(rows) + "\n").encode("utf-8"), content_type="text/csv"),
+            images,
+        )
+        real_chunks = run_import_job.iter_row_chunks
+
+        def sku_taken_mid_run(*args, **kwargs):
+            # Taken after the run loaded its SKUs: the chunk insert fails and is retried row by row.
+            Product.objects.create(store_id=STORE_ID, sku="LMP-1", name="Existing lamp", price="30.00")
+            yield from real_chunks(*args, **kwargs)
+
+        with mock.patch.object(run_import_job, "iter_row_chunks", sku_taken_mid_run):
+            job = RunImportJobUseCase.execute(RunImportJobCommand(import_job_id=job.id))
+
+        self.assertEqual((job.success_rows, job.failed_rows), (2, 1))
+        stored = sorted(os.listdir(os.path.join(settings.MEDIA_ROOT, f"store_{STORE_ID}", "products")))
+        imported = sorted(
+            os.path.basename(name)
+            for name in Product.objects.filter(store_id=STORE_ID).exclude(image="").values_list("image", flat=True)
+        )
+        self.assertEqual(stored, imported)
+        self.assertEqual(len(stored), 2)
+
+    @skipUnless(xlsx_supported(), "openpyxl is not installed")
+    def test_imports_xlsx_file(self):
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        sheet = workbook.active
+        for line in CSV_ROWS:
+            sheet.append([float(value) if value.replace(".", "", 1).isdigit() else value for value in line.split(",")])
+        output = BytesIO()
+        workbook.save(output)
+        upload = SimpleUploadedFile(
+            "products.xlsx",
+            output.getvalue(),
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+
+        job = self._create_job(upload)
+        job = RunImportJobUseCase.execute(RunImportJobCommand(import_job_id=job.id))
+
+        self.assertEqual(job.source_type, ImportJob.SOURCE_XLSX)
+        self.assertEqual((job.success_rows, job.failed_rows), (5, 2))
+        self.assertEqual(Inventory.objects.get(product__store_id=STORE_ID, product__sku="MUG-1").quantity, 4)
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import json
+from dataclasses import asdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.observability.performance.middleware_benchmark import (
+    DEFAULT_BENCHMARK_PATHS,
+    run_middleware_benchmark,
+)
+from apps.tenants.routing import DEFAULT_TENANT_REQUIRED_PATHS
+
+
+class Command(BaseCommand):
+    help = "Compare per-request route-check overhead of the legacy guard loops vs the shared request classification."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=20000,
+            help="Number of passes over the sample paths (default: 20000).",
+        )
+        parser.add_argument(
+            "--paths",
+            default="",
+            help="Comma-separated request paths to benchmark (default: built-in storefront/API/admin sample).",
+        )
+
+    def handle(self, *args, **options):
+        paths_raw = str(options.get("paths") or "").strip()
+        paths = [item.strip() for item in paths_raw.split(",") if item.strip()] or DEFAULT_BENCHMARK_PATHS
+
+        result = run_middleware_benchmark(
+            iterations=int(options.get("iterations") or 1),
+            paths=paths,
+            required_paths=getattr(settings, "TENANT_REQUIRED_PATHS", DEFAULT_TENANT_REQUIRED_PATHS),
+        )
+        self.stdout.write(json.dumps(asdict(result), indent=2))
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import json
+from dataclasses import asdict
+
+from django.core.management.base import BaseCommand
+
+from apps.observability.performance.reservation_benchmark import STRATEGIES, run_reservation_benchmark
+
+
+class Command(BaseCommand):
+    help = "Run parallel checkouts against one SKU and report reservation throughput, latency and oversell."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--checkouts", type=int, default=500, help="Number of checkouts (default: 500).")
+        parser.add_argument("--workers", type=int, default=50, help="Parallel worker threads (default: 50).")
+        parser.add_argument("--stock", type=int, default=100, help="Units on hand for the SKU (default: 100).")
+        parser.add_argument("--quantity", type=int, default=1, help="Units per checkout (default: 1).")
+        parser.add_argument(
+            "--strategy",
+            choices=[*STRATEGIES, "both"],
+            default="both",
+            help="Reservation path to benchmark (default: both).",
+        )
+
+    def handle(self, *args, **options):
+        strategies = STRATEGIES if options["strategy"] == "both" else [options["strategy"]]
+        results = [
+            asdict(
+                run_reservation_benchmark(
+                    checkouts=options["checkouts"],
+                    workers=options["workers"],
+                    stock=options["stock"],
+                    quantity=options["quantity"],
+                    strategy=strategy,
+                )
+            )
+            for strategy in strategies
+        ]
+        self.stdout.write(json.dumps(results, indent=2))
@@ -1,22 +1,112 @@
 from __future__ import annotations
 
-from prometheus_client import Counter, Histogram
+"""
+Prometheus metrics shared by every worker.
+
+When `PROMETHEUS_MULTIPROC_DIR` is set (gunicorn with several workers), the
+prometheus_client values below are backed by mmap files in that directory and
+`/metrics` aggregates all workers through `MultiProcessCollector`.
+
+Label cardinality stays bounded:
+- `route` is the resolved URL pattern (e.g. `/api/v1/orders/<int:pk>/`), never
+  the raw path; unresolved requests are reported as `unmatched`.
+- per-store latency is opt-in (`METRICS_STORE_LABELS_ENABLED`) and each worker
+  labels at most `METRICS_STORE_LABEL_LIMIT` stores; the rest share `other`.
+"""
+
+import os
+import threading
+
+from django.conf import settings
+from prometheus_client import Counter, Gauge, Histogram
+
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+UNMATCHED_ROUTE = "unmatched"
+OTHER_STORE = "other"
 
 REQUEST_TOTAL = Counter(
     "wasla_http_requests_total",
     "Total HTTP requests",
-    ["method", "path", "status"],
+    ["method", "route", "status"],
 )
 
 REQUEST_LATENCY_MS = Histogram(
     "wasla_http_request_latency_ms",
     "HTTP request latency in milliseconds",
-    ["method", "path"],
-    buckets=(10, 25, 50, 100, 250, 500, 1000, 2500, 5000),
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS_MS,
+)
+
+STORE_REQUEST_LATENCY_MS = Histogram(
+    "wasla_store_request_latency_ms",
+    "HTTP request latency in milliseconds per store (bounded label set)",
+    ["store"],
+    buckets=LATENCY_BUCKETS_MS,
 )
 
 SLOW_QUERY_TOTAL = Counter(
     "wasla_slow_queries_total",
     "Total slow SQL queries detected",
-    ["path"],
+    ["route"],
+)
+
+# Set by the stock reservation sweeper (celery worker) on every run.
+STALE_RESERVED_STOCK_UNITS = Gauge(
+    "wasla_stale_reserved_stock_units",
+    "Units held by reservations past their expiry when the sweeper last ran",
+    multiprocess_mode="mostrecent",
 )
+
+STOCK_RESERVATIONS_EXPIRED_TOTAL = Counter(
+    "wasla_stock_reservations_expired_total",
+    "Stock reservations released by the expiry sweeper",
+)
+
+
+def multiprocess_enabled() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def route_label(request) -> str:
+    """Return the URL pattern that served the request instead of its raw path."""
+    match = getattr(request, "resolver_match", None)
+    route = getattr(match, "route", None)
+    if not route:
+        return UNMATCHED_ROUTE
+    return route if route.startswith("/") else f"/{route}"
+
+
+class StoreLabelLimiter:
+    """Hands out at most `limit` distinct store labels per process."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = max(0, int(limit))
+        self._seen: set[str] = set()
+        self._lock = threading.Lock()
+
+    def label(self, store_id) -> str:
+        if not store_id:
+            return OTHER_STORE
+        value = str(store_id)
+        if value in self._seen:
+            return value
+        with self._lock:
+            if value in self._seen:
+                return value
+            if len(self._seen) >= self.limit:
+                return OTHER_STORE
+            self._seen.add(value)
+        return value
+
+
+_store_labels: StoreLabelLimiter | None = None
+
+
+def store_label(store_id) -> str | None:
+    """Label for `STORE_REQUEST_LATENCY_MS`, or None when per-store metrics are disabled."""
+    global _store_labels
+    if not getattr(settings, "METRICS_STORE_LABELS_ENABLED", False):
+        return None
+    if _store_labels is None:
+        _store_labels = StoreLabelLimiter(getattr(settings, "METRICS_STORE_LABEL_LIMIT", 100))
+    return _store_labels.label(store_id)
@@ -1,15 +1,27 @@
 from __future__ import annotations
 
 import logging
+from itertools import islice
 from time import monotonic
 
 from django.conf import settings
-from django.core.cache import cache
 from django.db import connection
 from django.utils.deprecation import MiddlewareMixin
 
 from apps.observability.logging import bind_request_context
-from apps.observability.metrics_registry import REQUEST_TOTAL, REQUEST_LATENCY_MS, SLOW_QUERY_TOTAL
+from apps.observability.metrics_registry import (
+    REQUEST_LATENCY_MS,
+    REQUEST_TOTAL,
+    SLOW_QUERY_TOTAL,
+    STORE_REQUEST_LATENCY_MS,
+    route_label,
+    store_label,
+)
+from apps.observability.performance.log_writer import (
+    build_performance_rows,
+    performance_log_writer,
+    should_sample,
+)
 from core.infrastructure.store_cache import StoreCacheService
 logger = logging.getLogger("wasla.request")
 performance_logger = logging.getLogger("wasla.performance")
@@ -18,8 +30,7 @@ performance_logger = logging.getLogger("wasla.performance")
 class TimingMiddleware(MiddlewareMixin):
     def process_request(self, request):
         request._start_time = monotonic()
-        request._db_query_count_start = len(getattr(connection, "queries", []))
-        request._db_queries_start = list(getattr(connection, "queries", []))
+        request._db_query_count_start = _query_log_length()
         StoreCacheService.set_cache_hit(False)
 
     def process_exception(self, request, exception):
@@ -28,7 +39,6 @@ class TimingMiddleware(MiddlewareMixin):
         cache_hit = StoreCacheService.consume_cache_hit()
         cache_status = "HIT" if cache_hit else "MISS"
         store_id = _resolve_store_id(request)
-        _increment_metrics(status_code=500)
         logger.error(
             "request_error",
             extra={
@@ -67,7 +77,6 @@ class TimingMiddleware(MiddlewareMixin):
         response["X-Response-Time-ms"] = str(latency_ms)
         response["X-Cache"] = "HIT" if cache_hit else "MISS"
         status_code = getattr(response, "status_code", 200)
-        _increment_metrics(status_code=status_code)
         _observe_metrics(request=request, status_code=status_code, latency_ms=latency_ms)
         logger.info(
             "request_complete",
@@ -114,30 +123,20 @@ class TimingMiddleware(MiddlewareMixin):
     def _persist_metric(self, *, request, status_code: int, latency_ms: int, query_count: int, cache_hit: bool):
         if not getattr(settings, "PERFORMANCE_LOG_PERSIST_ENABLED", True):
             return
-        slow_threshold = float(getattr(settings, "PERFORMANCE_SLOW_THRESHOLD_MS", 500.0))
+        if not should_sample(latency_ms=latency_ms, status_code=status_code):
+            return
         try:
-            from apps.observability.models import RequestPerformanceLog
-            from apps.observability.models import PerformanceLog
-
-            RequestPerformanceLog.objects.create(
-                request_id=getattr(request, "request_id", "") or "",
-                store_id=_resolve_store_id(request),
-                endpoint=(getattr(request, "path", "") or "")[:255],
-                method=(getattr(request, "method", "GET") or "GET")[:10],
-                status_code=int(status_code),
-                response_time_ms=float(latency_ms),
-                db_query_count=max(0, int(query_count)),
-                cache_hit=bool(cache_hit),
-                is_slow=float(latency_ms) >= slow_threshold,
-            )
-            PerformanceLog.objects.create(
-                path=(getattr(request, "path", "") or "")[:255],
-                method=(getattr(request, "method", "GET") or "GET")[:10],
-                store=_resolve_store_id(request),
-                duration_ms=float(latency_ms),
-                query_count=max(0, int(query_count)),
-                status_code=int(status_code),
-                request_id=getattr(request, "request_id", "") or "",
+            performance_log_writer.submit(
+                build_performance_rows(
+                    request_id=getattr(request, "request_id", "") or "",
+                    store_id=_resolve_store_id(request),
+                    path=getattr(request, "path", "") or "",
+                    method=getattr(request, "method", "GET") or "GET",
+                    status_code=status_code,
+                    latency_ms=latency_ms,
+                    query_count=query_count,
+                    cache_hit=cache_hit,
+                )
             )
         except Exception:  # pragma: no cover
             return
@@ -154,9 +153,14 @@ def _compute_latency_ms(request) -> int:
     return int((monotonic() - start) * 1000)
 
 
+def _query_log_length() -> int:
+    # `connection.queries` copies the whole log on every access; read the deque directly.
+    return len(getattr(connection, "queries_log", ()))
+
+
 def _compute_query_count(request) -> int:
     start = int(getattr(request, "_db_query_count_start", 0) or 0)
-    now = len(getattr(connection, "queries", []))
+    now = _query_log_length()
     if now < start:
         return 0
     return now - start
@@ -172,34 +176,15 @@ def _resolve_store_id(request) -> int:
     return 0
 
 
-def _increment_metrics(*, status_code: int):
-    try:
-        cache.incr("metrics:requests:total", 1)
-    except Exception:
-        cache.set("metrics:requests:total", 1, timeout=None)
-    key = f"metrics:requests:status:{status_code}"
-    try:
-        cache.incr(key, 1)
-    except Exception:
-        cache.set(key, 1, timeout=None)
-
-
-def _normalize_path(path: str) -> str:
-    if not path:
-        return "/"
-    if path.startswith("/api/"):
-        return "/api/*"
-    if path.startswith("/admin-portal/"):
-        return "/admin-portal/*"
-    return path
-
-
 def _observe_metrics(*, request, status_code: int, latency_ms: int):
     try:
         method = (getattr(request, "method", "GET") or "GET").upper()
-        path = _normalize_path(getattr(request, "path", "") or "")
-        REQUEST_TOTAL.labels(method=method, path=path, status=str(status_code)).inc()
-        REQUEST_LATENCY_MS.labels(method=method, path=path).observe(float(latency_ms))
+        route = route_label(request)
+        REQUEST_TOTAL.labels(method=method, route=route, status=str(status_code)).inc()
+        REQUEST_LATENCY_MS.labels(method=method, route=route).observe(float(latency_ms))
+        store = store_label(_resolve_store_id(request))
+        if store is not None:
+            STORE_REQUEST_LATENCY_MS.labels(store=store).observe(float(latency_ms))
     except Exception:
         return
 
@@ -209,9 +194,10 @@ def _log_slow_queries(request):
     if threshold_ms <= 0:
         return
 
-    all_queries = list(getattr(connection, "queries", []))
-    start_count = len(getattr(request, "_db_queries_start", []) or [])
-    request_queries = all_queries[start_count:]
+    if not getattr(connection, "queries_logged", False):
+        return
+    start_count = int(getattr(request, "_db_query_count_start", 0) or 0)
+    request_queries = list(islice(getattr(connection, "queries_log", ()), start_count, None))
 
     for item in request_queries:
         elapsed_s = float(item.get("time", 0.0) or 0.0)
@@ -234,6 +220,6 @@ def _log_slow_queries(request):
             },
         )
         try:
-            SLOW_QUERY_TOTAL.labels(path=_normalize_path(getattr(request, "path", "") or "")).inc()
+            SLOW_QUERY_TOTAL.labels(route=route_label(request)).inc()
         except Exception:
             pass
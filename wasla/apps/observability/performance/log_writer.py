@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+"""
+Buffered persistence for per-request performance rows.
+
+TimingMiddleware builds one `RequestPerformanceLog` / `PerformanceLog` pair per
+sampled request and hands it to `performance_log_writer`. With
+`PERFORMANCE_LOG_ASYNC` on, pairs are kept in a per-worker ring buffer and
+written with two `bulk_create` calls per batch by a background thread.
+"""
+
+import random
+
+from django.conf import settings
+
+from core.infrastructure.background_writer import BackgroundBulkWriter
+
+
+def should_sample(*, latency_ms: float, status_code: int) -> bool:
+    """Keep every slow or failing request and `PERFORMANCE_LOG_SAMPLE_RATE` of the rest."""
+    slow_threshold = float(getattr(settings, "PERFORMANCE_SLOW_THRESHOLD_MS", 500.0))
+    if float(latency_ms) >= slow_threshold or int(status_code) >= 500:
+        return True
+    rate = float(getattr(settings, "PERFORMANCE_LOG_SAMPLE_RATE", 1.0))
+    if rate >= 1.0:
+        return True
+    if rate <= 0.0:
+        return False
+    return random.random() < rate
+
+
+def build_performance_rows(
+    *,
+    request_id: str,
+    store_id: int,
+    path: str,
+    method: str,
+    status_code: int,
+    latency_ms: float,
+    query_count: int,
+    cache_hit: bool,
+):
+    from apps.observability.models import PerformanceLog, RequestPerformanceLog
+
+    slow_threshold = float(getattr(settings, "PERFORMANCE_SLOW_THRESHOLD_MS", 500.0))
+    path = (path or "")[:255]
+    method = (method or "GET")[:10]
+    query_count = max(0, int(query_count))
+    return (
+        RequestPerformanceLog(
+            request_id=request_id,
+            store_id=store_id,
+            endpoint=path,
+            method=method,
+            status_code=int(status_code),
+            response_time_ms=float(latency_ms),
+            db_query_count=query_count,
+            cache_hit=bool(cache_hit),
+            is_slow=float(latency_ms) >= slow_threshold,
+        ),
+        PerformanceLog(
+            path=path,
+            method=method,
+            store=store_id,
+            duration_ms=float(latency_ms),
+            query_count=query_count,
+            status_code=int(status_code),
+            request_id=request_id,
+        ),
+    )
+
+
+def _write_performance_rows(pairs) -> None:
+    from apps.observability.models import PerformanceLog, RequestPerformanceLog
+
+    RequestPerformanceLog.objects.bulk_create([pair[0] for pair in pairs])
+    PerformanceLog.objects.bulk_create([pair[1] for pair in pairs])
+
+
+performance_log_writer = BackgroundBulkWriter(
+    name="performance_log",
+    write_batch=_write_performance_rows,
+    is_async=lambda: bool(getattr(settings, "PERFORMANCE_LOG_ASYNC", False)),
+    max_batch=int(getattr(settings, "PERFORMANCE_LOG_BATCH_SIZE", 200) or 200),
+    flush_interval=float(getattr(settings, "PERFORMANCE_LOG_FLUSH_SECONDS", 2.0) or 2.0),
+    capacity=int(getattr(settings, "PERFORMANCE_LOG_BUFFER_SIZE", 10000) or 10000),
+)
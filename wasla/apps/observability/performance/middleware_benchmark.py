@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+"""
+Microbenchmark for per-request route checks done by the tenant/security guards.
+
+"legacy" replays the path checks each middleware used to perform on its own
+(`startswith` loops over prefix sets, once per guard). "classified" builds one
+`RequestClass` per request and lets every guard read its attributes.
+"""
+
+from dataclasses import dataclass
+from time import perf_counter
+
+from apps.tenants.routing import (
+    DEFAULT_TENANT_REQUIRED_PATHS,
+    TENANT_OPTIONAL_PATHS,
+    RouteClassifier,
+)
+
+
+DEFAULT_BENCHMARK_PATHS = [
+    "/",
+    "/products/42/",
+    "/category/7/",
+    "/cart/",
+    "/dashboard/",
+    "/dashboard/orders/",
+    "/store/setup/step-2/",
+    "/api/v1/orders/",
+    "/api/payments/initiate/",
+    "/api/auth/login/",
+    "/admin-portal/stores/",
+    "/static/css/app.css",
+    "/healthz",
+    "/metrics",
+]
+
+
+@dataclass(frozen=True)
+class MiddlewareBenchmarkResult:
+    iterations: int
+    paths: int
+    legacy_us_per_request: float
+    classified_us_per_request: float
+    speedup: float
+
+
+def _legacy_guard_checks(path: str, required_paths) -> tuple:
+    # TenantResolverMiddleware
+    is_admin_portal = path.startswith("/admin-portal/")
+    # StoreStatusGuardMiddleware
+    bypass_status = path.startswith("/admin-portal/") or path in ["/healthz", "/readyz", "/metrics"]
+    # TenantSecurityMiddleware._path_requires_tenant
+    requires_tenant = False
+    for optional_path in TENANT_OPTIONAL_PATHS:
+        if path.startswith(optional_path):
+            break
+    else:
+        for required_path in required_paths:
+            if path.startswith(required_path):
+                requires_tenant = True
+                break
+        else:
+            requires_tenant = path.startswith("/api/")
+    # TenantAuditMiddleware
+    is_api = path.startswith("/api/")
+    # SecurityAuditMiddleware
+    is_payment_api = (path or "").lower().startswith("/api/payments/")
+    # OnboardingFlowMiddleware
+    onboarding_guarded = (
+        path.startswith("/dashboard")
+        or path.startswith("/store/setup")
+        or path.startswith("/dashboard/setup")
+        or path.startswith("/store/create")
+    )
+    # AdminPortalSecurityHeadersMiddleware
+    admin_headers = path.startswith("/admin-portal/")
+    return (
+        is_admin_portal,
+        bypass_status,
+        requires_tenant,
+        is_api,
+        is_payment_api,
+        onboarding_guarded,
+        admin_headers,
+    )
+
+
+def _classified_guard_checks(path: str, classifier: RouteClassifier) -> tuple:
+    request_class = classifier.classify(path)
+    return (
+        request_class.is_admin_portal,
+        request_class.is_admin_portal or request_class.is_health_check,
+        request_class.requires_tenant,
+        request_class.is_api,
+        request_class.is_payment_api,
+        request_class.onboarding_guarded,
+        request_class.is_admin_portal,
+    )
+
+
+def run_middleware_benchmark(
+    *,
+    iterations: int = 20000,
+    paths: list[str] | None = None,
+    required_paths=DEFAULT_TENANT_REQUIRED_PATHS,
+) -> MiddlewareBenchmarkResult:
+    sample = list(paths or DEFAULT_BENCHMARK_PATHS)
+    classifier = RouteClassifier(required_paths=required_paths)
+    iterations = max(1, int(iterations))
+    requests_count = iterations * len(sample)
+
+    for path in sample:
+        if _legacy_guard_checks(path, required_paths) != _classified_guard_checks(path, classifier):
+            raise AssertionError(f"Route classification mismatch for {path!r}")
+
+    started = perf_counter()
+    for _ in range(iterations):
+        for path in sample:
+            _legacy_guard_checks(path, required_paths)
+    legacy_us = (perf_counter() - started) * 1_000_000 / requests_count
+
+    started = perf_counter()
+    for _ in range(iterations):
+        for path in sample:
+            _classified_guard_checks(path, classifier)
+    classified_us = (perf_counter() - started) * 1_000_000 / requests_count
+
+    return MiddlewareBenchmarkResult(
+        iterations=iterations,
+        paths=len(sample),
+        legacy_us_per_request=round(legacy_us, 3),
+        classified_us_per_request=round(classified_us, 3),
+        speedup=round(legacy_us / classified_us, 2) if classified_us else 0.0,
+    )
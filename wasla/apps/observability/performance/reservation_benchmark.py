@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+"""
+Concurrency benchmark for stock reservations on a single SKU.
+
+A throwaway product with `stock` units and one pending order per checkout is
+created, then `checkouts` reservations of `quantity` units run on `workers`
+threads, each with its own database connection. "ledger" reserves through
+`StockReservationService.reserve_stock` (conditional counter UPDATE);
+"row_lock" replays the previous path (lock the Inventory row, sum the active
+reservations, insert). Every run checks that nothing was oversold.
+
+Meaningful numbers need a server database: SQLite serializes writers, so
+parallel runs there mostly measure its lock timeouts.
+"""
+
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+from time import perf_counter
+
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from apps.catalog.models import Inventory, Product
+from apps.customers.models import Customer
+from apps.orders.models import Order, OrderItem, StockLedger, StockReservation
+from apps.orders.services.stock_ledger_service import InsufficientStockError
+from apps.orders.services.stock_reservation_service import StockReservationService
+
+
+BENCHMARK_STORE_ID = 990_000
+STRATEGIES = ("ledger", "row_lock")
+
+
+@dataclass(frozen=True)
+class ReservationBenchmarkResult:
+    strategy: str
+    checkouts: int
+    workers: int
+    stock: int
+    reserved: int
+    refused: int
+    errors: int
+    oversold: int
+    elapsed_ms: float
+    checkouts_per_second: float
+    p50_ms: float
+    p95_ms: float
+    ledger_available: int | None
+    ledger_reserved: int | None
+
+
+class _Refused(Exception):
+    pass
+
+
+def _reserve_with_row_lock(order_item: OrderItem, quantity: int) -> None:
+    with transaction.atomic():
+        inventory = Inventory.objects.select_for_update().get(product_id=order_item.product_id)
+        held = (
+            StockReservation.objects.filter(
+                product_id=order_item.product_id, status__in=["reserved", "confirmed"]
+            ).aggregate(total=Sum("quantity"))["total"]
+            or 0
+        )
+        if inventory.quantity - held < quantity:
+            raise _Refused()
+        StockReservation.objects.create(
+            order_item=order_item,
+            product_id=order_item.product_id,
+            quantity=quantity,
+            status="reserved",
+            expires_at=timezone.now() + timedelta(minutes=15),
+        )
+
+
+def _create_fixture(*, checkouts: int, stock: int, quantity: int, store_id: int) -> tuple[Product, list[OrderItem]]:
+    run_id = uuid.uuid4().hex[:10]
+    product = Product.objects.create(
+        store_id=store_id, sku=f"BENCH-{run_id}", name="Reservation benchmark", price=Decimal("10.00")
+    )
+    Inventory.objects.create(product=product, quantity=stock)
+    # Bulk inserts keep customer/order signals (emails, notifications) out of the fixture.
+    email = f"bench-{run_id}@example.com"
+    Customer.objects.bulk_create([Customer(store_id=store_id, email=email, full_name="Benchmark")])
+    customer = Customer.objects.get(store_id=store_id, email=email)
+    Order.objects.bulk_create(
+        [
+            Order(store_id=store_id, order_number=f"B{run_id}{index:06d}"[:32], customer=customer)
+            for index in range(checkouts)
+        ]
+    )
+    orders = list(Order.objects.filter(customer=customer).order_by("id"))
+    OrderItem.objects.bulk_create(
+        [OrderItem(order=order, product=product, quantity=quantity, price=product.price) for order in orders]
+    )
+    items = list(OrderItem.objects.filter(order__customer=customer).order_by("id"))
+    return product, items
+
+
+def _delete_fixture(product: Product) -> None:
+    customer_ids = list(Order.objects.filter(items__product=product).values_list("customer_id", flat=True).distinct())
+    StockReservation.objects.filter(product=product).delete()
+    OrderItem.objects.filter(product=product).delete()
+    Order.objects.filter(customer_id__in=customer_ids).delete()
+    Customer.objects.filter(id__in=customer_ids).delete()
+    product.delete()
+
+
+def _percentile(samples: list[float], percent: int) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, (len(ordered) * percent) // 100)]
+
+
+def run_reservation_benchmark(
+    *,
+    checkouts: int = 500,
+    workers: int = 50,
+    stock: int = 100,
+    quantity: int = 1,
+    strategy: str = "ledger",
+    store_id: int = BENCHMARK_STORE_ID,
+    cleanup: bool = True,
+) -> ReservationBenchmarkResult:
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy!r}; expected one of {', '.join(STRATEGIES)}")
+    checkouts = max(1, int(checkouts))
+    workers = max(1, int(workers))
+    product, items = _create_fixture(checkouts=checkouts, stock=stock, quantity=quantity, store_id=store_id)
+
+    def checkout(order_item: OrderItem) -> tuple[str, float]:
+        started = perf_counter()
+        try:
+            if strategy == "ledger":
+                StockReservationService.reserve_stock(order_item, quantity, tenant_id=None, store_id=store_id)
+            else:
+                _reserve_with_row_lock(order_item, quantity)
+            outcome = "reserved"
+        except (InsufficientStockError, _Refused):
+            outcome = "refused"
+        except Exception:
+            outcome = "error"
+        return outcome, (perf_counter() - started) * 1000
+
+    def threaded_checkout(order_item: OrderItem) -> tuple[str, float]:
+        try:
+            return checkout(order_item)
+        finally:
+            connection.close()
+
+    try:
+        started = perf_counter()
+        if workers == 1:
+            # Runs on the caller's connection (and inside its transaction, e.g. in tests).
+            results = [checkout(item) for item in items]
+        else:
+            close_old_connections()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(threaded_checkout, items))
+        elapsed_ms = (perf_counter() - started) * 1000
+
+        reserved_quantity = (
+            StockReservation.objects.filter(product=product, status="reserved").aggregate(total=Sum("quantity"))[
+                "total"
+            ]
+            or 0
+        )
+        ledger = StockLedger.objects.filter(product=product, variant__isnull=True).values_list(
+            "available", "reserved"
+        ).first()
+    finally:
+        if cleanup:
+            _delete_fixture(product)
+
+    latencies = [latency for outcome, latency in results if outcome == "reserved"]
+    return ReservationBenchmarkResult(
+        strategy=strategy,
+        checkouts=checkouts,
+        workers=workers,
+        stock=stock,
+        reserved=sum(1 for outcome, _ in results if outcome == "reserved"),
+        refused=sum(1 for outcome, _ in results if outcome == "refused"),
+        errors=sum(1 for outcome, _ in results if outcome == "error"),
+        oversold=max(0, reserved_quantity - stock),
+        elapsed_ms=round(elapsed_ms, 1),
+        checkouts_per_second=round(checkouts * 1000 / elapsed_ms, 1) if elapsed_ms else 0.0,
+        p50_ms=round(_percentile(latencies, 50), 2),
+        p95_ms=round(_percentile(latencies, 95), 2),
+        ledger_available=ledger[0] if ledger else None,
+        ledger_reserved=ledger[1] if ledger else None,
+    )
@@ -4,10 +4,13 @@ from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from apps.catalog.models import Category, Product, ProductVariant
-from apps.stores.models import StoreSettings
+from apps.coupons.models import Coupon
+from apps.stores.models import Store, StoreSettings
+from apps.storefront.models import CategorySEO, ProductSEO, StorefrontSettings
 from apps.subscriptions.models import StoreSubscription, SubscriptionPlan
 from apps.tenants.models import Permission, RolePermission, StorePaymentSettings, StoreShippingSettings, Tenant
-from apps.tenants.models import TenantMembership
+from apps.tenants.models import StoreDomain, TenantMembership
+from apps.tenants.services.resolution_cache import tenant_resolution_cache
 from core.infrastructure.store_cache import StoreCacheService
 
 
@@ -21,6 +24,17 @@ def _bump_store_config_namespace(store_id: int):
     StoreCacheService.bump_namespace_version(store_id=store_id, namespace="store_config")
 
 
+def _bump_plan_limits_namespace(store_id: int):
+    StoreCacheService.bump_namespace_version(store_id=store_id, namespace="subscription_limits")
+
+
+def _invalidate_tenant_resolution(tenant_id: int | None):
+    # Other workers notice the version bump; this worker drops its snapshots now.
+    tenant_resolution_cache.clear()
+    if tenant_id:
+        _bump_store_config_namespace(store_id=int(tenant_id))
+
+
 @receiver(post_save, sender=Product)
 @receiver(post_delete, sender=Product)
 def invalidate_product_cache(sender, instance: Product, **kwargs):
@@ -39,6 +53,31 @@ def invalidate_category_cache(sender, instance: Category, **kwargs):
     _bump_catalog_namespaces(store_id=int(instance.store_id))
 
 
+@receiver(post_save, sender=ProductSEO)
+@receiver(post_delete, sender=ProductSEO)
+def invalidate_product_seo_cache(sender, instance: ProductSEO, **kwargs):
+    _bump_catalog_namespaces(store_id=int(instance.product.store_id))
+
+
+@receiver(post_save, sender=CategorySEO)
+@receiver(post_delete, sender=CategorySEO)
+def invalidate_category_seo_cache(sender, instance: CategorySEO, **kwargs):
+    _bump_catalog_namespaces(store_id=int(instance.category.store_id))
+
+
+@receiver(post_save, sender=Coupon)
+@receiver(post_delete, sender=Coupon)
+def invalidate_coupon_cache(sender, instance: Coupon, **kwargs):
+    # Cart summaries and hot-cart coupon checks are keyed on this namespace.
+    StoreCacheService.bump_namespace_version(store_id=int(instance.store_id), namespace="coupons")
+
+
+@receiver(post_save, sender=StorefrontSettings)
+@receiver(post_delete, sender=StorefrontSettings)
+def invalidate_storefront_settings_cache(sender, instance: StorefrontSettings, **kwargs):
+    _bump_catalog_namespaces(store_id=int(instance.store_id))
+
+
 @receiver(post_save, sender=StoreSettings)
 @receiver(post_delete, sender=StoreSettings)
 def invalidate_store_settings_cache(sender, instance: StoreSettings, **kwargs):
@@ -64,6 +103,7 @@ def invalidate_shipping_settings_cache(sender, instance: StoreShippingSettings,
 @receiver(post_delete, sender=StoreSubscription)
 def invalidate_subscription_cache(sender, instance: StoreSubscription, **kwargs):
     _bump_catalog_namespaces(store_id=int(instance.store_id))
+    _bump_plan_limits_namespace(store_id=int(instance.store_id))
     _bump_store_config_namespace(store_id=int(instance.store_id))
     _invalidate_rbac_for_store(int(instance.store_id))
 
@@ -71,24 +111,45 @@ def invalidate_subscription_cache(sender, instance: StoreSubscription, **kwargs)
 @receiver(post_save, sender=Tenant)
 @receiver(post_delete, sender=Tenant)
 def invalidate_tenant_domain_and_theme_cache(sender, instance: Tenant, **kwargs):
-    _bump_store_config_namespace(store_id=int(instance.id))
+    _invalidate_tenant_resolution(instance.id)
+
+
+@receiver(post_save, sender=Store)
+@receiver(post_delete, sender=Store)
+def invalidate_store_resolution_cache(sender, instance: Store, **kwargs):
+    _invalidate_tenant_resolution(instance.tenant_id)
+    if instance.tenant_id:
+        _invalidate_tenant_access(int(instance.tenant_id))
+
+
+@receiver(post_save, sender=StoreDomain)
+@receiver(post_delete, sender=StoreDomain)
+def invalidate_store_domain_resolution_cache(sender, instance: StoreDomain, **kwargs):
+    _invalidate_tenant_resolution(instance.tenant_id)
 
 
 @receiver(post_save, sender=SubscriptionPlan)
 @receiver(post_delete, sender=SubscriptionPlan)
-def invalidate_plan_changes_permissions(sender, **kwargs):
+def invalidate_plan_changes_permissions(sender, instance: SubscriptionPlan, **kwargs):
     for store_id in StoreSubscription.objects.values_list("store_id", flat=True).distinct():
         _invalidate_rbac_for_store(int(store_id))
+    for store_id in instance.store_subscriptions.values_list("store_id", flat=True).distinct():
+        _bump_plan_limits_namespace(store_id=int(store_id))
 
 
 def _invalidate_rbac_for_store(store_id: int):
     StoreCacheService.bump_namespace_version(store_id=store_id, namespace="rbac_permissions")
 
 
+def _invalidate_tenant_access(tenant_id: int):
+    StoreCacheService.bump_namespace_version(store_id=tenant_id, namespace="tenant_access")
+
+
 @receiver(post_save, sender=TenantMembership)
 @receiver(post_delete, sender=TenantMembership)
 def invalidate_membership_permissions(sender, instance: TenantMembership, **kwargs):
     _invalidate_rbac_for_store(int(instance.tenant_id))
+    _invalidate_tenant_access(int(instance.tenant_id))
 
 
 @receiver(post_save, sender=RolePermission)
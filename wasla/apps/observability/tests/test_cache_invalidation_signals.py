@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import pytest
+
 from apps.catalog.models import Product
 from core.infrastructure.store_cache import StoreCacheService
 
@@ -63,3 +65,50 @@ def test_product_update_invalidates_storefront_listing_cache(db):
     )
     assert hit3 is False
     assert value3 == ["After"]
+
+
+def test_coalesced_invalidation_bumps_each_namespace_once_on_commit(db, django_capture_on_commit_callbacks):
+    from core.infrastructure.store_cache import coalesced_invalidation
+
+    store_id = 903
+    before = StoreCacheService.get_namespace_version(store_id=store_id, namespace="storefront_products")
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        with coalesced_invalidation():
+            for index in range(5):
+                Product.objects.create(
+                    store_id=store_id,
+                    sku=f"SKU-903-{index}",
+                    name=f"Bulk {index}",
+                    price="10.00",
+                    is_active=True,
+                )
+            with coalesced_invalidation():
+                Product.objects.create(store_id=store_id, sku="SKU-903-n", name="Nested", price="1.00")
+            assert StoreCacheService.get_namespace_version(store_id=store_id, namespace="storefront_products") == before
+
+    assert len(callbacks) == 1
+    assert StoreCacheService.get_namespace_version(store_id=store_id, namespace="storefront_products") == before + 1
+    assert StoreCacheService.get_namespace_version(store_id=store_id, namespace="product_detail") == before + 1
+
+
+def test_coalesced_invalidation_skips_bumps_of_a_rolled_back_block(db, django_capture_on_commit_callbacks):
+    from django.db import transaction
+
+    from core.infrastructure.store_cache import coalesced_invalidation
+
+    store_id = 904
+    before = StoreCacheService.get_namespace_version(store_id=store_id, namespace="storefront_products")
+
+    @coalesced_invalidation()
+    @transaction.atomic
+    def failing_write():
+        Product.objects.create(store_id=store_id, sku="SKU-904", name="Rolled back", price="1.00")
+        raise ValueError("boom")
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        with pytest.raises(ValueError):
+            failing_write()
+
+    assert callbacks == []
+    assert StoreCacheService.get_namespace_version(store_id=store_id, namespace="storefront_products") == before
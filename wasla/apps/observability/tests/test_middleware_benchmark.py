@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import json
+from io import StringIO
+
+from django.core.management import call_command
+
+from apps.observability.performance.middleware_benchmark import run_middleware_benchmark
+
+
+def test_middleware_benchmark_reports_both_variants():
+    result = run_middleware_benchmark(iterations=10)
+    assert result.iterations == 10
+    assert result.paths > 0
+    assert result.legacy_us_per_request > 0
+    assert result.classified_us_per_request > 0
+
+
+def test_benchmark_middleware_command_json_output():
+    output = StringIO()
+    call_command("benchmark_middleware", "--iterations", "5", "--paths", "/,/api/v1/orders/", stdout=output)
+    payload = json.loads(output.getvalue())
+    assert payload["paths"] == 2
+    assert "legacy_us_per_request" in payload
+    assert "classified_us_per_request" in payload
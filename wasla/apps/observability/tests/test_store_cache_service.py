@@ -45,3 +45,136 @@ def test_cache_set_get_delete_store_isolation(db):
     cache_delete(key=key, store_id=1)
     assert cache_get(key=key, store_id=1) is None
     assert cache_get(key=key, store_id=2) == {"allowed": False}
+
+
+def test_get_or_set_serves_repeat_reads_from_l1(db):
+    from unittest.mock import patch
+
+    StoreCacheService.get_or_set(
+        store_id=11, namespace="product_detail", key_parts=["l1"], producer=lambda: {"v": 1}, timeout=60
+    )
+    with patch("core.infrastructure.store_cache.cache_get") as l2_get:
+        value, hit = StoreCacheService.get_or_set(
+            store_id=11, namespace="product_detail", key_parts=["l1"], producer=lambda: {"v": 2}, timeout=60
+        )
+
+    assert (value, hit) == ({"v": 1}, True)
+    l2_get.assert_not_called()
+
+    StoreCacheService.bump_namespace_version(store_id=11, namespace="product_detail")
+    value, hit = StoreCacheService.get_or_set(
+        store_id=11, namespace="product_detail", key_parts=["l1"], producer=lambda: {"v": 3}, timeout=60
+    )
+    assert (value, hit) == ({"v": 3}, False)
+
+
+def test_request_scope_prefetches_versions_in_one_round_trip(db):
+    from unittest.mock import patch
+
+    from django.core.cache import cache
+
+    from core.infrastructure.store_cache import STOREFRONT_CACHE_NAMESPACES
+
+    StoreCacheService.begin_request_scope()
+    try:
+        with patch.object(cache, "get_many", wraps=cache.get_many) as get_many:
+            StoreCacheService.prefetch_versions(store_id=12, namespaces=STOREFRONT_CACHE_NAMESPACES)
+            for namespace in STOREFRONT_CACHE_NAMESPACES:
+                StoreCacheService.get_namespace_version(store_id=12, namespace=namespace)
+        assert get_many.call_count == 1
+
+        assert StoreCacheService.bump_namespace_version(store_id=12, namespace="store_config") == 2
+        assert StoreCacheService.get_namespace_version(store_id=12, namespace="store_config") == 2
+    finally:
+        StoreCacheService.end_request_scope()
+
+
+def test_local_lru_cache_enforces_byte_budget():
+    from core.infrastructure.local_cache import LocalLRUCache
+
+    l1 = LocalLRUCache(max_bytes=300, max_entries=100, ttl=60)
+    for index in range(10):
+        l1.set(f"k{index}", "x" * 100)
+
+    assert l1.size_bytes <= 300
+    assert l1.get("k9") == "x" * 100
+    assert l1.get("k0") is None
+    assert l1.set("big", "y" * 1000) is False
+
+
+def test_get_or_set_runs_one_producer_for_concurrent_misses(settings):
+    import threading
+    import time
+
+    settings.STORE_CACHE_L1_ENABLED = False
+    calls = []
+
+    def producer():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"ids": [1, 2, 3]}
+
+    results = []
+
+    def read():
+        results.append(
+            StoreCacheService.get_or_set(
+                store_id=13, namespace="storefront_products", key_parts=["flight"], producer=producer, timeout=60
+            )[0]
+        )
+
+    threads = [threading.Thread(target=read) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"ids": [1, 2, 3]}] * 6
+
+
+def test_get_or_set_serves_previous_version_while_refreshing(settings):
+    from unittest.mock import patch
+
+    settings.STORE_CACHE_L1_ENABLED = False
+    settings.STORE_CACHE_REFRESH_ASYNC = True
+    submitted = []
+
+    class _Executor:
+        def submit(self, fn):
+            submitted.append(fn)
+
+    def read(value):
+        return StoreCacheService.get_or_set(
+            store_id=14,
+            namespace="storefront_products",
+            key_parts=["swr"],
+            producer=lambda: value,
+            timeout=60,
+            stale_ttl=60,
+        )
+
+    assert read("old") == ("old", False)
+    StoreCacheService.bump_namespace_version(store_id=14, namespace="storefront_products")
+
+    with patch("core.infrastructure.store_cache.get_refresh_executor", return_value=_Executor()):
+        assert read("new") == ("old", True)
+        assert read("newer") == ("old", True)
+
+    assert len(submitted) == 1
+    submitted[0]()
+    assert read("newest") == ("new", True)
+
+
+def test_cache_entry_refreshes_early_for_slow_producers(settings):
+    import time
+
+    from core.infrastructure.store_cache import CacheEntry
+
+    now = time.time()
+    settings.STORE_CACHE_EARLY_REFRESH_BETA = 1.0
+    assert CacheEntry(value=1, expires_at=now + 0.01, compute_seconds=1000).should_refresh(now)
+    assert not CacheEntry(value=1, expires_at=now + 3600, compute_seconds=0.001).should_refresh(now)
+
+    settings.STORE_CACHE_EARLY_REFRESH_BETA = 0
+    assert not CacheEntry(value=1, expires_at=now + 0.01, compute_seconds=1000).should_refresh(now)
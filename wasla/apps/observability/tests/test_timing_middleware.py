@@ -56,3 +56,72 @@ def test_timing_middleware_logs_slow_request_warning(db):
 
     assert response.status_code == 200
     warning_mock.assert_called()
+
+
+@override_settings(PERFORMANCE_LOG_PERSIST_ENABLED=True, PERFORMANCE_LOG_ASYNC=True)
+def test_timing_middleware_buffers_rows_until_flush(db):
+    from apps.observability.models import PerformanceLog
+    from apps.observability.performance.log_writer import performance_log_writer
+
+    middleware = TimingMiddleware(lambda request: HttpResponse("ok", status=200))
+    with patch.object(performance_log_writer, "_ensure_thread"):
+        for _ in range(3):
+            request = RequestFactory().get("/buffered")
+            request.tenant = SimpleNamespace(id=7)
+            request.user = _AnonymousUser()
+            middleware(request)
+
+        assert not RequestPerformanceLog.objects.filter(endpoint="/buffered").exists()
+        assert performance_log_writer.flush() == 3
+
+    assert RequestPerformanceLog.objects.filter(endpoint="/buffered", store_id=7).count() == 3
+    assert PerformanceLog.objects.filter(path="/buffered", store=7).count() == 3
+
+
+@override_settings(PERFORMANCE_LOG_PERSIST_ENABLED=True, PERFORMANCE_LOG_SAMPLE_RATE=0.0)
+def test_timing_middleware_sampling_keeps_slow_requests(db):
+    middleware = TimingMiddleware(lambda request: HttpResponse("ok", status=200))
+
+    for path, latency in (("/sampled-fast", 5), ("/sampled-slow", 900)):
+        request = RequestFactory().get(path)
+        request.tenant = SimpleNamespace(id=8)
+        request.user = _AnonymousUser()
+        with patch("apps.observability.middleware.timing._compute_latency_ms", return_value=latency):
+            middleware(request)
+
+    assert not RequestPerformanceLog.objects.filter(endpoint="/sampled-fast").exists()
+    assert RequestPerformanceLog.objects.filter(endpoint="/sampled-slow", is_slow=True).exists()
+
+
+def test_route_label_uses_resolved_url_pattern():
+    from django.urls import resolve
+
+    from apps.observability.metrics_registry import UNMATCHED_ROUTE, route_label
+
+    request = RequestFactory().get("/metrics")
+    assert route_label(request) == UNMATCHED_ROUTE
+
+    request.resolver_match = resolve("/metrics")
+    assert route_label(request) == "/metrics"
+
+
+def test_store_label_limiter_is_bounded():
+    from apps.observability.metrics_registry import OTHER_STORE, StoreLabelLimiter
+
+    limiter = StoreLabelLimiter(limit=2)
+
+    assert [limiter.label(store_id) for store_id in (1, 2, 3, 1, None)] == ["1", "2", OTHER_STORE, "1", OTHER_STORE]
+
+
+def test_metrics_view_aggregates_multiprocess_directory(tmp_path, monkeypatch):
+    from apps.observability.views.metrics import _collector_registry
+    from prometheus_client import REGISTRY
+
+    assert _collector_registry() is REGISTRY
+
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    with patch("apps.observability.views.metrics.multiprocess.MultiProcessCollector") as collector_mock:
+        registry = _collector_registry()
+
+    assert registry is not REGISTRY
+    collector_mock.assert_called_once_with(registry)
@@ -7,7 +7,7 @@ from django.views.decorators.http import require_GET
 logger = logging.getLogger(__name__)
 
 try:
-    from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest, multiprocess
     PROMETHEUS_AVAILABLE = True
 except ImportError:
     PROMETHEUS_AVAILABLE = False
@@ -17,6 +17,17 @@ except ImportError:
     )
 
 
+def _collector_registry():
+    """Aggregate every gunicorn worker when running in multiprocess mode."""
+    from apps.observability.metrics_registry import multiprocess_enabled
+
+    if not multiprocess_enabled():
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
 @require_GET
 def metrics(request):
     """Prometheus metrics endpoint with graceful degradation."""
@@ -28,7 +39,7 @@ def metrics(request):
         )
     
     try:
-        payload = generate_latest()
+        payload = generate_latest(_collector_registry())
         return HttpResponse(payload, content_type=CONTENT_TYPE_LATEST)
     except Exception as e:
         logger.error(f"Error generating metrics: {e}", exc_info=True)
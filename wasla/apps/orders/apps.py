@@ -8,3 +8,4 @@ class OrderConfig(AppConfig):
 
     def ready(self):
         import apps.orders.email_signals  # noqa
+        import apps.orders.stock_signals  # noqa
@@ -0,0 +1,28 @@
+"""Recompute stock ledger counters from on-hand stock and active reservations."""
+from django.core.management.base import BaseCommand
+
+from apps.orders.services.stock_ledger_service import StockLedgerService
+
+
+class Command(BaseCommand):
+    help = "Reconcile StockLedger available/reserved counters against StockReservation rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--store-id",
+            type=int,
+            help="Reconcile only one store (optional)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Ledgers locked per transaction (default: 500)",
+        )
+
+    def handle(self, *args, **options):
+        corrected = StockLedgerService.reconcile(
+            store_id=options.get("store_id"),
+            batch_size=options.get("batch_size") or 500,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Reconciled stock ledgers; {corrected} had drifted"))
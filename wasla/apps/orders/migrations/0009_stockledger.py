@@ -0,0 +1,50 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0008_commerce_alignment"),
+        ("catalog", "0011_productimage_derivatives"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockLedger",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("store_id", models.IntegerField(db_index=True)),
+                ("available", models.PositiveIntegerField(default=0)),
+                ("reserved", models.PositiveIntegerField(default=0)),
+                ("reconciled_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_ledgers",
+                        to="catalog.product",
+                    ),
+                ),
+                (
+                    "variant",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="catalog.productvariant",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("product", "variant"), name="uq_stock_ledger_product_variant"),
+                    models.UniqueConstraint(
+                        condition=models.Q(("variant__isnull", True)),
+                        fields=("product",),
+                        name="uq_stock_ledger_product",
+                    ),
+                ],
+            },
+        ),
+    ]
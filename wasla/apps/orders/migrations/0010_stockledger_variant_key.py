@@ -0,0 +1,46 @@
+from django.db import migrations, models
+from django.db.models import Count, F, Min
+
+
+def fill_variant_keys(apps, schema_editor):
+    StockLedger = apps.get_model("orders", "StockLedger")
+    StockLedger.objects.filter(variant__isnull=False).update(variant_key=F("variant_id"))
+    # The partial constraint on product-level counters was never created on
+    # MySQL; keep one row per key and let reconcile_stock_ledgers recount it.
+    duplicates = (
+        StockLedger.objects.values("product_id", "variant_key")
+        .annotate(rows=Count("id"), keep=Min("id"))
+        .filter(rows__gt=1)
+    )
+    for duplicate in duplicates:
+        StockLedger.objects.filter(
+            product_id=duplicate["product_id"], variant_key=duplicate["variant_key"]
+        ).exclude(id=duplicate["keep"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0009_stockledger"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="stockledger",
+            name="variant_key",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_variant_keys, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name="stockledger",
+            name="uq_stock_ledger_product_variant",
+        ),
+        migrations.RemoveConstraint(
+            model_name="stockledger",
+            name="uq_stock_ledger_product",
+        ),
+        migrations.AddConstraint(
+            model_name="stockledger",
+            constraint=models.UniqueConstraint(fields=("product", "variant_key"), name="uq_stock_ledger_product_variant_key"),
+        ),
+    ]
@@ -186,6 +186,34 @@ class StockReservation(models.Model):
         return bool(self.expires_at and self.expires_at <= timezone.now())
 
 
+class StockLedger(models.Model):
+    """
+    Reservation counters for one product (`variant` empty) or one variant.
+
+    `reserved` is the quantity held by active StockReservation rows and
+    `available` the on-hand stock left for new reservations. Both move
+    together in single conditional UPDATEs, so checkouts never lock the
+    Inventory/ProductVariant row.
+    """
+    store_id = models.IntegerField(db_index=True)
+    product = models.ForeignKey("catalog.Product", on_delete=models.CASCADE, related_name="stock_ledgers")
+    variant = models.ForeignKey("catalog.ProductVariant", on_delete=models.CASCADE, null=True, blank=True)
+    # `variant_id`, or 0 for the product's own counter: NULLs never collide in a
+    # unique index and MySQL has no partial ones, so the key must be non-null.
+    variant_key = models.PositiveIntegerField(default=0)
+    available = models.PositiveIntegerField(default=0)
+    reserved = models.PositiveIntegerField(default=0)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["product", "variant_key"], name="uq_stock_ledger_product_variant_key"),
+        ]
+
+    def __str__(self) -> str:
+        return f"StockLedger {self.product_id}/{self.variant_id or '-'}: {self.available} available, {self.reserved} reserved"
+
+
 class ShipmentLineItem(models.Model):
     """
     Maps OrderItem to Shipment with quantity breakdown.
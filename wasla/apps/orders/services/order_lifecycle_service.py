@@ -2,10 +2,11 @@ from __future__ import annotations
 
 from django.db import transaction
 
+from apps.subscriptions.services.usage_service import MonthlyUsageService
 from apps.wallet.services.wallet_service import WalletService
 from apps.wallet.services.accounting_service import AccountingService
 
-from ..models import Order
+from ..models import Order, StockReservation
 
 
 class OrderLifecycleService:
@@ -125,13 +126,10 @@ class OrderLifecycleService:
         """
         # Release stock reservations
         from .stock_reservation_service import StockReservationService
-        for item in order.items.all():
-            try:
-                StockReservationService.release_reservation(
-                    item.stock_reservation,
-                    reason="Order cancelled"
-                )
-            except Exception:
-                # Reservation may not exist, skip
-                pass
+        StockReservationService.release_reservations(
+            StockReservation.objects.filter(order_item__order=order, status__in=["reserved", "confirmed"]),
+            reason="Order cancelled",
+        )
+        # Cancelled orders no longer count towards max_orders_monthly
+        MonthlyUsageService.release_order(store_id=order.store_id, created_at=order.created_at)
 
@@ -1,21 +1,33 @@
 import uuid
 from django.db import transaction
 from django.db.models import F
-from django.utils import timezone
 
 from apps.catalog.models import Inventory, ProductVariant, StockMovement
 from apps.subscriptions.services.entitlement_service import SubscriptionEntitlementService
+from apps.subscriptions.services.usage_service import ORDERS_LIMIT_FIELD, MonthlyUsageService
 from apps.wallet.services.wallet_service import WalletService
 from apps.wallet.services.accounting_service import AccountingService
 
 from ..models import Order, OrderItem
 from .pricing_service import PricingService
+from .stock_reservation_service import StockReservationService
 
 
 class OrderService:
     @staticmethod
     @transaction.atomic
-    def create_order(customer, items, store_id: int | None = None, tenant=None, tenant_id: int | None = None):
+    def create_order(
+        customer,
+        items,
+        store_id: int | None = None,
+        tenant=None,
+        tenant_id: int | None = None,
+        count_usage: bool = True,
+        **order_fields,
+    ):
+        # `order_fields` (totals, contact and shipping details) go into the same INSERT.
+        # Callers with more writes in the transaction pass count_usage=False and
+        # call count_monthly_usage() after them.
         resolved_store_id = store_id if store_id is not None else getattr(customer, "store_id", 1)
         customer_store_id = getattr(customer, "store_id", resolved_store_id)
         if customer_store_id != resolved_store_id:
@@ -27,46 +39,51 @@ class OrderService:
             if product_store_id != resolved_store_id:
                 raise ValueError("Product store does not match order store")
 
-        now = timezone.now()
-        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        if month_start.month == 12:
-            next_month_start = month_start.replace(year=month_start.year + 1, month=1)
-        else:
-            next_month_start = month_start.replace(month=month_start.month + 1)
+        # Cached and lock-free: a store without an active plan fails before any write.
+        orders_limit = SubscriptionEntitlementService.get_limit_or_raise(resolved_store_id, ORDERS_LIMIT_FIELD)
 
-        current_orders = (
-            Order.objects.for_tenant(resolved_store_id)
-            .filter(created_at__gte=month_start, created_at__lt=next_month_start)
-            .count()
-        )
-        SubscriptionEntitlementService.assert_within_limit(
-            store_id=resolved_store_id,
-            limit_field="max_orders_monthly",
-            current_usage=current_orders,
-            increment=1,
-        )
-
-        total = PricingService.calculate_total(items)
+        order_fields.setdefault("status", "pending")
+        if "total_amount" not in order_fields:
+            order_fields["total_amount"] = PricingService.calculate_total(items)
         resolved_tenant_id = tenant_id or (getattr(tenant, "id", None) if tenant is not None else None)
         order = Order.objects.create(
             tenant_id=resolved_tenant_id,
             store_id=resolved_store_id,
             order_number=str(uuid.uuid4())[:12],
             customer=customer,
-            status="pending",
-            total_amount=total
+            **order_fields,
         )
-        for item in items:
-            OrderItem.objects.create(
-                tenant_id=order.tenant_id,
-                order=order,
-                product=item["product"],
-                variant=item.get("variant"),
-                quantity=item["quantity"],
-                price=item["price"]
-            )
+        OrderItem.objects.bulk_create(
+            [
+                OrderItem(
+                    tenant_id=order.tenant_id,
+                    order=order,
+                    product=item["product"],
+                    variant=item.get("variant"),
+                    quantity=item["quantity"],
+                    price=item["price"],
+                )
+                for item in items
+            ]
+        )
+        if count_usage:
+            MonthlyUsageService.consume_order(store_id=resolved_store_id, limit=orders_limit, order_id=order.id)
         return order
 
+    @staticmethod
+    def count_monthly_usage(order) -> None:
+        """
+        Count a new order against its store's monthly plan limit.
+
+        The conditional UPDATE locks the store's usage row until commit, so
+        make it the last write of the transaction that creates the order.
+        """
+        MonthlyUsageService.consume_order(
+            store_id=order.store_id,
+            limit=SubscriptionEntitlementService.get_limit_or_raise(order.store_id, ORDERS_LIMIT_FIELD),
+            order_id=order.id,
+        )
+
     @staticmethod
     def validate_stock(order) -> None:
         items = list(order.items.select_related("product", "variant"))
@@ -156,6 +173,8 @@ class OrderService:
                 order_id=order.id,
             )
 
+        StockReservationService.consume_for_order(order, items)
+
         non_variant_product_ids = [i.product_id for i in items if not i.variant_id]
         for inventory in Inventory.objects.filter(product_id__in=non_variant_product_ids).select_related(
             "product"
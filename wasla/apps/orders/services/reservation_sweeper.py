@@ -0,0 +1,167 @@
+"""
+Reservation Sweeper
+
+Releases expired stock reservations in bounded, set-based batches.
+
+Each batch is one short transaction: a single `UPDATE ... RETURNING`
+(PostgreSQL, SQLite) flips up to STOCK_RESERVATION_SWEEP_BATCH expired rows
+to "released" and hands back their product/variant/quantity, and one ledger
+UPDATE returns the aggregated quantities to `available`. On PostgreSQL the
+batch skips rows locked by a concurrent release, so the sweeper can run
+every minute next to checkouts. Backends without UPDATE ... RETURNING lock
+and read the batch first, then update it.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from apps.observability.metrics_registry import STALE_RESERVED_STOCK_UNITS, STOCK_RESERVATIONS_EXPIRED_TOTAL
+from .stock_ledger_service import ACTIVE_RESERVATION_STATUSES, StockLedgerService
+from ..models import StockReservation
+
+logger = logging.getLogger("orders.stock")
+
+EXPIRED_REASON = "TTL expired"
+
+
+@dataclass(frozen=True)
+class SweepResult:
+    released_count: int
+    released_quantity: int
+    batches: int
+    # Reservations still holding stock after their expiry when the sweep started.
+    stale_count: int
+    stale_quantity: int
+    timestamp: str
+
+    def as_dict(self) -> dict:
+        return {
+            "released_count": self.released_count,
+            "released_quantity": self.released_quantity,
+            "batches": self.batches,
+            "stale_count": self.stale_count,
+            "stale_quantity": self.stale_quantity,
+            "failed_count": 0,
+            "timestamp": self.timestamp,
+        }
+
+
+def stale_reservation_stock(now: datetime | None = None) -> tuple[int, int]:
+    """`(reservations, units)` still held by active reservations past their expiry."""
+    totals = StockReservation.objects.filter(
+        status__in=ACTIVE_RESERVATION_STATUSES,
+        expires_at__lte=now or timezone.now(),
+    ).aggregate(count=Count("id"), quantity=Sum("quantity"))
+    return int(totals["count"] or 0), int(totals["quantity"] or 0)
+
+
+def sweep_expired_reservations(
+    *,
+    batch_size: int | None = None,
+    max_batches: int | None = None,
+    now: datetime | None = None,
+) -> SweepResult:
+    """Release up to `batch_size * max_batches` expired reservations."""
+    if batch_size is None:
+        batch_size = int(getattr(settings, "STOCK_RESERVATION_SWEEP_BATCH", 500) or 500)
+    if max_batches is None:
+        max_batches = int(getattr(settings, "STOCK_RESERVATION_SWEEP_MAX_BATCHES", 20) or 20)
+    now = now or timezone.now()
+
+    stale_count, stale_quantity = stale_reservation_stock(now)
+    STALE_RESERVED_STOCK_UNITS.set(stale_quantity)
+
+    released_count = 0
+    released_quantity = 0
+    batches = 0
+    while batches < max_batches:
+        with transaction.atomic():
+            rows = _release_batch(now, batch_size)
+            if rows:
+                StockLedgerService.release_many(rows)
+        if not rows:
+            break
+        batches += 1
+        released_count += len(rows)
+        released_quantity += sum(quantity for _, _, quantity in rows)
+        if len(rows) < batch_size:
+            break
+
+    if released_count:
+        STOCK_RESERVATIONS_EXPIRED_TOTAL.inc(released_count)
+        logger.info(
+            "Released expired stock reservations",
+            extra={"released_count": released_count, "released_quantity": released_quantity, "batches": batches},
+        )
+    return SweepResult(
+        released_count=released_count,
+        released_quantity=released_quantity,
+        batches=batches,
+        stale_count=stale_count,
+        stale_quantity=stale_quantity,
+        timestamp=str(now),
+    )
+
+
+def _supports_update_returning() -> bool:
+    if connection.vendor == "postgresql":
+        return True
+    return connection.vendor == "sqlite" and sqlite3.sqlite_version_info >= (3, 35)
+
+
+def _release_batch(now: datetime, batch_size: int) -> list[tuple[int, int | None, int]]:
+    if _supports_update_returning():
+        return _release_batch_returning(now, batch_size)
+
+    expired = StockReservation.objects.filter(status__in=ACTIVE_RESERVATION_STATUSES, expires_at__lte=now)
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    rows = list(
+        expired.select_for_update(skip_locked=skip_locked)
+        .order_by("expires_at")
+        .values_list("pk", "product_id", "variant_id", "quantity")[:batch_size]
+    )
+    if rows:
+        StockReservation.objects.filter(pk__in=[row[0] for row in rows]).update(
+            status="released", released_at=now, release_reason=EXPIRED_REASON
+        )
+    return [(product_id, variant_id, quantity) for _, product_id, variant_id, quantity in rows]
+
+
+def _release_batch_returning(now: datetime, batch_size: int) -> list[tuple[int, int | None, int]]:
+    meta = StockReservation._meta
+    qn = connection.ops.quote_name
+    table = qn(meta.db_table)
+    fields = ("id", "status", "expires_at", "released_at", "release_reason", "product", "variant", "quantity")
+    column = {name: qn(meta.get_field(name).column) for name in fields}
+    active = ", ".join(["%s"] * len(ACTIVE_RESERVATION_STATUSES))
+    lock = " FOR UPDATE SKIP LOCKED" if connection.vendor == "postgresql" else ""
+    sql = (
+        f"UPDATE {table} SET {column['status']} = %s, {column['released_at']} = %s, {column['release_reason']} = %s "
+        f"WHERE {column['id']} IN ("
+        f"SELECT {column['id']} FROM {table} WHERE {column['status']} IN ({active}) AND {column['expires_at']} <= %s "
+        f"ORDER BY {column['expires_at']} LIMIT %s{lock}"
+        f") AND {column['status']} IN ({active}) "
+        f"RETURNING {column['product']}, {column['variant']}, {column['quantity']}"
+    )
+    timestamp = connection.ops.adapt_datetimefield_value(now)
+    params = [
+        "released",
+        timestamp,
+        EXPIRED_REASON,
+        *ACTIVE_RESERVATION_STATUSES,
+        timestamp,
+        batch_size,
+        *ACTIVE_RESERVATION_STATUSES,
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [(int(product_id), variant_id, int(quantity)) for product_id, variant_id, quantity in cursor.fetchall()]
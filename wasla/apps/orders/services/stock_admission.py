@@ -0,0 +1,147 @@
+"""
+Pre-admission for stock reservations on hot SKUs.
+
+Every SKU reserved through `StockLedgerService` gets a token counter seeded
+from its ledger `available` count and kept for STOCK_ADMISSION_TTL seconds
+after the last seed. A checkout takes its quantity from the counter before
+touching the database, so once a flash sale sells out the remaining requests
+are turned away without queueing on the ledger row. The ledger stays the
+source of truth: admitted requests can still be refused by the conditional
+UPDATE, and any change that returns stock drops the counter so it is
+reseeded.
+
+`STOCK_ADMISSION` selects the backend: "redis", "cache" (any Django cache;
+only coherent within one process) or "off". "auto" uses Redis whenever
+`CACHE_USE_REDIS` is on and skips pre-admission otherwise.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+logger = logging.getLogger(__name__)
+
+# Results of `acquire`.
+ADMITTED = 1
+REFUSED = 0
+UNKNOWN = -1
+
+
+class CacheStockAdmission:
+    """Token counters on the Django cache (single process only)."""
+
+    def __init__(self, *, ttl: int, key_prefix: str = "stock") -> None:
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+
+    def key_for(self, product_id: int, variant_id: int | None) -> str:
+        return f"{self.key_prefix}:admit:{product_id}:{variant_id or 0}"
+
+    def acquire(self, key: str, quantity: int) -> int:
+        tokens = cache.get(key)
+        if tokens is None:
+            return UNKNOWN
+        if int(tokens) < quantity:
+            return REFUSED
+        cache.set(key, int(tokens) - quantity, timeout=self.ttl)
+        return ADMITTED
+
+    def seed(self, key: str, tokens: int) -> None:
+        cache.add(key, max(0, int(tokens)), timeout=self.ttl)
+
+    def give_back(self, key: str, quantity: int) -> None:
+        tokens = cache.get(key)
+        if tokens is not None:
+            cache.set(key, int(tokens) + quantity, timeout=self.ttl)
+
+    def forget(self, keys: list[str]) -> None:
+        cache.delete_many(keys)
+
+
+_ACQUIRE_LUA = """
+local tokens = redis.call('GET', KEYS[1])
+if not tokens then
+  return -1
+end
+if tonumber(tokens) < tonumber(ARGV[1]) then
+  return 0
+end
+redis.call('DECRBY', KEYS[1], ARGV[1])
+return 1
+"""
+
+_GIVE_BACK_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+  return redis.call('INCRBY', KEYS[1], ARGV[1])
+end
+return 0
+"""
+
+
+class RedisStockAdmission(CacheStockAdmission):
+    """Native Redis counters; acquire and give-back are single atomic scripts."""
+
+    def __init__(self, connection, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.connection = connection
+        self._acquire = connection.register_script(_ACQUIRE_LUA)
+        self._give_back = connection.register_script(_GIVE_BACK_LUA)
+
+    def acquire(self, key: str, quantity: int) -> int:
+        return int(self._acquire(keys=[key], args=[quantity]))
+
+    def seed(self, key: str, tokens: int) -> None:
+        self.connection.set(key, max(0, int(tokens)), ex=self.ttl, nx=True)
+
+    def give_back(self, key: str, quantity: int) -> None:
+        self._give_back(keys=[key], args=[quantity])
+
+    def forget(self, keys: list[str]) -> None:
+        if keys:
+            self.connection.delete(*keys)
+
+
+def _build_admission() -> CacheStockAdmission | None:
+    choice = str(getattr(settings, "STOCK_ADMISSION", "auto") or "auto").lower()
+    if choice == "auto":
+        choice = "redis" if getattr(settings, "CACHE_USE_REDIS", False) else "off"
+    if choice not in {"redis", "cache"}:
+        return None
+    prefix = f"{getattr(settings, 'CACHE_KEY_PREFIX', 'wasla')}:stock"
+    ttl = int(getattr(settings, "STOCK_ADMISSION_TTL", 60) or 60)
+    if choice == "redis":
+        try:
+            from django_redis import get_redis_connection
+
+            return RedisStockAdmission(get_redis_connection("default"), ttl=ttl, key_prefix=prefix)
+        except Exception:
+            logger.warning("Redis stock admission unavailable; reservations go straight to the ledger")
+            return None
+    return CacheStockAdmission(ttl=ttl, key_prefix=prefix)
+
+
+_admission: CacheStockAdmission | None = None
+_admission_built = False
+
+
+def get_stock_admission() -> CacheStockAdmission | None:
+    """The configured admission backend, or None when every request goes to the ledger."""
+    global _admission, _admission_built
+    if not _admission_built:
+        _admission = _build_admission()
+        _admission_built = True
+    return _admission
+
+
+@receiver(setting_changed)
+def _reset_stock_admission(setting, **kwargs):
+    global _admission, _admission_built
+    if setting in {"STOCK_ADMISSION", "STOCK_ADMISSION_TTL", "CACHE_USE_REDIS", "CACHES"}:
+        _admission = None
+        _admission_built = False
@@ -0,0 +1,304 @@
+"""
+Stock Ledger Service
+
+Reservation engine backed by per-product/per-variant `StockLedger` counters.
+
+- A reservation is one conditional UPDATE
+  (`available -= n, reserved += n WHERE available >= n`), so concurrent
+  checkouts on one SKU never wait on an Inventory row lock and can never
+  take more than is available.
+- Releases, sales and stock edits adjust the same counters with single
+  UPDATEs; `reconcile()` recomputes them from on-hand stock and the active
+  `StockReservation` rows to repair drift (e.g. stock written in bulk).
+- Hot SKUs are optionally pre-admitted by `stock_admission` counters before
+  the ledger is touched.
+- Ledger rows are created on first use from on-hand stock minus the
+  quantity already held by active reservations.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Q, Sum, Value, When
+from django.db.models.functions import Least
+from django.utils import timezone
+
+from apps.catalog.models import Inventory, ProductVariant
+from .stock_admission import REFUSED, UNKNOWN, get_stock_admission
+from ..models import StockLedger, StockReservation
+
+logger = logging.getLogger("orders.stock")
+
+ACTIVE_RESERVATION_STATUSES = ("reserved", "confirmed")
+
+
+class InsufficientStockError(ValueError):
+    def __init__(self, *, requested: int, available: int | None = None) -> None:
+        self.requested = requested
+        self.available = available
+        if available is None:
+            message = f"Insufficient stock: {requested} requested"
+        else:
+            message = f"Insufficient stock: only {available} available, {requested} requested"
+        super().__init__(message)
+
+
+class StockLedgerService:
+    @staticmethod
+    def reserve(*, store_id: int, product_id: int, variant_id: int | None, quantity: int) -> None:
+        """
+        Move `quantity` from available to reserved.
+
+        Call inside the transaction that creates the StockReservation row.
+
+        Raises:
+            InsufficientStockError: If less than `quantity` is available
+        """
+        admission = get_stock_admission()
+        key = admission.key_for(product_id, variant_id) if admission is not None else None
+        admitted = _admit(admission, key, quantity)
+        if admitted == REFUSED:
+            raise InsufficientStockError(requested=quantity)
+
+        taken = _take(product_id, variant_id, quantity)
+        if not taken and StockLedgerService._ensure_ledger(store_id, product_id, variant_id):
+            taken = _take(product_id, variant_id, quantity)
+        if not taken:
+            available = _ledger(product_id, variant_id).values_list("available", flat=True).first() or 0
+            _forget(admission, [key])
+            raise InsufficientStockError(requested=quantity, available=available)
+
+        if admitted == UNKNOWN and key is not None:
+            available = _ledger(product_id, variant_id).values_list("available", flat=True).first() or 0
+            _guard(admission.seed, key, available)
+
+    @staticmethod
+    def release(*, product_id: int, variant_id: int | None, quantity: int) -> None:
+        """Return reserved quantity to available (reservation cancelled or expired)."""
+        StockLedgerService.release_many([(product_id, variant_id, quantity)])
+
+    @staticmethod
+    def release_many(lines: Iterable[tuple[int, int | None, int]]) -> None:
+        """Return the quantities of many reservations with one UPDATE over their ledgers."""
+        grouped = _group(lines)
+        if not grouped:
+            return
+        keys = Q()
+        whens = []
+        for (product_id, variant_id), quantity in grouped.items():
+            keys |= Q(product_id=product_id, variant_key=variant_id or 0)
+            whens.append(When(product_id=product_id, variant_key=variant_id or 0, then=Value(quantity)))
+        released = Case(*whens, default=Value(0), output_field=PositiveIntegerField())
+        # `available` is assigned first: MySQL evaluates SET clauses left to right.
+        StockLedger.objects.filter(keys).update(
+            available=F("available") + Least(F("reserved"), released),
+            reserved=_decrement("reserved", released),
+        )
+        admission = get_stock_admission()
+        if admission is not None:
+            for (product_id, variant_id), quantity in grouped.items():
+                _guard(admission.give_back, admission.key_for(product_id, variant_id), quantity)
+
+    @staticmethod
+    def record_sale(lines: Iterable[tuple[int, int | None, int, bool]]) -> None:
+        """
+        Account for stock that left on-hand inventory (order paid).
+
+        Each line is `(product_id, variant_id, quantity, was_reserved)`: sold
+        reserved stock leaves `reserved`, anything else leaves `available`.
+        """
+        admission = get_stock_admission()
+        reserved_lines: dict = defaultdict(int)
+        unreserved_lines: dict = defaultdict(int)
+        for product_id, variant_id, quantity, was_reserved in lines:
+            target = reserved_lines if was_reserved else unreserved_lines
+            target[(product_id, variant_id)] += int(quantity)
+        for (product_id, variant_id), quantity in reserved_lines.items():
+            _ledger(product_id, variant_id).update(reserved=_decrement("reserved", Value(quantity)))
+        for (product_id, variant_id), quantity in unreserved_lines.items():
+            _ledger(product_id, variant_id).update(available=_decrement("available", Value(quantity)))
+        if admission is not None and unreserved_lines:
+            _forget(admission, [admission.key_for(*line) for line in unreserved_lines])
+
+    @staticmethod
+    def sync_on_hand(*, product_id: int, variant_id: int | None, on_hand: int) -> None:
+        """On-hand stock was set to `on_hand`; what is not reserved becomes available."""
+        on_hand = Value(int(on_hand))
+        updated = _ledger(product_id, variant_id).update(
+            available=Case(
+                When(reserved__lt=on_hand, then=on_hand - F("reserved")),
+                default=Value(0),
+                output_field=PositiveIntegerField(),
+            )
+        )
+        admission = get_stock_admission()
+        if updated and admission is not None:
+            _forget(admission, [admission.key_for(product_id, variant_id)])
+
+    @staticmethod
+    def counters(*, store_id: int, product_id: int, variant_id: int | None) -> tuple[int, int]:
+        """Current `(available, reserved)` for a product or variant."""
+        row = _ledger(product_id, variant_id).values_list("available", "reserved").first()
+        if row is None:
+            StockLedgerService._ensure_ledger(store_id, product_id, variant_id)
+            row = _ledger(product_id, variant_id).values_list("available", "reserved").first()
+        return row or (0, 0)
+
+    @staticmethod
+    def reconcile(*, store_id: int | None = None, batch_size: int = 500) -> int:
+        """
+        Recompute ledgers from on-hand stock and active StockReservation rows.
+
+        Ledgers are locked a batch at a time, so reservations on other SKUs
+        keep flowing. Returns the number of ledgers that had drifted.
+        """
+        ledgers = StockLedger.objects.order_by("id")
+        if store_id is not None:
+            ledgers = ledgers.filter(store_id=store_id)
+        corrected = 0
+        last_id = 0
+        while True:
+            with transaction.atomic():
+                batch = list(ledgers.select_for_update().filter(id__gt=last_id)[:batch_size])
+                if not batch:
+                    break
+                corrected += _reconcile_batch(batch)
+            last_id = batch[-1].id
+        return corrected
+
+    @staticmethod
+    def _ensure_ledger(store_id: int, product_id: int, variant_id: int | None) -> bool:
+        """Create the ledger row if missing; True when one was created."""
+        if _ledger(product_id, variant_id).exists():
+            return False
+        on_hand = _on_hand([(product_id, variant_id)]).get((product_id, variant_id), 0)
+        reserved = _held([product_id]).get((product_id, variant_id), 0)
+        StockLedger.objects.bulk_create(
+            [
+                StockLedger(
+                    store_id=store_id,
+                    product_id=product_id,
+                    variant_id=variant_id,
+                    variant_key=variant_id or 0,
+                    available=max(0, on_hand - reserved),
+                    reserved=reserved,
+                    reconciled_at=timezone.now(),
+                )
+            ],
+            ignore_conflicts=True,
+        )
+        return True
+
+
+def _ledger(product_id: int, variant_id: int | None):
+    return StockLedger.objects.filter(product_id=product_id, variant_key=variant_id or 0)
+
+
+def _decrement(field: str, amount) -> Case:
+    # `field - amount` floored at 0. The subtraction only runs when it stays
+    # positive: MySQL rejects negative intermediates on UNSIGNED columns.
+    return Case(
+        When(**{f"{field}__gt": amount}, then=F(field) - amount),
+        default=Value(0),
+        output_field=PositiveIntegerField(),
+    )
+
+
+def _take(product_id: int, variant_id: int | None, quantity: int) -> bool:
+    return bool(
+        _ledger(product_id, variant_id)
+        .filter(available__gte=quantity)
+        .update(available=F("available") - quantity, reserved=F("reserved") + quantity)
+    )
+
+
+def _group(lines: Iterable[tuple[int, int | None, int]]) -> dict[tuple[int, int | None], int]:
+    grouped: dict[tuple[int, int | None], int] = defaultdict(int)
+    for product_id, variant_id, quantity in lines:
+        grouped[(product_id, variant_id)] += int(quantity)
+    return grouped
+
+
+def _on_hand(keys: list[tuple[int, int | None]]) -> dict[tuple[int, int | None], int]:
+    product_ids = {product_id for product_id, variant_id in keys if variant_id is None}
+    variant_ids = {variant_id for _, variant_id in keys if variant_id is not None}
+    on_hand: dict[tuple[int, int | None], int] = {}
+    if product_ids:
+        for product_id, quantity in Inventory.objects.filter(product_id__in=product_ids).values_list(
+            "product_id", "quantity"
+        ):
+            on_hand[(product_id, None)] = int(quantity)
+    if variant_ids:
+        for variant_id, product_id, quantity in ProductVariant.objects.filter(id__in=variant_ids).values_list(
+            "id", "product_id", "stock_quantity"
+        ):
+            on_hand[(product_id, variant_id)] = int(quantity)
+    return on_hand
+
+
+def _held(product_ids: Iterable[int]) -> dict[tuple[int, int | None], int]:
+    rows = (
+        StockReservation.objects.filter(product_id__in=list(product_ids), status__in=ACTIVE_RESERVATION_STATUSES)
+        .values("product_id", "variant_id")
+        .annotate(total=Sum("quantity"))
+    )
+    return {(row["product_id"], row["variant_id"]): int(row["total"] or 0) for row in rows}
+
+
+def _reconcile_batch(batch: list[StockLedger]) -> int:
+    keys = [(ledger.product_id, ledger.variant_id) for ledger in batch]
+    on_hand = _on_hand(keys)
+    held = _held({product_id for product_id, _ in keys})
+    now = timezone.now()
+    drifted = []
+    for ledger in batch:
+        key = (ledger.product_id, ledger.variant_id)
+        reserved = held.get(key, 0)
+        available = max(0, on_hand.get(key, 0) - reserved)
+        if (ledger.available, ledger.reserved) != (available, reserved):
+            logger.warning(
+                "Stock ledger drift corrected",
+                extra={
+                    "product_id": ledger.product_id,
+                    "variant_id": ledger.variant_id,
+                    "available": (ledger.available, available),
+                    "reserved": (ledger.reserved, reserved),
+                },
+            )
+            drifted.append(key)
+        ledger.available = available
+        ledger.reserved = reserved
+        ledger.reconciled_at = now
+    StockLedger.objects.bulk_update(batch, ["available", "reserved", "reconciled_at"])
+    admission = get_stock_admission()
+    if drifted and admission is not None:
+        _forget(admission, [admission.key_for(*key) for key in drifted])
+    return len(drifted)
+
+
+def _admit(admission, key: str | None, quantity: int) -> int:
+    if admission is None:
+        return UNKNOWN
+    try:
+        return admission.acquire(key, quantity)
+    except Exception:
+        logger.warning("Stock admission check failed; using the ledger only", exc_info=True)
+        return UNKNOWN
+
+
+def _forget(admission, keys: list[str | None]) -> None:
+    keys = [key for key in keys if key]
+    if admission is not None and keys:
+        _guard(admission.forget, keys)
+
+
+def _guard(operation, *args) -> None:
+    # Admission counters are only a hint; never fail a checkout over them.
+    try:
+        operation(*args)
+    except Exception:
+        logger.warning("Stock admission update failed", exc_info=True)
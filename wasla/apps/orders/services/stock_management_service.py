@@ -17,6 +17,8 @@ import logging
 
 from apps.orders.models import StockReservation, OrderItem
 from apps.catalog.models import Product, ProductVariant
+from .stock_ledger_service import InsufficientStockError, StockLedgerService
+from .stock_reservation_service import StockReservationService
 
 logger = logging.getLogger("orders.stock")
 
@@ -40,48 +42,54 @@ class StockManagementService:
         Raises:
             ValueError: If not enough stock available
         """
+        existing = StockReservation.objects.filter(order_item=order_item).first()
+        if existing:
+            return existing
+
         product = order_item.product
         variant = order_item.variant
         quantity = order_item.quantity
         
-        # Check available stock
-        available = StockManagementService._get_available_stock(product, variant)
-        if available < quantity:
+        try:
+            StockLedgerService.reserve(
+                store_id=product.store_id,
+                product_id=product.id,
+                variant_id=variant.id if variant else None,
+                quantity=quantity,
+            )
+        except InsufficientStockError as exc:
             logger.warning(
                 "Insufficient stock for reservation",
                 extra={
                     "product_id": product.id,
                     "variant_id": variant.id if variant else None,
                     "requested": quantity,
-                    "available": available,
+                    "available": exc.available,
                 },
             )
-            raise ValueError(f"Insufficient stock: only {available} available, {quantity} requested")
+            raise
         
         expires_at = timezone.now() + timedelta(minutes=timeout_minutes)
         
-        reservation, created = StockReservation.objects.get_or_create(
+        reservation = StockReservation.objects.create(
             order_item=order_item,
-            defaults={
-                "tenant_id": order_item.tenant_id,
-                "product": product,
-                "variant": variant,
+            tenant_id=order_item.tenant_id,
+            product=product,
+            variant=variant,
+            quantity=quantity,
+            status=StockReservation.STATUS_CHOICES[0][0],  # "reserved"
+            expires_at=expires_at,
+        )
+        
+        logger.info(
+            "Stock reserved",
+            extra={
+                "product_id": product.id,
                 "quantity": quantity,
-                "status": StockReservation.STATUS_CHOICES[0][0],  # "reserved"
-                "expires_at": expires_at,
+                "expires_at": expires_at.isoformat(),
             },
         )
         
-        if created:
-            logger.info(
-                "Stock reserved",
-                extra={
-                    "product_id": product.id,
-                    "quantity": quantity,
-                    "expires_at": expires_at.isoformat(),
-                },
-            )
-        
         return reservation
     
     @staticmethod
@@ -114,9 +122,7 @@ class StockManagementService:
         Release/cancel a reservation.
         Called on order cancellation, timeout, or return completion.
         """
-        reservation.status = "released"
-        reservation.released_at = timezone.now()
-        reservation.save(update_fields=["status", "released_at"])
+        StockReservationService.release_reservations([reservation], reason=reason)
         
         logger.info(
             "Stock reservation released",
@@ -135,43 +141,28 @@ class StockManagementService:
         Celery task: Release reservations past timeout.
         Run every 5 minutes.
         """
-        expired = StockReservation.objects.filter(
-            status="reserved",
-            expires_at__lt=timezone.now(),
-        )
-        
-        count = 0
-        for reservation in expired:
-            StockManagementService.release_reservation(reservation, reason="timeout")
-            count += 1
-        
+        from .reservation_sweeper import sweep_expired_reservations
+
+        count = sweep_expired_reservations().released_count
         logger.info(f"Released {count} expired stock reservations")
         return count
     
     @staticmethod
     def _get_available_stock(product: Product, variant: ProductVariant | None = None) -> int:
-        """
-        Calculate available stock (total - reserved - sold).
-        For MVP, this is a simplified check.
-        """
-        if variant:
-            # Use variant stock if available
-            return max(0, variant.stock - StockManagementService._count_reserved(product, variant))
-        else:
-            # Use product stock
-            return max(0, product.stock - StockManagementService._count_reserved(product, None))
+        """Stock left for new reservations (on-hand minus active reservations)."""
+        available, _ = StockLedgerService.counters(
+            store_id=product.store_id,
+            product_id=product.id,
+            variant_id=variant.id if variant else None,
+        )
+        return available
     
     @staticmethod
     def _count_reserved(product: Product, variant: ProductVariant | None = None) -> int:
-        """Count active reservations for a product/variant."""
-        from django.db.models import Sum
-        
-        query = StockReservation.objects.filter(
-            product=product,
-            status__in=["reserved", "confirmed"],
+        """Quantity held by active reservations for a product/variant."""
+        _, reserved = StockLedgerService.counters(
+            store_id=product.store_id,
+            product_id=product.id,
+            variant_id=variant.id if variant else None,
         )
-        if variant:
-            query = query.filter(variant=variant)
-        
-        result = query.aggregate(total=Sum('quantity'))
-        return result['total'] or 0
+        return reserved
@@ -2,7 +2,8 @@
 Stock Reservation Service
 
 Manages stock reservations during checkout with auto-release on timeout.
-Prevents overselling by reserving inventory before payment.
+Prevents overselling by reserving inventory before payment; quantities are
+held on the `StockLedger` counters (see stock_ledger_service).
 """
 
 from __future__ import annotations
@@ -10,9 +11,12 @@ from __future__ import annotations
 from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
-from decimal import Decimal
+from typing import Iterable
 
-from apps.catalog.models import Inventory
+from apps.storefront.read_models import schedule_read_model_refresh
+from core.infrastructure.store_cache import StoreCacheService
+
+from .stock_ledger_service import ACTIVE_RESERVATION_STATUSES, StockLedgerService
 from ..models import StockReservation, OrderItem
 
 
@@ -25,6 +29,9 @@ class StockReservationService:
     2. confirm_reservation() - After payment (extends to 30 min)
     3. release_on_shipment() - When order ships (removes reservation)
     4. auto_release_expired() - Background job to clean up expired
+
+    Paid orders call consume_for_order(), which ends their reservations once
+    the on-hand stock has been reduced.
     """
     
     @staticmethod
@@ -43,26 +50,23 @@ class StockReservationService:
             StockReservation instance
             
         Raises:
-            ValueError: If insufficient stock available
+            InsufficientStockError: If insufficient stock available (a ValueError)
         """
-        inventory = Inventory.objects.select_for_update().get(product=order_item.product)
-        
-        # Check available stock (simplified: quantity must cover reservation)
-        available = inventory.quantity
-        if available < quantity:
-            raise ValueError(
-                f"Insufficient stock. Available: {available}, Requested: {quantity}"
-            )
+        StockLedgerService.reserve(
+            store_id=store_id,
+            product_id=order_item.product_id,
+            variant_id=order_item.variant_id,
+            quantity=quantity,
+        )
 
         # Create reservation with TTL
         expires_at = timezone.now() + timedelta(minutes=15)
         
         reservation = StockReservation.objects.create(
             tenant_id=tenant_id,
-            store_id=store_id,
             order_item=order_item,
-            product=order_item.product,
-            variant=order_item.variant,
+            product_id=order_item.product_id,
+            variant_id=order_item.variant_id,
             quantity=quantity,
             status="reserved",
             expires_at=expires_at,
@@ -91,7 +95,6 @@ class StockReservationService:
         return reservation
     
     @staticmethod
-    @transaction.atomic
     def release_reservation(reservation: StockReservation, reason: str = "Auto-released") -> None:
         """
         Release reserved stock back to inventory.
@@ -100,15 +103,47 @@ class StockReservationService:
             reservation: The StockReservation to release
             reason: Reason for release (cancelled, expired, shipped, etc)
         """
-        if reservation.status in {"released"}:
-            return
-        reservation.status = "released"
-        reservation.released_at = timezone.now()
-        reservation.release_reason = reason
-        reservation.save(update_fields=["status", "released_at", "release_reason"])
-    
+        StockReservationService.release_reservations([reservation], reason=reason)
+
     @staticmethod
     @transaction.atomic
+    def release_reservations(reservations: Iterable[StockReservation], reason: str = "Auto-released") -> int:
+        """
+        Release several reservations and return their quantities to the ledger.
+
+        Only rows still active in the database are released, so a reservation
+        released concurrently (e.g. by expiry) returns its stock once.
+
+        Returns:
+            Number of reservations released
+        """
+        reservations = list(reservations)
+        candidate_ids = [r.pk for r in reservations if r.status in ACTIVE_RESERVATION_STATUSES]
+        if not candidate_ids:
+            return 0
+        active = list(
+            StockReservation.objects.select_for_update()
+            .filter(pk__in=candidate_ids, status__in=ACTIVE_RESERVATION_STATUSES)
+            .values_list("pk", "product_id", "variant_id", "quantity")
+        )
+        if not active:
+            return 0
+        now = timezone.now()
+        released_ids = {pk for pk, _, _, _ in active}
+        StockReservation.objects.filter(pk__in=released_ids).update(
+            status="released", released_at=now, release_reason=reason
+        )
+        StockLedgerService.release_many(
+            (product_id, variant_id, quantity) for _, product_id, variant_id, quantity in active
+        )
+        for reservation in reservations:
+            if reservation.pk in released_ids:
+                reservation.status = "released"
+                reservation.released_at = now
+                reservation.release_reason = reason
+        return len(active)
+    
+    @staticmethod
     def release_on_shipment(order_item: OrderItem, shipped_quantity: int) -> None:
         """
         Release reservation when order ships.
@@ -123,40 +158,48 @@ class StockReservationService:
             # No reservation (may have been released already)
             return
         
-        if reservation.status == StockReservation.STATUS_RELEASED:
-            return
-        
         # Release the reserved stock
-        reservation.release_reservation(reason="Order shipped")
-    
+        StockReservationService.release_reservation(reservation, reason="Order shipped")
+
     @staticmethod
     @transaction.atomic
+    def consume_for_order(order, items: Iterable[OrderItem]) -> None:
+        """
+        Account for the stock of a paid order on the ledger.
+
+        Call after the on-hand Inventory/ProductVariant quantities were
+        reduced: held reservations end with the sale and their quantity
+        leaves `reserved`; unreserved items leave `available`. Those stock
+        UPDATEs fire no signals, so the sold products' storefront read models
+        (listing projection, stock facet) are refreshed here too.
+        """
+        items = list(items)
+        held = dict(
+            StockReservation.objects.select_for_update()
+            .filter(order_item__order=order, status__in=ACTIVE_RESERVATION_STATUSES)
+            .values_list("order_item_id", "pk")
+        )
+        if held:
+            StockReservation.objects.filter(pk__in=held.values()).update(
+                status="released", released_at=timezone.now(), release_reason="Order paid"
+            )
+        StockLedgerService.record_sale(
+            (item.product_id, item.variant_id, item.quantity, item.id in held) for item in items
+        )
+        schedule_read_model_refresh(item.product_id for item in items)
+        StoreCacheService.bump_namespace_version(store_id=order.store_id, namespace="storefront_products")
+    
+    @staticmethod
     def auto_release_expired() -> dict:
         """
         Auto-release expired reservations. Call periodically via celery task.
         
         Returns:
-            Number of reservations expired
+            Sweep summary (released count/quantity, stale stock before the sweep)
         """
-        now = timezone.now()
-        expired = StockReservation.objects.filter(
-            status__in=["reserved", "confirmed"],
-            expires_at__lte=now,
-        )
-        
-        count = 0
-        for reservation in expired:
-            reservation.status = "released"
-            reservation.released_at = now
-            reservation.release_reason = "TTL expired"
-            reservation.save(update_fields=["status", "released_at", "release_reason"])
-            count += 1
-        
-        return {
-            "released_count": count,
-            "failed_count": 0,
-            "timestamp": str(now),
-        }
+        from .reservation_sweeper import sweep_expired_reservations
+
+        return sweep_expired_reservations().as_dict()
     
     @staticmethod
     def get_reservation_status(order_item: OrderItem) -> dict:
@@ -0,0 +1,22 @@
+"""Keep stock ledgers in step with on-hand stock edits."""
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.catalog.models import Inventory, ProductVariant
+from apps.orders.services.stock_ledger_service import StockLedgerService
+
+
+@receiver(post_save, sender=Inventory)
+def sync_product_stock_ledger(sender, instance, created, **kwargs):
+    if created:
+        return
+    StockLedgerService.sync_on_hand(product_id=instance.product_id, variant_id=None, on_hand=instance.quantity)
+
+
+@receiver(post_save, sender=ProductVariant)
+def sync_variant_stock_ledger(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and "stock_quantity" not in update_fields):
+        return
+    StockLedgerService.sync_on_hand(
+        product_id=instance.product_id, variant_id=instance.id, on_hand=instance.stock_quantity
+    )
@@ -3,19 +3,30 @@ Celery tasks for orders app
 
 Tasks:
 - auto_release_expired_stock_reservations: Cleanup expired stock reservations
+- reconcile_stock_ledgers: Repair stock ledger counters from reservations
+- reconcile_monthly_order_usage: Repair max_orders_monthly usage counters
 - process_order_payments: Process pending order payments
 - send_order_notifications: Send email notifications for order status changes
 """
 
-from celery import shared_task
+try:
+    from celery import shared_task
+except Exception:  # pragma: no cover
+    def shared_task(*_args, **_kwargs):
+        def _decorator(func):
+            func.delay = func
+            return func
+        return _decorator
+
 from django.utils import timezone
-from django.contrib.auth.models import User
 from datetime import timedelta
 import logging
 
-from wasla.apps.orders.models import StockReservation, Order, RMA
-from wasla.apps.orders.services.stock_reservation_service import StockReservationService
-from wasla.config.celery import app
+from apps.orders.models import StockReservation, Order, RMA
+from apps.orders.services.reservation_sweeper import sweep_expired_reservations
+from apps.orders.services.stock_ledger_service import StockLedgerService
+from apps.orders.services.stock_reservation_service import StockReservationService
+from apps.subscriptions.services.usage_service import MonthlyUsageService
 
 logger = logging.getLogger(__name__)
 
@@ -25,28 +36,22 @@ def auto_release_expired_stock_reservations():
     """
     Release expired stock reservations.
     
-    Called periodically (every 5 minutes) to clean up reservations that have exceeded
-    their TTL and prevent inventory from being locked indefinitely.
-    
-    Flow:
-    1. Find all reserved/confirmed reservations with expires_at < now
-    2. For each expired reservation:
-       - Release the reservation (decrement inventory.reserved_quantity)
-       - Mark status as 'expired'
-       - Log the release
-    3. Return count of released reservations
+    Called every minute so expired reservations stop holding stock soon
+    after their TTL. Each run releases bounded batches with set-based
+    updates and returns the quantities to the stock ledgers (see
+    apps.orders.services.reservation_sweeper).
     
     Returns:
         dict: {
             'released_count': int,
+            'released_quantity': int,
+            'stale_quantity': int,
             'failed_count': int,
             'timestamp': str,
         }
     """
-    service = StockReservationService()
-    
     try:
-        result = service.auto_release_expired()
+        result = sweep_expired_reservations().as_dict()
         logger.info(f"Released {result['released_count']} expired stock reservations")
         return result
     except Exception as e:
@@ -58,6 +63,22 @@ def auto_release_expired_stock_reservations():
         }
 
 
+@shared_task
+def reconcile_stock_ledgers():
+    """Recompute stock ledger counters from on-hand stock and active reservations."""
+    corrected = StockLedgerService.reconcile()
+    logger.info(f"Reconciled stock ledgers; {corrected} had drifted")
+    return {'corrected_count': corrected}
+
+
+@shared_task
+def reconcile_monthly_order_usage():
+    """Recount this month's orders behind the max_orders_monthly usage counters."""
+    corrected = MonthlyUsageService.reconcile()
+    logger.info(f"Reconciled monthly order usage; {corrected} counters had drifted")
+    return {'corrected_count': corrected}
+
+
 @shared_task
 def send_order_notification(order_id, event_type, **kwargs):
     """
@@ -87,7 +108,7 @@ def send_order_notification(order_id, event_type, **kwargs):
         order = Order.objects.get(id=order_id)
         
         # Import here to avoid circular imports
-        from wasla.apps.orders.services.notification_service import OrderNotificationService
+        from apps.orders.services.notification_service import OrderNotificationService
         
         notification_service = OrderNotificationService()
         notification_service.send_notification(order, event_type, **kwargs)
@@ -120,8 +141,8 @@ def generate_invoice_pdf(invoice_id):
         dict: {'generated': bool, 'file_path': str, 'size_bytes': int}
     """
     try:
-        from wasla.apps.orders.models import Invoice
-        from wasla.apps.orders.services.invoice_service import InvoiceService
+        from apps.orders.models import Invoice
+        from apps.orders.services.invoice_service import InvoiceService
         
         invoice = Invoice.objects.get(id=invoice_id)
         service = InvoiceService()
@@ -160,9 +181,9 @@ def process_refund(refund_id):
         dict: {'processed': bool, 'status': str, 'gateway_ref': str}
     """
     try:
-        from wasla.apps.orders.models import RefundTransaction
-        from wasla.apps.orders.services.returns_service import RefundsService
-        from wasla.apps.payments.gateway import PaymentGatewayClient
+        from apps.orders.models import RefundTransaction
+        from apps.orders.services.returns_service import RefundsService
+        from apps.payments.gateway import PaymentGatewayClient
         
         refund = RefundTransaction.objects.get(id=refund_id)
         refunds_service = RefundsService()
@@ -199,8 +220,8 @@ def process_rma_return_received(rma_id):
         dict: {'processed': bool, 'rma_number': str}
     """
     try:
-        from wasla.apps.orders.models import RMA
-        from wasla.apps.orders.services.returns_service import ReturnsService
+        from apps.orders.models import RMA
+        from apps.orders.services.returns_service import ReturnsService
         
         rma = RMA.objects.get(id=rma_id)
         returns_service = ReturnsService()
@@ -242,11 +263,7 @@ def cleanup_abandoned_reservations():
             expires_at__lt=cutoff_time,
         )
         
-        count = abandoned.count()
-        service = StockReservationService()
-        
-        for reservation in abandoned:
-            service.release_reservation(reservation, reason='abandoned_auto_cleanup')
+        count = StockReservationService.release_reservations(abandoned, reason='abandoned_auto_cleanup')
         
         logger.info(f"Cleaned up {count} abandoned stock reservations")
         return {'cleaned_count': count}
@@ -269,8 +286,8 @@ def resync_rma_tracking(rma_id):
         dict: {'synced': bool, 'status': str}
     """
     try:
-        from wasla.apps.orders.models import RMA
-        from wasla.apps.shipping.tracking_service import ShippingTrackingService
+        from apps.orders.models import RMA
+        from apps.shipping.tracking_service import ShippingTrackingService
         
         rma = RMA.objects.get(id=rma_id)
         
@@ -298,21 +315,3 @@ def resync_rma_tracking(rma_id):
     except Exception as e:
         logger.error(f"Error resyncing RMA tracking {rma_id}: {str(e)}", exc_info=True)
         return {'synced': False, 'error': str(e)}
-
-
-# Celery Beat Schedule for periodic tasks
-# Add to config/celery.py:
-"""
-from celery.schedules import crontab
-
-app.conf.beat_schedule = {
-    'auto-release-expired-reservations': {
-        'task': 'wasla.apps.orders.tasks.auto_release_expired_stock_reservations',
-        'schedule': crontab(minute='*/5'),  # Every 5 minutes
-    },
-    'cleanup-abandoned-reservations': {
-        'task': 'wasla.apps.orders.tasks.cleanup_abandoned_reservations',
-        'schedule': crontab(hour=3, minute=0),  # Daily at 3 AM
-    },
-}
-"""
@@ -0,0 +1,243 @@
+"""Tests for the StockLedger reservation engine and the expiry sweeper."""
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock, skipIf
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from apps.catalog.models import Inventory, Product, ProductVariant
+from apps.customers.models import Customer
+from apps.observability.performance.reservation_benchmark import BENCHMARK_STORE_ID, run_reservation_benchmark
+from apps.observability.metrics_registry import STALE_RESERVED_STOCK_UNITS
+from apps.orders.models import Order, OrderItem, StockLedger, StockReservation
+from apps.orders.services import reservation_sweeper
+from apps.orders.services.reservation_sweeper import stale_reservation_stock, sweep_expired_reservations
+from apps.orders.services.stock_ledger_service import InsufficientStockError, StockLedgerService
+from apps.orders.services.stock_reservation_service import StockReservationService
+
+STORE_ID = 9401
+
+
+class ReservationFixtureMixin:
+    """A product with 5 units, a variant with 2 and helpers to reserve them."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.product = Product.objects.create(store_id=STORE_ID, sku="TEE", name="Tee", price=Decimal("50.00"))
+        Inventory.objects.create(product=self.product, quantity=5)
+        self.variant = ProductVariant.objects.create(
+            store_id=STORE_ID, product=self.product, sku="TEE-L", stock_quantity=2
+        )
+        customer = Customer(store_id=STORE_ID, email="ledger@example.com", full_name="Ledger")
+        Customer.objects.bulk_create([customer])
+        self.customer = Customer.objects.get(store_id=STORE_ID, email="ledger@example.com")
+        self._orders = 0
+
+    def _item(self, quantity: int, variant: ProductVariant | None = None) -> OrderItem:
+        self._orders += 1
+        Order.objects.bulk_create(
+            [Order(store_id=STORE_ID, order_number=f"LEDGER-{self._orders}", customer=self.customer)]
+        )
+        order = Order.objects.get(order_number=f"LEDGER-{self._orders}")
+        OrderItem.objects.bulk_create(
+            [OrderItem(order=order, product=self.product, variant=variant, quantity=quantity, price=Decimal("50"))]
+        )
+        return OrderItem.objects.get(order=order)
+
+    def _reserve(self, quantity: int, variant: ProductVariant | None = None) -> StockReservation:
+        item = self._item(quantity, variant)
+        return StockReservationService.reserve_stock(item, quantity, tenant_id=None, store_id=STORE_ID)
+
+    def _counters(self, variant: ProductVariant | None = None) -> tuple[int, int]:
+        return StockLedger.objects.values_list("available", "reserved").get(product=self.product, variant=variant)
+
+
+@override_settings(STOCK_ADMISSION="off")
+class StockLedgerTests(ReservationFixtureMixin, TestCase):
+    def test_reservations_hold_stock_until_released(self):
+        first = self._reserve(3)
+        self._reserve(2)
+        self.assertEqual(self._counters(), (0, 5))
+
+        with self.assertRaises(InsufficientStockError) as raised:
+            self._reserve(1)
+        self.assertEqual(raised.exception.available, 0)
+
+        StockReservationService.release_reservation(first, reason="cancelled")
+        StockReservationService.release_reservation(first, reason="cancelled again")
+        self.assertEqual(self._counters(), (3, 2))
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.release_reason), ("released", "cancelled"))
+
+    def test_variants_have_their_own_counters(self):
+        self._reserve(2, self.variant)
+        with self.assertRaises(InsufficientStockError):
+            self._reserve(1, self.variant)
+        self._reserve(4)
+        self.assertEqual(self._counters(self.variant), (0, 2))
+        self.assertEqual(self._counters(), (1, 4))
+
+    def test_ledger_is_seeded_net_of_existing_reservations(self):
+        StockReservation.objects.create(
+            order_item=self._item(2),
+            product=self.product,
+            quantity=2,
+            status="confirmed",
+            expires_at="2099-01-01T00:00:00Z",
+        )
+        self._reserve(3)
+        self.assertEqual(self._counters(), (0, 5))
+
+    def test_stock_edits_and_sales_move_the_counters(self):
+        reserved = self._reserve(2)
+        inventory = Inventory.objects.get(product=self.product)
+        inventory.quantity = 10
+        inventory.save()
+        self.assertEqual(self._counters(), (8, 2))
+
+        # Paying ends the reservation; an unreserved sale comes out of available.
+        StockReservationService.consume_for_order(reserved.order_item.order, [reserved.order_item])
+        unreserved = self._item(1)
+        StockReservationService.consume_for_order(unreserved.order, [unreserved])
+        self.assertEqual(self._counters(), (7, 0))
+        self.assertEqual(StockReservation.objects.get().release_reason, "Order paid")
+
+    def test_product_counter_is_unique_and_never_goes_negative(self):
+        from django.db import IntegrityError, transaction
+
+        self._reserve(2)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            StockLedger.objects.create(store_id=STORE_ID, product=self.product)
+
+        StockLedgerService.release_many([(self.product.id, None, 5)])
+        StockLedgerService.record_sale([(self.product.id, None, 9, False)])
+        self.assertEqual(self._counters(), (0, 0))
+        StockLedgerService.sync_on_hand(product_id=self.product.id, variant_id=None, on_hand=3)
+        self.assertEqual(self._counters(), (3, 0))
+
+    def test_reconcile_repairs_drift(self):
+        self._reserve(2)
+        self._reserve(1, self.variant)
+        StockLedger.objects.filter(product=self.product, variant=None).update(available=5, reserved=0)
+        # Written in bulk: no signal reaches the ledger.
+        ProductVariant.objects.filter(pk=self.variant.pk).update(stock_quantity=6)
+
+        self.assertEqual(StockLedgerService.reconcile(store_id=STORE_ID, batch_size=1), 2)
+        self.assertEqual(self._counters(), (3, 2))
+        self.assertEqual(self._counters(self.variant), (5, 1))
+        self.assertEqual(StockLedgerService.reconcile(), 0)
+
+    def test_paying_for_the_last_variant_unit_refreshes_the_storefront(self):
+        from apps.storefront.models import ProductFacetValue, StorefrontProductView
+
+        item = self._item(2, self.variant)
+        self.assertTrue(StorefrontProductView.objects.get(product=self.product).in_stock)
+
+        # What OrderService.mark_as_paid does for a variant line: a signal-free
+        # stock UPDATE, then the ledger sale.
+        ProductVariant.objects.filter(pk=self.variant.pk).update(stock_quantity=0)
+        StockReservationService.consume_for_order(item.order, [item])
+
+        view = StorefrontProductView.objects.get(product=self.product)
+        self.assertEqual((view.in_stock, view.stock_quantity), (False, 0))
+        self.assertEqual(
+            list(
+                ProductFacetValue.objects.filter(product=self.product, facet=ProductFacetValue.FACET_STOCK).values_list(
+                    "value", flat=True
+                )
+            ),
+            ["out"],
+        )
+
+    @override_settings(STOCK_ADMISSION="cache")
+    def test_sold_out_hot_sku_is_refused_before_the_database(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self._reserve(5)
+        item = self._item(1)
+
+        with self.assertNumQueries(0):
+            with self.assertRaises(InsufficientStockError):
+                StockLedgerService.reserve(store_id=STORE_ID, product_id=self.product.id, variant_id=None, quantity=1)
+
+        StockReservationService.release_reservation(StockReservation.objects.get(), reason="cancelled")
+        StockReservationService.reserve_stock(item, 1, tenant_id=None, store_id=STORE_ID)
+        self.assertEqual(self._counters(), (4, 1))
+
+
+@override_settings(STOCK_ADMISSION="off")
+class ReservationSweeperTests(ReservationFixtureMixin, TestCase):
+    def _expire(self, *reservations: StockReservation) -> None:
+        StockReservation.objects.filter(pk__in=[r.pk for r in reservations]).update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+    def test_sweep_releases_expired_reservations_in_batches(self):
+        expired = [self._reserve(1) for _ in range(3)]
+        kept = self._reserve(2)
+        variant_expired = self._reserve(1, self.variant)
+        self._expire(*expired, variant_expired)
+        self.assertEqual(stale_reservation_stock(), (4, 4))
+
+        result = sweep_expired_reservations(batch_size=2)
+
+        self.assertEqual((result.released_count, result.released_quantity, result.batches), (4, 4, 2))
+        self.assertEqual((result.stale_count, result.stale_quantity), (4, 4))
+        self.assertEqual(STALE_RESERVED_STOCK_UNITS._value.get(), 4)
+        self.assertEqual(self._counters(), (3, 2))
+        self.assertEqual(self._counters(self.variant), (2, 0))
+        self.assertEqual(
+            set(StockReservation.objects.filter(status="released").values_list("release_reason", flat=True)),
+            {"TTL expired"},
+        )
+        kept.refresh_from_db()
+        self.assertEqual(kept.status, "reserved")
+
+        result = sweep_expired_reservations(batch_size=2)
+        self.assertEqual((result.released_count, result.stale_quantity), (0, 0))
+
+    def test_sweep_is_bounded_per_run(self):
+        self._expire(*[self._reserve(1) for _ in range(3)])
+
+        self.assertEqual(sweep_expired_reservations(batch_size=1, max_batches=2).released_count, 2)
+        self.assertEqual(self._counters(), (4, 1))
+        self.assertEqual(StockReservationService.auto_release_expired()["released_count"], 1)
+
+    def test_sweep_without_update_returning(self):
+        self._expire(self._reserve(2), self._reserve(1, self.variant))
+
+        with mock.patch.object(reservation_sweeper, "_supports_update_returning", return_value=False):
+            result = sweep_expired_reservations(batch_size=10)
+
+        self.assertEqual((result.released_count, result.released_quantity), (2, 3))
+        self.assertEqual((self._counters(), self._counters(self.variant)), ((5, 0), (2, 0)))
+
+    def test_batch_returns_stock_to_all_ledgers_in_one_statement(self):
+        self._reserve(2)
+        self._reserve(1, self.variant)
+        with self.assertNumQueries(1):
+            StockLedgerService.release_many(
+                [(self.product.id, None, 1), (self.product.id, self.variant.id, 1), (self.product.id, None, 1)]
+            )
+        self.assertEqual((self._counters(), self._counters(self.variant)), ((5, 0), (2, 0)))
+
+
+@override_settings(STOCK_ADMISSION="off")
+class ReservationBenchmarkTests(TestCase):
+    def test_sequential_checkouts_never_oversell(self):
+        result = run_reservation_benchmark(checkouts=500, workers=1, stock=100)
+        self.assertEqual((result.reserved, result.refused, result.errors, result.oversold), (100, 400, 0, 0))
+        self.assertEqual((result.ledger_available, result.ledger_reserved), (0, 100))
+        self.assertFalse(Product.objects.filter(store_id=BENCHMARK_STORE_ID).exists())
+
+
+@skipIf(connection.vendor == "sqlite", "SQLite serializes writers; run against a server database")
+@override_settings(STOCK_ADMISSION="off")
+class ParallelReservationBenchmarkTests(TransactionTestCase):
+    def test_parallel_checkouts_on_one_sku_never_oversell(self):
+        result = run_reservation_benchmark(checkouts=500, workers=50, stock=100)
+        self.assertEqual((result.reserved, result.errors, result.oversold), (100, 0, 0))
+        self.assertEqual((result.ledger_available, result.ledger_reserved), (0, 100))
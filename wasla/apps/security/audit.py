@@ -2,7 +2,10 @@ from __future__ import annotations
 
 from typing import Any
 
+from django.conf import settings
+
 from apps.security.models import SecurityAuditLog
+from core.infrastructure.background_writer import BackgroundBulkWriter
 
 
 def get_client_ip(request) -> str:
@@ -12,6 +15,29 @@ def get_client_ip(request) -> str:
     return request.META.get("REMOTE_ADDR", "")
 
 
+def _build_audit_log(
+    *,
+    request,
+    event_type: str,
+    outcome: str,
+    metadata: dict[str, Any] | None = None,
+    user=None,
+) -> SecurityAuditLog:
+    actor = user
+    if actor is None and getattr(request, "user", None) and request.user.is_authenticated:
+        actor = request.user
+
+    return SecurityAuditLog(
+        event_type=event_type,
+        outcome=outcome,
+        user=actor,
+        path=(request.path or "")[:255],
+        method=(request.method or "")[:12],
+        ip_address=get_client_ip(request)[:64],
+        metadata=metadata or {},
+    )
+
+
 def log_security_event(
     *,
     request,
@@ -21,18 +47,48 @@ def log_security_event(
     user=None,
 ) -> None:
     try:
-        actor = user
-        if actor is None and getattr(request, "user", None) and request.user.is_authenticated:
-            actor = request.user
-
-        SecurityAuditLog.objects.create(
+        _build_audit_log(
+            request=request,
             event_type=event_type,
             outcome=outcome,
-            user=actor,
-            path=(request.path or "")[:255],
-            method=(request.method or "")[:12],
-            ip_address=get_client_ip(request)[:64],
-            metadata=metadata or {},
+            metadata=metadata,
+            user=user,
+        ).save()
+    except Exception:
+        return
+
+
+def _write_audit_logs(rows: list[SecurityAuditLog]) -> None:
+    SecurityAuditLog.objects.bulk_create(rows)
+
+
+audit_log_writer = BackgroundBulkWriter(
+    name="security_audit",
+    write_batch=_write_audit_logs,
+    is_async=lambda: bool(getattr(settings, "SECURITY_AUDIT_ASYNC", False)),
+    max_batch=int(getattr(settings, "SECURITY_AUDIT_BATCH_SIZE", 100) or 100),
+    flush_interval=float(getattr(settings, "SECURITY_AUDIT_FLUSH_SECONDS", 2.0) or 2.0),
+)
+
+
+def log_security_event_async(
+    *,
+    request,
+    event_type: str,
+    outcome: str,
+    metadata: dict[str, Any] | None = None,
+    user=None,
+) -> None:
+    """Queue an audit row for a background bulk insert (hot paths such as rate limiting)."""
+    try:
+        audit_log_writer.submit(
+            _build_audit_log(
+                request=request,
+                event_type=event_type,
+                outcome=outcome,
+                metadata=metadata,
+                user=user,
+            )
         )
     except Exception:
         return
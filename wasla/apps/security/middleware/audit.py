@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from apps.security.audit import log_security_event
 from apps.security.models import SecurityAuditLog
+from apps.tenants.routing import get_request_class
 
 
 class SecurityAuditMiddleware:
@@ -11,10 +12,9 @@ class SecurityAuditMiddleware:
     def __call__(self, request):
         response = self.get_response(request)
 
-        path = (request.path or "").lower()
         method = (request.method or "GET").upper()
 
-        if path.startswith("/api/payments/") and method in {"POST", "PUT", "PATCH", "DELETE"}:
+        if get_request_class(request).is_payment_api and method in {"POST", "PUT", "PATCH", "DELETE"}:
             outcome = (
                 SecurityAuditLog.OUTCOME_SUCCESS
                 if int(getattr(response, "status_code", 500)) < 400
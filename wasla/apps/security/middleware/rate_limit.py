@@ -1,74 +1,35 @@
 from __future__ import annotations
 
-import re
-from dataclasses import dataclass
-
-from django.conf import settings
-from django.core.cache import cache
 from django.http import JsonResponse, HttpResponse
 from django.utils.deprecation import MiddlewareMixin
 
-from apps.security.audit import log_security_event
+from apps.security.audit import log_security_event_async
 from apps.security.models import SecurityAuditLog
-
-
-@dataclass(frozen=True)
-class RateLimitRule:
-    key: str
-    pattern: str
-    methods: tuple[str, ...]
-    limit: int
-    window: int
-    message_key: str
-
-    def matches(self, path: str, method: str) -> bool:
-        if method.upper() not in self.methods:
-            return False
-        return re.search(self.pattern, path) is not None
+from apps.security.rate_limiter import RateLimitCheck, get_backend, get_rule_set
 
 
 class RateLimitMiddleware(MiddlewareMixin):
     def process_request(self, request):
-        rules = _load_rules()
         path = request.path or ""
         method = request.method or "GET"
 
-        for rule in rules:
-            if rule.matches(path, method):
-                ident = _client_identifier(request, rule.key)
-                cache_key = f"rl:{rule.key}:{ident}"
-                count = cache.get(cache_key)
-                if count is None:
-                    cache.set(cache_key, 1, timeout=rule.window)
-                    return None
-                if count >= rule.limit:
-                    log_security_event(
-                        request=request,
-                        event_type=SecurityAuditLog.EVENT_RATE_LIMIT,
-                        outcome=SecurityAuditLog.OUTCOME_BLOCKED,
-                        metadata={"rule": rule.key, "window": rule.window, "limit": rule.limit},
-                    )
-                    return _rate_limited_response(request, rule.message_key, rule.window)
-                cache.set(cache_key, count + 1, timeout=rule.window)
-                return None
-        return None
-
-
-def _load_rules() -> list[RateLimitRule]:
-    raw = getattr(settings, "SECURITY_RATE_LIMITS", [])
-    rules: list[RateLimitRule] = []
-    for item in raw:
-        rules.append(
-            RateLimitRule(
-                key=item["key"],
-                pattern=item["pattern"],
-                methods=tuple(item.get("methods", ["POST"])),
-                limit=int(item.get("limit", 10)),
-                window=int(item.get("window", 60)),
-                message_key=item.get("message_key", "rate_limited"),
+        rules = get_rule_set().matching(path, method)
+        if not rules:
+            return None
+
+        checks = [RateLimitCheck(rule=rule, identifier=_client_identifier(request, rule.key)) for rule in rules]
+        for result in get_backend().hit_many(checks):
+            if result.allowed:
+                continue
+            rule = result.rule
+            log_security_event_async(
+                request=request,
+                event_type=SecurityAuditLog.EVENT_RATE_LIMIT,
+                outcome=SecurityAuditLog.OUTCOME_BLOCKED,
+                metadata={"rule": rule.key, "window": rule.window, "limit": rule.limit},
             )
-        )
-    return rules
+            return _rate_limited_response(request, rule.message_key, rule.window)
+        return None
 
 
 def _client_identifier(request, prefix: str) -> str:
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+"""
+Rate limiter engine used by RateLimitMiddleware.
+
+- Rules from `SECURITY_RATE_LIMITS` are compiled once (regex + method index) and
+  rebuilt only when the setting changes.
+- Counting uses a sliding-window counter: the current fixed window plus the
+  previous window weighted by how much of it still overlaps the sliding window.
+- All rules matching a request are evaluated in one batch: a single Lua `EVAL`
+  on Redis, or atomic `incr` plus one `get_many` on any other Django cache.
+"""
+
+import logging
+import math
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Pattern
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    key: str
+    pattern: str
+    methods: tuple[str, ...]
+    limit: int
+    window: int
+    message_key: str
+    regex: Pattern[str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "regex", re.compile(self.pattern))
+
+    def matches(self, path: str, method: str) -> bool:
+        if method.upper() not in self.methods:
+            return False
+        return self.regex.search(path) is not None
+
+
+@dataclass(frozen=True)
+class RateLimitCheck:
+    rule: RateLimitRule
+    identifier: str
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    rule: RateLimitRule
+    count: float
+    allowed: bool
+
+
+class RateLimitRuleSet:
+    """Rules compiled once and indexed by HTTP method."""
+
+    def __init__(self, rules: Iterable[RateLimitRule]) -> None:
+        self.rules = tuple(rules)
+        by_method: dict[str, list[RateLimitRule]] = {}
+        for rule in self.rules:
+            for method in rule.methods:
+                by_method.setdefault(method, []).append(rule)
+        self._by_method = {method: tuple(items) for method, items in by_method.items()}
+
+    @classmethod
+    def from_settings(cls) -> "RateLimitRuleSet":
+        raw = getattr(settings, "SECURITY_RATE_LIMITS", [])
+        return cls(
+            RateLimitRule(
+                key=item["key"],
+                pattern=item["pattern"],
+                methods=tuple(m.upper() for m in item.get("methods", ["POST"])),
+                limit=int(item.get("limit", 10)),
+                window=int(item.get("window", 60)),
+                message_key=item.get("message_key", "rate_limited"),
+            )
+            for item in raw
+        )
+
+    def matching(self, path: str, method: str) -> list[RateLimitRule]:
+        candidates = self._by_method.get((method or "GET").upper())
+        if not candidates:
+            return []
+        return [rule for rule in candidates if rule.regex.search(path) is not None]
+
+
+class CacheRateLimitBackend:
+    """Sliding-window counter on the Django cache (locmem, memcached, redis)."""
+
+    def __init__(self, *, clock: Callable[[], float] = time.time, key_prefix: str = "rl") -> None:
+        self.clock = clock
+        self.key_prefix = key_prefix
+
+    def _bucket_keys(self, check: RateLimitCheck, now: float) -> tuple[str, str, float]:
+        window = max(1, int(check.rule.window))
+        bucket = int(now // window)
+        weight = 1.0 - ((now % window) / window)
+        base = f"{self.key_prefix}:{check.rule.key}:{check.identifier}"
+        return f"{base}:{bucket}", f"{base}:{bucket - 1}", weight
+
+    @staticmethod
+    def _result(check: RateLimitCheck, current: int, previous: int, weight: float) -> RateLimitResult:
+        estimated = previous * weight + current
+        return RateLimitResult(rule=check.rule, count=estimated, allowed=math.floor(estimated) <= check.rule.limit)
+
+    def _incr(self, key: str, window: int) -> int:
+        try:
+            return int(cache.incr(key))
+        except ValueError:
+            if cache.add(key, 1, timeout=window * 2):
+                return 1
+            return int(cache.incr(key))
+
+    def hit_many(self, checks: list[RateLimitCheck]) -> list[RateLimitResult]:
+        if not checks:
+            return []
+        now = self.clock()
+        keys = [self._bucket_keys(check, now) for check in checks]
+        current = [self._incr(curr_key, int(check.rule.window)) for check, (curr_key, _, _) in zip(checks, keys)]
+        previous = cache.get_many([prev_key for _, prev_key, _ in keys])
+        return [
+            self._result(check, count, int(previous.get(prev_key) or 0), weight)
+            for check, count, (_, prev_key, weight) in zip(checks, current, keys)
+        ]
+
+
+_SLIDING_WINDOW_LUA = """
+local out = {}
+for i = 1, #KEYS, 2 do
+  local ttl = tonumber(ARGV[(i + 1) / 2])
+  local current = redis.call('INCR', KEYS[i])
+  if current == 1 then
+    redis.call('EXPIRE', KEYS[i], ttl)
+  end
+  out[#out + 1] = current
+  out[#out + 1] = tonumber(redis.call('GET', KEYS[i + 1]) or '0')
+end
+return out
+"""
+
+
+class RedisRateLimitBackend(CacheRateLimitBackend):
+    """Same algorithm executed atomically for all rules in one Lua round trip."""
+
+    def __init__(self, connection, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.connection = connection
+        self._script = connection.register_script(_SLIDING_WINDOW_LUA)
+
+    def hit_many(self, checks: list[RateLimitCheck]) -> list[RateLimitResult]:
+        if not checks:
+            return []
+        now = self.clock()
+        keys = [self._bucket_keys(check, now) for check in checks]
+        flat_keys: list[str] = []
+        for curr_key, prev_key, _ in keys:
+            flat_keys.extend([curr_key, prev_key])
+        ttls = [int(check.rule.window) * 2 for check in checks]
+        raw = self._script(keys=flat_keys, args=ttls)
+        return [
+            self._result(check, int(raw[index * 2]), int(raw[index * 2 + 1]), weight)
+            for index, (check, (_, _, weight)) in enumerate(zip(checks, keys))
+        ]
+
+
+def _build_backend():
+    choice = str(getattr(settings, "SECURITY_RATE_LIMIT_BACKEND", "auto") or "auto").lower()
+    prefix = f"{getattr(settings, 'CACHE_KEY_PREFIX', 'wasla')}:rl"
+    use_redis = choice == "redis" or (choice == "auto" and getattr(settings, "CACHE_USE_REDIS", False))
+    if use_redis:
+        try:
+            from django_redis import get_redis_connection
+
+            return RedisRateLimitBackend(get_redis_connection("default"), key_prefix=prefix)
+        except Exception:
+            if choice == "redis":
+                logger.warning("Redis rate limit backend unavailable; falling back to cache backend")
+    return CacheRateLimitBackend()
+
+
+_rule_set: RateLimitRuleSet | None = None
+_backend = None
+
+
+def get_rule_set() -> RateLimitRuleSet:
+    global _rule_set
+    if _rule_set is None:
+        _rule_set = RateLimitRuleSet.from_settings()
+    return _rule_set
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = _build_backend()
+    return _backend
+
+
+@receiver(setting_changed)
+def _reset_rate_limiter(setting, **kwargs):
+    global _rule_set, _backend
+    if setting == "SECURITY_RATE_LIMITS":
+        _rule_set = None
+    if setting in {"SECURITY_RATE_LIMIT_BACKEND", "CACHES"}:
+        _backend = None
@@ -14,6 +14,8 @@ from core.infrastructure.store_cache import StoreCacheService
 _REQUEST_PERMISSION_CODES_ATTR = "_rbac_permission_codes"
 _REQUEST_MEMBERSHIP_ATTR = "_rbac_membership"
 
+TENANT_ACCESS_NAMESPACE = "tenant_access"
+
 
 def _resolve_request_object(args: tuple, kwargs: dict):
     if "request" in kwargs:
@@ -48,6 +50,49 @@ def _resolve_tenant_from_request(request):
     return None
 
 
+def _load_tenant_access(*, tenant_id: int, user_id: int) -> dict:
+    from apps.stores.models import Store
+
+    membership = (
+        TenantMembership.objects.filter(
+            tenant_id=tenant_id,
+            user_id=user_id,
+            is_active=True,
+        )
+        .values("id", "tenant_id", "user_id", "role", "is_active")
+        .first()
+    )
+    owns_store = Store.objects.filter(tenant_id=tenant_id, owner_id=user_id).exists()
+    return {
+        "allowed": bool(membership) or owns_store,
+        "owns_store": owns_store,
+        "membership": membership,
+    }
+
+
+def get_tenant_access(*, user, tenant) -> dict:
+    """
+    Return the cached access decision of `user` for `tenant`.
+
+    Keyed by (tenant, user) under the `tenant_access` namespace version, which
+    membership and store-ownership signals bump. Entries expire after
+    `TENANT_ACCESS_CACHE_TTL` seconds.
+    """
+    ttl = int(getattr(settings, "TENANT_ACCESS_CACHE_TTL", getattr(settings, "CACHE_TTL_SHORT", 60)) or 60)
+    decision, _ = StoreCacheService.get_or_set(
+        store_id=int(tenant.id),
+        namespace=TENANT_ACCESS_NAMESPACE,
+        key_parts=["user", int(user.id)],
+        producer=lambda: _load_tenant_access(tenant_id=int(tenant.id), user_id=int(user.id)),
+        timeout=ttl,
+    )
+    return decision
+
+
+def user_has_tenant_access(user, tenant) -> bool:
+    return bool(get_tenant_access(user=user, tenant=tenant).get("allowed"))
+
+
 def resolve_membership(request):
     cached_membership = getattr(request, _REQUEST_MEMBERSHIP_ATTR, None)
     if cached_membership is not None:
@@ -63,15 +108,8 @@ def resolve_membership(request):
         setattr(request, _REQUEST_MEMBERSHIP_ATTR, None)
         return None
 
-    membership = (
-        TenantMembership.objects.filter(
-            tenant_id=tenant.id,
-            user_id=user.id,
-            is_active=True,
-        )
-        .only("id", "tenant_id", "user_id", "role", "is_active")
-        .first()
-    )
+    membership_values = get_tenant_access(user=user, tenant=tenant).get("membership")
+    membership = TenantMembership(**membership_values) if membership_values else None
     setattr(request, _REQUEST_MEMBERSHIP_ATTR, membership)
     return membership
 
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import threading
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.security.rate_limiter import (
+    CacheRateLimitBackend,
+    RateLimitCheck,
+    RateLimitRule,
+    RateLimitRuleSet,
+    get_rule_set,
+)
+
+
+def _rule(**overrides) -> RateLimitRule:
+    values = {
+        "key": "test",
+        "pattern": r"^/api/",
+        "methods": ("POST",),
+        "limit": 5,
+        "window": 60,
+        "message_key": "rate_limited",
+    }
+    values.update(overrides)
+    return RateLimitRule(**values)
+
+
+class SlidingWindowRateLimiterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = 6000.0
+        self.backend = CacheRateLimitBackend(clock=lambda: self.now)
+
+    def test_concurrent_requests_never_exceed_limit(self):
+        check = RateLimitCheck(rule=_rule(limit=25), identifier="client")
+        allowed = []
+        lock = threading.Lock()
+
+        def hit():
+            for _ in range(10):
+                result = self.backend.hit_many([check])[0]
+                with lock:
+                    allowed.append(result.allowed)
+
+        threads = [threading.Thread(target=hit) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(allowed), 80)
+        self.assertEqual(sum(allowed), 25)
+
+    def test_previous_window_is_weighted_by_overlap(self):
+        check = RateLimitCheck(rule=_rule(limit=4, window=60), identifier="client")
+        for _ in range(4):
+            self.assertTrue(self.backend.hit_many([check])[0].allowed)
+        self.assertFalse(self.backend.hit_many([check])[0].allowed)
+
+        # Halfway through the next window half of the previous 5 hits still count.
+        self.now += 90
+        results = [self.backend.hit_many([check])[0] for _ in range(3)]
+        self.assertEqual([r.allowed for r in results], [True, True, False])
+
+        self.now += 120
+        self.assertTrue(self.backend.hit_many([check])[0].allowed)
+
+    def test_all_matching_rules_are_counted(self):
+        strict = _rule(key="strict", limit=1)
+        loose = _rule(key="loose", limit=10)
+        checks = [RateLimitCheck(rule=strict, identifier="c"), RateLimitCheck(rule=loose, identifier="c")]
+
+        self.backend.hit_many(checks)
+        results = self.backend.hit_many(checks)
+
+        self.assertEqual([r.allowed for r in results], [False, True])
+        self.assertEqual(results[1].count, 2)
+
+
+class RateLimitRuleSetTests(SimpleTestCase):
+    def test_matching_uses_method_index(self):
+        rule_set = RateLimitRuleSet([_rule(key="post_only"), _rule(key="any", methods=("GET", "POST"))])
+
+        self.assertEqual([r.key for r in rule_set.matching("/api/x", "post")], ["post_only", "any"])
+        self.assertEqual([r.key for r in rule_set.matching("/api/x", "GET")], ["any"])
+        self.assertEqual(rule_set.matching("/api/x", "DELETE"), [])
+        self.assertEqual(rule_set.matching("/shop/", "POST"), [])
+
+    def test_rules_reload_when_setting_changes(self):
+        with override_settings(
+            SECURITY_RATE_LIMITS=[{"key": "only", "pattern": r"^/x/", "methods": ["POST"], "limit": 1, "window": 1}]
+        ):
+            self.assertEqual([r.key for r in get_rule_set().rules], ["only"])
+        self.assertNotEqual([r.key for r in get_rule_set().rules], ["only"])
@@ -5,3 +5,6 @@ class StorefrontConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.storefront"
     verbose_name = "Storefront"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,187 @@
+"""Storefront facets: category, price band, variant option and stock status.
+
+Facet membership of every listed product is materialized in
+ProductFacetValue and refreshed from catalog and inventory signals, so a
+listing needs one grouped query for all facet counts instead of one
+aggregate per facet. Refreshes are scheduled through
+apps.storefront.read_models together with the product projection.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, DecimalField, Max, Min
+from django.db.models.functions import Coalesce
+
+from apps.catalog.models import Category, Inventory, Product, ProductOption, ProductVariant
+
+from .models import ProductFacetValue
+
+
+def price_band_edges() -> list[Decimal]:
+    raw = getattr(settings, "STOREFRONT_PRICE_BANDS", "0,50,100,250,500,1000")
+    edges = set()
+    for part in str(raw).split(","):
+        try:
+            edges.add(Decimal(part.strip()))
+        except InvalidOperation:
+            continue
+    return sorted(edges | {Decimal("0")})
+
+
+def price_band(price, edges: list[Decimal]) -> str:
+    band = edges[0]
+    for edge in edges:
+        if price >= edge:
+            band = edge
+    return str(band)
+
+
+def compute_product_facets(product_ids) -> dict[int, tuple[int, set[tuple[str, str]]]]:
+    """Facet memberships of listed products: {product_id: (store_id, {(facet, value)})}."""
+    products = list(
+        Product.objects.filter(
+            id__in=product_ids,
+            is_active=True,
+            visibility=Product.VISIBILITY_ENABLED,
+        ).values_list("id", "store_id", "price")
+    )
+    listed_ids = [product_id for product_id, _, _ in products]
+    if not listed_ids:
+        return {}
+
+    edges = price_band_edges()
+    facets = {
+        product_id: (store_id, {(ProductFacetValue.FACET_PRICE, price_band(price, edges))})
+        for product_id, store_id, price in products
+    }
+
+    category_links = Product.categories.through.objects.filter(product_id__in=listed_ids)
+    for product_id, category_id in category_links.values_list("product_id", "category_id"):
+        facets[product_id][1].add((ProductFacetValue.FACET_CATEGORY, str(category_id)))
+
+    variant_stock: dict[int, bool] = {}
+    variant_products: dict[int, int] = {}
+    variants = ProductVariant.objects.filter(product_id__in=listed_ids, is_active=True)
+    for variant_id, product_id, stock_quantity in variants.values_list("id", "product_id", "stock_quantity"):
+        variant_products[variant_id] = product_id
+        variant_stock[product_id] = variant_stock.get(product_id, False) or stock_quantity > 0
+
+    option_links = ProductVariant.options.through.objects.filter(productvariant_id__in=list(variant_products))
+    for variant_id, option_id in option_links.values_list("productvariant_id", "productoption_id"):
+        facets[variant_products[variant_id]][1].add((ProductFacetValue.FACET_OPTION, str(option_id)))
+
+    # Same rule as the product page: variants decide stock when present, then inventory.
+    inventory_stock = dict(Inventory.objects.filter(product_id__in=listed_ids).values_list("product_id", "in_stock"))
+    for product_id in listed_ids:
+        in_stock = variant_stock.get(product_id, inventory_stock.get(product_id, True))
+        facets[product_id][1].add((ProductFacetValue.FACET_STOCK, "in" if in_stock else "out"))
+    return facets
+
+
+def refresh_product_facets(product_ids) -> None:
+    product_ids = sorted({int(pk) for pk in product_ids})
+    if not product_ids:
+        return
+    facets = compute_product_facets(product_ids)
+    with transaction.atomic():
+        ProductFacetValue.objects.filter(product_id__in=product_ids).delete()
+        ProductFacetValue.objects.bulk_create(
+            [
+                ProductFacetValue(store_id=store_id, product_id=product_id, facet=facet, value=value)
+                for product_id, (store_id, values) in facets.items()
+                for facet, value in sorted(values)
+            ]
+        )
+
+
+def selected_option_ids(values) -> list[int]:
+    option_ids = []
+    for value in values:
+        try:
+            option_ids.append(int(value))
+        except (TypeError, ValueError):
+            continue
+    return sorted(set(option_ids))
+
+
+def filter_by_facets(qs, *, store_id: int, option_ids: list[int], in_stock: bool):
+    """Filter a Product or StorefrontProductView queryset.
+
+    Options combine with OR inside a group and AND across groups.
+    """
+    if option_ids:
+        groups: dict[int, list[str]] = defaultdict(list)
+        options = ProductOption.objects.filter(id__in=option_ids, group__store_id=store_id)
+        for option_id, group_id in options.values_list("id", "group_id"):
+            groups[group_id].append(str(option_id))
+        if not groups:
+            return qs.none()
+        for values in groups.values():
+            members = ProductFacetValue.objects.filter(
+                store_id=store_id, facet=ProductFacetValue.FACET_OPTION, value__in=values
+            )
+            qs = qs.filter(pk__in=members.values("product_id"))
+    if in_stock:
+        members = ProductFacetValue.objects.filter(store_id=store_id, facet=ProductFacetValue.FACET_STOCK, value="in")
+        qs = qs.filter(pk__in=members.values("product_id"))
+    return qs
+
+
+def facet_summary(*, store_id: int, product_qs) -> dict:
+    """Facet counts for the products in `product_qs`, ready for templates."""
+    counts: dict[str, dict[str, int]] = defaultdict(dict)
+    rows = (
+        ProductFacetValue.objects.filter(store_id=store_id, product_id__in=product_qs.values("pk"))
+        .values_list("facet", "value")
+        .annotate(count=Count("id"))
+    )
+    for facet, value, count in rows:
+        counts[facet][value] = count
+
+    category_counts = counts.get(ProductFacetValue.FACET_CATEGORY, {})
+    categories = [
+        {"id": category_id, "name": name, "count": category_counts[str(category_id)]}
+        for category_id, name in Category.objects.filter(
+            store_id=store_id, id__in=[int(value) for value in category_counts]
+        ).order_by("name").values_list("id", "name")
+    ]
+
+    option_counts = counts.get(ProductFacetValue.FACET_OPTION, {})
+    option_groups: dict[int, dict] = {}
+    options = (
+        ProductOption.objects.filter(group__store_id=store_id, id__in=[int(value) for value in option_counts])
+        .select_related("group")
+        .order_by("group__position", "group__name", "value")
+    )
+    for option in options:
+        group = option_groups.setdefault(option.group_id, {"id": option.group_id, "name": option.group.name, "options": []})
+        group["options"].append({"id": option.id, "value": option.value, "count": option_counts[str(option.id)]})
+
+    edges = price_band_edges()
+    band_counts = counts.get(ProductFacetValue.FACET_PRICE, {})
+    price_bands = [
+        {
+            "min": edge,
+            "max": edges[index + 1] if index + 1 < len(edges) else None,
+            "count": band_counts[str(edge)],
+        }
+        for index, edge in enumerate(edges)
+        if band_counts.get(str(edge))
+    ]
+
+    price_stats = product_qs.order_by().aggregate(
+        min_price=Coalesce(Min("price"), Decimal("0"), output_field=DecimalField()),
+        max_price=Coalesce(Max("price"), Decimal("0"), output_field=DecimalField()),
+    )
+    return {
+        "categories": categories,
+        "option_groups": list(option_groups.values()),
+        "price_bands": price_bands,
+        "in_stock": counts.get(ProductFacetValue.FACET_STOCK, {}).get("in", 0),
+        "min_price": price_stats["min_price"],
+        "max_price": price_stats["max_price"],
+    }
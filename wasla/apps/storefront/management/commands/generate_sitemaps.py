@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from apps.storefront.sitemaps import generate_store_sitemap
+from apps.stores.models import Store
+
+
+class Command(BaseCommand):
+    help = "Generate the storefront sitemap files, optionally for a single store."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--store-id", type=int, default=None)
+
+    def handle(self, *args, **options):
+        stores = Store.objects.all()
+        if options["store_id"] is not None:
+            stores = stores.filter(id=options["store_id"])
+
+        urls = written = 0
+        for store in stores.order_by("id").iterator():
+            build = generate_store_sitemap(store)
+            urls += build.urls
+            written += build.written
+        self.stdout.write(self.style.SUCCESS(f"Generated sitemaps with {urls} URLs ({written} shards written)."))
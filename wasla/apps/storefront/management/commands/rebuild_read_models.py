@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from apps.catalog.models import Product
+from apps.storefront.read_models import refresh_read_models
+from core.infrastructure.store_cache import StoreCacheService
+
+
+class Command(BaseCommand):
+    help = "Rebuild the storefront product projection and facet table, optionally for a single store."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--store-id", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        products = Product.objects.all()
+        if options["store_id"] is not None:
+            products = products.filter(store_id=options["store_id"])
+
+        batch_size = max(1, int(options["batch_size"]))
+        batch = []
+        refreshed = 0
+        for product_id in products.order_by("id").values_list("id", flat=True).iterator(chunk_size=batch_size):
+            batch.append(product_id)
+            if len(batch) >= batch_size:
+                refresh_read_models(batch)
+                refreshed += len(batch)
+                batch = []
+        if batch:
+            refresh_read_models(batch)
+            refreshed += len(batch)
+
+        for store_id in products.values_list("store_id", flat=True).distinct():
+            StoreCacheService.bump_namespace_version(store_id=store_id, namespace="storefront_products")
+        self.stdout.write(self.style.SUCCESS(f"Refreshed read models for {refreshed} products."))
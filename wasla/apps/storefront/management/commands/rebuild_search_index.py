@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from apps.catalog.models import Product
+from apps.storefront.search import get_search_backend, index_products
+
+
+class Command(BaseCommand):
+    help = "Rebuild the storefront product search index, optionally for a single store."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--store-id", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        get_search_backend().ensure_schema()
+        products = Product.objects.only("id", "store_id", "name", "sku", "description_ar", "description_en")
+        if options["store_id"] is not None:
+            products = products.filter(store_id=options["store_id"])
+
+        batch_size = max(1, int(options["batch_size"]))
+        batch = []
+        indexed = 0
+        for product in products.order_by("id").iterator(chunk_size=batch_size):
+            batch.append(product)
+            if len(batch) >= batch_size:
+                index_products(batch)
+                indexed += len(batch)
+                batch = []
+        if batch:
+            index_products(batch)
+            indexed += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} products."))
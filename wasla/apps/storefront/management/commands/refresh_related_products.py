@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from apps.catalog.models import Product
+from apps.storefront.related import mark_related_stale, refresh_stale_related_items
+
+
+class Command(BaseCommand):
+    help = "Recompute stale precomputed related products; --all marks every product stale first."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--store-id", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--all", action="store_true", default=False)
+
+    def handle(self, *args, **options):
+        if options["all"]:
+            products = Product.objects.all()
+            if options["store_id"] is not None:
+                products = products.filter(store_id=options["store_id"])
+            batch = []
+            for product_id in products.order_by("id").values_list("id", flat=True).iterator(chunk_size=2000):
+                batch.append(product_id)
+                if len(batch) >= 2000:
+                    mark_related_stale(batch)
+                    batch = []
+            mark_related_stale(batch)
+
+        refreshed = refresh_stale_related_items(
+            batch_size=max(1, int(options["batch_size"])),
+            store_id=options["store_id"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Refreshed related products of {refreshed} products."))
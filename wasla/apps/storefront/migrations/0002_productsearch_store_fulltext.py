@@ -0,0 +1,135 @@
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+# Frozen copy of apps.storefront.search.normalization at the time of this
+# migration, so the backfill does not depend on live app code.
+_ARABIC_DIACRITICS_RE = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+_ARABIC_FOLDING = str.maketrans({
+    "\u0623": "\u0627",
+    "\u0625": "\u0627",
+    "\u0622": "\u0627",
+    "\u0671": "\u0627",
+    "\u0649": "\u064a",
+    "\u0629": "\u0647",
+    "\u0624": "\u0648",
+    "\u0626": "\u064a",
+})
+
+_POSTGRES_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(%s, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(%s, '')), 'A') || "
+    "setweight(to_tsvector('arabic', coalesce(%s, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(%s, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(%s, '')), 'D')"
+)
+_SQLITE_FTS_TABLE = "storefront_product_fts"
+_MYSQL_FULLTEXT_INDEX = "storefront_search_text_ft"
+
+
+def _normalize(value):
+    text = unicodedata.normalize("NFKC", str(value or ""))
+    text = _ARABIC_DIACRITICS_RE.sub("", text)
+    return text.translate(_ARABIC_FOLDING).casefold()
+
+
+def _create_search_structures(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("ALTER TABLE storefront_productsearch ADD COLUMN IF NOT EXISTS search_vector tsvector")
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS storefront_search_vector_gin "
+                "ON storefront_productsearch USING gin (search_vector)"
+            )
+        elif connection.vendor == "mysql":
+            cursor.execute(
+                "SELECT 1 FROM information_schema.statistics "
+                "WHERE table_schema = DATABASE() AND table_name = 'storefront_productsearch' AND index_name = %s",
+                [_MYSQL_FULLTEXT_INDEX],
+            )
+            if cursor.fetchone() is None:
+                cursor.execute(
+                    f"ALTER TABLE storefront_productsearch ADD FULLTEXT INDEX {_MYSQL_FULLTEXT_INDEX} (search_text)"
+                )
+        elif connection.vendor == "sqlite":
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {_SQLITE_FTS_TABLE} USING fts5("
+                "product_id UNINDEXED, store_id UNINDEXED, name, sku, body, "
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            )
+
+
+def _write_batch(ProductSearch, connection, rows):
+    product_ids = [row[0] for row in rows]
+    ProductSearch.objects.filter(product_id__in=product_ids).delete()
+    ProductSearch.objects.bulk_create(
+        [
+            ProductSearch(
+                product_id=product_id,
+                store_id=store_id,
+                search_text=" ".join(part for part in (name, sku, description_ar, description_en) if part),
+            )
+            for product_id, store_id, name, sku, description_ar, description_en in rows
+        ]
+    )
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.executemany(
+                f"UPDATE storefront_productsearch SET search_vector = {_POSTGRES_VECTOR_SQL} WHERE product_id = %s",
+                [
+                    (*fields, " ".join(part for part in fields if part), product_id)
+                    for product_id, _store_id, *fields in rows
+                ],
+            )
+        elif connection.vendor == "sqlite":
+            placeholders = ", ".join(["%s"] * len(product_ids))
+            cursor.execute(f"DELETE FROM {_SQLITE_FTS_TABLE} WHERE product_id IN ({placeholders})", product_ids)
+            cursor.executemany(
+                f"INSERT INTO {_SQLITE_FTS_TABLE} (product_id, store_id, name, sku, body) VALUES (%s, %s, %s, %s, %s)",
+                [
+                    (product_id, store_id, name, sku, " ".join(part for part in (description_ar, description_en) if part))
+                    for product_id, store_id, name, sku, description_ar, description_en in rows
+                ],
+            )
+
+
+def backfill_search_index(apps, schema_editor):
+    Product = apps.get_model("catalog", "Product")
+    ProductSearch = apps.get_model("storefront", "ProductSearch")
+    connection = schema_editor.connection
+    _create_search_structures(connection)
+
+    products = Product.objects.order_by("id").values_list(
+        "id", "store_id", "name", "sku", "description_ar", "description_en"
+    )
+    batch = []
+    for product_id, store_id, *fields in products.iterator(chunk_size=BATCH_SIZE):
+        batch.append((product_id, store_id, *(_normalize(value) for value in fields)))
+        if len(batch) >= BATCH_SIZE:
+            _write_batch(ProductSearch, connection, batch)
+            batch = []
+    if batch:
+        _write_batch(ProductSearch, connection, batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("storefront", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="productsearch",
+            name="storefront_p_search__123abc_idx",
+        ),
+        migrations.AddField(
+            model_name="productsearch",
+            name="store_id",
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
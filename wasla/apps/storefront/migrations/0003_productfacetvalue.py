@@ -0,0 +1,32 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0010_product_list_indexes"),
+        ("storefront", "0002_productsearch_store_fulltext"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductFacetValue",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("store_id", models.IntegerField()),
+                ("facet", models.CharField(max_length=16)),
+                ("value", models.CharField(max_length=64)),
+                ("product", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="facet_values", to="catalog.product")),
+            ],
+            options={"verbose_name": "Product Facet Value", "verbose_name_plural": "Product Facet Values"},
+        ),
+        migrations.AddConstraint(
+            model_name="productfacetvalue",
+            constraint=models.UniqueConstraint(fields=("product", "facet", "value"), name="uq_product_facet_value"),
+        ),
+        migrations.AddIndex(
+            model_name="productfacetvalue",
+            index=models.Index(fields=["store_id", "facet", "value"], name="storefront__store_i_5a62f2_idx"),
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0010_product_list_indexes"),
+        ("storefront", "0003_productfacetvalue"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StorefrontProductView",
+            fields=[
+                ("product", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="storefront_view", serialize=False, to="catalog.product")),
+                ("store_id", models.IntegerField()),
+                ("name", models.CharField(max_length=255)),
+                ("sku", models.CharField(max_length=64)),
+                ("slug", models.CharField(blank=True, default="", max_length=255)),
+                ("price", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("min_price", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("max_price", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("image", models.ImageField(blank=True, default="", max_length=255, upload_to="")),
+                ("has_variants", models.BooleanField(default=False)),
+                ("in_stock", models.BooleanField(default=True)),
+                ("stock_quantity", models.PositiveIntegerField(default=0)),
+                ("is_listed", models.BooleanField(default=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={"verbose_name": "Storefront Product View", "verbose_name_plural": "Storefront Product Views"},
+        ),
+        migrations.AddIndex(
+            model_name="storefrontproductview",
+            index=models.Index(fields=["store_id", "is_listed", "product"], name="storefront__store_i_b45391_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="storefrontproductview",
+            index=models.Index(fields=["store_id", "is_listed", "price", "product"], name="storefront__store_i_a3d569_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="storefrontproductview",
+            index=models.Index(fields=["store_id", "is_listed", "name", "product"], name="storefront__store_i_240a83_idx"),
+        ),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def mark_existing_products_stale(apps, schema_editor):
+    Product = apps.get_model("catalog", "Product")
+    ProductRelatedItems = apps.get_model("storefront", "ProductRelatedItems")
+    batch = []
+    for product_id, store_id in Product.objects.order_by("id").values_list("id", "store_id").iterator(chunk_size=2000):
+        batch.append(ProductRelatedItems(product_id=product_id, store_id=store_id))
+        if len(batch) >= 2000:
+            ProductRelatedItems.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        ProductRelatedItems.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0010_product_list_indexes"),
+        ("storefront", "0004_storefrontproductview"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductRelatedItems",
+            fields=[
+                ("product", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="related_items", serialize=False, to="catalog.product")),
+                ("store_id", models.IntegerField()),
+                ("related", models.BinaryField(default=b"")),
+                ("is_stale", models.BooleanField(default=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={"verbose_name": "Product Related Items", "verbose_name_plural": "Product Related Items"},
+        ),
+        migrations.AddIndex(
+            model_name="productrelateditems",
+            index=models.Index(fields=["is_stale", "store_id"], name="storefront__is_stal_b3e3c8_idx"),
+        ),
+        migrations.RunPython(mark_existing_products_stale, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0011_productimage_derivatives"),
+        ("storefront", "0005_productrelateditems"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="storefrontproductview",
+            name="image_derivatives",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
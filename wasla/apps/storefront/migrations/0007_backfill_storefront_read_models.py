@@ -0,0 +1,145 @@
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+# Frozen copies of apps.storefront.read_models.build_product_views and
+# apps.storefront.facets.compute_product_facets, on the historical models.
+
+
+def _price_band_edges():
+    edges = set()
+    for part in str(getattr(settings, "STOREFRONT_PRICE_BANDS", "0,50,100,250,500,1000")).split(","):
+        try:
+            edges.add(Decimal(part.strip()))
+        except InvalidOperation:
+            continue
+    return sorted(edges | {Decimal("0")})
+
+
+def _price_band(price, edges):
+    band = edges[0]
+    for edge in edges:
+        if price >= edge:
+            band = edge
+    return str(band)
+
+
+def _backfill_batch(apps, product_ids, edges):
+    Product = apps.get_model("catalog", "Product")
+    ProductImage = apps.get_model("catalog", "ProductImage")
+    ProductVariant = apps.get_model("catalog", "ProductVariant")
+    Inventory = apps.get_model("catalog", "Inventory")
+    ProductSEO = apps.get_model("storefront", "ProductSEO")
+    StorefrontProductView = apps.get_model("storefront", "StorefrontProductView")
+    ProductFacetValue = apps.get_model("storefront", "ProductFacetValue")
+
+    products = list(
+        Product.objects.filter(id__in=product_ids).values_list(
+            "id", "store_id", "name", "sku", "price", "image", "is_active", "visibility"
+        )
+    )
+    slugs = dict(ProductSEO.objects.filter(product_id__in=product_ids).values_list("product_id", "slug"))
+    images = {}
+    gallery = ProductImage.objects.filter(product_id__in=product_ids).order_by("product_id", "-is_primary", "position", "id")
+    for product_id, image, derivatives in gallery.values_list("product_id", "image", "derivatives"):
+        images.setdefault(product_id, (image, derivatives))
+
+    variant_prices = {}
+    variant_stock = {}
+    variant_products = {}
+    variants = ProductVariant.objects.filter(product_id__in=product_ids, is_active=True)
+    for variant_id, product_id, price_override, stock_quantity in variants.values_list(
+        "id", "product_id", "price_override", "stock_quantity"
+    ):
+        variant_products[variant_id] = product_id
+        variant_prices.setdefault(product_id, []).append(price_override)
+        variant_stock[product_id] = variant_stock.get(product_id, 0) + int(stock_quantity)
+    inventory = {
+        product_id: (quantity, in_stock)
+        for product_id, quantity, in_stock in Inventory.objects.filter(product_id__in=product_ids).values_list(
+            "product_id", "quantity", "in_stock"
+        )
+    }
+
+    views = []
+    facets = {}
+    for product_id, store_id, name, sku, price, image, is_active, visibility in products:
+        prices = [price if override is None else override for override in variant_prices.get(product_id, [])] or [price]
+        if product_id in variant_stock:
+            stock_quantity = variant_stock[product_id]
+            in_stock = stock_quantity > 0
+        elif product_id in inventory:
+            stock_quantity, in_stock = inventory[product_id]
+        else:
+            stock_quantity, in_stock = 0, True
+        is_listed = bool(is_active) and visibility == "enabled"
+        gallery_image, image_derivatives = images.get(product_id, ("", {}))
+        views.append(
+            StorefrontProductView(
+                product_id=product_id,
+                store_id=store_id,
+                name=name,
+                sku=sku,
+                slug=slugs.get(product_id, ""),
+                price=price,
+                min_price=min(prices),
+                max_price=max(prices),
+                image=gallery_image or image or "",
+                image_derivatives=(image_derivatives or {}) if gallery_image else {},
+                has_variants=product_id in variant_stock,
+                in_stock=in_stock,
+                stock_quantity=stock_quantity,
+                is_listed=is_listed,
+            )
+        )
+        if is_listed:
+            facets[product_id] = (
+                store_id,
+                {("price", _price_band(price, edges)), ("stock", "in" if in_stock else "out")},
+            )
+
+    category_links = Product.categories.through.objects.filter(product_id__in=list(facets))
+    for product_id, category_id in category_links.values_list("product_id", "category_id"):
+        facets[product_id][1].add(("category", str(category_id)))
+    option_links = ProductVariant.options.through.objects.filter(productvariant_id__in=list(variant_products))
+    for variant_id, option_id in option_links.values_list("productvariant_id", "productoption_id"):
+        if variant_products[variant_id] in facets:
+            facets[variant_products[variant_id]][1].add(("option", str(option_id)))
+
+    StorefrontProductView.objects.bulk_create(views, ignore_conflicts=True)
+    ProductFacetValue.objects.bulk_create(
+        [
+            ProductFacetValue(product_id=product_id, store_id=store_id, facet=facet, value=value)
+            for product_id, (store_id, memberships) in facets.items()
+            for facet, value in memberships
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def backfill_read_models(apps, schema_editor):
+    Product = apps.get_model("catalog", "Product")
+    edges = _price_band_edges()
+    batch = []
+    for product_id in Product.objects.order_by("id").values_list("id", flat=True).iterator(chunk_size=BATCH_SIZE):
+        batch.append(product_id)
+        if len(batch) >= BATCH_SIZE:
+            _backfill_batch(apps, batch, edges)
+            batch = []
+    if batch:
+        _backfill_batch(apps, batch, edges)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0011_productimage_derivatives"),
+        ("storefront", "0006_storefrontproductview_image_derivatives"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_read_models, migrations.RunPython.noop),
+    ]
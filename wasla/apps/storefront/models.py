@@ -1,4 +1,6 @@
 """Storefront models for SEO and customer features."""
+import struct
+
 from django.db import models
 from django.utils.text import slugify
 
@@ -75,16 +77,14 @@ class ProductSearch(models.Model):
         on_delete=models.CASCADE,
         related_name="search_index"
     )
-    search_text = models.TextField()  # Denormalized text for search
+    store_id = models.IntegerField(default=0, db_index=True)
+    search_text = models.TextField()  # Normalized text for search (see apps.storefront.search)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Product Search Index"
         verbose_name_plural = "Product Search Indexes"
-        indexes = [
-            models.Index(fields=["search_text"]),
-        ]
 
     def __str__(self) -> str:
         return f"Search: {self.product.id}"
@@ -92,20 +92,132 @@ class ProductSearch(models.Model):
     @staticmethod
     def build_search_text(product) -> str:
         """Build searchable text from product fields."""
-        parts = [
-            product.name,
-            product.sku,
-            product.description_en,
-            product.description_ar,
-        ]
-        return " ".join(str(p) for p in parts if p)
+        from .search import SearchDocument
+
+        return SearchDocument.from_product(product).search_text
 
     def save(self, *args, **kwargs):
+        if not self.store_id:
+            self.store_id = self.product.store_id
         if not self.search_text:
             self.search_text = self.build_search_text(self.product)
         super().save(*args, **kwargs)
 
 
+class ProductFacetValue(models.Model):
+    """Materialized facet membership of a listed product (see apps.storefront.facets)."""
+
+    FACET_CATEGORY = "category"
+    FACET_PRICE = "price"
+    FACET_OPTION = "option"
+    FACET_STOCK = "stock"
+
+    store_id = models.IntegerField()
+    product = models.ForeignKey(
+        "catalog.Product",
+        on_delete=models.CASCADE,
+        related_name="facet_values"
+    )
+    facet = models.CharField(max_length=16)
+    value = models.CharField(max_length=64)
+
+    class Meta:
+        verbose_name = "Product Facet Value"
+        verbose_name_plural = "Product Facet Values"
+        constraints = [
+            models.UniqueConstraint(fields=["product", "facet", "value"], name="uq_product_facet_value"),
+        ]
+        indexes = [
+            models.Index(fields=["store_id", "facet", "value"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.product_id}:{self.facet}={self.value}"
+
+
+class StorefrontProductView(models.Model):
+    """Denormalized product card and sitemap entry (see apps.storefront.read_models)."""
+
+    product = models.OneToOneField(
+        "catalog.Product",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="storefront_view"
+    )
+    store_id = models.IntegerField()
+    name = models.CharField(max_length=255)
+    sku = models.CharField(max_length=64)
+    slug = models.CharField(max_length=255, blank=True, default="")
+    price = models.DecimalField(max_digits=12, decimal_places=2)
+    min_price = models.DecimalField(max_digits=12, decimal_places=2)
+    max_price = models.DecimalField(max_digits=12, decimal_places=2)
+    image = models.ImageField(max_length=255, blank=True, default="")
+    image_derivatives = models.JSONField(default=dict, blank=True)
+    has_variants = models.BooleanField(default=False)
+    in_stock = models.BooleanField(default=True)
+    stock_quantity = models.PositiveIntegerField(default=0)
+    is_listed = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Storefront Product View"
+        verbose_name_plural = "Storefront Product Views"
+        indexes = [
+            models.Index(fields=["store_id", "is_listed", "product"]),
+            models.Index(fields=["store_id", "is_listed", "price", "product"]),
+            models.Index(fields=["store_id", "is_listed", "name", "product"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"View: {self.product_id}"
+
+    @property
+    def id(self) -> int:
+        return self.product_id
+
+
+class ProductRelatedItems(models.Model):
+    """Precomputed related products of one product (see apps.storefront.related).
+
+    `related` packs the ranked product ids as little-endian uint32 values.
+    """
+
+    product = models.OneToOneField(
+        "catalog.Product",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="related_items"
+    )
+    store_id = models.IntegerField()
+    related = models.BinaryField(default=b"")
+    is_stale = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Product Related Items"
+        verbose_name_plural = "Product Related Items"
+        indexes = [
+            models.Index(fields=["is_stale", "store_id"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"Related: {self.product_id}"
+
+    @staticmethod
+    def pack(product_ids) -> bytes:
+        ids = [int(pk) for pk in product_ids]
+        return struct.pack(f"<{len(ids)}I", *ids)
+
+    @staticmethod
+    def unpack(data) -> list[int]:
+        data = bytes(data or b"")
+        return list(struct.unpack(f"<{len(data) // 4}I", data))
+
+    @property
+    def related_ids(self) -> list[int]:
+        return self.unpack(self.related)
+
+
 class StorefrontSettings(models.Model):
     """Global storefront configuration per store."""
 
@@ -0,0 +1,136 @@
+"""Shared full-page cache for anonymous storefront visitors.
+
+Pages are rendered once per (store, language, host, path, normalized query)
+and tied to the `storefront_products` and `store_config` namespace versions,
+so any catalog or store configuration change produces new keys.
+
+Shared renders never contain visitor state: the cart badge comes from
+`cart_fragment`, and CSRF inputs are emptied and filled from the `csrftoken`
+cookie by storefront.js.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+
+from core.infrastructure.store_cache import StoreCacheService
+
+
+IGNORED_QUERY_PARAMS = frozenset({
+    "utm_source",
+    "utm_medium",
+    "utm_campaign",
+    "utm_term",
+    "utm_content",
+    "fbclid",
+    "gclid",
+})
+
+_CSRF_INPUT_RE = re.compile(r'<input type="hidden" name="csrfmiddlewaretoken" value="[^"]*">')
+_CSRF_PLACEHOLDER = '<input type="hidden" name="csrfmiddlewaretoken" value="" data-csrf-from-cookie>'
+
+
+def is_shared_render(request) -> bool:
+    """True while a view renders a page that will be served to other visitors."""
+    return bool(getattr(request, "storefront_shared_render", False))
+
+
+def normalize_query(query_dict) -> str:
+    pairs = sorted(
+        (key, value)
+        for key in query_dict.keys()
+        if key not in IGNORED_QUERY_PARAMS
+        for value in query_dict.getlist(key)
+    )
+    return urlencode(pairs)
+
+
+def _is_cacheable_request(request) -> bool:
+    if not getattr(settings, "STOREFRONT_PAGE_CACHE_ENABLED", True):
+        return False
+    if request.method not in ("GET", "HEAD"):
+        return False
+    if getattr(getattr(request, "store", None), "id", None) is None:
+        return False
+    if getattr(getattr(request, "tenant", None), "id", None) is None:
+        return False
+    if "messages" in request.COOKIES:
+        return False
+    user = getattr(request, "user", None)
+    return not (user is not None and user.is_authenticated)
+
+
+def page_cache_key(request) -> str:
+    store_id = int(request.store.id)
+    tenant_id = int(request.tenant.id)
+    versions = StoreCacheService.get_many_versions(
+        [(store_id, "storefront_products"), (tenant_id, "store_config")]
+    )
+    raw = "|".join([request.get_host(), request.path, normalize_query(request.GET)])
+    digest = hashlib.md5(raw.encode("utf-8")).hexdigest()
+    language = getattr(request, "LANGUAGE_CODE", "") or settings.LANGUAGE_CODE
+    return (
+        f"storefront:page:{store_id}:{language}"
+        f":p{versions[(store_id, 'storefront_products')]}:c{versions[(tenant_id, 'store_config')]}:{digest}"
+    )
+
+
+def _is_storable(response) -> bool:
+    if response.status_code != 200 or getattr(response, "streaming", False):
+        return False
+    if response.cookies:
+        return False
+    cache_control = response.get("Cache-Control", "")
+    return "private" not in cache_control and "no-store" not in cache_control
+
+
+def _build_entry(response) -> dict:
+    charset = getattr(response, "charset", None) or settings.DEFAULT_CHARSET
+    content = _CSRF_INPUT_RE.sub(_CSRF_PLACEHOLDER, response.content.decode(charset)).encode(charset)
+    return {
+        "content": content,
+        "content_type": response.get("Content-Type", f"text/html; charset={charset}"),
+        "etag": f'"{hashlib.md5(content).hexdigest()}"',
+    }
+
+
+def _serve(request, entry: dict, *, status: str):
+    if entry["etag"] in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(entry["content"], content_type=entry["content_type"])
+    response["ETag"] = entry["etag"]
+    response["Cache-Control"] = "public, max-age=0, must-revalidate"
+    response["X-Page-Cache"] = status
+    return response
+
+
+def anonymous_page_cache(view):
+    """Serve anonymous GET/HEAD requests from the shared page cache."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not _is_cacheable_request(request):
+            return view(request, *args, **kwargs)
+
+        key = page_cache_key(request)
+        entry = cache.get(key)
+        if entry is not None:
+            return _serve(request, entry, status="HIT")
+
+        request.storefront_shared_render = True
+        response = view(request, *args, **kwargs)
+        if not _is_storable(response):
+            return response
+        entry = _build_entry(response)
+        cache.set(key, entry, timeout=int(getattr(settings, "STOREFRONT_PAGE_CACHE_TIMEOUT", 300) or 300))
+        return _serve(request, entry, status="MISS")
+
+    return wrapper
@@ -0,0 +1,238 @@
+"""Keyset (cursor) pagination for storefront listings.
+
+Pages are addressed by the (sort key, id) of their last row (`after`) or
+first row (`before`), so a deep page costs one indexed range query instead
+of counting or slicing the whole result set. The first few pages of each
+listing are kept as a small cached *window* of rows; cursors that fall
+inside the window are served from it without touching the database.
+"""
+from __future__ import annotations
+
+import base64
+import json
+from dataclasses import dataclass, field
+from functools import cached_property
+from urllib.parse import urlencode
+
+from django.db.models import Q
+
+# sort parameter -> (model field, descending); "pk" also works for StorefrontProductView,
+# whose primary key is the product.
+SORT_FIELDS = {
+    "-id": ("pk", True),
+    "id": ("pk", False),
+    "price": ("price", False),
+    "-price": ("price", True),
+    "name": ("name", False),
+    "-name": ("name", True),
+}
+
+
+def sort_ordering(field_name: str, descending: bool) -> tuple[str, ...]:
+    """order_by() arguments for a (field, pk) keyset; pk breaks ties."""
+    prefix = "-" if descending else ""
+    if field_name == "pk":
+        return (f"{prefix}pk",)
+    return (f"{prefix}{field_name}", f"{prefix}pk")
+
+
+def clamp_per_page(value, *, default: int, maximum: int) -> int:
+    try:
+        per_page = int(value)
+    except (TypeError, ValueError):
+        per_page = int(default)
+    return max(1, min(per_page, int(maximum)))
+
+
+def encode_cursor(row) -> str:
+    payload = json.dumps([str(part) for part in row], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(raw: str | None) -> list[str] | None:
+    if not raw:
+        return None
+    try:
+        payload = base64.urlsafe_b64decode(raw + "=" * (-len(raw) % 4))
+        row = json.loads(payload)
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(row, list) or len(row) != 2 or not all(isinstance(part, str) for part in row):
+        return None
+    return row
+
+
+@dataclass
+class Window:
+    """Leading rows of a listing; `complete` when no rows exist beyond them."""
+
+    rows: list[list]
+    complete: bool
+
+
+class KeysetPaginator:
+    """Range queries over `queryset` ordered by (sort field, pk)."""
+
+    def __init__(self, queryset, *, sort: str) -> None:
+        self.field, self.descending = SORT_FIELDS[sort]
+        self.queryset = queryset
+
+    def ordering(self, reverse: bool = False) -> tuple[str, ...]:
+        return sort_ordering(self.field, self.descending != reverse)
+
+    def _rows(self, qs, limit: int) -> list[list]:
+        if self.field == "pk":
+            return [[pk, pk] for pk in qs.values_list("pk", flat=True)[:limit]]
+        return [list(row) for row in qs.values_list(self.field, "pk")[:limit]]
+
+    def parse(self, cursor: list[str]) -> list | None:
+        opts = self.queryset.model._meta
+        try:
+            field = opts.pk if self.field == "pk" else opts.get_field(self.field)
+            return [field.to_python(cursor[0]), int(cursor[1])]
+        except Exception:
+            return None
+
+    def _beyond(self, row: list, *, forward: bool) -> Q:
+        op = "gt" if forward != self.descending else "lt"
+        if self.field == "pk":
+            return Q(**{f"pk__{op}": row[1]})
+        return Q(**{f"{self.field}__{op}": row[0]}) | Q(**{self.field: row[0], f"pk__{op}": row[1]})
+
+    def first(self, limit: int) -> list[list]:
+        return self._rows(self.queryset.order_by(*self.ordering()), limit)
+
+    def after(self, row: list, limit: int) -> list[list]:
+        return self._rows(self.queryset.filter(self._beyond(row, forward=True)).order_by(*self.ordering()), limit)
+
+    def before(self, row: list, limit: int) -> list[list]:
+        qs = self.queryset.filter(self._beyond(row, forward=False)).order_by(*self.ordering(reverse=True))
+        return list(reversed(self._rows(qs, limit)))
+
+
+class RankedPaginator:
+    """Pages over a ranked id list (search relevance); the row key is the rank.
+
+    `load_ids` runs only when a page is not covered by the cached window.
+    """
+
+    def __init__(self, load_ids) -> None:
+        self._load_ids = load_ids
+
+    @cached_property
+    def rows(self) -> list[list]:
+        return [[position, pk] for position, pk in enumerate(self._load_ids())]
+
+    def parse(self, cursor: list[str]) -> list | None:
+        try:
+            return [int(cursor[0]), int(cursor[1])]
+        except ValueError:
+            return None
+
+    def first(self, limit: int) -> list[list]:
+        return self.rows[:limit]
+
+    def after(self, row: list, limit: int) -> list[list]:
+        start = row[0] + 1
+        return self.rows[start:start + limit]
+
+    def before(self, row: list, limit: int) -> list[list]:
+        end = max(0, row[0])
+        return self.rows[max(0, end - limit):end]
+
+
+@dataclass
+class KeysetPage:
+    """Template-facing page: `object_list` plus cursor links that keep other query params.
+
+    `params` maps each query parameter to its list of values (`dict(request.GET.lists())`).
+    """
+
+    object_list: list
+    number: int
+    has_next: bool
+    has_previous: bool
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+    params: dict = field(default_factory=dict)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+    def _query(self, **extra) -> str:
+        params = {key: values for key, values in self.params.items() if key not in ("after", "before", "page")}
+        params.update({key: [value] for key, value in extra.items() if value is not None})
+        return urlencode(params, doseq=True)
+
+    @property
+    def first_query(self) -> str:
+        return self._query()
+
+    @property
+    def next_query(self) -> str:
+        return self._query(after=self.next_cursor, page=self.number + 1)
+
+    @property
+    def previous_query(self) -> str:
+        return self._query(before=self.previous_cursor, page=max(1, self.number - 1))
+
+
+def _window_index(rows: list[list], row: list) -> int | None:
+    for index, candidate in enumerate(rows):
+        if candidate[1] == row[1]:
+            return index
+    return None
+
+
+def paginate(paginator, window: Window, *, per_page: int, after: str | None = None, before: str | None = None, number: int = 1):
+    """Resolve one page of rows, preferring the cached window over a range query."""
+    rows = window.rows
+    direction, cursor = ("after", decode_cursor(after)) if after else ("before", decode_cursor(before))
+    row = paginator.parse(cursor) if cursor else None
+
+    if row is None:
+        page_rows = rows[:per_page]
+        has_next = len(rows) > per_page or (not window.complete and len(rows) == per_page)
+        has_previous = False
+        number = 1
+    elif direction == "after":
+        index = _window_index(rows, row)
+        end = None if index is None else index + 1 + per_page
+        if index is not None and (window.complete or end <= len(rows)):
+            page_rows = rows[index + 1:end]
+            has_next = end < len(rows) or not window.complete
+        else:
+            fetched = paginator.after(row, per_page + 1)
+            page_rows, has_next = fetched[:per_page], len(fetched) > per_page
+        has_previous = True
+    else:
+        index = _window_index(rows, row)
+        if index is not None:
+            page_rows = rows[max(0, index - per_page):index]
+            has_previous = index - per_page > 0
+        else:
+            fetched = paginator.before(row, per_page + 1)
+            page_rows, has_previous = fetched[-per_page:], len(fetched) > per_page
+        has_next = True
+
+    if not has_previous:
+        number = 1
+    return page_rows, {
+        "number": max(1, int(number)),
+        "has_next": has_next,
+        "has_previous": has_previous,
+        "next_cursor": encode_cursor(page_rows[-1]) if page_rows and has_next else None,
+        "previous_cursor": encode_cursor(page_rows[0]) if page_rows and has_previous else None,
+    }
+
+
+def load_window(paginator, *, per_page: int, pages: int) -> Window:
+    limit = per_page * max(1, pages)
+    rows = paginator.first(limit + 1)
+    return Window(rows=rows[:limit], complete=len(rows) <= limit)
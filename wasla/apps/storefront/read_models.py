@@ -0,0 +1,140 @@
+"""Storefront read models derived from the catalog.
+
+StorefrontProductView holds everything a listing card or sitemap entry
+needs (name, SKU, SEO slug, price range, primary image and its responsive
+derivatives, stock), so listing pages read one indexed table instead of
+prefetching images, variants and SEO rows. It is refreshed together with the facet table from catalog
+signals, and each refresh marks the products' precomputed related items
+stale; `batched_read_model_refresh` collapses bulk writes into one refresh
+per product.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Decimal
+
+from django.db import transaction
+
+from apps.catalog.models import Inventory, Product, ProductImage, ProductVariant
+
+from .facets import refresh_product_facets
+from .models import ProductSEO, StorefrontProductView
+from .related import mark_related_stale
+
+# Product ids collected by `batched_read_model_refresh`; None when refreshing immediately.
+_pending_refresh: ContextVar[set[int] | None] = ContextVar("storefront_read_model_refresh", default=None)
+
+
+def build_product_views(product_ids) -> list[StorefrontProductView]:
+    """Projection rows for `product_ids`, computed with one query per source table."""
+    products = list(
+        Product.objects.filter(id__in=product_ids).values_list(
+            "id", "store_id", "name", "sku", "price", "image", "is_active", "visibility"
+        )
+    )
+    ids = [row[0] for row in products]
+    if not ids:
+        return []
+
+    slugs = dict(ProductSEO.objects.filter(product_id__in=ids).values_list("product_id", "slug"))
+
+    # Primary image first, then gallery order; mirrors what ProductImage.save settles on.
+    images: dict[int, tuple[str, dict]] = {}
+    gallery = ProductImage.objects.filter(product_id__in=ids).order_by("product_id", "-is_primary", "position", "id")
+    for product_id, image, derivatives in gallery.values_list("product_id", "image", "derivatives"):
+        images.setdefault(product_id, (image, derivatives))
+
+    variant_prices: dict[int, list[Decimal]] = {}
+    variant_stock: dict[int, int] = {}
+    variants = ProductVariant.objects.filter(product_id__in=ids, is_active=True)
+    for product_id, price_override, stock_quantity in variants.values_list("product_id", "price_override", "stock_quantity"):
+        variant_prices.setdefault(product_id, []).append(price_override)
+        variant_stock[product_id] = variant_stock.get(product_id, 0) + int(stock_quantity)
+
+    inventory = {
+        product_id: (quantity, in_stock)
+        for product_id, quantity, in_stock in Inventory.objects.filter(product_id__in=ids).values_list(
+            "product_id", "quantity", "in_stock"
+        )
+    }
+
+    views = []
+    for product_id, store_id, name, sku, price, image, is_active, visibility in products:
+        prices = [price if override is None else override for override in variant_prices.get(product_id, [])] or [price]
+        if product_id in variant_stock:
+            stock_quantity = variant_stock[product_id]
+            in_stock = stock_quantity > 0
+        elif product_id in inventory:
+            stock_quantity, in_stock = inventory[product_id]
+        else:
+            stock_quantity, in_stock = 0, True
+        gallery_image, image_derivatives = images.get(product_id, ("", {}))
+        views.append(
+            StorefrontProductView(
+                product_id=product_id,
+                store_id=store_id,
+                name=name,
+                sku=sku,
+                slug=slugs.get(product_id, ""),
+                price=price,
+                min_price=min(prices),
+                max_price=max(prices),
+                image=gallery_image or image or "",
+                image_derivatives=(image_derivatives or {}) if gallery_image else {},
+                has_variants=product_id in variant_stock,
+                in_stock=in_stock,
+                stock_quantity=stock_quantity,
+                is_listed=bool(is_active) and visibility == Product.VISIBILITY_ENABLED,
+            )
+        )
+    return views
+
+
+def refresh_product_views(product_ids) -> None:
+    product_ids = sorted({int(pk) for pk in product_ids})
+    if not product_ids:
+        return
+    views = build_product_views(product_ids)
+    with transaction.atomic():
+        StorefrontProductView.objects.filter(product_id__in=product_ids).delete()
+        StorefrontProductView.objects.bulk_create(views)
+
+
+def refresh_read_models(product_ids) -> None:
+    product_ids = {int(pk) for pk in product_ids}
+    refresh_product_views(product_ids)
+    refresh_product_facets(product_ids)
+    mark_related_stale(product_ids)
+
+
+def schedule_read_model_refresh(product_ids) -> None:
+    """Refresh read models of `product_ids` now, or at the end of the enclosing batch."""
+    product_ids = {int(pk) for pk in product_ids if pk}
+    if not product_ids:
+        return
+    pending = _pending_refresh.get()
+    if pending is not None:
+        pending.update(product_ids)
+        return
+    refresh_read_models(product_ids)
+
+
+@contextmanager
+def batched_read_model_refresh():
+    """
+    Collect read model refreshes made inside the block and refresh each
+    product once when it exits. Nested blocks defer to the outermost one.
+    Usable as a decorator; nothing is refreshed when the block raises.
+    """
+    if _pending_refresh.get() is not None:
+        yield
+        return
+    pending: set[int] = set()
+    token = _pending_refresh.set(pending)
+    try:
+        yield
+    finally:
+        _pending_refresh.reset(token)
+    if pending:
+        refresh_read_models(pending)
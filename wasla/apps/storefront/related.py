@@ -0,0 +1,201 @@
+"""Precomputed related products.
+
+Related items of a product are ranked in the background from category
+overlap, price proximity and co-purchase counts (orders containing both
+products), and stored as a packed id array in ProductRelatedItems, so a
+product page reads them with one primary-key lookup.
+
+Catalog changes mark rows stale through the read model refresh, and new
+order items mark their products stale when the job runs.
+`refresh_stale_related_items` then recomputes only stale rows, from the
+Celery beat task or `manage.py refresh_related_products`.
+"""
+from __future__ import annotations
+
+import math
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router
+from django.db.models import Max
+from django.utils import timezone
+
+from apps.catalog.models import Product
+from apps.orders.models import OrderItem
+
+from .models import ProductRelatedItems, StorefrontProductView
+
+CATEGORY_WEIGHT = 3.0
+CO_PURCHASE_WEIGHT = 2.0
+PRICE_WEIGHT = 1.0
+
+# Highest OrderItem id whose products were already marked stale.
+ORDER_ITEM_WATERMARK_KEY = "storefront:related:order_item_watermark"
+
+
+def related_limit() -> int:
+    return max(1, int(getattr(settings, "STOREFRONT_RELATED_LIMIT", 12) or 12))
+
+
+def price_similarity(price, other) -> float:
+    price, other = float(price or 0), float(other or 0)
+    if price <= 0 or other <= 0:
+        return 0.0
+    return 1.0 - min(1.0, abs(price - other) / max(price, other))
+
+
+class StoreGraph:
+    """Listed products of one store with their prices and categories."""
+
+    def __init__(self, store_id: int) -> None:
+        self.store_id = int(store_id)
+        self.prices = {
+            int(pk): price
+            for pk, price in StorefrontProductView.objects.filter(store_id=self.store_id, is_listed=True).values_list(
+                "pk", "price"
+            )
+        }
+        self.categories: dict[int, list[int]] = defaultdict(list)
+        members: dict[int, list[tuple[float, int]]] = defaultdict(list)
+        links = Product.categories.through.objects.filter(product__store_id=self.store_id)
+        for product_id, category_id in links.values_list("product_id", "category_id"):
+            self.categories[product_id].append(category_id)
+            if product_id in self.prices:
+                members[category_id].append((float(self.prices[product_id]), product_id))
+        # Category members sorted by price, so the closest-priced ones are a slice.
+        self.members = {category_id: sorted(rows) for category_id, rows in members.items()}
+
+    def category_neighbours(self, category_id: int, price) -> list[int]:
+        rows = self.members.get(category_id, [])
+        width = max(1, int(getattr(settings, "STOREFRONT_RELATED_CATEGORY_NEIGHBOURS", 50) or 50))
+        if len(rows) <= 2 * width:
+            return [product_id for _, product_id in rows]
+        position = bisect_left(rows, (float(price or 0), 0))
+        start = max(0, min(position - width, len(rows) - 2 * width))
+        return [product_id for _, product_id in rows[start:start + 2 * width]]
+
+
+def co_purchase_counts(product_ids) -> dict[int, dict[int, int]]:
+    """{product_id: {other_product_id: orders containing both}} over the recent order window."""
+    product_ids = set(product_ids)
+    days = int(getattr(settings, "STOREFRONT_RELATED_ORDER_DAYS", 180) or 180)
+    orders = (
+        OrderItem.objects.filter(product_id__in=product_ids, order__created_at__gte=timezone.now() - timedelta(days=days))
+        .exclude(order__status="cancelled")
+        .values("order_id")
+    )
+    baskets: dict[int, set[int]] = defaultdict(set)
+    for order_id, product_id in OrderItem.objects.filter(order_id__in=orders).values_list("order_id", "product_id"):
+        baskets[order_id].add(product_id)
+
+    counts: dict[int, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    for basket in baskets.values():
+        for product_id in basket & product_ids:
+            for other in basket:
+                if other != product_id:
+                    counts[product_id][other] += 1
+    return counts
+
+
+def rank_related(graph: StoreGraph, product_id: int, price, co_purchases: dict[int, int]) -> list[int]:
+    scores: dict[int, float] = defaultdict(float)
+    categories = graph.categories.get(product_id, [])
+    for category_id in categories:
+        for candidate in graph.category_neighbours(category_id, price):
+            scores[candidate] += CATEGORY_WEIGHT / len(categories)
+    for candidate, count in co_purchases.items():
+        if candidate in graph.prices:
+            scores[candidate] += CO_PURCHASE_WEIGHT * math.log1p(count)
+    scores.pop(product_id, None)
+    for candidate in scores:
+        scores[candidate] += PRICE_WEIGHT * price_similarity(price, graph.prices[candidate])
+    return sorted(scores, key=lambda candidate: (-scores[candidate], candidate))[:related_limit()]
+
+
+def refresh_related_items(product_ids, *, graph: StoreGraph | None = None) -> int:
+    """Recompute related items of `product_ids` (all of one store when `graph` is given)."""
+    products = list(Product.objects.filter(id__in=set(product_ids)).values_list("id", "store_id", "price"))
+    if not products:
+        return 0
+    # Claim the rows first: a change made while ranking marks them stale again.
+    ProductRelatedItems.objects.filter(pk__in=[row[0] for row in products]).update(is_stale=False)
+
+    by_store: dict[int, list[tuple[int, object]]] = defaultdict(list)
+    for product_id, store_id, price in products:
+        by_store[store_id].append((product_id, price))
+
+    rows = []
+    for store_id, store_products in by_store.items():
+        store_graph = graph if graph is not None and graph.store_id == store_id else StoreGraph(store_id)
+        co_purchases = co_purchase_counts([product_id for product_id, _ in store_products])
+        for product_id, price in store_products:
+            related = rank_related(store_graph, product_id, price, co_purchases.get(product_id, {}))
+            rows.append(
+                ProductRelatedItems(
+                    product_id=product_id,
+                    store_id=store_id,
+                    related=ProductRelatedItems.pack(related),
+                    is_stale=False,
+                )
+            )
+    # MySQL cannot name a conflict target; ON DUPLICATE KEY resolves on the `product` primary key.
+    features = connections[router.db_for_write(ProductRelatedItems)].features
+    conflict_target = {"unique_fields": ["product"]} if features.supports_update_conflicts_with_target else {}
+    ProductRelatedItems.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        update_fields=["store_id", "related", "updated_at"],
+        **conflict_target,
+    )
+    return len(rows)
+
+
+def mark_related_stale(product_ids) -> None:
+    product_ids = {int(pk) for pk in product_ids if pk}
+    if not product_ids:
+        return
+    ProductRelatedItems.objects.bulk_create(
+        [
+            ProductRelatedItems(product_id=product_id, store_id=store_id)
+            for product_id, store_id in Product.objects.filter(id__in=product_ids).values_list("id", "store_id")
+        ],
+        ignore_conflicts=True,
+    )
+    ProductRelatedItems.objects.filter(pk__in=product_ids, is_stale=False).update(is_stale=True)
+
+
+def mark_ordered_products_stale() -> None:
+    """Mark products of order items added since the last run stale (co-purchase counts moved)."""
+    latest = OrderItem.objects.aggregate(latest=Max("id"))["latest"] or 0
+    watermark = cache.get(ORDER_ITEM_WATERMARK_KEY)
+    if watermark is not None and latest > int(watermark):
+        mark_related_stale(
+            OrderItem.objects.filter(id__gt=int(watermark), id__lte=latest).values_list("product_id", flat=True).distinct()
+        )
+    cache.set(ORDER_ITEM_WATERMARK_KEY, latest, timeout=None)
+
+
+def refresh_stale_related_items(*, batch_size: int = 500, store_id: int | None = None) -> int:
+    """Recompute every stale row, store by store, sharing one StoreGraph per store."""
+    mark_ordered_products_stale()
+    stale = ProductRelatedItems.objects.filter(is_stale=True)
+    if store_id is not None:
+        stale = stale.filter(store_id=store_id)
+    refreshed = 0
+    for current_store in list(stale.order_by("store_id").values_list("store_id", flat=True).distinct()):
+        graph = StoreGraph(current_store)
+        store_stale = stale.filter(store_id=current_store).order_by("pk").values_list("pk", flat=True)
+        batch = list(store_stale[:batch_size])
+        while batch:
+            refreshed += refresh_related_items(batch, graph=graph)
+            batch = list(store_stale.filter(pk__gt=batch[-1])[:batch_size])
+    return refreshed
+
+
+def related_product_ids(product_id: int) -> list[int]:
+    """Ranked related ids of one product (may include products unlisted since)."""
+    data = ProductRelatedItems.objects.filter(pk=product_id).values_list("related", flat=True).first()
+    return ProductRelatedItems.unpack(data)
@@ -0,0 +1,20 @@
+"""Per-store product search: normalization, backends and index maintenance."""
+from .backends import DatabaseSearchBackend, MySQLSearchBackend, PostgresSearchBackend, SearchDocument, SQLiteSearchBackend
+from .normalization import normalize_text, query_tokens, tokenize
+from .service import get_search_backend, index_products, remove_products, search_product_ids, try_index_products
+
+__all__ = [
+    "DatabaseSearchBackend",
+    "MySQLSearchBackend",
+    "PostgresSearchBackend",
+    "SQLiteSearchBackend",
+    "SearchDocument",
+    "get_search_backend",
+    "index_products",
+    "normalize_text",
+    "query_tokens",
+    "remove_products",
+    "search_product_ids",
+    "tokenize",
+    "try_index_products",
+]
@@ -0,0 +1,263 @@
+"""Per-store product search backends.
+
+- PostgresSearchBackend: `tsvector` column + GIN index on ProductSearch
+  (`simple` config for names/SKUs, `arabic`/`english` for descriptions),
+  prefix queries and `ts_rank_cd` ordering.
+- MySQLSearchBackend: FULLTEXT index on ProductSearch.search_text, boolean
+  mode prefix queries ordered by MATCH ... AGAINST relevance.
+- SQLiteSearchBackend: an FTS5 virtual table with bm25 ranking, used for
+  local development and tests.
+- DatabaseSearchBackend: portable fallback scanning the normalized
+  ProductSearch.search_text of one store.
+
+Documents and queries are both passed through `normalize_text`, so Arabic
+spelling variants and Latin case differences match each other.
+"""
+from __future__ import annotations
+
+from django.db import connection as default_connection
+
+from .normalization import normalize_text, query_tokens
+
+
+class SearchDocument:
+    __slots__ = ("product_id", "store_id", "name", "sku", "description_ar", "description_en")
+
+    def __init__(self, *, product_id: int, store_id: int, name: str, sku: str, description_ar: str, description_en: str):
+        self.product_id = int(product_id)
+        self.store_id = int(store_id)
+        self.name = normalize_text(name)
+        self.sku = normalize_text(sku)
+        self.description_ar = normalize_text(description_ar)
+        self.description_en = normalize_text(description_en)
+
+    @classmethod
+    def from_product(cls, product) -> "SearchDocument":
+        return cls(
+            product_id=product.pk,
+            store_id=product.store_id,
+            name=product.name,
+            sku=product.sku,
+            description_ar=product.description_ar,
+            description_en=product.description_en,
+        )
+
+    @property
+    def search_text(self) -> str:
+        return " ".join(part for part in (self.name, self.sku, self.description_ar, self.description_en) if part)
+
+
+class DatabaseSearchBackend:
+    vendor = None
+
+    def __init__(self, connection=default_connection) -> None:
+        self.connection = connection
+
+    def ensure_schema(self) -> None:
+        """Create backend-specific structures; must be idempotent."""
+
+    def index(self, documents: list[SearchDocument]) -> None:
+        from apps.storefront.models import ProductSearch
+
+        if not documents:
+            return
+        # MySQL cannot name a conflict target; its ON DUPLICATE KEY UPDATE
+        # resolves on the unique `product` column by itself.
+        conflict_target = (
+            {"unique_fields": ["product"]} if self.connection.features.supports_update_conflicts_with_target else {}
+        )
+        ProductSearch.objects.bulk_create(
+            [
+                ProductSearch(product_id=document.product_id, store_id=document.store_id, search_text=document.search_text)
+                for document in documents
+            ],
+            update_conflicts=True,
+            update_fields=["store_id", "search_text", "updated_at"],
+            **conflict_target,
+        )
+
+    def remove(self, product_ids: list[int]) -> None:
+        from apps.storefront.models import ProductSearch
+
+        ProductSearch.objects.filter(product_id__in=product_ids).delete()
+
+    def search(self, *, store_id: int, query: str, limit: int) -> list[int]:
+        from apps.storefront.models import ProductSearch
+
+        tokens = query_tokens(query)
+        if not tokens:
+            return []
+        qs = ProductSearch.objects.filter(store_id=int(store_id))
+        for token in tokens:
+            qs = qs.filter(search_text__contains=token)
+        return list(qs.order_by("-product_id").values_list("product_id", flat=True)[:limit])
+
+
+class SQLiteSearchBackend(DatabaseSearchBackend):
+    vendor = "sqlite"
+    table = "storefront_product_fts"
+
+    # The FTS table lives outside the migration graph (Django cannot describe
+    # virtual tables), so every operation makes sure it exists; this is a
+    # schema lookup on SQLite and keeps fresh test databases working.
+    def ensure_schema(self) -> None:
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+                "product_id UNINDEXED, store_id UNINDEXED, name, sku, body, "
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            )
+
+    def index(self, documents: list[SearchDocument]) -> None:
+        super().index(documents)
+        if not documents:
+            return
+        self.ensure_schema()
+        with self.connection.cursor() as cursor:
+            self._delete(cursor, [document.product_id for document in documents])
+            cursor.executemany(
+                f"INSERT INTO {self.table} (product_id, store_id, name, sku, body) VALUES (%s, %s, %s, %s, %s)",
+                [
+                    (
+                        document.product_id,
+                        document.store_id,
+                        document.name,
+                        document.sku,
+                        " ".join(part for part in (document.description_ar, document.description_en) if part),
+                    )
+                    for document in documents
+                ],
+            )
+
+    def remove(self, product_ids: list[int]) -> None:
+        super().remove(product_ids)
+        if not product_ids:
+            return
+        self.ensure_schema()
+        with self.connection.cursor() as cursor:
+            self._delete(cursor, product_ids)
+
+    # `product_id` is UNINDEXED, so every DELETE scans the whole FTS table:
+    # delete a batch per statement instead of one statement per product.
+    def _delete(self, cursor, product_ids: list[int]) -> None:
+        ids = [int(pk) for pk in product_ids]
+        for start in range(0, len(ids), 500):
+            batch = ids[start : start + 500]
+            placeholders = ", ".join(["%s"] * len(batch))
+            cursor.execute(f"DELETE FROM {self.table} WHERE product_id IN ({placeholders})", batch)
+
+    def search(self, *, store_id: int, query: str, limit: int) -> list[int]:
+        tokens = query_tokens(query)
+        if not tokens:
+            return []
+        self.ensure_schema()
+        match = " AND ".join('"{}"*'.format(token.replace('"', '""')) for token in tokens)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT product_id FROM {self.table} WHERE {self.table} MATCH %s AND store_id = %s "
+                f"ORDER BY bm25({self.table}, 0, 0, 10.0, 8.0, 1.0), product_id DESC LIMIT %s",
+                [match, int(store_id), int(limit)],
+            )
+            return [int(row[0]) for row in cursor.fetchall()]
+
+
+class MySQLSearchBackend(DatabaseSearchBackend):
+    vendor = "mysql"
+    index_name = "storefront_search_text_ft"
+
+    # InnoDB leaves words shorter than innodb_ft_min_token_size (3 by
+    # default) out of FULLTEXT indexes; such tokens are matched with LIKE.
+    min_token_size = 3
+
+    def ensure_schema(self) -> None:
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM information_schema.statistics "
+                "WHERE table_schema = DATABASE() AND table_name = 'storefront_productsearch' AND index_name = %s",
+                [self.index_name],
+            )
+            if cursor.fetchone() is None:
+                cursor.execute(f"ALTER TABLE storefront_productsearch ADD FULLTEXT INDEX {self.index_name} (search_text)")
+
+    def search(self, *, store_id: int, query: str, limit: int) -> list[int]:
+        tokens = query_tokens(query)
+        indexed = [token for token in tokens if len(token) >= self.min_token_size]
+        if not indexed:
+            return super().search(store_id=store_id, query=query, limit=limit)
+        match = " ".join(f"+{token}*" for token in indexed)
+        short_filters = "".join(" AND search_text LIKE %s" for token in tokens if token not in indexed)
+        short_params = [f"%{token}%" for token in tokens if token not in indexed]
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT product_id FROM storefront_productsearch "
+                "WHERE store_id = %s AND MATCH (search_text) AGAINST (%s IN BOOLEAN MODE)"
+                f"{short_filters} "
+                "ORDER BY MATCH (search_text) AGAINST (%s IN BOOLEAN MODE) DESC, product_id DESC LIMIT %s",
+                [int(store_id), match, *short_params, match, int(limit)],
+            )
+            return [int(row[0]) for row in cursor.fetchall()]
+
+
+class PostgresSearchBackend(DatabaseSearchBackend):
+    vendor = "postgresql"
+
+    _VECTOR_SQL = (
+        "setweight(to_tsvector('simple', coalesce(%s, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(%s, '')), 'A') || "
+        "setweight(to_tsvector('arabic', coalesce(%s, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(%s, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(%s, '')), 'D')"
+    )
+
+    def ensure_schema(self) -> None:
+        with self.connection.cursor() as cursor:
+            cursor.execute("ALTER TABLE storefront_productsearch ADD COLUMN IF NOT EXISTS search_vector tsvector")
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS storefront_search_vector_gin "
+                "ON storefront_productsearch USING gin (search_vector)"
+            )
+
+    def index(self, documents: list[SearchDocument]) -> None:
+        super().index(documents)
+        if not documents:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"UPDATE storefront_productsearch SET search_vector = {self._VECTOR_SQL} WHERE product_id = %s",
+                [
+                    (
+                        document.name,
+                        document.sku,
+                        document.description_ar,
+                        document.description_en,
+                        document.search_text,
+                        document.product_id,
+                    )
+                    for document in documents
+                ],
+            )
+
+    def search(self, *, store_id: int, query: str, limit: int) -> list[int]:
+        tokens = query_tokens(query)
+        if not tokens:
+            return []
+        prefix_query = " & ".join(f"{token}:*" for token in tokens)
+        plain_query = " ".join(tokens)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT product_id FROM storefront_productsearch, "
+                "(SELECT to_tsquery('simple', %s) || plainto_tsquery('arabic', %s) || plainto_tsquery('english', %s) AS q) AS query "
+                "WHERE store_id = %s AND search_vector @@ query.q "
+                "ORDER BY ts_rank_cd(search_vector, query.q) DESC, product_id DESC LIMIT %s",
+                [prefix_query, plain_query, plain_query, int(store_id), int(limit)],
+            )
+            return [int(row[0]) for row in cursor.fetchall()]
+
+
+_BACKENDS = {
+    backend.vendor: backend for backend in (MySQLSearchBackend, SQLiteSearchBackend, PostgresSearchBackend)
+}
+
+
+def backend_for_connection(connection=default_connection) -> DatabaseSearchBackend:
+    return _BACKENDS.get(connection.vendor, DatabaseSearchBackend)(connection)
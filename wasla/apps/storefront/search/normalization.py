@@ -0,0 +1,44 @@
+"""Text normalization shared by the search index and search queries.
+
+Arabic text is folded so spelling variants match each other:
+- diacritics (tashkeel), superscript alef and tatweel are removed
+- أ إ آ ٱ -> ا,  ى -> ي,  ة -> ه,  ؤ -> و,  ئ -> ي
+Latin text is case-folded. Everything is NFKC-normalized first.
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+
+_ARABIC_DIACRITICS_RE = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+_ARABIC_FOLDING = str.maketrans({
+    "\u0623": "\u0627",  # hamza above alef -> alef
+    "\u0625": "\u0627",  # hamza below alef -> alef
+    "\u0622": "\u0627",  # madda alef -> alef
+    "\u0671": "\u0627",  # wasla alef -> alef
+    "\u0649": "\u064a",  # alef maksura -> ya
+    "\u0629": "\u0647",  # ta marbuta -> ha
+    "\u0624": "\u0648",  # hamza on waw -> waw
+    "\u0626": "\u064a",  # hamza on ya -> ya
+})
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+MAX_QUERY_TOKENS = 8
+
+
+def normalize_text(value: str | None) -> str:
+    text = unicodedata.normalize("NFKC", str(value or ""))
+    text = _ARABIC_DIACRITICS_RE.sub("", text)
+    return text.translate(_ARABIC_FOLDING).casefold()
+
+
+def tokenize(value: str | None) -> list[str]:
+    return _TOKEN_RE.findall(normalize_text(value))
+
+
+def query_tokens(query: str | None) -> list[str]:
+    """Distinct normalized query tokens, in order, capped at MAX_QUERY_TOKENS."""
+    seen: dict[str, None] = {}
+    for token in tokenize(query):
+        seen.setdefault(token, None)
+    return list(seen)[:MAX_QUERY_TOKENS]
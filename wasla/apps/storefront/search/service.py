@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import logging
+
+from django.conf import settings
+from django.db import DatabaseError, connections, router, transaction
+
+from .backends import DatabaseSearchBackend, SearchDocument, backend_for_connection
+
+logger = logging.getLogger("wasla.performance")
+
+
+def get_search_backend() -> DatabaseSearchBackend:
+    """Backend for the database holding ProductSearch (STOREFRONT_SEARCH_BACKEND=auto|database)."""
+    from apps.storefront.models import ProductSearch
+
+    connection = connections[router.db_for_write(ProductSearch)]
+    if getattr(settings, "STOREFRONT_SEARCH_BACKEND", "auto") == "database":
+        return DatabaseSearchBackend(connection)
+    return backend_for_connection(connection)
+
+
+def index_products(products) -> None:
+    documents = [SearchDocument.from_product(product) for product in products]
+    if documents:
+        get_search_backend().index(documents)
+
+
+def try_index_products(products) -> bool:
+    """
+    Index `products` without failing the caller's write.
+
+    The index runs in a savepoint, so a failure rolls back only the index
+    rows and leaves them for `rebuild_search_index` to repair.
+    """
+    products = list(products)
+    try:
+        with transaction.atomic():
+            index_products(products)
+    except DatabaseError:
+        logger.exception("storefront_search_index_failed", extra={"product_ids": [product.pk for product in products]})
+        return False
+    return True
+
+
+def remove_products(product_ids) -> None:
+    product_ids = [int(pk) for pk in product_ids]
+    if product_ids:
+        get_search_backend().remove(product_ids)
+
+
+def search_product_ids(*, store_id: int, query: str, limit: int | None = None) -> list[int]:
+    """Product ids of one store matching `query`, best match first."""
+    if limit is None:
+        limit = int(getattr(settings, "STOREFRONT_SEARCH_MAX_RESULTS", 1000) or 1000)
+    return get_search_backend().search(store_id=int(store_id), query=query, limit=limit)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from apps.catalog.models import Inventory, Product, ProductImage, ProductVariant
+from core.infrastructure.store_cache import StoreCacheService
+
+from .models import ProductSEO
+from .read_models import schedule_read_model_refresh
+from .search import remove_products, try_index_products
+
+SEARCHABLE_PRODUCT_FIELDS = frozenset({"store_id", "name", "sku", "description_ar", "description_en"})
+READ_MODEL_PRODUCT_FIELDS = frozenset({"store_id", "name", "sku", "price", "image", "is_active", "visibility"})
+
+
+@receiver(post_save, sender=Product)
+def index_saved_product(sender, instance: Product, raw: bool = False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is None or READ_MODEL_PRODUCT_FIELDS.intersection(update_fields):
+        schedule_read_model_refresh([instance.pk])
+    if update_fields is not None and not SEARCHABLE_PRODUCT_FIELDS.intersection(update_fields):
+        return
+    try_index_products([instance])
+
+
+@receiver(post_delete, sender=Product)
+def remove_deleted_product(sender, instance: Product, **kwargs):
+    remove_products([instance.pk])
+
+
+@receiver(m2m_changed, sender=Product.categories.through)
+def refresh_category_read_models(sender, instance, action: str, reverse: bool, pk_set=None, **kwargs):
+    # post_clear carries no pk_set, so a cleared category refreshes its products on pre_clear.
+    if reverse and action == "pre_clear":
+        schedule_read_model_refresh(instance.products.values_list("id", flat=True))
+    elif not reverse and action in ("post_add", "post_remove", "post_clear"):
+        schedule_read_model_refresh([instance.pk])
+    elif reverse and action in ("post_add", "post_remove") and pk_set:
+        schedule_read_model_refresh(pk_set)
+
+
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_save, sender=ProductSEO)
+def refresh_product_read_models(sender, instance, raw: bool = False, **kwargs):
+    if not raw:
+        schedule_read_model_refresh([instance.product_id])
+
+
+@receiver(post_delete, sender=ProductVariant)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_delete, sender=ProductSEO)
+@receiver(post_delete, sender=Inventory)
+def refresh_product_read_models_after_delete(sender, instance, **kwargs):
+    # Deleting a product removes these rows first; refreshing on commit keeps
+    # them from re-inserting read model rows for the product being deleted.
+    transaction.on_commit(partial(schedule_read_model_refresh, [instance.product_id]))
+
+
+@receiver(m2m_changed, sender=ProductVariant.options.through)
+def refresh_variant_option_read_models(sender, instance, action: str, reverse: bool, pk_set=None, **kwargs):
+    if reverse and action == "pre_clear":
+        schedule_read_model_refresh(instance.variants.values_list("product_id", flat=True))
+    elif not reverse and action in ("post_add", "post_remove", "post_clear"):
+        schedule_read_model_refresh([instance.product_id])
+    elif reverse and action in ("post_add", "post_remove") and pk_set:
+        schedule_read_model_refresh(ProductVariant.objects.filter(id__in=pk_set).values_list("product_id", flat=True))
+
+
+@receiver(post_save, sender=Inventory)
+def refresh_inventory_read_models(sender, instance: Inventory, raw: bool = False, **kwargs):
+    if raw:
+        return
+    schedule_read_model_refresh([instance.product_id])
+    # Unlike product and variant saves, stock changes do not bump the catalog namespaces.
+    store_id = Product.objects.filter(pk=instance.product_id).values_list("store_id", flat=True).first()
+    if store_id is not None:
+        StoreCacheService.bump_namespace_version(store_id=store_id, namespace="storefront_products")
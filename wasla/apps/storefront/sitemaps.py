@@ -1,67 +1,320 @@
-"""Storefront sitemap for search engine optimization."""
-from django.contrib.sitemaps import Sitemap
+"""Per-store sitemaps, generated into storage and served as static files.
+
+Each store gets a sitemap index (`sitemap.xml`) and gzip shards of at most
+STOREFRONT_SITEMAP_MAX_URLS URLs (`sitemap-<section>-<n>.xml.gz`) under
+`<STOREFRONT_SITEMAP_DIR>/store_<id>/`. Every section is one annotated query
+(priority included) streamed straight into its shards.
+
+A manifest records the `storefront_products` namespace version, the base
+URL and a digest per shard. Once the namespace moves on, the existing files
+keep being served while one background worker regenerates them, rewriting
+only the shards whose content changed. Files live in default storage, so a
+front proxy may also serve them directly.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import tempfile
+from dataclasses import dataclass
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections
+from django.db.models import Case, Exists, FloatField, OuterRef, Value, When
 from django.urls import reverse
-from apps.catalog.models import Product, Category
-from apps.storefront.models import ProductSEO, CategorySEO
+from django.utils import timezone
+
+from apps.catalog.models import Product
+from core.infrastructure.store_cache import StoreCacheService, get_refresh_executor
+
+from .models import CategorySEO, StorefrontProductView
+
+logger = logging.getLogger("wasla.performance")
+
+SITEMAP_NAMESPACE = "storefront_products"
+INDEX_NAME = "sitemap.xml"
+MANIFEST_NAME = "manifest.json"
+# Protocol limit for URLs in one sitemap file.
+MAX_URLS_PER_SHARD = 50_000
+
+_URLSET_OPEN = '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+_URLSET_CLOSE = "</urlset>\n"
+
+
+@dataclass
+class SitemapBuild:
+    urls: int
+    shards: int
+    written: int
+
+
+def max_urls_per_shard() -> int:
+    configured = int(getattr(settings, "STOREFRONT_SITEMAP_MAX_URLS", MAX_URLS_PER_SHARD) or MAX_URLS_PER_SHARD)
+    return max(1, min(configured, MAX_URLS_PER_SHARD))
+
+
+def sitemap_dir(store_id: int) -> str:
+    root = str(getattr(settings, "STOREFRONT_SITEMAP_DIR", "sitemaps") or "sitemaps").strip("/")
+    return f"{root}/store_{int(store_id)}"
+
+
+def store_base_url(store) -> str:
+    scheme = getattr(settings, "STOREFRONT_SITEMAP_SCHEME", "https") or "https"
+    return f"{scheme}://{store.get_display_domain()}"
+
+
+def _slug_path(url_name: str) -> str:
+    """URL path format string for a slug route, reversed once per section."""
+    return reverse(url_name, kwargs={"slug": "slug-placeholder"}).replace("slug-placeholder", "{slug}")
+
+
+def _page_entries(store_id: int):
+    yield reverse("storefront:home"), None, "daily", 1.0
+
+
+def _category_entries(store_id: int):
+    listed_products = Product.categories.through.objects.filter(
+        category_id=OuterRef("category_id"),
+        product__is_active=True,
+        product__visibility=Product.VISIBILITY_ENABLED,
+    )
+    rows = (
+        CategorySEO.objects.filter(category__store_id=store_id)
+        .annotate(
+            priority=Case(
+                When(Exists(listed_products), then=Value(0.8)),
+                default=Value(0.5),
+                output_field=FloatField(),
+            )
+        )
+        .order_by("category_id")
+        .values_list("slug", "updated_at", "priority")
+    )
+    path = _slug_path("storefront:category")
+    for slug, updated_at, priority in rows.iterator(chunk_size=2000):
+        yield path.format(slug=quote(slug)), updated_at, "weekly", priority
+
+
+def _product_entries(store_id: int):
+    rows = (
+        StorefrontProductView.objects.filter(store_id=store_id, is_listed=True)
+        .exclude(slug="")
+        .annotate(
+            priority=Case(
+                When(has_variants=True, then=Value(0.7)),
+                default=Value(0.6),
+                output_field=FloatField(),
+            )
+        )
+        .order_by("pk")
+        .values_list("slug", "updated_at", "priority")
+    )
+    path = _slug_path("storefront:product_detail")
+    for slug, updated_at, priority in rows.iterator(chunk_size=2000):
+        yield path.format(slug=quote(slug)), updated_at, "weekly", priority
+
+
+# Ordered by pk so new products land in the last shard and leave earlier shards unchanged.
+SECTIONS = (
+    ("pages", _page_entries),
+    ("categories", _category_entries),
+    ("products", _product_entries),
+)
+
+
+def _url_element(base_url: str, path: str, lastmod, changefreq: str, priority: float) -> str:
+    parts = [f"<url><loc>{escape(base_url + path)}</loc>"]
+    if lastmod is not None:
+        parts.append(f"<lastmod>{lastmod.date().isoformat()}</lastmod>")
+    parts.append(f"<changefreq>{changefreq}</changefreq><priority>{priority:.1f}</priority></url>\n")
+    return "".join(parts)
+
+
+class _Shard:
+    """One gzip shard spooled to a temporary file while its digest is computed."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.urls = 0
+        self.lastmod = None
+        self._digest = hashlib.sha256()
+        self._file = tempfile.TemporaryFile()
+        # mtime=0 keeps the bytes stable for unchanged content.
+        self._gzip = gzip.GzipFile(fileobj=self._file, mode="wb", mtime=0)
+        self._write(_URLSET_OPEN)
+
+    def _write(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self._digest.update(data)
+        self._gzip.write(data)
+
+    def add(self, element: str, lastmod) -> None:
+        self._write(element)
+        self.urls += 1
+        if lastmod is not None and (self.lastmod is None or lastmod > self.lastmod):
+            self.lastmod = lastmod
+
+    def finish(self) -> str:
+        self._write(_URLSET_CLOSE)
+        self._gzip.close()
+        self._file.seek(0)
+        return self._digest.hexdigest()
+
+    def save(self, path: str) -> None:
+        if default_storage.exists(path):
+            default_storage.delete(path)
+        default_storage.save(path, File(self._file, name=path))
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def load_manifest(store_id: int) -> dict | None:
+    path = f"{sitemap_dir(store_id)}/{MANIFEST_NAME}"
+    if not default_storage.exists(path):
+        return None
+    try:
+        with default_storage.open(path, "rb") as handle:
+            manifest = json.loads(handle.read().decode("utf-8"))
+    except (OSError, ValueError):
+        return None
+    return manifest if isinstance(manifest, dict) else None
+
+
+def _replace(path: str, content: bytes) -> None:
+    if default_storage.exists(path):
+        default_storage.delete(path)
+    default_storage.save(path, ContentFile(content))
+
+
+def generate_store_sitemap(store) -> SitemapBuild:
+    """Write the sitemap index and shards of `store`, skipping unchanged shards."""
+    store_id = int(store.id)
+    # Read before querying: a change made during generation leaves the result stale.
+    version = StoreCacheService.get_namespace_version(store_id=store_id, namespace=SITEMAP_NAMESPACE)
+    base_url = store_base_url(store)
+    directory = sitemap_dir(store_id)
+    previous = load_manifest(store_id) or {}
+    previous_digests = previous.get("shards", {}) if previous.get("base_url") == base_url else {}
+    limit = max_urls_per_shard()
+
+    digests: dict[str, str] = {}
+    index_entries: list[tuple[str, object]] = []
+    urls = written = 0
+
+    def flush(shard: _Shard) -> None:
+        nonlocal written
+        try:
+            digest = shard.finish()
+            path = f"{directory}/{shard.name}"
+            if previous_digests.get(shard.name) != digest or not default_storage.exists(path):
+                shard.save(path)
+                written += 1
+            digests[shard.name] = digest
+            index_entries.append((shard.name, shard.lastmod))
+        finally:
+            shard.close()
+
+    for section, entries in SECTIONS:
+        shard = None
+        number = 0
+        for path, lastmod, changefreq, priority in entries(store_id):
+            if shard is None or shard.urls >= limit:
+                if shard is not None:
+                    flush(shard)
+                number += 1
+                shard = _Shard(f"sitemap-{section}-{number}.xml.gz")
+            shard.add(_url_element(base_url, path, lastmod, changefreq, priority), lastmod)
+            urls += 1
+        if shard is not None:
+            flush(shard)
 
+    for name in set(previous.get("shards", {})) - set(digests):
+        stale = f"{directory}/{name}"
+        if default_storage.exists(stale):
+            default_storage.delete(stale)
 
-class StorefrontHomeSitemap(Sitemap):
-    """Sitemap for storefront home page."""
-    changefreq = "daily"
-    priority = 1.0
+    index = ['<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+    for name, lastmod in index_entries:
+        lastmod_tag = f"<lastmod>{lastmod.date().isoformat()}</lastmod>" if lastmod is not None else ""
+        index.append(f"<sitemap><loc>{escape(f'{base_url}/{name}')}</loc>{lastmod_tag}</sitemap>\n")
+    index.append("</sitemapindex>\n")
+    _replace(f"{directory}/{INDEX_NAME}", "".join(index).encode("utf-8"))
 
-    def items(self):
-        return [{"name": "storefront:home", "priority": 1.0}]
+    manifest = {
+        "version": version,
+        "base_url": base_url,
+        "shards": digests,
+        "generated_at": timezone.now().isoformat(),
+    }
+    _replace(f"{directory}/{MANIFEST_NAME}", json.dumps(manifest, sort_keys=True).encode("utf-8"))
+    return SitemapBuild(urls=urls, shards=len(digests), written=written)
 
-    def location(self, item):
-        return reverse(item["name"])
 
+def is_sitemap_current(store, manifest: dict | None) -> bool:
+    if not manifest or manifest.get("base_url") != store_base_url(store):
+        return False
+    version = StoreCacheService.get_namespace_version(store_id=int(store.id), namespace=SITEMAP_NAMESPACE)
+    return manifest.get("version") == version
 
-class CategorySitemap(Sitemap):
-    """Sitemap for product categories."""
-    changefreq = "weekly"
-    priority = 0.8
 
-    def items(self):
-        return CategorySEO.objects.all().select_related("category").order_by("-category__id")
+def _lock_key(store_id: int) -> str:
+    return f"storefront:sitemap:lock:{int(store_id)}"
 
-    def location(self, item):
-        return reverse("storefront:category", kwargs={"slug": item.slug})
 
-    def lastmod(self, item):
-        return item.updated_at
+def _regenerate(store_id: int) -> None:
+    from apps.stores.models import Store
 
-    def priority(self, item):
-        return 0.8 if item.category.products.count() > 0 else 0.5
+    try:
+        store = Store.objects.filter(pk=store_id).first()
+        if store is not None:
+            generate_store_sitemap(store)
+    except Exception:
+        logger.exception("storefront_sitemap_failed", extra={"store_id": store_id})
+    finally:
+        cache.delete(_lock_key(store_id))
 
 
-class ProductSitemap(Sitemap):
-    """Sitemap for products."""
-    changefreq = "weekly"
-    priority = 0.7
+def _regenerate_in_background(store_id: int) -> None:
+    try:
+        _regenerate(store_id)
+    finally:
+        connections.close_all()
 
-    def items(self):
-        return ProductSEO.objects.filter(
-            product__is_active=True,
-            product__visibility=Product.VISIBILITY_ENABLED
-        ).select_related("product").order_by("-product__id")
 
-    def location(self, item):
-        return reverse("storefront:product_detail", kwargs={"slug": item.slug})
+def schedule_sitemap_regeneration(store_id: int) -> bool:
+    """Regenerate one store's sitemap unless a regeneration is already running.
 
-    def lastmod(self, item):
-        return item.updated_at
+    Runs on the store cache refresh pool when STORE_CACHE_REFRESH_ASYNC is on,
+    inline otherwise.
+    """
+    lock_ttl = int(getattr(settings, "STOREFRONT_SITEMAP_LOCK_TTL_SECONDS", 600) or 600)
+    if not cache.add(_lock_key(store_id), 1, timeout=lock_ttl):
+        return False
+    if getattr(settings, "STORE_CACHE_REFRESH_ASYNC", False):
+        get_refresh_executor().submit(_regenerate_in_background, int(store_id))
+    else:
+        _regenerate(int(store_id))
+    return True
 
-    def priority(self, item):
-        # Higher priority for featured products
-        if item.product.variants.exists():
-            return 0.7
-        return 0.6
 
+def ensure_store_sitemap(store) -> bool:
+    """Schedule a regeneration of missing or stale sitemap files.
 
-# Sitemap index
-sitemaps = {
-    "home": StorefrontHomeSitemap,
-    "categories": CategorySitemap,
-    "products": ProductSitemap,
-}
+    Both go through the regeneration lock, so concurrent requests never
+    build one store's sitemap twice. Returns whether a build exists to serve;
+    a stale one is served until its regeneration finishes.
+    """
+    manifest = load_manifest(int(store.id))
+    if manifest is not None and is_sitemap_current(store, manifest):
+        return True
+    schedule_sitemap_regeneration(int(store.id))
+    return manifest is not None or load_manifest(int(store.id)) is not None
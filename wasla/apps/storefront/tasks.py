@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+try:
+    from celery import shared_task
+except Exception:  # pragma: no cover
+    def shared_task(*_args, **_kwargs):
+        def _decorator(func):
+            func.delay = func
+            return func
+        return _decorator
+
+from .related import refresh_stale_related_items
+
+
+@shared_task
+def refresh_related_products(store_id: int | None = None) -> dict:
+    refreshed = refresh_stale_related_items(store_id=store_id)
+    return {"refreshed": refreshed}
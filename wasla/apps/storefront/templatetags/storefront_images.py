@@ -0,0 +1,55 @@
+"""Responsive product images built from ProductImage derivative manifests."""
+from __future__ import annotations
+
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+
+register = template.Library()
+
+# `sizes` hint per layout slot; browsers pick the smallest derivative that fills it.
+SIZES = {
+    "thumb": "80px",
+    "card": "(min-width: 992px) 25vw, (min-width: 576px) 50vw, 100vw",
+    "detail": "(min-width: 992px) 40vw, 100vw",
+    "zoom": "100vw",
+}
+
+
+def _url(image) -> str:
+    if not image:
+        return ""
+    return image.url if hasattr(image, "url") else default_storage.url(str(image))
+
+
+@register.simple_tag
+def responsive_image(image, derivatives=None, preset="card", alt="", css_class="", style=""):
+    """`<picture>` with WebP and JPEG `srcset`s; a plain `<img>` until derivatives exist."""
+    sources = (derivatives or {}).get("sources") or {}
+    if not sources:
+        if not image:
+            return ""
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" style="{}" loading="lazy" decoding="async">',
+            _url(image), alt, css_class, style,
+        )
+
+    by_width = {entry["width"]: entry for entry in sources.values()}
+    widths = sorted(by_width)
+    fallback = sources.get(preset) or by_width[widths[-1]]
+    sizes = SIZES.get(preset, SIZES["card"])
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" class="{}" style="{}" '
+        'loading="lazy" decoding="async"></picture>',
+        ", ".join(f"{_url(by_width[width]['webp'])} {width}w" for width in widths),
+        sizes,
+        _url(fallback["jpeg"]),
+        ", ".join(f"{_url(by_width[width]['jpeg'])} {width}w" for width in widths),
+        sizes,
+        fallback["width"],
+        fallback["height"],
+        alt,
+        css_class,
+        style,
+    )
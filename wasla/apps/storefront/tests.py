@@ -1,5 +1,6 @@
 """Tests for storefront views and models."""
 from decimal import Decimal
+from io import StringIO
 from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth import get_user_model
@@ -9,7 +10,7 @@ from apps.customers.models import Customer
 from apps.orders.models import Order
 from apps.stores.models import Store
 from apps.tenants.models import Tenant
-from .models import ProductSEO, CategorySEO, StorefrontSettings
+from .models import ProductSEO, CategorySEO, ProductFacetValue, StorefrontProductView, StorefrontSettings
 
 User = get_user_model()
 
@@ -64,7 +65,7 @@ class StorefrontHomeViewTest(TestCase):
         )
 
         response = self.client.get(reverse("storefront:home"))
-        self.assertIn(product, response.context["products"])
+        self.assertIn(product.pk, [card.pk for card in response.context["products"]])
 
 
 class CategoryProductsViewTest(TestCase):
@@ -114,7 +115,7 @@ class CategoryProductsViewTest(TestCase):
         response = self.client.get(
             reverse("storefront:category", kwargs={"slug": "test-category"})
         )
-        self.assertIn(product, response.context["products"].object_list)
+        self.assertIn(product.pk, [card.pk for card in response.context["products"].object_list])
 
     def test_category_filters_by_price(self):
         """Test price filtering on category page."""
@@ -148,9 +149,9 @@ class CategoryProductsViewTest(TestCase):
         )
         self.assertEqual(response.status_code, 200)
         # Neither should be in results for 50-500 range
-        products = list(response.context["products"])
-        self.assertNotIn(cheap_product, products)
-        self.assertNotIn(expensive_product, products)
+        products = [card.pk for card in response.context["products"]]
+        self.assertNotIn(cheap_product.pk, products)
+        self.assertNotIn(expensive_product.pk, products)
 
 
 class ProductSearchViewTest(TestCase):
@@ -184,7 +185,7 @@ class ProductSearchViewTest(TestCase):
         ProductSEO.objects.create(product=product, slug="test-product")
 
         response = self.client.get(reverse("storefront:search"), {"q": "Test"})
-        self.assertIn(product, response.context["products"].object_list)
+        self.assertIn(product.pk, [card.pk for card in response.context["products"].object_list])
 
     def test_search_finds_products_by_sku(self):
         """Test that search finds products by SKU."""
@@ -199,7 +200,7 @@ class ProductSearchViewTest(TestCase):
         ProductSEO.objects.create(product=product, slug="product")
 
         response = self.client.get(reverse("storefront:search"), {"q": "ABC123"})
-        self.assertIn(product, response.context["products"].object_list)
+        self.assertIn(product.pk, [card.pk for card in response.context["products"].object_list])
 
     def test_search_returns_empty_without_query(self):
         """Test that search returns no results without query."""
@@ -378,3 +379,594 @@ class StorefrontSettingsTest(TestCase):
         """Test default VAT rate."""
         settings = StorefrontSettings.objects.create(store=self.store)
         self.assertEqual(settings.vat_rate, Decimal("0.15"))
+
+
+class StorefrontPageCacheTest(TestCase):
+    """Test the shared page cache for anonymous visitors."""
+
+    def setUp(self):
+        from types import SimpleNamespace
+
+        from django.contrib.auth.models import AnonymousUser
+        from django.core.cache import cache
+
+        cache.clear()
+        self.renders = 0
+        self.anonymous = AnonymousUser()
+        self.store = SimpleNamespace(id=4101)
+        self.tenant = SimpleNamespace(id=4102)
+
+    def _view(self):
+        from django.http import HttpResponse
+
+        from .page_cache import anonymous_page_cache, is_shared_render
+
+        @anonymous_page_cache
+        def view(request):
+            self.renders += 1
+            self.assertTrue(is_shared_render(request))
+            return HttpResponse(
+                '<form><input type="hidden" name="csrfmiddlewaretoken" value="secret-token"></form>'
+            )
+
+        return view
+
+    def _get(self, path="/store/", user=None, **extra):
+        from django.test import RequestFactory
+
+        request = RequestFactory().get(path, **extra)
+        request.store = self.store
+        request.tenant = self.tenant
+        request.user = user or self.anonymous
+        return request
+
+    def test_second_anonymous_request_is_served_without_rendering_or_queries(self):
+        view = self._view()
+        first = view(self._get())
+
+        with self.assertNumQueries(0):
+            second = view(self._get())
+
+        self.assertEqual(self.renders, 1)
+        self.assertEqual(first["X-Page-Cache"], "MISS")
+        self.assertEqual(second["X-Page-Cache"], "HIT")
+        self.assertEqual(first.content, second.content)
+        self.assertNotIn(b"secret-token", second.content)
+        self.assertIn(b"data-csrf-from-cookie", second.content)
+
+    def test_etag_revalidation_returns_not_modified(self):
+        view = self._view()
+        etag = view(self._get())["ETag"]
+
+        response = view(self._get(HTTP_IF_NONE_MATCH=etag))
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_query_is_normalized_and_namespace_bump_invalidates(self):
+        from core.infrastructure.store_cache import StoreCacheService
+
+        view = self._view()
+        view(self._get("/store/products/?page=2&q=shoe"))
+        view(self._get("/store/products/?q=shoe&utm_source=ad&page=2"))
+        self.assertEqual(self.renders, 1)
+
+        StoreCacheService.bump_namespace_version(store_id=self.store.id, namespace="storefront_products")
+        view(self._get("/store/products/?page=2&q=shoe"))
+        self.assertEqual(self.renders, 2)
+
+    def test_authenticated_visitors_bypass_cache(self):
+        from django.http import HttpResponse
+
+        from .page_cache import anonymous_page_cache, is_shared_render
+
+        user = User.objects.create_user(username="shopper", password="pass12345")
+
+        @anonymous_page_cache
+        def view(request):
+            self.renders += 1
+            self.assertFalse(is_shared_render(request))
+            return HttpResponse("private")
+
+        view(self._get(user=user))
+        response = view(self._get(user=user))
+
+        self.assertEqual(self.renders, 2)
+        self.assertNotIn("X-Page-Cache", response)
+
+
+class ProductSearchIndexTest(TestCase):
+    """Test the per-store product search index."""
+
+    def _product(self, store_id, sku, name, **extra):
+        return Product.objects.create(store_id=store_id, sku=sku, name=name, price=Decimal("10.00"), **extra)
+
+    def test_normalization_folds_arabic_variants(self):
+        from .search import normalize_text
+
+        self.assertEqual(normalize_text("أَحْمَد"), "احمد")
+        self.assertEqual(normalize_text("قهوة"), normalize_text("قهوه"))
+        self.assertEqual(normalize_text("مصطفى"), "مصطفي")
+        self.assertEqual(normalize_text("CAFÉ"), "café")
+
+    def test_prefix_search_is_ranked_and_scoped_to_store(self):
+        from .search import search_product_ids
+
+        by_name = self._product(71, "SKU-1", "Coffee Beans")
+        by_description = self._product(71, "SKU-2", "Mug", description_en="Perfect for coffee lovers")
+        self._product(72, "SKU-3", "Coffee Beans")
+
+        self.assertEqual(search_product_ids(store_id=71, query="cof"), [by_name.id, by_description.id])
+        self.assertEqual(search_product_ids(store_id=71, query="tea"), [])
+
+    def test_arabic_query_matches_spelling_variants(self):
+        from .search import search_product_ids
+
+        product = self._product(73, "SKU-AR", "قهوة عربية")
+
+        self.assertEqual(search_product_ids(store_id=73, query="قهوه"), [product.id])
+
+    def test_index_follows_product_saves_and_deletes(self):
+        from .search import search_product_ids
+
+        product = self._product(74, "SKU-4", "Green Tea")
+        product.name = "Black Tea"
+        product.save(update_fields=["name"])
+
+        self.assertEqual(search_product_ids(store_id=74, query="black"), [product.id])
+        self.assertEqual(search_product_ids(store_id=74, query="green"), [])
+
+        product_id = product.id
+        product.delete()
+        self.assertEqual(search_product_ids(store_id=74, query="tea"), [])
+        self.assertNotIn(product_id, search_product_ids(store_id=74, query="black"))
+
+    def test_index_failure_does_not_fail_the_product_save(self):
+        from unittest import mock
+
+        from django.db import DatabaseError
+
+        from .search import SQLiteSearchBackend, search_product_ids
+
+        with mock.patch.object(SQLiteSearchBackend, "index", side_effect=DatabaseError("index unavailable")):
+            product = self._product(75, "SKU-5", "Oolong Tea")
+
+        self.assertTrue(Product.objects.filter(pk=product.pk).exists())
+        self.assertEqual(search_product_ids(store_id=75, query="oolong"), [])
+
+    def test_migration_backfills_existing_products(self):
+        import importlib
+        from types import SimpleNamespace
+
+        from django.apps import apps as django_apps
+        from django.db import connection
+
+        from .models import ProductSearch
+        from .search import search_product_ids
+
+        product = self._product(76, "SKU-6", "قهوة Espresso")
+        ProductSearch.objects.filter(product=product).update(store_id=0, search_text="")
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM storefront_product_fts WHERE product_id = %s", [product.id])
+
+        migration = importlib.import_module("apps.storefront.migrations.0002_productsearch_store_fulltext")
+        # The backfill only reads the editor's connection; SQLite cannot open a
+        # schema editor inside the test transaction.
+        migration.backfill_search_index(django_apps, SimpleNamespace(connection=connection))
+
+        row = ProductSearch.objects.get(product=product)
+        self.assertEqual((row.store_id, row.search_text), (76, "قهوه espresso sku-6"))
+        self.assertEqual(search_product_ids(store_id=76, query="espresso"), [product.id])
+
+
+class KeysetPaginationTest(TestCase):
+    """Test cursor pagination over (sort key, id)."""
+
+    def setUp(self):
+        for index, price in enumerate(["5.00", "3.00", "3.00", "8.00", "3.00", "1.00", "8.00"]):
+            Product.objects.create(store_id=81, sku=f"KP-{index}", name=f"Product {index}", price=Decimal(price))
+        self.queryset = Product.objects.filter(store_id=81)
+        self.expected = list(self.queryset.order_by("price", "id").values_list("id", flat=True))
+
+    def _walk(self, window_pages):
+        from .pagination import KeysetPaginator, load_window, paginate
+
+        paginator = KeysetPaginator(self.queryset, sort="price")
+        window = load_window(paginator, per_page=2, pages=window_pages)
+        seen, after, pages = [], None, []
+        while True:
+            rows, state = paginate(paginator, window, per_page=2, after=after)
+            seen.extend(row[1] for row in rows)
+            pages.append(state)
+            if not state["has_next"]:
+                return seen, pages
+            after = state["next_cursor"]
+
+    def test_forward_walk_visits_every_product_once_in_order(self):
+        for window_pages in (1, 2, 10):
+            seen, pages = self._walk(window_pages)
+            self.assertEqual(seen, self.expected)
+            self.assertEqual(len(pages), 4)
+            self.assertFalse(pages[0]["has_previous"])
+
+    def test_window_pages_are_served_without_queries(self):
+        from .pagination import KeysetPaginator, load_window, paginate
+
+        paginator = KeysetPaginator(self.queryset, sort="price")
+        window = load_window(paginator, per_page=2, pages=2)
+        _, first = paginate(paginator, window, per_page=2)
+        with self.assertNumQueries(0):
+            rows, _ = paginate(paginator, window, per_page=2, after=first["next_cursor"])
+        self.assertEqual([row[1] for row in rows], self.expected[2:4])
+
+        _, second = paginate(paginator, window, per_page=2, after=first["next_cursor"])
+        with self.assertNumQueries(1):
+            rows, _ = paginate(paginator, window, per_page=2, after=second["next_cursor"])
+        self.assertEqual([row[1] for row in rows], self.expected[4:6])
+
+    def test_previous_cursor_returns_preceding_page(self):
+        from .pagination import KeysetPaginator, Window, encode_cursor, paginate
+
+        paginator = KeysetPaginator(self.queryset.order_by(), sort="-price")
+        expected = list(self.queryset.order_by("-price", "-id").values_list("price", "id"))
+        rows, state = paginate(paginator, Window(rows=[], complete=False), per_page=2, before=encode_cursor(expected[4]))
+        self.assertEqual([row[1] for row in rows], [expected[2][1], expected[3][1]])
+        self.assertTrue(state["has_previous"])
+        self.assertTrue(state["has_next"])
+
+    def test_invalid_cursor_and_per_page_fall_back_to_defaults(self):
+        from .pagination import KeysetPaginator, clamp_per_page, load_window, paginate
+
+        paginator = KeysetPaginator(self.queryset, sort="price")
+        window = load_window(paginator, per_page=2, pages=1)
+        rows, state = paginate(paginator, window, per_page=2, after="not-a-cursor")
+        self.assertEqual([row[1] for row in rows], self.expected[:2])
+        self.assertEqual(state["number"], 1)
+
+        self.assertEqual(clamp_per_page("abc", default=20, maximum=60), 20)
+        self.assertEqual(clamp_per_page("100000", default=20, maximum=60), 60)
+        self.assertEqual(clamp_per_page("-5", default=20, maximum=60), 1)
+
+
+class ProductFacetTest(TestCase):
+    """Test the materialized facet table and facet counts."""
+
+    def setUp(self):
+        from apps.catalog.models import Inventory, ProductOption, ProductOptionGroup
+
+        from .read_models import batched_read_model_refresh
+
+        owner = get_user_model().objects.create_user(username="facet-owner", password="pass")
+        tenant = Tenant.objects.create(name="Facet Tenant", slug="facet-tenant")
+        self.store = Store.objects.create(name="Facet Store", slug="facet-store", subdomain="facet-store", tenant=tenant, owner=owner)
+        self.category = Category.objects.create(store_id=self.store.id, name="Shirts")
+        color = ProductOptionGroup.objects.create(store=self.store, name="Color")
+        size = ProductOptionGroup.objects.create(store=self.store, name="Size", position=1)
+        self.red = ProductOption.objects.create(group=color, value="Red")
+        self.blue = ProductOption.objects.create(group=color, value="Blue")
+        self.large = ProductOption.objects.create(group=size, value="L")
+
+        with batched_read_model_refresh():
+            self.cheap = Product.objects.create(store_id=self.store.id, sku="F-1", name="Cheap", price=Decimal("20.00"))
+            self.cheap.categories.add(self.category)
+            variant = ProductVariant.objects.create(product=self.cheap, sku="F-1-R", stock_quantity=3)
+            variant.options.add(self.red, self.large)
+
+            self.pricey = Product.objects.create(store_id=self.store.id, sku="F-2", name="Pricey", price=Decimal("120.00"))
+            variant = ProductVariant.objects.create(product=self.pricey, sku="F-2-B", stock_quantity=0)
+            variant.options.add(self.blue)
+
+            self.plain = Product.objects.create(store_id=self.store.id, sku="F-3", name="Plain", price=Decimal("60.00"))
+            Inventory.objects.create(product=self.plain, quantity=4)
+
+    def _listed(self):
+        return Product.objects.filter(store_id=self.store.id, is_active=True, visibility=Product.VISIBILITY_ENABLED)
+
+    def test_facet_summary_counts_every_facet(self):
+        from .facets import facet_summary
+
+        summary = facet_summary(store_id=self.store.id, product_qs=self._listed())
+
+        self.assertEqual(summary["categories"], [{"id": self.category.id, "name": "Shirts", "count": 1}])
+        self.assertEqual([(band["min"], band["count"]) for band in summary["price_bands"]], [(Decimal("0"), 1), (Decimal("50"), 1), (Decimal("100"), 1)])
+        self.assertEqual(
+            [(group["name"], [(option["value"], option["count"]) for option in group["options"]]) for group in summary["option_groups"]],
+            [("Color", [("Blue", 1), ("Red", 1)]), ("Size", [("L", 1)])],
+        )
+        self.assertEqual(summary["in_stock"], 2)
+        self.assertEqual((summary["min_price"], summary["max_price"]), (Decimal("20.00"), Decimal("120.00")))
+
+    def test_option_and_stock_filters(self):
+        from .facets import filter_by_facets
+
+        def ids(option_ids=(), in_stock=False):
+            qs = filter_by_facets(self._listed(), store_id=self.store.id, option_ids=list(option_ids), in_stock=in_stock)
+            return set(qs.values_list("id", flat=True))
+
+        self.assertEqual(ids([self.red.id, self.blue.id]), {self.cheap.id, self.pricey.id})
+        self.assertEqual(ids([self.blue.id, self.large.id]), set())
+        self.assertEqual(ids(in_stock=True), {self.cheap.id, self.plain.id})
+
+    def test_inventory_and_visibility_changes_refresh_incrementally(self):
+        from .facets import facet_summary
+
+        self.plain.inventory.quantity = 0
+        self.plain.inventory.save()
+        self.assertFalse(ProductFacetValue.objects.filter(product=self.plain).exists())
+
+        variant = self.pricey.variants.get()
+        variant.stock_quantity = 5
+        variant.save()
+        summary = facet_summary(store_id=self.store.id, product_qs=self._listed())
+        self.assertEqual(summary["in_stock"], 2)
+        self.assertEqual(len(summary["price_bands"]), 2)
+
+
+class StorefrontProductViewTest(TestCase):
+    """Test the denormalized product card projection."""
+
+    def setUp(self):
+        from apps.catalog.models import Inventory
+
+        self.product = Product.objects.create(store_id=91, sku="PV-1", name="Lamp", price=Decimal("40.00"))
+        ProductSEO.objects.create(product=self.product, slug="lamp")
+        ProductVariant.objects.create(product=self.product, sku="PV-1-S", price_override=Decimal("35.00"), stock_quantity=0)
+        ProductVariant.objects.create(product=self.product, sku="PV-1-L", stock_quantity=2)
+        self.simple = Product.objects.create(store_id=91, sku="PV-2", name="Bulb", price=Decimal("5.00"))
+        Inventory.objects.create(product=self.simple, quantity=0)
+
+    def test_projection_holds_card_fields(self):
+        card = StorefrontProductView.objects.get(pk=self.product.pk)
+
+        self.assertEqual((card.name, card.sku, card.slug), ("Lamp", "PV-1", "lamp"))
+        self.assertEqual((card.min_price, card.max_price), (Decimal("35.00"), Decimal("40.00")))
+        self.assertTrue(card.has_variants)
+        self.assertTrue(card.in_stock)
+        self.assertEqual(card.stock_quantity, 2)
+        self.assertEqual(card.id, self.product.pk)
+
+        simple = StorefrontProductView.objects.get(pk=self.simple.pk)
+        self.assertFalse(simple.in_stock)
+        self.assertFalse(simple.is_listed)
+
+    def test_listing_page_is_one_query(self):
+        from .pagination import KeysetPaginator, load_window
+
+        listed = StorefrontProductView.objects.filter(store_id=91, is_listed=True)
+        with self.assertNumQueries(1):
+            window = load_window(KeysetPaginator(listed, sort="price"), per_page=10, pages=1)
+        self.assertEqual([row[1] for row in window.rows], [self.product.pk])
+
+    def test_bulk_rebuild_and_deletes(self):
+        from django.core.management import call_command
+
+        StorefrontProductView.objects.all().delete()
+        call_command("rebuild_read_models", "--store-id", "91", "--batch-size", "1", stdout=StringIO())
+        self.assertEqual(StorefrontProductView.objects.filter(store_id=91).count(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.delete()
+        self.assertFalse(StorefrontProductView.objects.filter(pk=self.product.pk).exists())
+        self.assertFalse(ProductFacetValue.objects.filter(product_id=self.product.pk).exists())
+
+    def test_migration_backfill_matches_the_live_projection(self):
+        import importlib
+
+        from django.apps import apps as django_apps
+
+        expected_views = list(StorefrontProductView.objects.order_by("pk").values())
+        expected_facets = set(ProductFacetValue.objects.values_list("product_id", "store_id", "facet", "value"))
+        StorefrontProductView.objects.all().delete()
+        ProductFacetValue.objects.all().delete()
+
+        migration = importlib.import_module("apps.storefront.migrations.0007_backfill_storefront_read_models")
+        migration.backfill_read_models(django_apps, None)
+
+        views = list(StorefrontProductView.objects.order_by("pk").values())
+        for row in expected_views + views:
+            row.pop("updated_at")
+        self.assertEqual(views, expected_views)
+        self.assertEqual(set(ProductFacetValue.objects.values_list("product_id", "store_id", "facet", "value")), expected_facets)
+        self.assertTrue(expected_facets)
+
+
+class StoreSitemapTest(TestCase):
+    """Test the generated per-store sitemap files."""
+
+    def setUp(self):
+        import tempfile
+
+        from django.core.cache import cache
+        from django.test import override_settings
+
+        cache.clear()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media.name, STOREFRONT_SITEMAP_MAX_URLS=2)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        owner = get_user_model().objects.create_user(username="sitemap-owner", password="x")
+        self.tenant = Tenant.objects.create(name="Sitemap Tenant", slug="sitemap-tenant")
+        self.store = Store.objects.create(
+            owner=owner, tenant=self.tenant, name="Sitemap Store", slug="sitemap-store", subdomain="maps"
+        )
+        category = Category.objects.create(store_id=self.store.id, name="Lamps")
+        CategorySEO.objects.create(category=category, slug="lamps")
+        empty = Category.objects.create(store_id=self.store.id, name="Empty")
+        CategorySEO.objects.create(category=empty, slug="empty")
+        self.products = []
+        for index in range(3):
+            product = Product.objects.create(
+                store_id=self.store.id, sku=f"SM-{index}", name=f"Lamp {index}", price=Decimal("10.00")
+            )
+            ProductSEO.objects.create(product=product, slug=f"lamp-{index}")
+            self.products.append(product)
+        self.products[0].categories.add(category)
+        ProductVariant.objects.create(product=self.products[0], sku="SM-0-S", stock_quantity=1)
+        hidden = Product.objects.create(store_id=self.store.id, sku="SM-H", name="Hidden", price=Decimal("1.00"), is_active=False)
+        ProductSEO.objects.create(product=hidden, slug="hidden-lamp")
+        other = Product.objects.create(store_id=self.store.id + 1, sku="SM-O", name="Other", price=Decimal("1.00"))
+        ProductSEO.objects.create(product=other, slug="other-lamp")
+
+    def _read(self, name):
+        import gzip
+
+        from django.core.files.storage import default_storage
+
+        from .sitemaps import sitemap_dir
+
+        with default_storage.open(f"{sitemap_dir(self.store.id)}/{name}", "rb") as handle:
+            data = handle.read()
+        return (gzip.decompress(data) if name.endswith(".gz") else data).decode("utf-8")
+
+    def test_shards_are_scoped_gzipped_and_prioritized(self):
+        from .sitemaps import generate_store_sitemap
+
+        with self.assertNumQueries(2):
+            build = generate_store_sitemap(self.store)
+
+        self.assertEqual((build.urls, build.shards), (6, 4))
+        index = self._read("sitemap.xml")
+        for name in ("pages-1", "categories-1", "products-1", "products-2"):
+            self.assertIn(f"<loc>https://maps.w-sala.com/sitemap-{name}.xml.gz</loc>", index)
+
+        categories = self._read("sitemap-categories-1.xml.gz")
+        self.assertIn("<loc>https://maps.w-sala.com/store/category/lamps/</loc>", categories)
+        self.assertIn("<priority>0.8</priority>", categories)
+        self.assertIn("<priority>0.5</priority>", categories)
+
+        products = self._read("sitemap-products-1.xml.gz") + self._read("sitemap-products-2.xml.gz")
+        self.assertIn("/store/product/lamp-0/</loc><lastmod>", products)
+        self.assertEqual(products.count("<priority>0.7</priority>"), 1)
+        self.assertNotIn("hidden-lamp", products)
+        self.assertNotIn("other-lamp", products)
+
+    def test_regeneration_rewrites_changed_shards_only(self):
+        from .sitemaps import generate_store_sitemap
+
+        generate_store_sitemap(self.store)
+        self.assertEqual(generate_store_sitemap(self.store).written, 0)
+
+        product = Product.objects.create(store_id=self.store.id, sku="SM-3", name="Lamp 3", price=Decimal("10.00"))
+        ProductSEO.objects.create(product=product, slug="lamp-3")
+        build = generate_store_sitemap(self.store)
+        self.assertEqual(build.written, 1)
+        self.assertIn("lamp-3", self._read("sitemap-products-2.xml.gz"))
+
+    def test_view_serves_files_and_refreshes_stale_sitemaps(self):
+        from django.test import RequestFactory
+
+        from .views import sitemap_file
+
+        def get(filename="sitemap.xml"):
+            request = RequestFactory().get(f"/{filename}")
+            request.store = self.store
+            response = sitemap_file(request, filename)
+            return response, b"".join(response.streaming_content)
+
+        response, body = get()
+        self.assertEqual(response["Content-Type"], "application/xml")
+        self.assertIn(b"sitemap-products-2.xml.gz", body)
+
+        self.products[2].delete()
+        response, body = get()
+        self.assertNotIn(b"sitemap-products-2.xml.gz", body)
+
+        response, body = get("sitemap-products-1.xml.gz")
+        self.assertEqual(response["Content-Type"], "application/gzip")
+
+    def test_view_answers_503_while_the_first_build_is_locked(self):
+        from django.core.cache import cache
+        from django.test import RequestFactory
+
+        from .sitemaps import _lock_key, load_manifest
+        from .views import sitemap_file
+
+        request = RequestFactory().get("/sitemap.xml")
+        request.store = self.store
+        cache.add(_lock_key(self.store.id), 1)
+        response = sitemap_file(request, "sitemap.xml")
+        self.assertEqual((response.status_code, response["Retry-After"]), (503, "120"))
+        self.assertIsNone(load_manifest(self.store.id))
+
+        cache.delete(_lock_key(self.store.id))
+        self.assertEqual(sitemap_file(request, "sitemap.xml").status_code, 200)
+
+
+class RelatedProductsTest(TestCase):
+    """Test the precomputed related products."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.lamps = Category.objects.create(store_id=93, name="Lamps")
+        self.lamp = self._product("RL-1", "50.00", self.lamps)
+        self.close = self._product("RL-2", "55.00", self.lamps)
+        self.far = self._product("RL-3", "500.00", self.lamps)
+        self.bulb = self._product("RL-4", "5.00")
+        self.other_store = Product.objects.create(store_id=94, sku="RL-5", name="Other", price=Decimal("50.00"))
+
+    def _product(self, sku, price, category=None):
+        product = Product.objects.create(store_id=93, sku=sku, name=sku, price=Decimal(price))
+        ProductSEO.objects.create(product=product, slug=sku.lower())
+        if category is not None:
+            product.categories.add(category)
+        return product
+
+    def _order(self, *products):
+        from apps.orders.models import OrderItem
+
+        # bulk_create skips the analytics and email receivers, which need a full tenant setup.
+        if not hasattr(self, "customer"):
+            [self.customer] = Customer.objects.bulk_create(
+                [Customer(store_id=93, email="buyer@example.com", full_name="Buyer")]
+            )
+        [order] = Order.objects.bulk_create(
+            [Order(store_id=93, order_number=f"RL-{Order.objects.count() + 1}", customer=self.customer)]
+        )
+        OrderItem.objects.bulk_create(
+            [OrderItem(order=order, product=product, quantity=1, price=product.price) for product in products]
+        )
+
+    def test_catalog_changes_mark_rows_stale_and_ranking_mixes_signals(self):
+        from .models import ProductRelatedItems
+        from .related import refresh_stale_related_items, related_product_ids
+
+        self.assertTrue(ProductRelatedItems.objects.get(pk=self.lamp.pk).is_stale)
+        self._order(self.lamp, self.bulb)
+        self._order(self.lamp, self.bulb)
+
+        refresh_stale_related_items()
+        self.assertFalse(ProductRelatedItems.objects.filter(is_stale=True).exists())
+        self.assertEqual(related_product_ids(self.lamp.pk), [self.close.pk, self.far.pk, self.bulb.pk])
+        self.assertEqual(related_product_ids(self.bulb.pk), [self.lamp.pk])
+
+        self.close.is_active = False
+        self.close.save()
+        self.assertTrue(ProductRelatedItems.objects.get(pk=self.close.pk).is_stale)
+        self.assertFalse(ProductRelatedItems.objects.get(pk=self.lamp.pk).is_stale)
+
+    def test_new_orders_mark_products_stale(self):
+        from .models import ProductRelatedItems
+        from .related import refresh_stale_related_items, related_product_ids
+
+        refresh_stale_related_items()
+        self.assertNotIn(self.bulb.pk, related_product_ids(self.far.pk))
+
+        self._order(self.far, self.bulb)
+        self.assertEqual(refresh_stale_related_items(), 2)
+        self.assertIn(self.bulb.pk, related_product_ids(self.far.pk))
+        self.assertEqual(ProductRelatedItems.objects.get(pk=self.far.pk).related_ids, related_product_ids(self.far.pk))
+
+    def test_recommendation_rule_reads_precomputed_ids(self):
+        from apps.analytics.infrastructure.rules.recommendation_rules import recommend_for_product
+
+        from .related import refresh_stale_related_items
+
+        refresh_stale_related_items()
+        with self.assertNumQueries(2):
+            recommended = recommend_for_product(tenant_id=93, product_id=self.lamp.pk)
+        self.assertEqual(recommended, [self.close.pk, self.far.pk])
+        self.assertEqual(recommend_for_product(tenant_id=94, product_id=self.lamp.pk), [])
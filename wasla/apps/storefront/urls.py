@@ -11,6 +11,7 @@ urlpatterns = [
     path("store/category/<slug:slug>/", views.category_products, name="category"),
     path("store/search/", views.product_search, name="search"),
     path("store/product/<slug:slug>/", views.product_detail_sf, name="product_detail"),
+    path("store/cart/summary/", views.cart_fragment, name="cart_fragment"),
 
     # Customer account
     path("customer/orders/", views.customer_orders, name="customer_orders"),
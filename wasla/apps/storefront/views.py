@@ -4,10 +4,13 @@ from __future__ import annotations
 from decimal import Decimal
 from typing import Any
 
-from django.db.models import Q, Prefetch, F, DecimalField, Case, When, IntegerField, Min, Max
-from django.db.models.functions import Coalesce
-from django.http import HttpRequest, HttpResponse
+from django.conf import settings
+from django.db.models import Prefetch, Case, When, IntegerField
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpRequest, HttpResponse, JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
+from django.views.decorators.cache import never_cache
+from django.views.decorators.csrf import ensure_csrf_cookie
 from django.views.decorators.http import require_GET, require_http_methods
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
@@ -20,8 +23,23 @@ from apps.orders.models import Order
 from apps.stores.models import Store
 from apps.tenants.domain.tenant_context import TenantContext
 from apps.tenants.interfaces.web.decorators import resolve_tenant_for_request
-from core.infrastructure.store_cache import StoreCacheService
-from .models import ProductSEO, CategorySEO, StorefrontSettings, ProductSearch
+from core.infrastructure.store_cache import STOREFRONT_CACHE_NAMESPACES, StoreCacheService
+from .models import ProductSEO, CategorySEO, StorefrontSettings, ProductFacetValue, StorefrontProductView
+from .page_cache import anonymous_page_cache, is_shared_render
+from .facets import facet_summary, filter_by_facets, selected_option_ids
+from .pagination import (
+    SORT_FIELDS,
+    KeysetPage,
+    KeysetPaginator,
+    RankedPaginator,
+    clamp_per_page,
+    load_window,
+    paginate,
+    sort_ordering,
+)
+from .related import related_product_ids
+from .search import search_product_ids
+from .sitemaps import INDEX_NAME, ensure_store_sitemap, sitemap_dir
 
 
 def _build_tenant_context(request: HttpRequest) -> TenantContext:
@@ -42,7 +60,8 @@ def _build_tenant_context(request: HttpRequest) -> TenantContext:
     currency = getattr(tenant, "currency", "SAR")
     if not tenant_id or not store_id:
         raise CartError("Tenant context is required.")
-    if not request.session.session_key:
+    # Shared (page-cached) renders carry no visitor state, so no session is created for them.
+    if not request.session.session_key and not is_shared_render(request):
         request.session.save()
     session_key = request.session.session_key
     user_id = request.user.id if getattr(request, "user", None) and request.user.is_authenticated else None
@@ -57,13 +76,15 @@ def _build_tenant_context(request: HttpRequest) -> TenantContext:
 
 def _get_storefront_context(request: HttpRequest, tenant_ctx: TenantContext) -> dict:
     """Get common storefront context."""
-    try:
-        cart = GetCartUseCase.execute(tenant_ctx)
-        vat_rate = Decimal("0.15")
-        vat_amount = (cart.subtotal * vat_rate).quantize(Decimal("0.01"))
-    except CartError:
-        cart = None
-        vat_amount = Decimal("0.00")
+    cart = None
+    vat_amount = Decimal("0.00")
+    if not is_shared_render(request):
+        try:
+            cart = GetCartUseCase.execute(tenant_ctx)
+            vat_rate = Decimal("0.15")
+            vat_amount = (cart.subtotal * vat_rate).quantize(Decimal("0.01"))
+        except CartError:
+            cart = None
 
     store = getattr(request, "store", None)
     settings = StorefrontSettings.objects.filter(store_id=tenant_ctx.store_id).first()
@@ -80,6 +101,7 @@ def _get_storefront_context(request: HttpRequest, tenant_ctx: TenantContext) ->
 
 
 @require_GET
+@anonymous_page_cache
 def storefront_home(request: HttpRequest) -> HttpResponse:
     """Store homepage with featured products."""
     try:
@@ -90,15 +112,10 @@ def storefront_home(request: HttpRequest) -> HttpResponse:
     context = _get_storefront_context(request, tenant_ctx)
 
     # Get featured products (active, enabled visibility)
-    products = Product.objects.filter(
+    products = StorefrontProductView.objects.filter(
         store_id=tenant_ctx.store_id,
-        is_active=True,
-        visibility=Product.VISIBILITY_ENABLED,
-    ).prefetch_related(
-        "images",
-        "categories",
-        "variants"
-    ).order_by("-id")[:12]
+        is_listed=True,
+    ).order_by("-pk")[:12]
 
     context.update({
         "page_title": request.store.name if request.store else "Store",
@@ -110,20 +127,17 @@ def storefront_home(request: HttpRequest) -> HttpResponse:
 
 
 def _filtered_product_queryset(*, tenant_ctx: TenantContext, query: str | None = None, category_id: int | None = None):
-    qs = Product.objects.filter(
-        store_id=tenant_ctx.store_id,
-        is_active=True,
-        visibility=Product.VISIBILITY_ENABLED,
-    )
+    """Listed product cards of the store (StorefrontProductView rows)."""
+    qs = StorefrontProductView.objects.filter(store_id=tenant_ctx.store_id, is_listed=True)
     if query:
-        qs = qs.filter(
-            Q(name__icontains=query) |
-            Q(sku__icontains=query) |
-            Q(description_en__icontains=query) |
-            Q(description_ar__icontains=query)
-        )
+        qs = qs.filter(pk__in=search_product_ids(store_id=tenant_ctx.store_id, query=query))
     if category_id:
-        qs = qs.filter(categories__id=category_id)
+        in_category = ProductFacetValue.objects.filter(
+            store_id=tenant_ctx.store_id,
+            facet=ProductFacetValue.FACET_CATEGORY,
+            value=str(category_id),
+        )
+        qs = qs.filter(pk__in=in_category.values("product_id"))
     return qs
 
 
@@ -141,7 +155,24 @@ def _apply_price_filters(qs, min_price: str | None, max_price: str | None):
     return qs
 
 
+def _selected_facets(request: HttpRequest) -> tuple[list[int], bool]:
+    return selected_option_ids(request.GET.getlist("option")), request.GET.get("in_stock") == "1"
+
+
+def _cached_facets(*, store_id: int, product_qs, key_parts: list[str]) -> dict:
+    facets, _ = StoreCacheService.get_or_set(
+        store_id=store_id,
+        namespace="storefront_products",
+        key_parts=["facets", *key_parts],
+        producer=lambda: facet_summary(store_id=store_id, product_qs=product_qs),
+        timeout=180,
+        stale_ttl=60,
+    )
+    return facets
+
+
 @require_GET
+@anonymous_page_cache
 def product_list(request: HttpRequest) -> HttpResponse:
     """Display full product listing with pagination, search, and filters."""
     try:
@@ -149,6 +180,7 @@ def product_list(request: HttpRequest) -> HttpResponse:
     except CartError:
         return redirect("home")
 
+    StoreCacheService.prefetch_versions(store_id=tenant_ctx.store_id, namespaces=STOREFRONT_CACHE_NAMESPACES)
     context = _get_storefront_context(request, tenant_ctx)
     query = request.GET.get("q", "").strip()
     category_id = request.GET.get("category")
@@ -160,79 +192,106 @@ def product_list(request: HttpRequest) -> HttpResponse:
     except (TypeError, ValueError):
         category_id_int = None
 
-    sort_by = request.GET.get("sort", "-id")
-    if sort_by not in ["-id", "id", "price", "-price", "name", "-name"]:
+    # Searches are ordered by relevance unless the visitor picks another sort.
+    sort_by = request.GET.get("sort", "relevance" if query else "-id")
+    if sort_by not in SORT_FIELDS and not (query and sort_by == "relevance"):
         sort_by = "-id"
 
-    page = request.GET.get("page", 1)
-    per_page = int(request.GET.get("per_page", context["settings"].product_per_page))
+    per_page = clamp_per_page(
+        request.GET.get("per_page"),
+        default=context["settings"].product_per_page,
+        maximum=getattr(settings, "STOREFRONT_MAX_PER_PAGE", 60),
+    )
+    option_ids, in_stock_only = _selected_facets(request)
 
-    def _load_product_ids():
+    def _matching_products(*, with_query: bool):
         qs = _filtered_product_queryset(
             tenant_ctx=tenant_ctx,
-            query=query or None,
+            query=(query or None) if with_query else None,
             category_id=category_id_int,
         )
         qs = _apply_price_filters(qs, min_price, max_price)
-        qs = qs.order_by(sort_by).values_list("id", flat=True)
-        return list(qs)
+        return filter_by_facets(qs, store_id=tenant_ctx.store_id, option_ids=option_ids, in_stock=in_stock_only)
+
+    if sort_by == "relevance":
+        def _load_ranked_ids():
+            ranked_ids = search_product_ids(store_id=tenant_ctx.store_id, query=query)
+            matching = set(_matching_products(with_query=False).filter(pk__in=ranked_ids).values_list("pk", flat=True))
+            return [pk for pk in ranked_ids if pk in matching]
 
-    ids, _ = StoreCacheService.get_or_set(
+        paginator = RankedPaginator(_load_ranked_ids)
+    else:
+        paginator = KeysetPaginator(_matching_products(with_query=True), sort=sort_by)
+
+    filter_key_parts = [
+        f"q:{query or 'all'}",
+        f"c:{category_id_int or 'all'}",
+        f"min:{min_price or 'any'}",
+        f"max:{max_price or 'any'}",
+        f"o:{','.join(map(str, option_ids)) or 'any'}",
+        f"s:{int(in_stock_only)}",
+    ]
+
+    # Only the first few pages are cached; deeper cursors run one range query.
+    window, _ = StoreCacheService.get_or_set(
         store_id=tenant_ctx.store_id,
         namespace="storefront_products",
         key_parts=[
             "list",
             getattr(request, "LANGUAGE_CODE", "ar"),
-            f"q:{query or 'all'}",
-            f"c:{category_id_int or 'all'}",
-            f"min:{min_price or 'any'}",
-            f"max:{max_price or 'any'}",
+            *filter_key_parts,
             f"sort:{sort_by}",
+            f"pp:{per_page}",
         ],
-        producer=_load_product_ids,
+        producer=lambda: load_window(
+            paginator,
+            per_page=per_page,
+            pages=getattr(settings, "STOREFRONT_LISTING_CACHED_PAGES", 5),
+        ),
         timeout=180,
+        stale_ttl=60,
     )
 
-    paginator = Paginator(ids, per_page)
     try:
-        products_page = paginator.page(page)
-    except PageNotAnInteger:
-        products_page = paginator.page(1)
-    except EmptyPage:
-        products_page = paginator.page(paginator.num_pages)
+        page_number = int(request.GET.get("page", 1))
+    except (TypeError, ValueError):
+        page_number = 1
+    page_rows, page_state = paginate(
+        paginator,
+        window,
+        per_page=per_page,
+        after=request.GET.get("after"),
+        before=request.GET.get("before"),
+        number=page_number,
+    )
 
-    page_ids = list(products_page.object_list or [])
+    page_ids = [row[1] for row in page_rows]
     products = []
     if page_ids:
-        preserved = Case(*[When(id=pk, then=pos) for pos, pk in enumerate(page_ids)], output_field=IntegerField())
-        products = list(
-            Product.objects.filter(id__in=page_ids)
-            .prefetch_related("images", "categories", "variants")
-            .order_by(preserved)
-        )
+        preserved = Case(*[When(pk=pk, then=pos) for pos, pk in enumerate(page_ids)], output_field=IntegerField())
+        products = list(StorefrontProductView.objects.filter(pk__in=page_ids).order_by(preserved))
 
-    products_page.object_list = products
+    products_page = KeysetPage(products, params=dict(request.GET.lists()), **page_state)
 
     categories = Category.objects.filter(store_id=tenant_ctx.store_id)
-    category_ids = list(categories.values_list("id", flat=True))
-    price_stats = Product.objects.filter(
+    facets = _cached_facets(
         store_id=tenant_ctx.store_id,
-        is_active=True,
-        visibility=Product.VISIBILITY_ENABLED,
-    ).aggregate(
-        min_price=Coalesce(Min("price"), Decimal("0"), output_field=DecimalField()),
-        max_price=Coalesce(Max("price"), Decimal("0"), output_field=DecimalField()),
+        product_qs=_matching_products(with_query=True),
+        key_parts=filter_key_parts,
     )
 
     context.update({
         "page_title": f"Search: {query}" if query else "All Products",
         "products": products_page,
         "categories": categories,
+        "facets": facets,
+        "selected_options": option_ids,
+        "in_stock_only": in_stock_only,
         "current_sort": sort_by,
         "current_min_price": min_price,
         "current_max_price": max_price,
-        "min_product_price": price_stats.get("min_price", Decimal("0")),
-        "max_product_price": price_stats.get("max_price", Decimal("999999")),
+        "min_product_price": facets["min_price"],
+        "max_product_price": facets["max_price"],
         "query": query,
     })
 
@@ -240,6 +299,7 @@ def product_list(request: HttpRequest) -> HttpResponse:
 
 
 @require_GET
+@anonymous_page_cache
 def category_products(request: HttpRequest, slug: str) -> HttpResponse:
     """Display products in a category."""
     try:
@@ -259,26 +319,40 @@ def category_products(request: HttpRequest, slug: str) -> HttpResponse:
         tenant_ctx=tenant_ctx,
         query=None,
         category_id=category.id,
-    ).prefetch_related(
-        "images",
-        "categories",
-        "variants"
     )
 
     # Apply filters
     min_price = request.GET.get("min_price")
     max_price = request.GET.get("max_price")
+    option_ids, in_stock_only = _selected_facets(request)
 
     products = _apply_price_filters(products, min_price, max_price)
+    products = filter_by_facets(products, store_id=tenant_ctx.store_id, option_ids=option_ids, in_stock=in_stock_only)
+    facets = _cached_facets(
+        store_id=tenant_ctx.store_id,
+        product_qs=products,
+        key_parts=[
+            f"c:{category.id}",
+            f"min:{min_price or 'any'}",
+            f"max:{max_price or 'any'}",
+            f"o:{','.join(map(str, option_ids)) or 'any'}",
+            f"s:{int(in_stock_only)}",
+        ],
+    )
 
     # Apply sorting
     sort_by = request.GET.get("sort", "-id")
-    if sort_by in ["-id", "id", "price", "-price", "name", "-name"]:
-        products = products.order_by(sort_by)
+    if sort_by not in SORT_FIELDS:
+        sort_by = "-id"
+    products = products.order_by(*sort_ordering(*SORT_FIELDS[sort_by]))
 
     # Pagination
     page = request.GET.get("page", 1)
-    per_page = int(request.GET.get("per_page", context["settings"].product_per_page))
+    per_page = clamp_per_page(
+        request.GET.get("per_page"),
+        default=context["settings"].product_per_page,
+        maximum=getattr(settings, "STOREFRONT_MAX_PER_PAGE", 60),
+    )
     paginator = Paginator(products, per_page)
 
     try:
@@ -290,18 +364,6 @@ def category_products(request: HttpRequest, slug: str) -> HttpResponse:
 
     # Get all categories for sidebar
     categories = Category.objects.filter(store_id=tenant_ctx.store_id)
-    category_ids = list(categories.values_list("id", flat=True))
-
-    # Get price range
-    price_stats = Product.objects.filter(
-        store_id=tenant_ctx.store_id,
-        categories__in=category_ids,
-        is_active=True,
-        visibility=Product.VISIBILITY_ENABLED,
-    ).aggregate(
-        min_price=Coalesce(F("price"), Decimal("0"), output_field=DecimalField()),
-        max_price=Coalesce(F("price"), Decimal("0"), output_field=DecimalField()),
-    )
 
     context.update({
         "page_title": category.name,
@@ -309,8 +371,11 @@ def category_products(request: HttpRequest, slug: str) -> HttpResponse:
         "category_seo": category_seo,
         "products": products_page,
         "categories": categories,
-        "min_product_price": price_stats.get("min_price", Decimal("0")),
-        "max_product_price": price_stats.get("max_price", Decimal("999999")),
+        "facets": facets,
+        "selected_options": option_ids,
+        "in_stock_only": in_stock_only,
+        "min_product_price": facets["min_price"],
+        "max_product_price": facets["max_price"],
         "current_sort": sort_by,
         "current_min_price": min_price,
         "current_max_price": max_price,
@@ -326,6 +391,7 @@ def product_search(request: HttpRequest) -> HttpResponse:
 
 
 @require_GET
+@anonymous_page_cache
 def product_detail_sf(request: HttpRequest, slug: str) -> HttpResponse:
     """Display product detail page."""
     try:
@@ -343,23 +409,22 @@ def product_detail_sf(request: HttpRequest, slug: str) -> HttpResponse:
 
     # Get variants if any
     variants = product.variants.filter(is_active=True).prefetch_related("options")
+    gallery = list(product.images.all())
 
-    # Get related products (same category)
-    related_products = Product.objects.filter(
-        store_id=tenant_ctx.store_id,
-        is_active=True,
-        visibility=Product.VISIBILITY_ENABLED,
-        categories__in=product.categories.all(),
-    ).exclude(id=product.id).prefetch_related(
-        "images",
-        "variants"
-    ).distinct()[:4]
+    # Related products are precomputed (apps.storefront.related); rows unlisted since are skipped.
+    related_ids = related_product_ids(product.id)[:8]
+    cards = StorefrontProductView.objects.filter(
+        store_id=tenant_ctx.store_id, is_listed=True, pk__in=related_ids
+    ).exclude(slug="").in_bulk()
+    related_products = [cards[pk] for pk in related_ids if pk in cards][:4]
 
     context.update({
         "page_title": product_seo.meta_title,
         "product": product,
         "product_seo": product_seo,
         "variants": variants,
+        "gallery": gallery,
+        "primary_image": next((image for image in gallery if image.is_primary), None),
         "related_products": related_products,
         "in_stock": any(v.stock_quantity > 0 for v in variants) if variants else product.visibility == Product.VISIBILITY_ENABLED,
     })
@@ -367,6 +432,47 @@ def product_detail_sf(request: HttpRequest, slug: str) -> HttpResponse:
     return render(request, "storefront/product_detail.html", context)
 
 
+@require_GET
+@never_cache
+@ensure_csrf_cookie
+def cart_fragment(request: HttpRequest) -> HttpResponse:
+    """Per-visitor cart badge for page-cached storefront pages."""
+    empty = {"count": 0, "total": "0", "currency": getattr(getattr(request, "tenant", None), "currency", "SAR")}
+    # Visitors without a session cannot have a cart; don't create one just to say so.
+    if not request.session.session_key and not request.user.is_authenticated:
+        return JsonResponse(empty)
+    try:
+        tenant_ctx = _build_tenant_context(request)
+        cart = GetCartUseCase.execute(tenant_ctx)
+    except CartError:
+        return JsonResponse(empty)
+    return JsonResponse({
+        "count": len(cart.items),
+        "total": str(cart.total),
+        "currency": cart.currency,
+    })
+
+
+@require_GET
+def sitemap_file(request: HttpRequest, filename: str = INDEX_NAME) -> HttpResponse:
+    """Serve the store's generated sitemap index or one of its gzip shards."""
+    store = getattr(request, "store", None)
+    if store is None:
+        raise Http404("Store not found")
+    if not ensure_store_sitemap(store):
+        # The first build is running elsewhere; crawlers retry 503s later.
+        response = HttpResponse("Sitemap is being generated", status=503, content_type="text/plain")
+        response["Retry-After"] = "120"
+        return response
+    path = f"{sitemap_dir(store.id)}/{filename}"
+    if not default_storage.exists(path):
+        raise Http404("Sitemap not found")
+    content_type = "application/xml" if filename == INDEX_NAME else "application/gzip"
+    response = FileResponse(default_storage.open(path, "rb"), content_type=content_type)
+    response["Cache-Control"] = "public, max-age=3600"
+    return response
+
+
 @login_required
 def customer_orders(request: HttpRequest) -> HttpResponse:
     """Display customer's order history."""
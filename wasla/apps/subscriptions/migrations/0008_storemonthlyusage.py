@@ -0,0 +1,29 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("subscriptions", "0007_billing_system"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StoreMonthlyUsage",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("store_id", models.IntegerField()),
+                ("period", models.DateField(help_text="First day of the counted month.")),
+                ("orders_count", models.PositiveIntegerField(default=0)),
+                ("reconciled_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("store_id", "period"), name="uq_store_monthly_usage"),
+                ],
+                "indexes": [
+                    models.Index(fields=["period", "store_id"], name="sub_usage_period_store_idx"),
+                ],
+            },
+        ),
+    ]
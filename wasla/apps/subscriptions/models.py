@@ -79,6 +79,26 @@ class StoreSubscription(models.Model):
         ]
 
 
+class StoreMonthlyUsage(models.Model):
+    """Orders a store has placed in one calendar month, checked against `max_orders_monthly`."""
+
+    store_id = models.IntegerField()
+    period = models.DateField(help_text="First day of the counted month.")
+    orders_count = models.PositiveIntegerField(default=0)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["store_id", "period"], name="uq_store_monthly_usage"),
+        ]
+        indexes = [
+            models.Index(fields=["period", "store_id"], name="sub_usage_period_store_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Store {self.store_id} {self.period:%Y-%m}: {self.orders_count} orders"
+
+
 class PaymentTransaction(models.Model):
     """Manual (admin-recorded) payment for a subscription."""
     objects = TenantManager()
@@ -1,5 +1,11 @@
 from __future__ import annotations
 
+from datetime import date
+
+from django.conf import settings
+
+from core.infrastructure.store_cache import StoreCacheService
+
 from .exceptions import (
     NoActiveSubscriptionError,
     SubscriptionFeatureNotAllowedError,
@@ -8,6 +14,9 @@ from .exceptions import (
 from .feature_policy import FeaturePolicy
 from .subscription_service import SubscriptionService
 
+PLAN_LIMITS_NAMESPACE = "subscription_limits"
+LIMIT_FIELDS = ("max_products", "max_orders_monthly", "max_staff_users")
+
 
 class SubscriptionEntitlementService:
     @staticmethod
@@ -48,3 +57,46 @@ class SubscriptionEntitlementService:
         if current_usage + increment > limit:
             raise SubscriptionLimitExceededError(limit_field, int(limit), int(current_usage))
 
+    @staticmethod
+    def get_plan_limits(store_id: int) -> dict:
+        """
+        Cached snapshot of the active plan's limits for hot paths (checkout).
+
+        Stored under the `subscription_limits` namespace, which subscription
+        and plan signals bump; `end_date` is rechecked on every read so an
+        expired subscription stops counting as active without a write.
+        """
+        ttl = int(getattr(settings, "SUBSCRIPTION_LIMITS_CACHE_TTL", 300) or 300)
+        snapshot, _ = StoreCacheService.get_or_set(
+            store_id=int(store_id),
+            namespace=PLAN_LIMITS_NAMESPACE,
+            key_parts=["active"],
+            producer=lambda: _plan_limits_snapshot(store_id),
+            timeout=ttl,
+        )
+        if snapshot["end_date"] and date.fromisoformat(snapshot["end_date"]) < date.today():
+            return {**snapshot, "has_subscription": False}
+        return snapshot
+
+    @staticmethod
+    def get_limit_or_raise(store_id: int, limit_field: str) -> int | None:
+        """The active plan's `limit_field` from the cached snapshot; None means unlimited."""
+        snapshot = SubscriptionEntitlementService.get_plan_limits(store_id)
+        if not snapshot["has_subscription"]:
+            raise NoActiveSubscriptionError("No active subscription for this store")
+        if not snapshot["plan_active"]:
+            raise NoActiveSubscriptionError("Subscription plan is not active")
+        return snapshot["limits"].get(limit_field)
+
+
+def _plan_limits_snapshot(store_id: int) -> dict:
+    subscription = SubscriptionService.get_active_subscription(store_id)
+    if subscription is None:
+        return {"has_subscription": False, "plan_active": False, "end_date": None, "limits": {}}
+    plan = subscription.plan
+    return {
+        "has_subscription": True,
+        "plan_active": bool(getattr(plan, "is_active", True)),
+        "end_date": subscription.end_date.isoformat(),
+        "limits": {field: getattr(plan, field, None) for field in LIMIT_FIELDS},
+    }
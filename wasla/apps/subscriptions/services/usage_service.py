@@ -0,0 +1,154 @@
+"""
+Monthly usage counters for plan limits.
+
+`max_orders_monthly` is enforced against one `StoreMonthlyUsage` row per
+store and calendar month instead of counting the month's orders on every
+checkout:
+
+- Creating an order is a single conditional UPDATE
+  (`orders_count += 1 WHERE orders_count < limit`), so concurrent checkouts
+  can never overshoot the limit.
+- Cancelling an order gives its slot back to the month it was created in.
+- The row is seeded on first use from the month's non-cancelled orders, and
+  `reconcile()` recounts them periodically to repair drift (orders written
+  or cancelled outside the services).
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, time, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .exceptions import SubscriptionLimitExceededError
+from ..models import StoreMonthlyUsage
+
+logger = logging.getLogger("wasla.subscriptions")
+
+ORDERS_LIMIT_FIELD = "max_orders_monthly"
+
+
+def month_period(moment: datetime | None = None) -> date:
+    """First day of the month containing `moment` (now by default)."""
+    return (moment or timezone.now()).date().replace(day=1)
+
+
+def _month_bounds(period: date) -> tuple[datetime, datetime]:
+    next_period = (
+        period.replace(year=period.year + 1, month=1) if period.month == 12 else period.replace(month=period.month + 1)
+    )
+    tzinfo = dt_timezone.utc if settings.USE_TZ else None
+    return datetime.combine(period, time.min, tzinfo=tzinfo), datetime.combine(next_period, time.min, tzinfo=tzinfo)
+
+
+class MonthlyUsageService:
+    @staticmethod
+    def consume_order(
+        *, store_id: int, limit: int | None, now: datetime | None = None, order_id: int | None = None
+    ) -> None:
+        """
+        Count one more order for this month.
+
+        Call inside the transaction that creates the order, as its last
+        write: the counter row stays locked until commit. `order_id` is the
+        already inserted order being counted, left out when seeding the row.
+
+        Raises:
+            SubscriptionLimitExceededError: If the month already holds `limit` orders
+        """
+        period = month_period(now)
+        if not _increment(store_id, period, limit):
+            MonthlyUsageService._ensure_counter(store_id, period, exclude_order_id=order_id)
+            if not _increment(store_id, period, limit):
+                current = _counter(store_id, period).values_list("orders_count", flat=True).first() or 0
+                raise SubscriptionLimitExceededError(ORDERS_LIMIT_FIELD, int(limit), int(current))
+
+    @staticmethod
+    def release_order(*, store_id: int, created_at: datetime | None) -> None:
+        """Give back the slot of a cancelled order to the month it was created in."""
+        _counter(store_id, month_period(created_at)).filter(orders_count__gt=0).update(
+            orders_count=Greatest(F("orders_count") - 1, Value(0))
+        )
+
+    @staticmethod
+    def reconcile(*, period: date | None = None, store_id: int | None = None, batch_size: int = 500) -> int:
+        """
+        Recount the orders behind the counters of `period` (this month by default).
+
+        Counters are locked a batch at a time. Returns the number that had drifted.
+        """
+        period = period or month_period()
+        counters = StoreMonthlyUsage.objects.filter(period=period).order_by("id")
+        if store_id is not None:
+            counters = counters.filter(store_id=store_id)
+        corrected = 0
+        last_id = 0
+        while True:
+            with transaction.atomic():
+                batch = list(counters.select_for_update().filter(id__gt=last_id)[:batch_size])
+                if not batch:
+                    break
+                corrected += _reconcile_batch(batch, period)
+            last_id = batch[-1].id
+        return corrected
+
+    @staticmethod
+    def _ensure_counter(store_id: int, period: date, exclude_order_id: int | None = None) -> None:
+        StoreMonthlyUsage.objects.bulk_create(
+            [
+                StoreMonthlyUsage(
+                    store_id=store_id,
+                    period=period,
+                    orders_count=_count_orders([store_id], period, exclude_order_id).get(store_id, 0),
+                    reconciled_at=timezone.now(),
+                )
+            ],
+            ignore_conflicts=True,
+        )
+
+
+def _counter(store_id: int, period: date):
+    return StoreMonthlyUsage.objects.filter(store_id=store_id, period=period)
+
+
+def _increment(store_id: int, period: date, limit: int | None) -> bool:
+    counter = _counter(store_id, period)
+    if limit is not None:
+        counter = counter.filter(orders_count__lt=int(limit))
+    return bool(counter.update(orders_count=F("orders_count") + 1))
+
+
+def _count_orders(store_ids: list[int], period: date, exclude_order_id: int | None = None) -> dict[int, int]:
+    from apps.orders.models import Order
+
+    start, end = _month_bounds(period)
+    orders = Order.objects.filter(store_id__in=store_ids, created_at__gte=start, created_at__lt=end).exclude(
+        status="cancelled"
+    )
+    if exclude_order_id is not None:
+        orders = orders.exclude(id=exclude_order_id)
+    rows = orders.values("store_id").annotate(total=Count("id"))
+    return {row["store_id"]: int(row["total"]) for row in rows}
+
+
+def _reconcile_batch(batch: list[StoreMonthlyUsage], period: date) -> int:
+    counts = _count_orders([counter.store_id for counter in batch], period)
+    now = timezone.now()
+    drifted = 0
+    for counter in batch:
+        count = counts.get(counter.store_id, 0)
+        if counter.orders_count != count:
+            logger.warning(
+                "Monthly order usage drift corrected",
+                extra={"store_id": counter.store_id, "period": str(period), "orders": (counter.orders_count, count)},
+            )
+            drifted += 1
+        counter.orders_count = count
+        counter.reconciled_at = now
+    StoreMonthlyUsage.objects.bulk_update(batch, ["orders_count", "reconciled_at"])
+    return drifted
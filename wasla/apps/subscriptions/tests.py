@@ -2,18 +2,23 @@ import uuid
 from datetime import date, timedelta
 from decimal import Decimal
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from apps.catalog.services.product_service import ProductService
 from apps.customers.models import Customer
+from apps.orders.models import Order
+from apps.orders.services.order_lifecycle_service import OrderLifecycleService
 from apps.orders.services.order_service import OrderService
-from apps.subscriptions.models import StoreSubscription, SubscriptionPlan
+from apps.subscriptions.models import StoreMonthlyUsage, StoreSubscription, SubscriptionPlan
 from apps.subscriptions.services.exceptions import (
     NoActiveSubscriptionError,
     SubscriptionFeatureNotAllowedError,
     SubscriptionLimitExceededError,
 )
 from apps.subscriptions.services.entitlement_service import SubscriptionEntitlementService
+from apps.subscriptions.services.usage_service import MonthlyUsageService, month_period
 from apps.tenants.models import Tenant
 
 
@@ -130,3 +135,107 @@ class FeatureGatingTests(TestCase):
     def test_feature_gate_blocks_missing_feature(self):
         with self.assertRaises(SubscriptionFeatureNotAllowedError):
             SubscriptionEntitlementService.assert_feature_enabled(self.tenant.id, "advanced_ai")
+
+
+class MonthlyOrderUsageTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(
+            slug=f"u-{uuid.uuid4().hex[:8]}",
+            name="Usage Tenant",
+            is_active=True,
+        )
+        self.plan = SubscriptionPlan.objects.create(
+            name=f"UsagePlan-{uuid.uuid4().hex[:8]}",
+            price=0,
+            billing_cycle="monthly",
+            max_products=200,
+            max_orders_monthly=2,
+            is_active=True,
+        )
+        StoreSubscription.objects.create(
+            store_id=self.tenant.id,
+            plan=self.plan,
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=30),
+            status="active",
+        )
+        self.products = [
+            ProductService.create_product(
+                store_id=self.tenant.id,
+                sku=f"SKU-{index}",
+                name=f"P{index}",
+                price=Decimal("5.00"),
+                quantity=10,
+            )
+            for index in range(10)
+        ]
+        self.customer = Customer.objects.create(
+            store_id=self.tenant.id,
+            email=f"usage-{uuid.uuid4()}@example.com",
+            full_name="Customer",
+        )
+
+    def _order(self, lines: int = 1):
+        return OrderService.create_order(
+            self.customer,
+            [{"product": product, "quantity": 1, "price": product.price} for product in self.products[:lines]],
+            store_id=self.tenant.id,
+            tenant_id=self.tenant.id,
+        )
+
+    def _usage(self) -> int:
+        return StoreMonthlyUsage.objects.get(store_id=self.tenant.id, period=month_period()).orders_count
+
+    def test_order_creation_queries_do_not_grow_with_line_items(self):
+        self.plan.max_orders_monthly = 10
+        self.plan.save()
+        self._order(1)
+        with CaptureQueriesContext(connection) as one_line:
+            self._order(1)
+        with CaptureQueriesContext(connection) as ten_lines:
+            self._order(10)
+
+        self.assertEqual(len(ten_lines), len(one_line))
+        self.assertEqual(Order.objects.get(items__product=self.products[9]).items.count(), 10)
+        self.assertEqual(self._usage(), 3)
+
+    def test_cancelling_an_order_frees_its_monthly_slot(self):
+        first = self._order()
+        self._order()
+        with self.assertRaises(SubscriptionLimitExceededError) as raised:
+            self._order()
+        self.assertEqual((raised.exception.limit, raised.exception.usage), (2, 2))
+
+        OrderLifecycleService.transition(order=first, new_status="cancelled")
+        self.assertEqual(self._usage(), 1)
+        self._order()
+        self.assertEqual(self._usage(), 2)
+
+    def test_counter_is_seeded_from_existing_orders_and_reconciled(self):
+        Order.objects.bulk_create(
+            [Order(store_id=self.tenant.id, order_number=f"U-{uuid.uuid4().hex[:8]}", customer=self.customer)]
+        )
+        self._order()
+        self.assertEqual(self._usage(), 2)
+
+        StoreMonthlyUsage.objects.filter(store_id=self.tenant.id).update(orders_count=0)
+        Order.objects.filter(store_id=self.tenant.id).update(status="cancelled")
+        self.assertEqual(MonthlyUsageService.reconcile(store_id=self.tenant.id), 0)
+        StoreMonthlyUsage.objects.filter(store_id=self.tenant.id).update(orders_count=2)
+        self.assertEqual(MonthlyUsageService.reconcile(store_id=self.tenant.id), 1)
+        self.assertEqual(self._usage(), 0)
+
+    def test_plan_limit_snapshot_is_cached_until_the_plan_changes(self):
+        self.assertEqual(SubscriptionEntitlementService.get_limit_or_raise(self.tenant.id, "max_orders_monthly"), 2)
+        with self.assertNumQueries(0):
+            SubscriptionEntitlementService.get_limit_or_raise(self.tenant.id, "max_orders_monthly")
+
+        self.plan.max_orders_monthly = None
+        self.plan.save()
+        self.assertIsNone(SubscriptionEntitlementService.get_limit_or_raise(self.tenant.id, "max_orders_monthly"))
+
+        subscription = StoreSubscription.objects.get(store_id=self.tenant.id)
+        subscription.status = "expired"
+        subscription.save()
+        with self.assertRaises(NoActiveSubscriptionError):
+            SubscriptionEntitlementService.get_limit_or_raise(self.tenant.id, "max_orders_monthly")
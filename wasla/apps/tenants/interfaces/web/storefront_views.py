@@ -6,7 +6,8 @@ from django.views.decorators.http import require_GET
 
 from apps.catalog.models import Product
 from apps.subscriptions.models import StoreSubscription
-from core.infrastructure.store_cache import StoreCacheService
+from apps.storefront.search import search_product_ids
+from core.infrastructure.store_cache import STOREFRONT_CACHE_NAMESPACES, StoreCacheService
 from apps.tenants.application.policies.ownership import EnsureTenantOwnershipPolicy
 from apps.tenants.domain.errors import StoreAccessDeniedError, StoreInactiveError
 from apps.tenants.domain.visibility import StorefrontState, get_storefront_state
@@ -23,6 +24,7 @@ def _get_tenant_from_request(request: HttpRequest) -> Tenant:
 @require_GET
 def storefront_home(request: HttpRequest) -> HttpResponse:
     tenant = _get_tenant_from_request(request)
+    StoreCacheService.prefetch_versions(store_id=tenant.id, namespaces=STOREFRONT_CACHE_NAMESPACES)
 
     state = get_storefront_state(
         tenant_is_active=tenant.is_active,
@@ -54,7 +56,7 @@ def storefront_home(request: HttpRequest) -> HttpResponse:
         if category_id:
             queryset = queryset.filter(categories__id=category_id)
         if query:
-            queryset = queryset.filter(name__icontains=query)
+            queryset = queryset.filter(id__in=search_product_ids(store_id=tenant.id, query=query))
         return list(queryset.order_by("-id").only("id", "name", "price", "image", "sku")[:24])
 
     def _load_store_config():
@@ -86,6 +88,7 @@ def storefront_home(request: HttpRequest) -> HttpResponse:
         key_parts=["home", getattr(request, "LANGUAGE_CODE", "ar"), f"c:{category_id or 'all'}", f"q:{query or 'all'}"],
         producer=_load_products,
         timeout=180,
+        stale_ttl=60,
     )
     store_config, _ = StoreCacheService.get_or_set(
         store_id=tenant.id,
@@ -23,7 +23,13 @@ from django.utils.deprecation import MiddlewareMixin
 
 from .models import Tenant
 from .infrastructure.subdomain_resolver import extract_subdomain
-from .services.domain_resolution import resolve_tenant_by_host, resolve_store_by_slug
+from .routing import get_request_class
+from .services.domain_resolution import (
+    resolve_active_store_by_slug,
+    resolve_store_by_slug,
+    resolve_tenant_by_host,
+    resolve_tenant_snapshot,
+)
 
 
 class TenantResolverMiddleware(MiddlewareMixin):
@@ -46,7 +52,7 @@ class TenantResolverMiddleware(MiddlewareMixin):
         return normalized_host == base_domain or normalized_host == www_domain
 
     def process_request(self, request):
-        if request.path.startswith("/admin-portal/"):
+        if get_request_class(request).is_admin_portal:
             request.store = None
             request.tenant = None
             return None
@@ -81,15 +87,10 @@ class TenantResolverMiddleware(MiddlewareMixin):
                 session_store_id = None
 
             if session_store_id:
-                store = (
-                    Store.objects.select_related("tenant")
-                    .filter(tenant_id=session_store_id)
-                    .order_by("id")
-                    .first()
-                )
-                if store:
-                    request.store = store
-                    request.tenant = store.tenant
+                resolved = resolve_tenant_snapshot(session_store_id)
+                if resolved and resolved.store:
+                    request.store = resolved.store
+                    request.tenant = resolved.tenant
                     return None
 
             user = getattr(request, "user", None)
@@ -109,18 +110,7 @@ class TenantResolverMiddleware(MiddlewareMixin):
 
             return None
 
-        store_qs = Store.objects.select_related("tenant").filter(slug=subdomain)
-        try:
-            Store._meta.get_field("is_active")
-            store_qs = store_qs.filter(is_active=True)
-        except Exception:
-            try:
-                Store._meta.get_field("status")
-                store_qs = store_qs.filter(status=Store.STATUS_ACTIVE)
-            except Exception:
-                pass
-
-        store = store_qs.first()
+        store = resolve_active_store_by_slug(subdomain)
         if not store:
             if self._is_platform_subdomain_host(host) and not request.path.startswith("/api/"):
                 return render(
@@ -149,14 +139,20 @@ class TenantMiddleware:
         request.tenant = self._resolve_tenant(request)
         if request.tenant and not getattr(request, "store", None):
             try:
-                from apps.stores.models import Store
-                store = Store.objects.filter(tenant=request.tenant).order_by("id").first()
-                if store:
-                    request.store = store
+                resolved = resolve_tenant_snapshot(request.tenant.id)
+                if resolved and resolved.store:
+                    request.store = resolved.store
             except Exception:
                 pass
         return self.get_response(request)
 
+    @staticmethod
+    def _active_tenant_by_id(tenant_id: int):
+        resolved = resolve_tenant_snapshot(tenant_id)
+        if resolved and resolved.tenant and resolved.tenant.is_active:
+            return resolved.tenant
+        return None
+
     def _resolve_tenant(self, request):
         """
         Resolve tenant using a predictable priority order.
@@ -183,7 +179,7 @@ class TenantMiddleware:
 
             try:
                 if header_store_id is not None:
-                    tenant = Tenant.objects.filter(id=header_store_id, is_active=True).first()
+                    tenant = self._active_tenant_by_id(header_store_id)
                 else:
                     tenant = Tenant.objects.filter(slug=raw_header, is_active=True).first()
                     if not tenant:
@@ -215,7 +211,7 @@ class TenantMiddleware:
 
         try:
             if store_id is not None:
-                tenant = Tenant.objects.filter(id=store_id, is_active=True).first()
+                tenant = self._active_tenant_by_id(store_id)
                 if tenant:
                     return tenant
 
@@ -244,12 +240,9 @@ class StoreStatusGuardMiddleware(MiddlewareMixin):
     
     def process_request(self, request):
         """Check store status before allowing request to proceed."""
-        # Allow admin portal to bypass this check
-        if request.path.startswith("/admin-portal/"):
-            return None
-        
-        # Allow health checks to bypass
-        if request.path in ["/healthz", "/readyz", "/metrics"]:
+        request_class = get_request_class(request)
+        # Allow admin portal and health checks to bypass this check
+        if request_class.is_admin_portal or request_class.is_health_check:
             return None
         
         store = getattr(request, "store", None)
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+"""
+Request route classification.
+
+AR:
+- يصنّف مسار الطلب مرة واحدة فقط لكل طلب ويضع النتيجة في `request.request_class`.
+- تقرأ جميع الـ middleware اللاحقة (المستأجر، الأمان، التدقيق، الإعداد) هذه النتيجة
+  بدلاً من إعادة فحص `request.path`.
+
+EN:
+- Classifies the request path once per request and attaches an immutable
+  `RequestClass` as `request.request_class`.
+- Tenant, security, audit and onboarding guards read that object instead of
+  re-parsing `request.path` with their own `startswith` loops.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Iterable, Pattern
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+ADMIN_PORTAL_PREFIX = "/admin-portal/"
+
+HEALTH_CHECK_PATHS = frozenset({"/healthz", "/readyz", "/metrics"})
+
+# Paths that DON'T require tenant resolution
+TENANT_OPTIONAL_PATHS = frozenset({
+    "/api/auth/",           # Authentication endpoints
+    "/api/health/",         # Health checks
+    "/healthz",             # Readiness/liveness probes
+    "/readyz",
+    "/metrics",
+    "/admin-portal/",       # Admin portal (optional tenant sometimes)
+    "/static/",             # Static files
+    "/media/",              # Media files
+    "/api/schema/",         # API docs
+    "/api/docs/",
+    "/api/redoc/",
+})
+
+DEFAULT_TENANT_REQUIRED_PATHS = frozenset({
+    "/api/v1/",
+    "/api/subscriptions/",
+    "/billing/",
+    "/merchant/",
+    "/dashboard/",
+})
+
+ONBOARDING_GUARDED_PREFIXES = frozenset({
+    "/dashboard",
+    "/store/setup",
+    "/store/create",
+})
+
+PAYMENT_API_PREFIX = "/api/payments/"
+
+
+class PrefixTable:
+    """Precompiled prefix matcher: one anchored regex alternation instead of a loop."""
+
+    def __init__(self, prefixes: Iterable[str]) -> None:
+        self.prefixes = frozenset(p for p in prefixes if p)
+        ordered = sorted(self.prefixes, key=len, reverse=True)
+        self._pattern: Pattern[str] | None = (
+            re.compile("|".join(re.escape(p) for p in ordered)) if ordered else None
+        )
+
+    def matches(self, path: str) -> bool:
+        return self._pattern is not None and self._pattern.match(path) is not None
+
+
+@dataclass(frozen=True, slots=True)
+class RequestClass:
+    path: str
+    is_admin_portal: bool
+    is_health_check: bool
+    is_api: bool
+    is_payment_api: bool
+    requires_tenant: bool
+    onboarding_guarded: bool
+
+
+class RouteClassifier:
+    # RequestClass is immutable, so results are shared between requests for the same path.
+    MEMO_MAX_ENTRIES = 4096
+
+    def __init__(self, *, required_paths: Iterable[str], optional_paths: Iterable[str] = TENANT_OPTIONAL_PATHS):
+        self.required_paths = frozenset(required_paths)
+        self.optional_paths = frozenset(optional_paths)
+        self._required = PrefixTable(self.required_paths)
+        self._optional = PrefixTable(self.optional_paths)
+        self._onboarding = PrefixTable(ONBOARDING_GUARDED_PREFIXES)
+        self._memo: dict[str, RequestClass] = {}
+
+    @classmethod
+    def from_settings(cls) -> "RouteClassifier":
+        return cls(required_paths=getattr(settings, "TENANT_REQUIRED_PATHS", DEFAULT_TENANT_REQUIRED_PATHS))
+
+    def requires_tenant(self, path: str) -> bool:
+        if self._optional.matches(path):
+            return False
+        if self._required.matches(path):
+            return True
+        # Default: require tenant for API routes
+        return path.startswith("/api/")
+
+    def classify(self, path: str) -> RequestClass:
+        path = path or "/"
+        request_class = self._memo.get(path)
+        if request_class is not None:
+            return request_class
+
+        request_class = RequestClass(
+            path=path,
+            is_admin_portal=path.startswith(ADMIN_PORTAL_PREFIX),
+            is_health_check=path in HEALTH_CHECK_PATHS,
+            is_api=path.startswith("/api/"),
+            is_payment_api=path.lower().startswith(PAYMENT_API_PREFIX),
+            requires_tenant=self.requires_tenant(path),
+            onboarding_guarded=self._onboarding.matches(path),
+        )
+        if len(self._memo) >= self.MEMO_MAX_ENTRIES:
+            self._memo.clear()
+        self._memo[path] = request_class
+        return request_class
+
+
+_default_classifier: RouteClassifier | None = None
+
+
+def get_route_classifier() -> RouteClassifier:
+    global _default_classifier
+    if _default_classifier is None:
+        _default_classifier = RouteClassifier.from_settings()
+    return _default_classifier
+
+
+@receiver(setting_changed)
+def _reset_route_classifier(setting, **kwargs):
+    global _default_classifier
+    if setting == "TENANT_REQUIRED_PATHS":
+        _default_classifier = None
+
+
+def get_request_class(request) -> RequestClass:
+    """Return the request's classification, classifying lazily if no middleware did."""
+    request_class = getattr(request, "request_class", None)
+    if request_class is None or request_class.path != request.path:
+        request_class = get_route_classifier().classify(request.path)
+        request.request_class = request_class
+    return request_class
+
+
+class RequestClassificationMiddleware:
+    """Classify `request.path` once so later guards share the same decision."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        get_route_classifier()
+
+    def __call__(self, request):
+        request.request_class = get_route_classifier().classify(request.path)
+        return self.get_response(request)
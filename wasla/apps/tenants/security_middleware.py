@@ -21,6 +21,13 @@ from django.db.utils import OperationalError, ProgrammingError
 from django.core.exceptions import PermissionDenied
 from django.shortcuts import render
 
+from apps.tenants.routing import (
+    DEFAULT_TENANT_REQUIRED_PATHS,
+    TENANT_OPTIONAL_PATHS,
+    RouteClassifier,
+    get_request_class,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,20 +43,8 @@ class TenantSecurityMiddleware:
     - TENANT_BYPASS_SUPERADMIN: Allow superadmin to bypass tenant checks
     """
     
-    # Paths that DON'T require tenant resolution
-    TENANT_OPTIONAL_PATHS = {
-        '/api/auth/',           # Authentication endpoints
-        '/api/health/',         # Health checks
-        '/healthz',             # Readiness/liveness probes
-        '/readyz',
-        '/metrics',
-        '/admin-portal/',       # Admin portal (optional tenant sometimes)
-        '/static/',             # Static files
-        '/media/',              # Media files
-        '/api/schema/',         # API docs
-        '/api/docs/',
-        '/api/redoc/',
-    }
+    # Paths that DON'T require tenant resolution (see apps.tenants.routing)
+    TENANT_OPTIONAL_PATHS = TENANT_OPTIONAL_PATHS
     
     def __init__(self, get_response: Callable) -> None:
         """Initialize middleware with WSGI app."""
@@ -68,15 +63,13 @@ class TenantSecurityMiddleware:
         return response
     
     def _compile_tenant_required_paths(self) -> None:
-        """Compile configurable tenant-required paths."""
+        """Compile configurable tenant-required paths into a prefix table."""
         self.tenant_required_paths: Set[str] = set(
-            getattr(settings, 'TENANT_REQUIRED_PATHS', {
-                '/api/v1/',
-                '/api/subscriptions/',
-                '/billing/',
-                '/merchant/',
-                '/dashboard/',
-            })
+            getattr(settings, 'TENANT_REQUIRED_PATHS', DEFAULT_TENANT_REQUIRED_PATHS)
+        )
+        self.route_classifier = RouteClassifier(
+            required_paths=self.tenant_required_paths,
+            optional_paths=self.TENANT_OPTIONAL_PATHS,
         )
     
     def _check_tenant_security(self, request: HttpRequest) -> Optional[HttpResponse]:
@@ -88,7 +81,7 @@ class TenantSecurityMiddleware:
         tenant = getattr(request, 'tenant', None)
         
         # Check if this path requires a tenant
-        if self._path_requires_tenant(request.path):
+        if get_request_class(request).requires_tenant:
             if not tenant:
                 return self._handle_missing_tenant(request)
         
@@ -109,21 +102,7 @@ class TenantSecurityMiddleware:
     
     def _path_requires_tenant(self, path: str) -> bool:
         """Determine if a path requires tenant resolution."""
-        # Check optional paths first
-        for optional_path in self.TENANT_OPTIONAL_PATHS:
-            if path.startswith(optional_path):
-                return False
-        
-        # Check configured required paths
-        for required_path in self.tenant_required_paths:
-            if path.startswith(required_path):
-                return True
-        
-        # Default: require tenant for API routes
-        if path.startswith('/api/'):
-            return True
-        
-        return False
+        return self.route_classifier.requires_tenant(path)
     
     def _user_has_tenant_access(self, user: Any, tenant: Any) -> bool:
         """
@@ -132,36 +111,19 @@ class TenantSecurityMiddleware:
         Access is allowed if:
         - User is superadmin
         - User owns the tenant (store owner)
-        - User is staff in the tenant
+        - User has an active membership in the tenant
+
+        The decision is served from the shared access cache in apps.security.rbac.
         """
         if user.is_superuser and getattr(settings, 'TENANT_BYPASS_SUPERADMIN', True):
             return True
         
-        # Check if user owns this tenant
         try:
-            from apps.stores.models import Store
-            store = Store.objects.filter(
-                tenant=tenant,
-                owner=user
-            ).exists()
-            if store:
-                return True
+            from apps.security.rbac import user_has_tenant_access
+            return user_has_tenant_access(user, tenant)
         except Exception:
-            pass
-        
-        # Check if user has staff role in this tenant
-        try:
-            from apps.tenants.models import StaffRole
-            staff = StaffRole.objects.filter(
-                tenant=tenant,
-                user=user
-            ).exists()
-            if staff:
-                return True
-        except Exception:
-            pass
-        
-        return False
+            logger.exception("Tenant access check failed for tenant %s", getattr(tenant, 'id', None))
+            return False
     
     def _handle_missing_tenant(self, request: HttpRequest) -> HttpResponse:
         """
@@ -182,7 +144,7 @@ class TenantSecurityMiddleware:
         # Check if this is a root domain request without default store
         is_root_domain_no_default = getattr(request, '_is_root_domain_no_default', False)
         
-        if path.startswith('/api/'):
+        if get_request_class(request).is_api:
             logger.warning(
                 f"SECURITY: API request without tenant resolution. "
                 f"Path: {path}, {user_info}"
@@ -311,7 +273,7 @@ class TenantAuditMiddleware:
         # Log sensitive API calls
         # SAFE: AuthenticationMiddleware guaranteed to have run before this middleware
         user = getattr(request, 'user', None)
-        if request.path.startswith('/api/') and user and user.is_authenticated:
+        if get_request_class(request).is_api and user and user.is_authenticated:
             if current_tenant:
                 user_id = getattr(user, 'id', 'UNKNOWN')
                 logger.debug(
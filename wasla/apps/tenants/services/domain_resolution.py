@@ -6,6 +6,7 @@ from django.core.cache import cache
 from apps.tenants.domain.policies import normalize_domain
 from apps.tenants.models import StoreDomain, Tenant
 from apps.stores.models import Store
+from apps.tenants.services.resolution_cache import ResolvedTenant, tenant_resolution_cache
 
 
 def _cache_key(host: str) -> str:
@@ -17,15 +18,22 @@ def resolve_tenant_by_host(host: str) -> Tenant | None:
     if not normalized:
         return None
 
+    resolved = tenant_resolution_cache.get(f"host:{normalized}")
+    if resolved is not None:
+        return resolved.tenant
+
     cache_timeout = int(getattr(settings, "CUSTOM_DOMAIN_CACHE_SECONDS", 300) or 300)
     cached = cache.get(_cache_key(normalized))
     if cached is not None:
         if cached == 0:
             return None
-        return Tenant.objects.filter(id=cached, is_active=True).first()
+        tenant = Tenant.objects.filter(id=cached, is_active=True).first()
+    else:
+        tenant = _resolve_uncached(normalized)
+        cache.set(_cache_key(normalized), tenant.id if tenant else 0, cache_timeout)
 
-    tenant = _resolve_uncached(normalized)
-    cache.set(_cache_key(normalized), tenant.id if tenant else 0, cache_timeout)
+    if tenant:
+        tenant = tenant_resolution_cache.set(f"host:{normalized}", tenant=tenant).tenant
     return tenant
 
 
@@ -34,6 +42,7 @@ def invalidate_domain_cache(host: str) -> None:
     if not normalized:
         return
     cache.delete(_cache_key(normalized))
+    tenant_resolution_cache.delete(f"host:{normalized}")
 
 
 def resolve_store_by_slug(slug: str) -> 'Store | None':
@@ -52,6 +61,50 @@ def resolve_store_by_slug(slug: str) -> 'Store | None':
         return None
 
 
+def resolve_active_store_by_slug(slug: str) -> 'Store | None':
+    """Resolve an active store (with its tenant) for a storefront subdomain."""
+    if not slug:
+        return None
+
+    resolved = tenant_resolution_cache.get(f"slug:{slug}")
+    if resolved is not None:
+        return resolved.store
+
+    store_qs = Store.objects.select_related("tenant").filter(slug=slug)
+    try:
+        Store._meta.get_field("is_active")
+        store_qs = store_qs.filter(is_active=True)
+    except Exception:
+        try:
+            Store._meta.get_field("status")
+            store_qs = store_qs.filter(status=Store.STATUS_ACTIVE)
+        except Exception:
+            pass
+
+    store = store_qs.first()
+    if store is None:
+        return None
+    return tenant_resolution_cache.set(f"slug:{slug}", store=store).store
+
+
+def resolve_tenant_snapshot(tenant_id: int) -> ResolvedTenant | None:
+    """
+    Resolve a tenant by id together with its primary (lowest id) store.
+
+    The tenant is returned whether or not it is active; callers apply their own
+    `is_active` policy.
+    """
+    resolved = tenant_resolution_cache.get(f"tenant:{int(tenant_id)}")
+    if resolved is not None:
+        return resolved
+
+    store = Store.objects.select_related("tenant").filter(tenant_id=tenant_id).order_by("id").first()
+    tenant = store.tenant if store else Tenant.objects.filter(id=tenant_id).first()
+    if tenant is None:
+        return None
+    return tenant_resolution_cache.set(f"tenant:{int(tenant_id)}", store=store, tenant=tenant)
+
+
 def _resolve_uncached(host: str) -> Tenant | None:
     # Use defensive getattr for backward compatibility with older migrations
     status_active = getattr(StoreDomain, "STATUS_ACTIVE", "active")
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+"""
+Per-process cache of resolved (store, tenant) snapshots.
+
+AR:
+- كل عامل (worker) يحتفظ بذاكرة LRU محدودة لنتائج تحديد المتجر/المستأجر.
+- كل مدخل مرتبط بنسخة `store_config` الخاصة بالمستأجر في StoreCacheService،
+  لذلك أي تعديل من أي عامل يُبطل المدخل لدى جميع العمال خلال نافذة زمنية محدودة.
+
+EN:
+- Each worker keeps a bounded LRU of lookup key -> (store, tenant) snapshot.
+- Entries are versioned with the tenant's `store_config` namespace version in
+  StoreCacheService. The post_save receivers bump that version, so every worker
+  drops the entry within `TENANT_RESOLUTION_CACHE_STALENESS_SECONDS`.
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any
+
+from django.conf import settings
+
+from core.infrastructure.store_cache import StoreCacheService
+
+
+RESOLUTION_NAMESPACE = "store_config"
+
+
+@dataclass(frozen=True)
+class ResolvedTenant:
+    store: Any
+    tenant: Any
+
+
+@dataclass
+class _Entry:
+    store: Any
+    tenant: Any
+    tenant_id: int
+    version: int
+    checked_at: float
+    expires_at: float
+
+
+def _copy_snapshot(store, tenant) -> ResolvedTenant:
+    tenant_copy = copy.copy(tenant) if tenant is not None else None
+    store_copy = None
+    if store is not None:
+        store_copy = copy.copy(store)
+        if tenant_copy is not None:
+            store_copy.tenant = tenant_copy
+    return ResolvedTenant(store=store_copy, tenant=tenant_copy)
+
+
+class TenantResolutionCache:
+    """Bounded, thread-safe LRU of resolution snapshots for one process."""
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(getattr(settings, "TENANT_RESOLUTION_CACHE_ENABLED", True))
+
+    @staticmethod
+    def _max_entries() -> int:
+        return max(1, int(getattr(settings, "TENANT_RESOLUTION_CACHE_MAX_ENTRIES", 1024) or 1024))
+
+    @staticmethod
+    def _staleness_seconds() -> float:
+        return float(getattr(settings, "TENANT_RESOLUTION_CACHE_STALENESS_SECONDS", 5) or 0)
+
+    @staticmethod
+    def _ttl_seconds() -> float:
+        return float(getattr(settings, "TENANT_RESOLUTION_CACHE_TTL", 300) or 300)
+
+    @staticmethod
+    def _current_version(tenant_id: int) -> int:
+        return StoreCacheService.get_namespace_version(store_id=int(tenant_id), namespace=RESOLUTION_NAMESPACE)
+
+    def get(self, key: str) -> ResolvedTenant | None:
+        if not self.enabled():
+            return None
+
+        now = monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            needs_check = now - entry.checked_at >= self._staleness_seconds()
+
+        if needs_check:
+            if self._current_version(entry.tenant_id) != entry.version:
+                with self._lock:
+                    if self._entries.get(key) is entry:
+                        del self._entries[key]
+                return None
+            entry.checked_at = now
+
+        return _copy_snapshot(entry.store, entry.tenant)
+
+    def set(self, key: str, *, store=None, tenant=None) -> ResolvedTenant:
+        """Remember a snapshot and return a private copy for the caller."""
+        if tenant is None and store is not None:
+            tenant = getattr(store, "tenant", None)
+        if not self.enabled() or tenant is None or getattr(tenant, "pk", None) is None:
+            return ResolvedTenant(store=store, tenant=tenant)
+
+        snapshot = _copy_snapshot(store, tenant)
+        now = monotonic()
+        entry = _Entry(
+            store=snapshot.store,
+            tenant=snapshot.tenant,
+            tenant_id=int(tenant.pk),
+            version=self._current_version(int(tenant.pk)),
+            checked_at=now,
+            expires_at=now + self._ttl_seconds(),
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries():
+                self._entries.popitem(last=False)
+
+        return _copy_snapshot(entry.store, entry.tenant)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+tenant_resolution_cache = TenantResolutionCache()
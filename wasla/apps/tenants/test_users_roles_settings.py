@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.test.utils import override_settings
@@ -88,5 +90,7 @@ class UsersRolesSettingsTests(TestCase):
         self.client.force_login(self.admin)
         self._set_store_session()
 
-        response = self.client.get(reverse("tenants:dashboard_users_roles"))
+        # Active members pass the tenant gate; the owner-only policy in the view must deny.
+        with patch("apps.accounts.middleware.resolve_onboarding_state", return_value=None):
+            response = self.client.get(reverse("tenants:dashboard_users_roles"))
         self.assertEqual(response.status_code, 403)
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.management import call_command
+from django.http import HttpResponse
 from django.test import RequestFactory, TestCase
 from django.test.utils import override_settings
 
-from apps.security.rbac import has_permission
+from apps.security.rbac import has_permission, resolve_membership, user_has_tenant_access
+from apps.stores.models import Store
 from apps.tenants.models import Permission, RolePermission, Tenant, TenantMembership
+from apps.tenants.security_middleware import TenantSecurityMiddleware
 
 
 @override_settings(ALLOWED_HOSTS=["testserver", "localhost", ".localhost"])
@@ -62,6 +66,77 @@ class RBACPermissionTests(TestCase):
         self.assertEqual(response.status_code, 200)
 
 
+class TenantAccessCacheTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        user_model = get_user_model()
+        self.owner = user_model.objects.create_user(username="access-owner", password="pass12345")
+        self.staff = user_model.objects.create_user(username="access-staff", password="pass12345")
+        self.outsider = user_model.objects.create_user(username="access-outsider", password="pass12345")
+        self.tenant = Tenant.objects.create(slug="access-tenant", name="Access Tenant", is_active=True)
+        Store.objects.create(
+            owner=self.owner,
+            tenant=self.tenant,
+            name="Access Store",
+            slug="access-store",
+            subdomain="access-store",
+        )
+        self.membership = TenantMembership.objects.create(
+            tenant=self.tenant,
+            user=self.staff,
+            role=TenantMembership.ROLE_STAFF,
+            is_active=True,
+        )
+
+    def _dashboard_request(self, user):
+        request = RequestFactory().get("/dashboard/")
+        request.user = user
+        request.tenant = self.tenant
+        return request
+
+    def test_owner_and_member_allowed_outsider_denied(self):
+        self.assertTrue(user_has_tenant_access(self.owner, self.tenant))
+        self.assertTrue(user_has_tenant_access(self.staff, self.tenant))
+        self.assertFalse(user_has_tenant_access(self.outsider, self.tenant))
+
+    def test_warm_access_check_needs_no_queries(self):
+        middleware = TenantSecurityMiddleware(lambda r: HttpResponse())
+        self.assertIsNone(middleware._check_tenant_security(self._dashboard_request(self.staff)))
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(middleware._check_tenant_security(self._dashboard_request(self.staff)))
+            membership = resolve_membership(self._dashboard_request(self.staff))
+
+        self.assertEqual(membership.id, self.membership.id)
+        self.assertEqual(membership.role, TenantMembership.ROLE_STAFF)
+
+    def test_membership_change_invalidates_decision(self):
+        self.assertTrue(user_has_tenant_access(self.staff, self.tenant))
+
+        self.membership.is_active = False
+        self.membership.save(update_fields=["is_active"])
+
+        self.assertFalse(user_has_tenant_access(self.staff, self.tenant))
+        response = TenantSecurityMiddleware(lambda r: HttpResponse())._check_tenant_security(
+            self._dashboard_request(self.staff)
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_new_store_ownership_invalidates_decision(self):
+        self.assertFalse(user_has_tenant_access(self.outsider, self.tenant))
+
+        Store.objects.create(
+            owner=self.outsider,
+            tenant=self.tenant,
+            name="Second Store",
+            slug="second-store",
+            subdomain="second-store",
+        )
+
+        self.assertTrue(user_has_tenant_access(self.outsider, self.tenant))
+
+
 class SeedPermissionsCommandTests(TestCase):
     def test_seed_permissions_creates_records(self):
         call_command("seed_permissions")
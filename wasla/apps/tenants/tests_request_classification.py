@@ -0,0 +1,74 @@
+"""
+Tests for the once-per-request route classification shared by the guards.
+"""
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from apps.accounts.middleware import OnboardingFlowMiddleware
+from apps.tenants.routing import (
+    RequestClassificationMiddleware,
+    RouteClassifier,
+    get_request_class,
+)
+from apps.tenants.security_middleware import TenantSecurityMiddleware
+
+
+class TestRouteClassifier(SimpleTestCase):
+    def setUp(self):
+        self.classifier = RouteClassifier(required_paths={"/dashboard/", "/api/v1/"})
+
+    def test_optional_paths_win_over_api_default(self):
+        self.assertFalse(self.classifier.classify("/api/auth/login/").requires_tenant)
+        self.assertFalse(self.classifier.classify("/api/health/").requires_tenant)
+
+    def test_required_and_api_paths_require_tenant(self):
+        self.assertTrue(self.classifier.classify("/dashboard/orders/").requires_tenant)
+        self.assertTrue(self.classifier.classify("/api/catalog/").requires_tenant)
+        self.assertFalse(self.classifier.classify("/products/1/").requires_tenant)
+
+    def test_guard_flags(self):
+        admin = self.classifier.classify("/admin-portal/stores/")
+        self.assertTrue(admin.is_admin_portal)
+        self.assertFalse(admin.requires_tenant)
+
+        self.assertTrue(self.classifier.classify("/healthz").is_health_check)
+        self.assertFalse(self.classifier.classify("/healthz/extra").is_health_check)
+        self.assertTrue(self.classifier.classify("/API/Payments/x/").is_payment_api)
+        self.assertTrue(self.classifier.classify("/store/setup/2/").onboarding_guarded)
+        self.assertFalse(self.classifier.classify("/store/1/").onboarding_guarded)
+
+    def test_results_are_shared_per_path(self):
+        self.assertIs(self.classifier.classify("/cart/"), self.classifier.classify("/cart/"))
+
+
+class TestRequestClassificationMiddleware(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_middleware_attaches_request_class(self):
+        seen = {}
+
+        def view(request):
+            seen["request_class"] = request.request_class
+            return HttpResponse()
+
+        RequestClassificationMiddleware(view)(self.factory.get("/api/v1/orders/"))
+        self.assertTrue(seen["request_class"].requires_tenant)
+        self.assertTrue(seen["request_class"].is_api)
+
+    def test_lazy_classification_without_middleware(self):
+        request = self.factory.get("/dashboard/")
+        self.assertTrue(get_request_class(request).onboarding_guarded)
+        self.assertIs(get_request_class(request), request.request_class)
+
+    @override_settings(TENANT_REQUIRED_PATHS={"/reports/"})
+    def test_settings_change_rebuilds_classifier(self):
+        request = self.factory.get("/reports/monthly/")
+        self.assertTrue(get_request_class(request).requires_tenant)
+        self.assertTrue(TenantSecurityMiddleware(lambda r: None)._path_requires_tenant("/reports/x/"))
+
+    def test_onboarding_guard_helper_matches_classifier(self):
+        self.assertTrue(OnboardingFlowMiddleware._should_guard("/dashboard/setup/"))
+        self.assertTrue(OnboardingFlowMiddleware._should_guard("/store/create"))
+        self.assertFalse(OnboardingFlowMiddleware._should_guard("/cart/"))
@@ -0,0 +1,109 @@
+"""
+Tests for the per-process tenant/store resolution cache.
+
+Covers:
+1. Warm storefront requests resolve store + tenant with zero DB queries
+2. Local invalidation when Tenant/Store rows change in this worker
+3. Cross-worker invalidation through the store_config namespace version
+4. LRU bound on the number of snapshots
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from apps.stores.models import Store
+from apps.tenants.middleware import TenantMiddleware, TenantResolverMiddleware
+from apps.tenants.models import Tenant
+from apps.tenants.services.resolution_cache import TenantResolutionCache, tenant_resolution_cache
+from core.infrastructure.store_cache import StoreCacheService
+
+User = get_user_model()
+
+
+@override_settings(ALLOWED_HOSTS=["*"], WASSLA_BASE_DOMAIN="w-sala.com")
+class TestTenantResolutionCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        tenant_resolution_cache.clear()
+        self.factory = RequestFactory()
+        self.owner = User.objects.create_user(username="owner@example.com", password="pass12345")
+        self.tenant = Tenant.objects.create(slug="shop", name="Shop", is_active=True)
+        self.store = Store.objects.create(
+            owner=self.owner,
+            tenant=self.tenant,
+            name="Shop",
+            slug="shop",
+            subdomain="shop",
+            status=Store.STATUS_ACTIVE,
+        )
+
+    def tearDown(self):
+        tenant_resolution_cache.clear()
+
+    def _resolve(self, host="shop.w-sala.com"):
+        request = self.factory.get("/", HTTP_HOST=host)
+        request.session = {}
+        TenantResolverMiddleware(lambda r: HttpResponse()).process_request(request)
+        TenantMiddleware(lambda r: HttpResponse())(request)
+        return request
+
+    def test_warm_request_resolves_without_queries(self):
+        first = self._resolve()
+        self.assertEqual(first.store.id, self.store.id)
+        self.assertEqual(first.tenant.id, self.tenant.id)
+
+        with self.assertNumQueries(0):
+            second = self._resolve()
+
+        self.assertEqual(second.store.id, self.store.id)
+        self.assertEqual(second.tenant.id, self.tenant.id)
+
+    def test_snapshots_are_private_copies(self):
+        first = self._resolve()
+        first.store.name = "Mutated"
+
+        second = self._resolve()
+        self.assertEqual(second.store.name, "Shop")
+        self.assertIsNot(first.store, second.store)
+
+    def test_tenant_save_invalidates_local_snapshots(self):
+        self._resolve()
+        self.tenant.is_active = False
+        self.tenant.save(update_fields=["is_active"])
+
+        request = self._resolve()
+        self.assertFalse(request.store.tenant.is_active)
+        self.assertIsNone(request.tenant)
+
+    @override_settings(TENANT_RESOLUTION_CACHE_STALENESS_SECONDS=0)
+    def test_namespace_bump_from_other_worker_invalidates(self):
+        self._resolve()
+        Store.objects.filter(pk=self.store.pk).update(name="Renamed elsewhere")
+        StoreCacheService.bump_namespace_version(store_id=self.tenant.id, namespace="store_config")
+
+        request = self._resolve()
+        self.assertEqual(request.store.name, "Renamed elsewhere")
+
+    def test_unknown_subdomain_is_not_cached(self):
+        request = self.factory.get("/", HTTP_HOST="missing.w-sala.com")
+        response = TenantResolverMiddleware(lambda r: HttpResponse()).process_request(request)
+        self.assertEqual(response.status_code, 404)
+        self.assertIsNone(tenant_resolution_cache.get("slug:missing"))
+
+    @override_settings(TENANT_RESOLUTION_CACHE_MAX_ENTRIES=2)
+    def test_lru_is_bounded(self):
+        lru = TenantResolutionCache()
+        for key in ("a", "b", "c"):
+            lru.set(key, tenant=self.tenant)
+
+        self.assertEqual(len(lru), 2)
+        self.assertIsNone(lru.get("a"))
+        self.assertEqual(lru.get("c").tenant.id, self.tenant.id)
+
+    @override_settings(TENANT_RESOLUTION_CACHE_ENABLED=False)
+    def test_disabled_cache_always_misses(self):
+        lru = TenantResolutionCache()
+        lru.set("a", tenant=self.tenant)
+        self.assertIsNone(lru.get("a"))
@@ -39,4 +39,28 @@ else:
 			"task": "apps.domains.tasks.renew_expiring_ssl",
 			"schedule": crontab(minute=30, hour=2),
 		},
+		"storefront-related-products": {
+			"task": "apps.storefront.tasks.refresh_related_products",
+			"schedule": crontab(minute="*/15"),
+		},
+		"cart-flush-hot-carts": {
+			"task": "apps.cart.tasks.flush_hot_carts",
+			"schedule": crontab(minute="*/5"),
+		},
+		"orders-release-expired-reservations": {
+			"task": "apps.orders.tasks.auto_release_expired_stock_reservations",
+			"schedule": crontab(minute="*"),
+		},
+		"orders-cleanup-abandoned-reservations": {
+			"task": "apps.orders.tasks.cleanup_abandoned_reservations",
+			"schedule": crontab(minute=0, hour=3),
+		},
+		"orders-reconcile-stock-ledgers": {
+			"task": "apps.orders.tasks.reconcile_stock_ledgers",
+			"schedule": crontab(minute=30, hour=3),
+		},
+		"orders-reconcile-monthly-usage": {
+			"task": "apps.orders.tasks.reconcile_monthly_order_usage",
+			"schedule": crontab(minute=15, hour="*/6"),
+		},
 	}
@@ -0,0 +1,34 @@
+"""
+Gunicorn settings for Prometheus multiprocess metrics.
+
+Usage:
+    PROMETHEUS_MULTIPROC_DIR=/run/wasla/prometheus \\
+        gunicorn config.wsgi:application -c config/gunicorn.py
+
+Every worker writes its counters and histograms to mmap files in
+PROMETHEUS_MULTIPROC_DIR, and `/metrics` aggregates them. The directory is
+cleared when the master starts, and a worker's files are marked dead on exit.
+"""
+
+import multiprocessing
+import os
+import shutil
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", str(multiprocessing.cpu_count() * 2 + 1)))
+
+
+def on_starting(server):
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not directory:
+        return
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
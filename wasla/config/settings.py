@@ -111,6 +111,13 @@ SECURITY_RATE_LIMITS = [
         "message_key": "api_rate_limited",
     },
 ]
+# Sliding-window counters: "auto" uses a Lua script on Redis when CACHE_USE_REDIS is on,
+# otherwise atomic incr on the default cache. "cache" forces the cache backend.
+SECURITY_RATE_LIMIT_BACKEND = os.getenv("SECURITY_RATE_LIMIT_BACKEND", "auto").strip().lower() or "auto"
+# Rate-limit audit rows are buffered and bulk-inserted by a background thread.
+SECURITY_AUDIT_ASYNC = _env_bool("SECURITY_AUDIT_ASYNC", "1" if ENVIRONMENT == "production" else "0")
+SECURITY_AUDIT_BATCH_SIZE = int(os.getenv("SECURITY_AUDIT_BATCH_SIZE", "100") or "100")
+SECURITY_AUDIT_FLUSH_SECONDS = float(os.getenv("SECURITY_AUDIT_FLUSH_SECONDS", "2") or "2")
 
 WASSLA_BASE_DOMAIN = os.getenv("WASSLA_BASE_DOMAIN", "w-sala.com").strip().lower() or "w-sala.com"
 
@@ -159,6 +166,14 @@ CUSTOM_DOMAIN_VERIFY_MIN_INTERVAL_SECONDS = int(
 CUSTOM_DOMAIN_DNS_CACHE_SECONDS = int(os.getenv("CUSTOM_DOMAIN_DNS_CACHE_SECONDS", "300") or "300")
 CUSTOM_DOMAIN_CACHE_SECONDS = int(os.getenv("CUSTOM_DOMAIN_CACHE_SECONDS", "300") or "300")
 
+# Per-process tenant/store resolution snapshots (versioned via store_config namespace)
+TENANT_RESOLUTION_CACHE_ENABLED = _env_bool("TENANT_RESOLUTION_CACHE_ENABLED", "1")
+TENANT_RESOLUTION_CACHE_MAX_ENTRIES = int(os.getenv("TENANT_RESOLUTION_CACHE_MAX_ENTRIES", "1024") or "1024")
+TENANT_RESOLUTION_CACHE_STALENESS_SECONDS = int(
+    os.getenv("TENANT_RESOLUTION_CACHE_STALENESS_SECONDS", "5") or "5"
+)
+TENANT_RESOLUTION_CACHE_TTL = int(os.getenv("TENANT_RESOLUTION_CACHE_TTL", "300") or "300")
+
 # Root domain default store
 DEFAULT_STORE_SLUG = os.getenv("WASLA_DEFAULT_STORE_SLUG", "store1").strip() or "store1"
 
@@ -258,6 +273,7 @@ if WASLA_ENABLE_AR:
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "apps.tenants.routing.RequestClassificationMiddleware",  # Classify request.path once for all guards
     "apps.security.middleware.rate_limit.RateLimitMiddleware",
     "apps.system.middleware.FriendlyErrorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -393,7 +409,66 @@ if (os.getenv("DJANGO_ENABLE_EXTRA_DBS", "0") or "0") == "1":
 CACHE_TTL_DEFAULT = int(os.getenv("CACHE_TTL_DEFAULT", "300") or "300")
 CACHE_TTL_SHORT = int(os.getenv("CACHE_TTL_SHORT", "60") or "60")
 CACHE_TTL_LONG = int(os.getenv("CACHE_TTL_LONG", "900") or "900")
+TENANT_ACCESS_CACHE_TTL = int(os.getenv("TENANT_ACCESS_CACHE_TTL", str(CACHE_TTL_SHORT)) or CACHE_TTL_SHORT)
 CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "wasla")
+# StoreCacheService L1: per-process LRU in front of the shared cache.
+STORE_CACHE_L1_ENABLED = _env_bool("STORE_CACHE_L1_ENABLED", "1")
+STORE_CACHE_L1_MAX_BYTES = int(os.getenv("STORE_CACHE_L1_MAX_BYTES", str(16 * 1024 * 1024)) or 16 * 1024 * 1024)
+STORE_CACHE_L1_MAX_ENTRIES = int(os.getenv("STORE_CACHE_L1_MAX_ENTRIES", "5000") or "5000")
+STORE_CACHE_L1_TTL_SECONDS = float(os.getenv("STORE_CACHE_L1_TTL_SECONDS", "5") or "5")
+# StoreCacheService stampede protection: single-flight lock, early refresh and
+# background refresh for values served stale (get_or_set(stale_ttl=...)).
+STORE_CACHE_LOCK_TTL_SECONDS = int(os.getenv("STORE_CACHE_LOCK_TTL_SECONDS", "10") or "10")
+STORE_CACHE_LOCK_WAIT_SECONDS = float(os.getenv("STORE_CACHE_LOCK_WAIT_SECONDS", "1") or "1")
+STORE_CACHE_EARLY_REFRESH_BETA = float(os.getenv("STORE_CACHE_EARLY_REFRESH_BETA", "1") or "0")
+STORE_CACHE_REFRESH_ASYNC = _env_bool("STORE_CACHE_REFRESH_ASYNC", "1" if ENVIRONMENT == "production" else "0")
+STORE_CACHE_REFRESH_WORKERS = int(os.getenv("STORE_CACHE_REFRESH_WORKERS", "2") or "2")
+# Shared full-page cache for anonymous storefront visitors.
+STOREFRONT_PAGE_CACHE_ENABLED = _env_bool("STOREFRONT_PAGE_CACHE_ENABLED", "1")
+STOREFRONT_PAGE_CACHE_TIMEOUT = int(os.getenv("STOREFRONT_PAGE_CACHE_TIMEOUT", "300") or "300")
+# Storefront product search: "auto" picks Postgres tsvector / SQLite FTS5 by DB vendor, "database" scans ProductSearch.
+STOREFRONT_SEARCH_BACKEND = os.getenv("STOREFRONT_SEARCH_BACKEND", "auto")
+STOREFRONT_SEARCH_MAX_RESULTS = int(os.getenv("STOREFRONT_SEARCH_MAX_RESULTS", "1000") or "1000")
+# Listing pagination: per_page upper bound and how many leading pages are cached per filter combination.
+STOREFRONT_MAX_PER_PAGE = int(os.getenv("STOREFRONT_MAX_PER_PAGE", "60") or "60")
+STOREFRONT_LISTING_CACHED_PAGES = int(os.getenv("STOREFRONT_LISTING_CACHED_PAGES", "5") or "5")
+# Lower edges of the storefront price-band facet (changing them requires `manage.py rebuild_read_models`).
+STOREFRONT_PRICE_BANDS = os.getenv("STOREFRONT_PRICE_BANDS", "0,50,100,250,500,1000")
+# Per-store sitemap files (under default storage): URLs per gzip shard (protocol max 50000),
+# storage directory, URL scheme and how long one regeneration may hold its lock.
+STOREFRONT_SITEMAP_MAX_URLS = int(os.getenv("STOREFRONT_SITEMAP_MAX_URLS", "50000") or "50000")
+STOREFRONT_SITEMAP_DIR = os.getenv("STOREFRONT_SITEMAP_DIR", "sitemaps")
+STOREFRONT_SITEMAP_SCHEME = os.getenv("STOREFRONT_SITEMAP_SCHEME", "https")
+STOREFRONT_SITEMAP_LOCK_TTL_SECONDS = int(os.getenv("STOREFRONT_SITEMAP_LOCK_TTL_SECONDS", "600") or "600")
+# Precomputed related products: ids kept per product, closest-priced category members considered
+# on each side of a product, and the order window for co-purchase counts.
+STOREFRONT_RELATED_LIMIT = int(os.getenv("STOREFRONT_RELATED_LIMIT", "12") or "12")
+STOREFRONT_RELATED_CATEGORY_NEIGHBOURS = int(os.getenv("STOREFRONT_RELATED_CATEGORY_NEIGHBOURS", "50") or "50")
+STOREFRONT_RELATED_ORDER_DAYS = int(os.getenv("STOREFRONT_RELATED_ORDER_DAYS", "180") or "180")
+# Products accepted per bulk catalog write (POST /api/catalog/products/bulk/).
+CATALOG_BULK_MAX_PRODUCTS = int(os.getenv("CATALOG_BULK_MAX_PRODUCTS", "5000") or "5000")
+# Catalog import rows parsed, validated and committed per chunk (one transaction each).
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "500") or "500")
+# Hot cart store: "auto" keeps active carts in Redis when CACHE_USE_REDIS is on
+# ("redis"/"cache" force a backend, "off" writes every change to the database).
+# Idle carts are written back to Cart/CartItem by apps.cart.tasks.flush_hot_carts.
+CART_HOT_STORE = os.getenv("CART_HOT_STORE", "auto")
+CART_HOT_STORE_TTL = int(os.getenv("CART_HOT_STORE_TTL", "172800") or "172800")
+CART_HOT_FLUSH_IDLE_SECONDS = int(os.getenv("CART_HOT_FLUSH_IDLE_SECONDS", "900") or "900")
+CART_HOT_FLUSH_BATCH = int(os.getenv("CART_HOT_FLUSH_BATCH", "500") or "500")
+# Stock reservation pre-admission: "auto" keeps a Redis token counter per hot
+# SKU when CACHE_USE_REDIS is on ("redis"/"cache" force a backend, "off" sends
+# every checkout to the StockLedger row). Counters are reseeded after the TTL.
+STOCK_ADMISSION = os.getenv("STOCK_ADMISSION", "auto")
+STOCK_ADMISSION_TTL = int(os.getenv("STOCK_ADMISSION_TTL", "60") or "60")
+# Expired reservations are released by apps.orders.tasks every minute, at most
+# BATCH * MAX_BATCHES rows per run, one short transaction per batch.
+STOCK_RESERVATION_SWEEP_BATCH = int(os.getenv("STOCK_RESERVATION_SWEEP_BATCH", "500") or "500")
+STOCK_RESERVATION_SWEEP_MAX_BATCHES = int(os.getenv("STOCK_RESERVATION_SWEEP_MAX_BATCHES", "20") or "20")
+# Plan-limit snapshots used at checkout; subscription and plan saves bump them.
+SUBSCRIPTION_LIMITS_CACHE_TTL = int(os.getenv("SUBSCRIPTION_LIMITS_CACHE_TTL", "300") or "300")
+# Log one cache_stats summary every N cache operations (0 disables).
+CACHE_STATS_LOG_EVERY = int(os.getenv("CACHE_STATS_LOG_EVERY", "1000") or "0")
 CACHE_USE_REDIS = _env_bool("CACHE_USE_REDIS", "0")
 CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://127.0.0.1:6379/1")
 
@@ -727,7 +802,17 @@ SETTLEMENT_PROCESSING_ENABLED = _env_bool("SETTLEMENT_PROCESSING_ENABLED", "1")
 # Performance observability
 PERFORMANCE_SLOW_THRESHOLD_MS = float(os.getenv("PERFORMANCE_SLOW_THRESHOLD_MS", "500") or "500")
 PERFORMANCE_LOG_PERSIST_ENABLED = _env_bool("PERFORMANCE_LOG_PERSIST_ENABLED", "1")
+# Slow (>= PERFORMANCE_SLOW_THRESHOLD_MS) and 5xx requests are always kept; the rest are sampled.
+PERFORMANCE_LOG_SAMPLE_RATE = float(os.getenv("PERFORMANCE_LOG_SAMPLE_RATE", "1") or "1")
+# Buffer rows per worker and bulk insert them from a background thread.
+PERFORMANCE_LOG_ASYNC = _env_bool("PERFORMANCE_LOG_ASYNC", "1" if ENVIRONMENT == "production" else "0")
+PERFORMANCE_LOG_BATCH_SIZE = int(os.getenv("PERFORMANCE_LOG_BATCH_SIZE", "200") or "200")
+PERFORMANCE_LOG_FLUSH_SECONDS = float(os.getenv("PERFORMANCE_LOG_FLUSH_SECONDS", "2") or "2")
+PERFORMANCE_LOG_BUFFER_SIZE = int(os.getenv("PERFORMANCE_LOG_BUFFER_SIZE", "10000") or "10000")
 PERFORMANCE_SLOW_QUERY_THRESHOLD_MS = float(os.getenv("PERFORMANCE_SLOW_QUERY_THRESHOLD_MS", "250") or "250")
+# Per-store latency histogram; each worker labels at most METRICS_STORE_LABEL_LIMIT stores.
+METRICS_STORE_LABELS_ENABLED = _env_bool("METRICS_STORE_LABELS_ENABLED", "0")
+METRICS_STORE_LABEL_LIMIT = int(os.getenv("METRICS_STORE_LABEL_LIMIT", "100") or "100")
 OBS_LOG_LEVEL = os.getenv("OBS_LOG_LEVEL", "INFO")
 
 
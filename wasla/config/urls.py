@@ -1,13 +1,12 @@
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.contrib.sitemaps.views import sitemap
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.views.generic import TemplateView
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 from apps.observability.views.health import healthz, readyz
 from apps.observability.views.metrics import metrics
-from apps.storefront.sitemaps import sitemaps
+from apps.storefront.views import sitemap_file
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -30,7 +29,8 @@ urlpatterns = [
     path("api/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"),
 
     # SEO Sitemaps
-    path("sitemap.xml", sitemap, {"sitemaps": sitemaps}, name="sitemaps"),
+    path("sitemap.xml", sitemap_file, name="sitemaps"),
+    re_path(r"^(?P<filename>sitemap-[a-z]+-\d+\.xml\.gz)$", sitemap_file, name="sitemap_shard"),
 
     # Language switcher (POST)
     path("i18n/", include("django.conf.urls.i18n")),
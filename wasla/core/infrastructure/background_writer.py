@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+from typing import Any, Callable
+
+from django.db import connections
+
+
+logger = logging.getLogger("wasla.performance")
+
+
+class BackgroundBulkWriter:
+    """
+    Per-process ring buffer flushed by a daemon thread.
+
+    Items are appended from the request path without touching the database.
+    A background thread hands them to `write_batch` (typically a `bulk_create`)
+    whenever `max_batch` items are pending or every `flush_interval` seconds.
+    When the buffer is full the oldest items are dropped and counted.
+
+    When `is_async()` is false (e.g. local development and tests) items are
+    written synchronously on submit so behaviour stays deterministic.
+    """
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        write_batch: Callable[[list[Any]], None],
+        is_async: Callable[[], bool] = lambda: True,
+        max_batch: int = 200,
+        flush_interval: float = 2.0,
+        capacity: int = 10000,
+    ) -> None:
+        self.name = name
+        self.write_batch = write_batch
+        self.is_async = is_async
+        self.max_batch = max(1, int(max_batch))
+        self.flush_interval = max(0.05, float(flush_interval))
+        self.dropped = 0
+        self._buffer: deque[Any] = deque(maxlen=max(1, int(capacity)))
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+        atexit.register(self._flush_quietly)
+
+    def submit(self, item: Any) -> None:
+        if not self.is_async():
+            self._write([item])
+            return
+
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(item)
+            pending = len(self._buffer)
+        self._ensure_thread()
+        if pending >= self.max_batch:
+            self._wakeup.set()
+
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def flush(self) -> int:
+        """Write everything buffered so far; returns the number of items written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._buffer.popleft() for _ in range(min(self.max_batch, len(self._buffer)))]
+                if not batch:
+                    return written
+                self._write(batch)
+                written += len(batch)
+
+    def _write(self, batch: list[Any]) -> None:
+        try:
+            self.write_batch(batch)
+        except Exception:
+            logger.exception("background_writer_flush_failed", extra={"writer": self.name, "batch_size": len(batch)})
+
+    def _ensure_thread(self) -> None:
+        pid = os.getpid()
+        if self._thread is not None and self._thread.is_alive() and self._pid == pid:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == pid:
+                return
+            if self._pid is not None and self._pid != pid:
+                # Forked worker: the parent's buffer and thread do not belong to us.
+                self._buffer.clear()
+            self._pid = pid
+            self._thread = threading.Thread(target=self._run, name=f"bulk-writer-{self.name}", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                connections.close_all()
+
+    def _flush_quietly(self) -> None:
+        try:
+            self.flush()
+        except Exception:
+            pass
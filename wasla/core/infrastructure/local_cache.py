@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import pickle
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import Any
+
+
+class LocalLRUCache:
+    """
+    Per-process LRU bounded by entry count and by pickled size in bytes.
+
+    Values are stored pickled, so callers never share mutable objects and the
+    byte budget reflects what was actually cached. Entries expire after `ttl`
+    seconds; they are meant to sit in front of a shared cache, not replace it.
+    """
+
+    def __init__(self, *, max_bytes: int, max_entries: int, ttl: float) -> None:
+        self.max_bytes = max(0, int(max_bytes))
+        self.max_entries = max(0, int(max_entries))
+        self.ttl = float(ttl)
+        self._entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            payload, expires_at = entry
+            if expires_at <= monotonic():
+                self._pop(key)
+                return default
+            self._entries.move_to_end(key)
+        return pickle.loads(payload)
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> bool:
+        if self.max_entries <= 0 or self.max_bytes <= 0:
+            return False
+        try:
+            payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return False
+        if len(payload) > self.max_bytes:
+            return False
+
+        expires_at = monotonic() + (self.ttl if ttl is None else min(self.ttl, float(ttl)))
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (payload, expires_at)
+            self._size += len(payload)
+            while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._pop(oldest)
+        return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[0])
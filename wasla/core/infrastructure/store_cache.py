@@ -1,14 +1,78 @@
 from __future__ import annotations
 
-from typing import Any, Callable
+"""
+Store-scoped cache with versioned namespaces.
 
+Lookups go through two tiers:
+- L1: a per-process `LocalLRUCache` (byte-bounded, short TTL) keyed by the
+  fully versioned key, so a namespace bump makes old L1 entries unreachable.
+- L2: the shared Django cache (Redis in production).
+
+Namespace versions are memoized for the duration of a request
+(`request_started` / `request_finished`) and can be loaded for several
+namespaces with one `get_many` via `prefetch_versions`. A storefront page that
+prefetches its namespaces and hits L1 costs a single L2 round trip.
+
+`get_or_set` protects producers against stampedes: single-flight locking,
+probabilistic early refresh and, per call, stale-while-revalidate.
+"""
+
+import logging
+import math
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Iterable
+
+from django.conf import settings
 from django.core.cache import cache
+from django.db import connections, transaction
+from django.core.signals import request_finished, request_started, setting_changed
 
-from apps.core.cache import cache_get, cache_set, consume_cache_hit, cache_hit_var
+from apps.core.cache import cache_get, cache_set, cache_stats, consume_cache_hit, cache_hit_var
+from core.infrastructure.local_cache import LocalLRUCache
 
 
 DEFAULT_CACHE_TIMEOUT = 300
 
+logger = logging.getLogger("wasla.performance")
+
+# Namespaces a storefront page may read; prefetched together in one get_many.
+STOREFRONT_CACHE_NAMESPACES = (
+    "store_config",
+    "storefront_products",
+    "product_detail",
+    "variant_price",
+    "rbac_permissions",
+    "tenant_access",
+)
+
+# Per-request memo of version key -> version; None outside a request scope.
+_version_memo: ContextVar[dict[str, int] | None] = ContextVar("store_cache_versions", default=None)
+
+# (store_id, namespace) bumps deferred by `coalesced_invalidation`; None when not collecting.
+_pending_invalidations: ContextVar[set[tuple[int, str]] | None] = ContextVar("store_cache_invalidations", default=None)
+
+_l1: LocalLRUCache | None = None
+
+
+def get_l1_cache() -> LocalLRUCache | None:
+    global _l1
+    if not getattr(settings, "STORE_CACHE_L1_ENABLED", True):
+        return None
+    if _l1 is None:
+        _l1 = LocalLRUCache(
+            max_bytes=int(getattr(settings, "STORE_CACHE_L1_MAX_BYTES", 16 * 1024 * 1024)),
+            max_entries=int(getattr(settings, "STORE_CACHE_L1_MAX_ENTRIES", 5000)),
+            ttl=float(getattr(settings, "STORE_CACHE_L1_TTL_SECONDS", 5)),
+        )
+    return _l1
+
 
 class StoreCacheService:
     @staticmethod
@@ -19,39 +83,94 @@ class StoreCacheService:
     def consume_cache_hit() -> bool:
         return consume_cache_hit()
 
+    @staticmethod
+    def begin_request_scope() -> None:
+        _version_memo.set({})
+
+    @staticmethod
+    def end_request_scope() -> None:
+        _version_memo.set(None)
+
     @staticmethod
     def _version_key(*, store_id: int, namespace: str) -> str:
         return f"store:{int(store_id)}:cache_version:{namespace}"
 
+    @staticmethod
+    def get_many_versions(pairs: Iterable[tuple[int, str]]) -> dict[tuple[int, str], int]:
+        """Load versions for several (store_id, namespace) pairs with one `get_many`."""
+        memo = _version_memo.get()
+        keys = {
+            (int(store_id), namespace): StoreCacheService._version_key(store_id=int(store_id), namespace=namespace)
+            for store_id, namespace in pairs
+        }
+        versions: dict[tuple[int, str], int] = {}
+        missing = {}
+        for pair, key in keys.items():
+            if memo is not None and key in memo:
+                versions[pair] = memo[key]
+            else:
+                missing[pair] = key
+
+        if missing:
+            found = cache.get_many(list(missing.values()))
+            uninitialised = {}
+            for pair, key in missing.items():
+                value = found.get(key)
+                if not isinstance(value, int) or value < 1:
+                    value = 1
+                    uninitialised[key] = 1
+                versions[pair] = value
+                if memo is not None:
+                    memo[key] = value
+            if uninitialised:
+                cache.set_many(uninitialised, timeout=None)
+        return versions
+
+    @staticmethod
+    def prefetch_versions(*, store_id: int, namespaces: Iterable[str]) -> dict[str, int]:
+        """Load several namespace versions of one store; returns namespace -> version."""
+        versions = StoreCacheService.get_many_versions((int(store_id), namespace) for namespace in namespaces)
+        return {namespace: version for (_, namespace), version in versions.items()}
+
     @staticmethod
     def get_namespace_version(*, store_id: int, namespace: str) -> int:
-        key = StoreCacheService._version_key(store_id=int(store_id), namespace=namespace)
-        value = cache.get(key)
-        if isinstance(value, int) and value > 0:
-            return value
-        cache.set(key, 1, timeout=None)
-        return 1
+        return StoreCacheService.prefetch_versions(store_id=store_id, namespaces=[namespace])[namespace]
 
     @staticmethod
     def bump_namespace_version(*, store_id: int, namespace: str) -> int:
+        """Bump and return the new version; returns 0 when deferred by `coalesced_invalidation`."""
+        pending = _pending_invalidations.get()
+        if pending is not None:
+            pending.add((int(store_id), namespace))
+            return 0
         key = StoreCacheService._version_key(store_id=int(store_id), namespace=namespace)
         try:
-            return int(cache.incr(key, 1))
+            version = int(cache.incr(key, 1))
         except Exception:
             current = cache.get(key)
             if not isinstance(current, int) or current < 1:
                 current = 1
             current += 1
             cache.set(key, current, timeout=None)
-            return int(current)
+            version = int(current)
+        memo = _version_memo.get()
+        if memo is not None:
+            memo[key] = version
+        return version
 
     @staticmethod
-    def build_key(*, store_id: int, namespace: str, key_parts: list[str | int] | tuple[str | int, ...]) -> str:
+    def _versioned_key(*, store_id: int, namespace: str, version: int, key_parts) -> str:
         safe_parts = [str(part).strip().replace(" ", "_") for part in key_parts if str(part).strip()]
-        version = StoreCacheService.get_namespace_version(store_id=int(store_id), namespace=namespace)
         suffix = ":".join(safe_parts)
         return f"store:{int(store_id)}:{namespace}:v{version}:{suffix}" if suffix else f"store:{int(store_id)}:{namespace}:v{version}"
 
+    @staticmethod
+    def build_key(*, store_id: int, namespace: str, key_parts: list[str | int] | tuple[str | int, ...]) -> str:
+        version = StoreCacheService.get_namespace_version(store_id=int(store_id), namespace=namespace)
+        return StoreCacheService._versioned_key(
+            store_id=int(store_id), namespace=namespace, version=version, key_parts=key_parts
+        )
+
     @staticmethod
     def get_or_set(
         *,
@@ -60,11 +179,231 @@ class StoreCacheService:
         key_parts: list[str | int] | tuple[str | int, ...],
         producer: Callable[[], Any],
         timeout: int = DEFAULT_CACHE_TIMEOUT,
+        stale_ttl: int = 0,
     ) -> tuple[Any, bool]:
-        key = StoreCacheService.build_key(store_id=int(store_id), namespace=namespace, key_parts=key_parts)
-        value = cache_get(key=key.replace(f"store:{int(store_id)}:", "", 1), store_id=int(store_id))
-        if value is not None:
-            return value, True
-        value = producer()
-        cache_set(key=key.replace(f"store:{int(store_id)}:", "", 1), value=value, store_id=int(store_id), ttl=timeout)
-        return value, False
+        """
+        Return `(value, hit)` for a versioned store key.
+
+        - Only one caller per key runs `producer` (single flight); others wait
+          briefly for its result.
+        - Values are refreshed probabilistically shortly before they expire.
+        - With `stale_ttl`, values outlive `timeout` by that many seconds and the
+          previous namespace version is served while a refresh runs, so a bump
+          does not send every concurrent request to the database.
+        """
+        store_id = int(store_id)
+        stale_ttl = max(0, int(stale_ttl or 0))
+        version = StoreCacheService.get_namespace_version(store_id=store_id, namespace=namespace)
+        key = StoreCacheService._versioned_key(store_id=store_id, namespace=namespace, version=version, key_parts=key_parts)
+        l1 = get_l1_cache()
+
+        if l1 is not None:
+            value = l1.get(key)
+            if value is not None:
+                cache_hit_var.set(True)
+                cache_stats.record("l1_hit")
+                return value, True
+
+        refresh = _Refresh(store_id=store_id, key=key, producer=producer, timeout=timeout, stale_ttl=stale_ttl)
+        entry = _read_entry(key, store_id)
+        if entry is not None:
+            if l1 is not None and not entry.is_expired(time.time()):
+                l1.set(key, entry.value, ttl=timeout)
+            if entry.should_refresh(time.time()) and refresh.acquire():
+                if stale_ttl and _refresh_async():
+                    refresh.submit()
+                else:
+                    return refresh.run(), False
+            return entry.value, True
+
+        stale = None
+        if stale_ttl and version > 1:
+            previous_key = StoreCacheService._versioned_key(
+                store_id=store_id, namespace=namespace, version=version - 1, key_parts=key_parts
+            )
+            stale = _read_entry(previous_key, store_id)
+
+        if refresh.acquire():
+            if stale is not None and _refresh_async():
+                cache_stats.record("stale")
+                refresh.submit()
+                return stale.value, True
+            value = refresh.run()
+            if l1 is not None:
+                l1.set(key, value, ttl=timeout)
+            return value, False
+
+        if stale is not None:
+            cache_stats.record("stale")
+            return stale.value, True
+        entry = refresh.wait()
+        if entry is not None:
+            return entry.value, True
+        # The lock holder is slow or gone: compute without waiting any longer.
+        return refresh.run(release=False), False
+
+
+@contextmanager
+def coalesced_invalidation(using: str | None = None):
+    """
+    Collect namespace bumps made inside the block and apply each
+    (store, namespace) pair once, after the surrounding transaction commits.
+
+    Use around bulk catalog writes so N row saves cost one bump per namespace
+    instead of N. Nested blocks defer to the outermost one. Usable as a
+    decorator; nothing is bumped when the block raises (e.g. an inner
+    `transaction.atomic` rolled back), and when the block runs outside any
+    transaction the bumps apply as soon as it exits.
+    """
+    if _pending_invalidations.get() is not None:
+        yield
+        return
+    pending: set[tuple[int, str]] = set()
+    token = _pending_invalidations.set(pending)
+    try:
+        yield
+    finally:
+        _pending_invalidations.reset(token)
+    if pending:
+        transaction.on_commit(partial(_apply_invalidations, frozenset(pending)), using=using)
+
+
+def _apply_invalidations(pending: frozenset[tuple[int, str]]) -> None:
+    for store_id, namespace in sorted(pending):
+        StoreCacheService.bump_namespace_version(store_id=store_id, namespace=namespace)
+
+
+@dataclass
+class CacheEntry:
+    """Value stored in the shared cache together with its refresh metadata."""
+
+    value: Any
+    expires_at: float
+    compute_seconds: float = 0.0
+
+    def is_expired(self, now: float) -> bool:
+        return now >= self.expires_at
+
+    def should_refresh(self, now: float) -> bool:
+        # Probabilistic early expiration ("XFetch"): the closer to expiry and the
+        # slower the producer, the likelier a caller refreshes ahead of time.
+        beta = float(getattr(settings, "STORE_CACHE_EARLY_REFRESH_BETA", 1.0) or 0.0)
+        if beta <= 0:
+            return self.is_expired(now)
+        jitter = -self.compute_seconds * beta * math.log(max(random.random(), 1e-12))
+        return now + jitter >= self.expires_at
+
+
+def _read_entry(key: str, store_id: int) -> CacheEntry | None:
+    raw = cache_get(key=key.replace(f"store:{int(store_id)}:", "", 1), store_id=int(store_id))
+    if raw is None:
+        return None
+    if isinstance(raw, CacheEntry):
+        return raw
+    # Written before entries carried metadata: treat as fresh until its TTL.
+    return CacheEntry(value=raw, expires_at=float("inf"))
+
+
+def _refresh_async() -> bool:
+    return bool(getattr(settings, "STORE_CACHE_REFRESH_ASYNC", False))
+
+
+class _Refresh:
+    """Single-flight recomputation of one key guarded by a short cache lock."""
+
+    def __init__(self, *, store_id: int, key: str, producer: Callable[[], Any], timeout: int, stale_ttl: int) -> None:
+        self.store_id = store_id
+        self.key = key
+        self.producer = producer
+        self.timeout = int(timeout)
+        self.stale_ttl = stale_ttl
+        self.lock_key = f"lock:{key}"
+
+    def acquire(self) -> bool:
+        lock_ttl = int(getattr(settings, "STORE_CACHE_LOCK_TTL_SECONDS", 10) or 10)
+        try:
+            return bool(cache.add(self.lock_key, 1, timeout=lock_ttl))
+        except Exception:
+            return True
+
+    def release(self) -> None:
+        try:
+            cache.delete(self.lock_key)
+        except Exception:
+            pass
+
+    def run(self, *, release: bool = True) -> Any:
+        try:
+            started = time.monotonic()
+            value = self.producer()
+            entry = CacheEntry(
+                value=value,
+                expires_at=time.time() + self.timeout,
+                compute_seconds=time.monotonic() - started,
+            )
+            cache_set(
+                key=self.key.replace(f"store:{self.store_id}:", "", 1),
+                value=entry,
+                store_id=self.store_id,
+                ttl=self.timeout + self.stale_ttl,
+            )
+            return value
+        finally:
+            if release:
+                self.release()
+
+    def submit(self) -> None:
+        get_refresh_executor().submit(self._run_in_background)
+
+    def _run_in_background(self) -> None:
+        try:
+            self.run()
+        except Exception:
+            logger.exception("store_cache_refresh_failed", extra={"store_id": self.store_id, "cache_key": self.key})
+        finally:
+            connections.close_all()
+
+    def wait(self) -> CacheEntry | None:
+        deadline = time.monotonic() + float(getattr(settings, "STORE_CACHE_LOCK_WAIT_SECONDS", 1.0) or 0)
+        while time.monotonic() < deadline:
+            time.sleep(0.02)
+            entry = _read_entry(self.key, self.store_id)
+            if entry is not None:
+                return entry
+        return None
+
+
+_refresh_executor: ThreadPoolExecutor | None = None
+_refresh_executor_pid: int | None = None
+
+
+def get_refresh_executor() -> ThreadPoolExecutor:
+    """Small per-process pool that recomputes values served stale."""
+    global _refresh_executor, _refresh_executor_pid
+    pid = os.getpid()
+    if _refresh_executor is None or _refresh_executor_pid != pid:
+        _refresh_executor = ThreadPoolExecutor(
+            max_workers=int(getattr(settings, "STORE_CACHE_REFRESH_WORKERS", 2) or 1),
+            thread_name_prefix="store-cache-refresh",
+        )
+        _refresh_executor_pid = pid
+    return _refresh_executor
+
+
+def _begin_request_scope(**kwargs):
+    StoreCacheService.begin_request_scope()
+
+
+def _end_request_scope(**kwargs):
+    StoreCacheService.end_request_scope()
+
+
+def _reset_l1_cache(setting, **kwargs):
+    global _l1
+    if setting.startswith("STORE_CACHE_L1_"):
+        _l1 = None
+
+
+request_started.connect(_begin_request_scope, dispatch_uid="store_cache_begin_request_scope")
+request_finished.connect(_end_request_scope, dispatch_uid="store_cache_end_request_scope")
+setting_changed.connect(_reset_l1_cache, dispatch_uid="store_cache_reset_l1")
@@ -33,6 +33,9 @@ document.addEventListener('DOMContentLoaded', function() {
         return new bootstrap.Popover(popoverTriggerEl);
     });
 
+    // Page-cached pages: per-visitor cart badge and CSRF token
+    setupSharedPageState();
+
     // Handle cart add button
     setupCartHandlers();
 
@@ -46,6 +49,40 @@ document.addEventListener('DOMContentLoaded', function() {
     autoDismissAlerts();
 });
 
+/**
+ * Pages served from the shared page cache carry no visitor state: load the
+ * cart badge separately and fill emptied CSRF inputs from the csrftoken cookie.
+ */
+function fillCsrfInputs() {
+    const token = getCookie('csrftoken');
+    if (!token) {
+        return;
+    }
+    document.querySelectorAll('input[data-csrf-from-cookie]').forEach(input => {
+        input.value = token;
+    });
+}
+
+function setupSharedPageState() {
+    document.addEventListener('submit', fillCsrfInputs, true);
+
+    const badge = document.querySelector('[data-cart-count]');
+    if (!badge || !badge.dataset.cartSummaryUrl) {
+        fillCsrfInputs();
+        return;
+    }
+    fetch(badge.dataset.cartSummaryUrl, {credentials: 'same-origin', headers: {'Accept': 'application/json'}})
+        .then(response => response.ok ? response.json() : null)
+        .then(summary => {
+            if (summary) {
+                badge.textContent = summary.count;
+                badge.hidden = !summary.count;
+            }
+        })
+        .catch(() => {})
+        .finally(fillCsrfInputs);
+}
+
 /**
  * Setup cart-related event handlers
  */